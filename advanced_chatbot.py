@@ -16,7 +16,19 @@ os.environ.setdefault("GRPC_VERBOSITY", "NONE")
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+from src.config import SETTINGS
+from src.query import get_query_cache_stats, warm_query_cache
 from src.rag_query import run_rag_query
+from src.structured_query import warm_structured_engine
+
+# Example questions shown in the help text; also pre-embedded at startup
+EXAMPLE_QUESTIONS = [
+    "What is the bond pricing formula?",
+    "How do I implement a long-short strategy?",
+    "What are the key leading indicators?",
+    "How do I calculate position sizing?",
+    "What are the risks of portfolio management?",
+]
 
 
 class RAGChatbot:
@@ -107,11 +119,8 @@ class RAGChatbot:
         print("  • Type 'clear' to clear the screen")
         print("  • Type 'quit' or 'exit' to end the session")
         print("\nEXAMPLE QUESTIONS:")
-        print("  • What is the bond pricing formula?")
-        print("  • How do I implement a long-short strategy?")
-        print("  • What are the key leading indicators?")
-        print("  • How do I calculate position sizing?")
-        print("  • What are the risks of portfolio management?")
+        for question in EXAMPLE_QUESTIONS:
+            print(f"  • {question}")
     
     def print_history(self):
         """Print conversation history."""
@@ -136,6 +145,9 @@ class RAGChatbot:
         print(f"Session duration: {session_duration}")
         print(f"Average response time: {session_duration.total_seconds() / max(self.question_count, 1):.1f}s")
         print(f"Conversation entries: {len(self.conversation_history)}")
+        cache = get_query_cache_stats()
+        print(f"Query cache: {cache['hits']} hits / {cache['misses']} misses "
+              f"(hit rate {cache['hit_rate']:.0%}, {cache['size']} cached)")
     
     def clear_screen(self):
         """Clear the terminal screen."""
@@ -168,28 +180,26 @@ class RAGChatbot:
             'sources': sources
         })
     
-    def get_context_from_history(self, current_question):
-        """Get relevant context from conversation history."""
+    def get_context_from_history(self):
+        """Get relevant context from conversation history (None without history)."""
         if not self.conversation_history:
-            return current_question
+            return None
         
-        # Add recent context to the question
         recent_questions = [entry['question'] for entry in self.conversation_history[-3:]]
-        context = f"Previous questions: {'; '.join(recent_questions)}\n\nCurrent question: {current_question}"
-        return context
+        return f"Previous questions: {'; '.join(recent_questions)}"
     
     def process_question(self, question):
         """Process a user question."""
         self.question_count += 1
         
-        # Add context from conversation history
-        contextual_question = self.get_context_from_history(question)
+        # History goes to generation only; routing and retrieval use the bare question
+        history = self.get_context_from_history()
         
         print(f"\nProcessing question {self.question_count}: '{question}'")
         print("Searching knowledge base...")
         
         try:
-            result = run_rag_query(contextual_question, top_k=7, collection="ptm_knowledge_base")
+            result = run_rag_query(question, top_k=7, collection="ptm_knowledge_base", history=history)
             
             if result.success:
                 self.format_response(question, result.response, result.sources)
@@ -218,6 +228,16 @@ class RAGChatbot:
         self.print_welcome()
         self.print_help()
         
+        if SETTINGS.structured_routing:
+            # Loads the time-series store while the user types the first question
+            warm_structured_engine()
+        
+        if SETTINGS.query_cache_warmup:
+            try:
+                warm_query_cache(EXAMPLE_QUESTIONS)
+            except Exception as e:
+                print(f"\n[WARNING] Could not pre-embed example questions: {e}")
+        
         print("\nReady to help! What would you like to know?")
         
         while True:
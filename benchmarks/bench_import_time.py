@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark and guard for the ``src`` package.
+
+Measures cold-start time of lightweight entry points in fresh interpreters and
+fails if any of them exceeds the budget or pulls in the heavy ML stack
+(sentence-transformers/torch, qdrant-client, pandas, Gemini).
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --budget 0.5 --runs 7
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that must not be imported by lightweight commands
+HEAVY_MODULES = [
+    "torch",
+    "sentence_transformers",
+    "qdrant_client",
+    "pandas",
+    "google.generativeai",
+]
+
+# (label, python code) pairs executed in a fresh interpreter
+SCENARIOS = [
+    ("import src", "import src"),
+    ("import src.query", "import src.query"),
+    ("import src.rag_query", "import src.rag_query"),
+    ("src.SETTINGS access", "import src; src.SETTINGS"),
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+exec({code!r})
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+
+def run_probe(code: str) -> dict:
+    """Run a code snippet in a fresh interpreter and report import time and heavy modules."""
+    probe = PROBE.format(code=code, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def time_cli_help(module: str) -> float:
+    """Wall-clock time of ``python -m <module> --help`` including interpreter start-up."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", module, "--help"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark and guard import time of the src package")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Fresh-interpreter runs per scenario")
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="Maximum allowed seconds for any lightweight command")
+    args = parser.parse_args()
+
+    failures = []
+
+    print(f"[BENCH] Import time ({args.runs} runs, budget {args.budget:.2f}s)")
+    for label, code in SCENARIOS:
+        samples = [run_probe(code) for _ in range(args.runs)]
+        times = [s["elapsed"] for s in samples]
+        heavy = sorted({m for s in samples for m in s["heavy"]})
+        median = statistics.median(times)
+        print(f"   {label:<24} median={median * 1000:7.1f}ms  min={min(times) * 1000:7.1f}ms"
+              f"  heavy={heavy or 'none'}")
+        if heavy:
+            failures.append(f"{label} imported heavy modules: {', '.join(heavy)}")
+        if median > args.budget:
+            failures.append(f"{label} took {median:.3f}s (budget {args.budget:.2f}s)")
+
+    for module in ("src.query", "src.rag_query"):
+        times = [time_cli_help(module) for _ in range(args.runs)]
+        median = statistics.median(times)
+        label = f"-m {module} --help"
+        print(f"   {label:<24} median={median * 1000:7.1f}ms  (incl. interpreter start-up)")
+        if median > args.budget:
+            failures.append(f"python -m {module} --help took {median:.3f}s (budget {args.budget:.2f}s)")
+
+    if failures:
+        print("\n[FAIL] Import-time guard:")
+        for failure in failures:
+            print(f"   - {failure}")
+        return 1
+
+    print("\n[OK] All lightweight commands are within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Per-query latency benchmark for embedded versus server Qdrant.
+
+Loads the same vectors into an in-memory embedded client, an embedded client
+with on-disk storage and (if reachable) the Qdrant server from QDRANT_HOST /
+QDRANT_PORT, then times ``index_qdrant.search`` for the same queries in each.
+The server timings include the HTTP round-trip that embedded mode avoids.
+
+Usage:
+    python benchmarks/bench_qdrant_modes.py --points 20000 --queries 500
+    python benchmarks/bench_qdrant_modes.py --skip-server
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import SETTINGS
+from src.index_qdrant import connect, delete_collection, recreate_collection, search, upsert_points
+
+COLLECTION = "bench_qdrant_modes"
+
+
+def synthetic_vectors(n: int, dim: int, seed: int = 7) -> np.ndarray:
+    """Clustered, L2-normalized vectors that roughly mimic sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(n // 200, 8), dim))
+    vectors = centers[rng.integers(0, len(centers), n)] + 0.6 * rng.normal(size=(n, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype("float32")
+
+
+def load(client: Any, data: np.ndarray) -> float:
+    """Create the benchmark collection and upload the vectors; returns seconds taken."""
+    started = time.perf_counter()
+    recreate_collection(client, COLLECTION, data.shape[1])
+    for start in range(0, len(data), 512):
+        block = data[start:start + 512]
+        upsert_points(client, COLLECTION, block.tolist(),
+                      [{"id": start + i + 1, "video_number": (start + i) % 40} for i in range(len(block))])
+    return time.perf_counter() - started
+
+
+def time_queries(client: Any, queries: np.ndarray, top_k: int,
+                 filters: Optional[Dict[str, Any]] = None) -> List[float]:
+    """Search latency in milliseconds for each query (after one warm-up call)."""
+    search(client, COLLECTION, queries[0].tolist(), top_k, filters)
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        search(client, COLLECTION, query.tolist(), top_k, filters)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return sorted(latencies)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark embedded versus server Qdrant query latency")
+    parser.add_argument("--points", type=int, default=10000, help="Number of vectors")
+    parser.add_argument("--dim", type=int, default=768, help="Vector dimension")
+    parser.add_argument("--queries", type=int, default=300, help="Number of queries")
+    parser.add_argument("--top-k", type=int, default=SETTINGS.top_k, help="Results per query")
+    parser.add_argument("--skip-server", action="store_true", help="Only benchmark embedded modes")
+    args = parser.parse_args()
+
+    data = synthetic_vectors(args.points, args.dim)
+    rng = np.random.default_rng(11)
+    queries = data[rng.choice(len(data), size=min(args.queries, len(data)), replace=False)]
+
+    with tempfile.TemporaryDirectory(prefix="qdrant_embedded_") as storage:
+        modes = [("embedded :memory:", lambda: connect("", 0, path=":memory:")),
+                 ("embedded on-disk", lambda: connect("", 0, path=storage))]
+        if not args.skip_server:
+            modes.append((f"server {SETTINGS.qdrant_host}:{SETTINGS.qdrant_port}",
+                           lambda: connect(SETTINGS.qdrant_host, SETTINGS.qdrant_port, SETTINGS.qdrant_api_key)))
+
+        print(f"[BENCH] {len(data)} vectors x {data.shape[1]} dims, {len(queries)} queries, top_k={args.top_k}")
+        print(f"   {'mode':<28}{'load':>9}{'p50':>9}{'p95':>9}{'filtered p50':>14}")
+
+        for label, make_client in modes:
+            try:
+                client = make_client()
+            except ConnectionError as e:
+                print(f"   {label:<28}[SKIPPED] {e}")
+                continue
+
+            load_seconds = load(client, data)
+            plain = time_queries(client, queries, args.top_k)
+            filtered = time_queries(client, queries, args.top_k, {"video_number": {"gte": 10, "lte": 19}})
+            delete_collection(client, COLLECTION)
+
+            print(f"   {label:<28}{load_seconds:>8.1f}s{statistics.median(plain):>7.2f}ms"
+                  f"{plain[int(0.95 * (len(plain) - 1))]:>7.2f}ms{statistics.median(filtered):>12.2f}ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
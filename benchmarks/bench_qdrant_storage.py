@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Memory-versus-latency benchmark for Qdrant collection storage options.
+
+Builds one throw-away collection per storage configuration (plain float32,
+on-disk vectors, int8 scalar and binary quantization with rescoring), then
+reports estimated resident memory, search latency and recall@k against exact
+NumPy search. Requires a running Qdrant server (QDRANT_HOST/QDRANT_PORT).
+
+Usage:
+    python benchmarks/bench_qdrant_storage.py --points 20000 --queries 200
+    python benchmarks/bench_qdrant_storage.py --source collection --collection ptm_knowledge_base
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import SETTINGS
+from src.index_qdrant import connect, delete_collection, recreate_collection, search, upsert_points
+
+# (label, recreate_collection kwargs, search kwargs)
+CONFIGURATIONS = [
+    ("float32 / RAM", {"quantization": "none", "on_disk": False}, {}),
+    ("float32 / on_disk", {"quantization": "none", "on_disk": True}, {}),
+    ("int8 scalar / RAM", {"quantization": "scalar", "on_disk": False},
+     {"rescore": True, "oversampling": 1.5}),
+    ("int8 scalar / on_disk", {"quantization": "scalar", "on_disk": True},
+     {"rescore": True, "oversampling": 1.5}),
+    ("binary / on_disk", {"quantization": "binary", "on_disk": True},
+     {"rescore": True, "oversampling": 3.0}),
+]
+
+
+def synthetic_vectors(n: int, dim: int, seed: int = 7) -> np.ndarray:
+    """Clustered, L2-normalized vectors that roughly mimic sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(n // 200, 8), dim))
+    vectors = centers[rng.integers(0, len(centers), n)] + 0.6 * rng.normal(size=(n, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype("float32")
+
+
+def collection_vectors(client: Any, collection: str, limit: int) -> np.ndarray:
+    """Sample stored vectors from an existing collection."""
+    vectors: List[List[float]] = []
+    offset = None
+    while len(vectors) < limit:
+        points, offset = client.scroll(
+            collection_name=collection, limit=min(256, limit - len(vectors)),
+            offset=offset, with_vectors=True, with_payload=False,
+        )
+        vectors.extend(p.vector for p in points)
+        if offset is None:
+            break
+    return np.asarray(vectors, dtype="float32")
+
+
+def estimate_memory(n: int, dim: int, quantization: str, on_disk: bool, hnsw_m: int) -> Dict[str, float]:
+    """Estimate resident bytes for vectors, quantized codes and the HNSW graph."""
+    original = 0 if on_disk else n * dim * 4
+    quantized = {"none": 0, "scalar": n * dim, "binary": n * dim / 8}[quantization]
+    graph = n * hnsw_m * 2 * 4  # level-0 links dominate
+    return {"vectors": original, "quantized": quantized, "graph": graph,
+            "total": original + quantized + graph}
+
+
+def wait_for_index(client: Any, collection: str, timeout: float = 300.0) -> None:
+    """Block until the optimizer has finished building the index."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = client.get_collection(collection)
+        if str(info.status).lower().endswith("green"):
+            return
+        time.sleep(0.5)
+    print(f"   [WARNING] {collection} still indexing after {timeout:.0f}s")
+
+
+def run_configuration(
+    client: Any,
+    label: str,
+    create_kwargs: Dict[str, Any],
+    search_kwargs: Dict[str, Any],
+    data: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    top_k: int,
+    hnsw_ef: Optional[int],
+    hnsw_m: int,
+    keep: bool,
+) -> Dict[str, Any]:
+    from qdrant_client.http import models as rest
+
+    name = "bench_storage_" + "".join(c if c.isalnum() else "_" for c in label.lower())
+    recreate_collection(client, name, data.shape[1], hnsw_m=hnsw_m, **create_kwargs)
+    # Index even small benchmark collections so HNSW is actually exercised
+    client.update_collection(name, optimizers_config=rest.OptimizersConfigDiff(indexing_threshold=1000))
+
+    for start in range(0, len(data), 512):
+        block = data[start:start + 512]
+        upsert_points(client, name, block.tolist(),
+                      [{"id": start + i + 1} for i in range(len(block))])
+    wait_for_index(client, name)
+
+    latencies = []
+    recalls = []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        hits = search(client, name, query.tolist(), top_k, hnsw_ef=hnsw_ef, **search_kwargs)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found = {h.id - 1 for h in hits}
+        recalls.append(len(found & set(expected.tolist())) / top_k)
+
+    if not keep:
+        delete_collection(client, name)
+
+    latencies.sort()
+    memory = estimate_memory(len(data), data.shape[1], create_kwargs["quantization"],
+                             create_kwargs["on_disk"], hnsw_m)
+    return {
+        "label": label,
+        "memory_mb": memory["total"] / 2**20,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))],
+        "recall": float(np.mean(recalls)),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Qdrant quantization, on_disk and HNSW options")
+    parser.add_argument("--source", choices=["synthetic", "collection"], default="synthetic",
+                        help="Use synthetic vectors or sample an existing collection")
+    parser.add_argument("--collection", type=str, default=SETTINGS.collection,
+                        help="Collection to sample when --source collection")
+    parser.add_argument("--points", type=int, default=20000, help="Number of vectors")
+    parser.add_argument("--dim", type=int, default=768, help="Dimension of synthetic vectors")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--top-k", type=int, default=10, help="Results per query")
+    parser.add_argument("--hnsw-m", type=int, default=SETTINGS.qdrant_hnsw_m or 16, help="HNSW m")
+    parser.add_argument("--hnsw-ef", type=int, default=SETTINGS.qdrant_hnsw_ef, help="Query-time hnsw_ef")
+    parser.add_argument("--keep", action="store_true", help="Keep benchmark collections")
+    args = parser.parse_args()
+
+    client = connect(SETTINGS.qdrant_host, SETTINGS.qdrant_port, SETTINGS.qdrant_api_key)
+
+    if args.source == "collection":
+        data = collection_vectors(client, args.collection, args.points)
+    else:
+        data = synthetic_vectors(args.points, args.dim)
+
+    rng = np.random.default_rng(11)
+    queries = data[rng.choice(len(data), size=min(args.queries, len(data)), replace=False)]
+    queries = queries + 0.05 * rng.normal(size=queries.shape).astype("float32")
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    truth = np.argsort(-(queries @ data.T), axis=1)[:, :args.top_k]
+
+    print(f"[BENCH] {len(data)} vectors x {data.shape[1]} dims, {len(queries)} queries, "
+          f"top_k={args.top_k}, hnsw_m={args.hnsw_m}, hnsw_ef={args.hnsw_ef or 'default'}")
+    print(f"   {'configuration':<24}{'est. RAM':>10}{'p50':>9}{'p95':>9}{'recall@k':>10}")
+
+    for label, create_kwargs, search_kwargs in CONFIGURATIONS:
+        row = run_configuration(client, label, create_kwargs, search_kwargs, data, queries, truth,
+                                args.top_k, args.hnsw_ef, args.hnsw_m, args.keep)
+        print(f"   {row['label']:<24}{row['memory_mb']:>8.1f}MB{row['p50_ms']:>7.2f}ms"
+              f"{row['p95_ms']:>7.2f}ms{row['recall']:>10.3f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
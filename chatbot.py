@@ -14,7 +14,18 @@ os.environ.setdefault("GRPC_VERBOSITY", "NONE")
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+from src.config import SETTINGS
+from src.query import warm_query_cache
 from src.rag_query import run_rag_query
+from src.structured_query import warm_structured_engine
+
+# Example questions shown in the help text; also pre-embedded at startup
+EXAMPLE_QUESTIONS = [
+    "What is the bond pricing formula?",
+    "How do I implement a long-short strategy?",
+    "What are the key leading indicators?",
+    "How do I calculate position sizing?",
+]
 
 
 def print_welcome():
@@ -41,10 +52,8 @@ def print_help():
     print("  • Type 'quit' or 'exit' to end the session")
     print("  • Type 'clear' to clear the screen")
     print("\nEXAMPLE QUESTIONS:")
-    print("  • What is the bond pricing formula?")
-    print("  • How do I implement a long-short strategy?")
-    print("  • What are the key leading indicators?")
-    print("  • How do I calculate position sizing?")
+    for question in EXAMPLE_QUESTIONS:
+        print(f"  • {question}")
 
 
 def clear_screen():
@@ -84,6 +93,16 @@ def main():
     print_welcome()
     print_help()
     
+    if SETTINGS.structured_routing:
+        # Loads the time-series store while the user types the first question
+        warm_structured_engine()
+    
+    if SETTINGS.query_cache_warmup:
+        try:
+            warm_query_cache(EXAMPLE_QUESTIONS)
+        except Exception as e:
+            print(f"\n[WARNING] Could not pre-embed example questions: {e}")
+    
     print("\nReady to help! What would you like to know?")
     
     while True:
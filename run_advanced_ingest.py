@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Script to run the advanced ingestion process with proper PPTX, DOCX, and PDF parsing.
-Excludes CSV and Excel files as requested.
+Excel workbooks are ingested as per-sheet summaries; CSV files are excluded.
 """
 
 import sys
@@ -21,8 +21,8 @@ def main():
     print("  [OK] PDF files (with pdfplumber)")
     print("  [OK] PPTX files (with python-pptx)")
     print("  [OK] DOCX files (with python-docx)")
+    print("  [OK] Excel files (per-sheet summaries, read-only streaming)")
     print("  [SKIP] CSV files (excluded)")
-    print("  [SKIP] Excel files (excluded)")
     print("=" * 60)
     
     try:
@@ -38,12 +38,14 @@ def main():
         print(f"   - Total chunks: {result.get('total_chunks', 0)}")
         print(f"   - Files processed: {result.get('processed_files', 0)}")
         print(f"   - Successful batches: {result.get('successful_batches', 0)}")
+        print(f"   - Live collection: {result.get('collection')}")
         
         print(f"\n[INFO] Advanced processing includes:")
         print(f"   - Text files (transcripts)")
         print(f"   - PDF files (with proper text and table extraction)")
         print(f"   - PPTX files (with slide and table extraction)")
         print(f"   - DOCX files (with paragraph and table extraction)")
+        print(f"   - Excel workbooks (one summary per sheet with column statistics)")
         print(f"   - Rich metadata extraction for all file types")
         
     except Exception as e:
@@ -8,8 +8,17 @@ Main components:
 - config: Configuration management with validation
 - embeddings: Text embedding generation using SentenceTransformers
 - chunkers: Text chunking and Excel processing utilities
+- spreadsheets: Streaming per-sheet workbook summaries
+- dedup: MinHash/LSH near-duplicate chunk detection for ingest
+- transcript_compaction: Transcript filler and repeat removal with an offset map
+- timeseries_store: Memory-mapped cache of the KB's date-indexed series
+- correlation: Vectorized rolling and lagged correlations across series
+- yield_curve: Yield-curve spreads, inversion episodes and real rates
+- structured_query: Routes numeric time-series questions to the KB tables
 - utils: General utility functions for file handling and data processing
 - index_qdrant: Qdrant vector database operations
+- summary_index: Per-video and per-document summary vectors for two-stage retrieval
+- reranker: Budgeted cross-encoder reranking with a score cache
 - ingest: Knowledge base ingestion pipeline
 - query: Semantic search query interface
 
@@ -28,20 +37,53 @@ __version__ = "1.0.0"
 __author__ = "Knowledge Base System"
 __description__ = "Semantic vector search system for knowledge bases"
 
-# Import main classes and functions for easy access
-from .config import SETTINGS, Settings
-from .embeddings import EmbeddingModel
-from .chunkers import Chunk, chunk_text, excel_to_text_summaries
-from .utils import (
-    read_text, list_classes, sha1, save_json, load_json, 
-    batched, ensure_directory, get_file_size
-)
-from .index_qdrant import (
-    connect, recreate_collection, upsert_points, search,
-    get_collection_info, delete_collection
-)
-from .advanced_ingest import ingest_advanced
-from .query import QueryResult, run_query, run_query_with_stats, pretty_print
+# Public names are resolved lazily (PEP 562) so that ``import src`` and
+# lightweight commands such as ``python -m src.query --help`` do not pay for
+# sentence-transformers/torch, qdrant-client or pandas until they are used.
+_LAZY_ATTRIBUTES = {
+    "SETTINGS": "config",
+    "Settings": "config",
+    "EmbeddingModel": "embeddings",
+    "Chunk": "chunkers",
+    "chunk_text": "chunkers",
+    "excel_to_text_summaries": "chunkers",
+    "read_text": "utils",
+    "list_classes": "utils",
+    "sha1": "utils",
+    "save_json": "utils",
+    "load_json": "utils",
+    "batched": "utils",
+    "ensure_directory": "utils",
+    "get_file_size": "utils",
+    "connect": "index_qdrant",
+    "recreate_collection": "index_qdrant",
+    "upsert_points": "index_qdrant",
+    "search": "index_qdrant",
+    "get_collection_info": "index_qdrant",
+    "delete_collection": "index_qdrant",
+    "ingest_advanced": "advanced_ingest",
+    "QueryResult": "query",
+    "run_query": "query",
+    "run_query_with_stats": "query",
+    "pretty_print": "query",
+}
+
+
+def __getattr__(name: str):
+    """Import the submodule that defines ``name`` on first access."""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    import importlib
+    
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
 __all__ = [
     # Configuration
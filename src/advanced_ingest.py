@@ -1,12 +1,15 @@
 """
 Advanced ingestion module with proper PPTX, DOCX, and PDF parsing.
-Excludes CSV and Excel files as requested.
+Excel workbooks are ingested as one summary chunk per sheet; CSV files are excluded.
 """
 
 from __future__ import annotations
 import argparse
 import logging
+import re
 import sys
+import time
+from concurrent.futures import Executor
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -20,12 +23,27 @@ except ImportError as e:
 from .config import SETTINGS
 from .utils import batched, sha1
 from .chunkers import Chunk, chunk_text
-from .embeddings import EmbeddingModel
-from .index_qdrant import connect, recreate_collection, upsert_points
-from .file_parsers import parse_file_by_type, get_file_metadata
+from .embeddings import EmbeddingModel, model_fingerprint
+from .index_qdrant import (
+    collection_options, connect_from_settings, create_payload_indexes, gc_generations, index_payload,
+    list_generations, recreate_collection, resolve_alias, swap_alias, upsert_points, validate_collection, versioned_collection_name
+)
+from .chunk_store import ChunkStore
+from .dedup import find_duplicates, merge_duplicates
+from .generations import generation_paths, remove_generation_files, save_manifest
+from .transcript_compaction import chunk_spans, compact_transcript
+from .ingest_journal import IngestJournal, file_signature
+from .sparse_index import BM25Index
+from .summary_index import SummaryBuilder
+from .file_parsers import parse_file_segments, get_file_metadata
+from .parse_worker import IsolatedParser, ParseQuarantine
+from .spreadsheets import SPREADSHEET_EXTENSIONS, sheet_executor, summarize_workbook
 
 logger = logging.getLogger(__name__)
 
+# chunk_text drops pieces shorter than this; shorter PDF pages are merged into the next page
+_MIN_CHUNK_WORDS = 10
+
 def build_payload(base_meta: Dict[str, Any], text: str, idx: int) -> Dict[str, Any]:
     """Build payload for Qdrant point with proper ID generation."""
     if not isinstance(text, str):
@@ -34,11 +52,13 @@ def build_payload(base_meta: Dict[str, Any], text: str, idx: int) -> Dict[str, A
     if not isinstance(base_meta, dict):
         raise TypeError("Base metadata must be a dictionary")
     
-    # Create a unique ID using class_id, index, and text hash
+    # Create a unique ID using class_id, source file (and sheet), index, and text hash;
+    # the text prefix alone cannot tell apart files or sheets that start alike
     class_id = base_meta.get('class_id', 'unknown')
+    source = "/".join(str(base_meta[key]) for key in ("file_name", "sheet") if key in base_meta)
     text_hash = sha1(text[:64])[:8]  # Use first 8 chars of hash
     # Convert to integer for Qdrant compatibility
-    unique_id = int(sha1(f"{class_id}-{idx}-{text_hash}")[:16], 16)
+    unique_id = int(sha1(f"{class_id}-{source}-{idx}-{text_hash}")[:16], 16)
     
     return {
         "id": unique_id,
@@ -48,19 +68,78 @@ def build_payload(base_meta: Dict[str, Any], text: str, idx: int) -> Dict[str, A
         "word_count": len(text.split())
     }
 
-def process_advanced_file(file_path: Path, class_id: str, video_number: str, settings: Any) -> List[tuple[str, Dict[str, Any]]]:
-    """Process a single file using advanced parsers."""
+def video_fields(video_label: str) -> Dict[str, Any]:
+    """
+    Build filterable video fields from a video label such as "7" or "33a".
+    
+    ``video_number`` is stored as an integer so it can back an integer payload
+    index and range filters; the original label is kept in ``video_label``.
+    """
+    digits = re.match(r"\d+", video_label or "")
+    fields: Dict[str, Any] = {"video_label": video_label}
+    if digits:
+        fields["video_number"] = int(digits.group())
+    return fields
+
+def _parse_document(
+    file_path: Path,
+    parser: Optional[IsolatedParser]
+) -> Optional[tuple[List[tuple[str, Dict[str, Any]]], Dict[str, Any]]]:
+    """Parse a document into segments, in the isolated worker if one is given, otherwise in-process."""
+    if parser is None:
+        return parse_file_segments(file_path), get_file_metadata(file_path)
+    return parser.parse_or_skip(file_path)
+
+def _merge_short_segments(
+    segments: List[tuple[str, Dict[str, Any]]],
+    min_words: int
+) -> List[tuple[str, Dict[str, Any]]]:
+    """
+    Join segments too short to form a chunk (a title page, say) onto the next one.
+    
+    A merged segment keeps the first page number and counts the tables of all its pages.
+    """
+    merged: List[tuple[str, Dict[str, Any]]] = []
+    pending: Optional[tuple[str, Dict[str, Any]]] = None
+    for text, meta in segments:
+        if pending is not None:
+            text = f"{pending[0]}\n\n{text}"
+            meta = {**meta, **pending[1], "table_count": pending[1].get("table_count", 0) + meta.get("table_count", 0)}
+            pending = None
+        if len(text.split()) < min_words:
+            pending = (text, meta)
+        else:
+            merged.append((text, meta))
+    if pending is not None:
+        if merged:
+            last_text, last_meta = merged.pop()
+            pending = (
+                f"{last_text}\n\n{pending[0]}",
+                {**last_meta, "table_count": last_meta.get("table_count", 0) + pending[1].get("table_count", 0)}
+            )
+        merged.append(pending)
+    return merged
+
+def process_advanced_file(
+    file_path: Path,
+    class_id: str,
+    video_number: str,
+    settings: Any,
+    parser: Optional[IsolatedParser] = None
+) -> List[tuple[str, Dict[str, Any]]]:
+    """Process a single file using advanced parsers (isolated in ``parser`` if given)."""
     chunks_data = []
     
     try:
         logger.debug(f"Processing file: {file_path}")
         
         # Parse the file based on its type
-        file_text = parse_file_by_type(file_path)
+        parsed = _parse_document(file_path, parser)
+        if parsed is None:
+            return chunks_data
+        segments, metadata = parsed
         
-        if file_text.strip():
-            # Get file metadata
-            metadata = get_file_metadata(file_path)
+        if segments:
             
             # Determine source type
             file_extension = file_path.suffix.lower()
@@ -71,24 +150,28 @@ def process_advanced_file(file_path: Path, class_id: str, video_number: str, set
                 "class_id": class_id,
                 "source": source_type,
                 "file_path": str(file_path),
-                "video_number": video_number,
+                **video_fields(video_number),
                 "file_name": file_path.name,
                 "file_size": metadata.get("file_size", 0),
                 **metadata  # Include all metadata
             }
             
-            # Chunk the text
-            file_chunks = chunk_text(
-                file_text,
-                max_words=settings.max_chunk_words,
-                overlap_words=settings.chunk_overlap_words,
-                base_meta=base_meta,
-            )
-            
-            for i, chunk in enumerate(file_chunks):
-                payload = build_payload(chunk.metadata, chunk.text, i)
-                chunks_data.append((chunk.text, payload))
-                logger.debug(f"Created {source_type} chunk {i} for {class_id}")
+            # Chunk each segment on its own so PDF chunks keep their page number and table count;
+            # chunk indices run on across segments for neighbor expansion
+            for segment_text, segment_meta in _merge_short_segments(segments, _MIN_CHUNK_WORDS):
+                file_chunks = chunk_text(
+                    segment_text,
+                    max_words=settings.max_chunk_words,
+                    overlap_words=settings.chunk_overlap_words,
+                    base_meta={**base_meta, **segment_meta},
+                    min_words=_MIN_CHUNK_WORDS,
+                )
+                
+                for chunk in file_chunks:
+                    i = len(chunks_data)
+                    payload = build_payload({**chunk.metadata, "chunk_index": i}, chunk.text, i)
+                    chunks_data.append((chunk.text, payload))
+                    logger.debug(f"Created {source_type} chunk {i} for {class_id}")
         else:
             logger.warning(f"File {file_path} produced no text content")
             
@@ -97,7 +180,45 @@ def process_advanced_file(file_path: Path, class_id: str, video_number: str, set
     
     return chunks_data
 
-def process_text_file(text_file: Path, video_folder: Optional[Path], settings: Any) -> List[tuple[str, Dict[str, Any]]]:
+def process_spreadsheet_file(
+    file_path: Path,
+    class_id: str,
+    video_number: str,
+    settings: Any,
+    sheet_pool: Optional[Executor] = None
+) -> List[tuple[str, Dict[str, Any]]]:
+    """Summarize each sheet of a workbook into one chunk (sheets in parallel on ``sheet_pool``)."""
+    chunks_data = []
+    
+    try:
+        logger.debug(f"Processing workbook: {file_path}")
+        base_meta = {
+            "class_id": class_id,
+            "file_path": str(file_path),
+            **video_fields(video_number),
+            "file_name": file_path.name,
+            "file_size": file_path.stat().st_size,
+            "file_extension": file_path.suffix.lower(),
+        }
+        
+        for chunk in summarize_workbook(file_path, base_meta, executor=sheet_pool):
+            sheet_index = chunk.metadata["sheet_index"]
+            payload = build_payload({**chunk.metadata, "chunk_index": sheet_index}, chunk.text, sheet_index)
+            chunks_data.append((chunk.text, payload))
+            logger.debug(f"Created sheet chunk '{chunk.metadata['sheet']}' for {class_id}")
+    
+    except Exception as e:
+        logger.error(f"Error processing workbook {file_path}: {e}")
+    
+    return chunks_data
+
+def process_text_file(
+    text_file: Path,
+    video_folder: Optional[Path],
+    settings: Any,
+    parser: Optional[IsolatedParser] = None,
+    sheet_pool: Optional[Executor] = None
+) -> List[tuple[str, Dict[str, Any]]]:
     """Process a single text file and its associated video folder."""
     # Extract video number from filename
     filename = text_file.stem
@@ -114,19 +235,34 @@ def process_text_file(text_file: Path, video_folder: Optional[Path], settings: A
         with open(text_file, 'r', encoding='utf-8', errors='ignore') as f:
             raw_text = f.read()
         
+        # Strip speech-to-text filler; chunks keep their character span in the raw file
+        compacted = None
+        if settings.transcript_compaction and raw_text.strip():
+            compacted = compact_transcript(raw_text, settings.transcript_min_repeat_words)
+            logger.debug(
+                f"Compacted {text_file.name}: {compacted.original_words} -> {compacted.words} words "
+                f"({compacted.removed})"
+            )
+        
         if raw_text.strip():
             t_chunks = chunk_text(
-                raw_text,
+                compacted.text if compacted is not None else raw_text,
                 max_words=settings.max_chunk_words,
                 overlap_words=settings.chunk_overlap_words,
                 base_meta={
                     "class_id": class_id, 
                     "source": "transcript",
                     "file_path": str(text_file),
-                    "video_number": video_number
+                    "file_name": text_file.name,
+                    **video_fields(video_number)
                 },
             )
             
+            if compacted is not None:
+                for chunk, span in zip(t_chunks, chunk_spans(compacted, [c.text for c in t_chunks])):
+                    if span is not None:
+                        chunk.metadata["original_span"] = list(span)
+            
             for i, chunk in enumerate(t_chunks):
                 payload = build_payload(chunk.metadata, chunk.text, i)
                 chunks_data.append((chunk.text, payload))
@@ -137,25 +273,30 @@ def process_text_file(text_file: Path, video_folder: Optional[Path], settings: A
     except Exception as e:
         logger.error(f"Error processing text file {text_file}: {e}")
     
-    # Process supporting files in video folder (PDF, PPTX, DOCX only)
+    # Process supporting files in video folder (PDF, PPTX, DOCX and Excel workbooks)
     if video_folder and video_folder.exists():
         try:
             logger.debug(f"Processing video folder: {video_folder}")
             
             # Process PDF files
             for pdf_file in video_folder.glob("*.pdf"):
-                pdf_chunks = process_advanced_file(pdf_file, class_id, video_number, settings)
+                pdf_chunks = process_advanced_file(pdf_file, class_id, video_number, settings, parser)
                 chunks_data.extend(pdf_chunks)
             
             # Process PPTX files
             for pptx_file in video_folder.glob("*.pptx"):
-                pptx_chunks = process_advanced_file(pptx_file, class_id, video_number, settings)
+                pptx_chunks = process_advanced_file(pptx_file, class_id, video_number, settings, parser)
                 chunks_data.extend(pptx_chunks)
             
             # Process DOCX files
             for docx_file in video_folder.glob("*.docx"):
-                docx_chunks = process_advanced_file(docx_file, class_id, video_number, settings)
+                docx_chunks = process_advanced_file(docx_file, class_id, video_number, settings, parser)
                 chunks_data.extend(docx_chunks)
+            
+            # Process Excel workbooks (one summary chunk per sheet)
+            for workbook in _spreadsheet_files(video_folder, settings):
+                sheet_chunks = process_spreadsheet_file(workbook, class_id, video_number, settings, sheet_pool)
+                chunks_data.extend(sheet_chunks)
                     
         except Exception as e:
             logger.error(f"Error processing video folder {video_folder}: {e}")
@@ -165,14 +306,17 @@ def process_text_file(text_file: Path, video_folder: Optional[Path], settings: A
     
     return chunks_data
 
-def process_trade_template_file(template_file: Path, settings) -> List[tuple]:
+def process_trade_template_file(template_file: Path, settings, parser: Optional[IsolatedParser] = None) -> List[tuple]:
     """Process a trade template file (DOCX/DOC) and return chunks."""
     chunks_data = []
     
     try:
         # Extract text content from the template file
         if template_file.suffix.lower() in ['.docx', '.doc']:
-            text_content = parse_file_by_type(template_file)
+            parsed = _parse_document(template_file, parser)
+            if parsed is None:
+                return chunks_data
+            text_content = parsed[0]
         else:
             logger.warning(f"Unsupported file type for trade template: {template_file}")
             return chunks_data
@@ -212,130 +356,401 @@ def process_trade_template_file(template_file: Path, settings) -> List[tuple]:
     
     return chunks_data
 
-def ingest_advanced(kb_root: str, collection: str, dry_run: bool = False) -> Dict[str, Any]:
-    """Advanced ingestion process with proper file parsing."""
+def _spreadsheet_files(folder: Path, settings: Any) -> List[Path]:
+    """Excel workbooks in a folder, sorted, or none if spreadsheet ingestion is disabled."""
+    if not settings.ingest_spreadsheets:
+        return []
+    # Skip Excel's "~$" lock files left next to open workbooks
+    return sorted(
+        p for p in folder.iterdir()
+        if p.suffix.lower() in SPREADSHEET_EXTENSIONS and not p.name.startswith("~$")
+    )
+
+def _source_units(
+    kb_path: Path,
+    parser: Optional[IsolatedParser] = None,
+    sheet_pool: Optional[Executor] = None
+) -> List[tuple[str, List[Path], Any]]:
+    """
+    List the source units of the KB in a deterministic order.
+    
+    A unit is a transcript with its video folder, or one trade template file.
+    
+    Returns:
+        List of (key, files, parse) where ``parse()`` returns the unit's chunks
+    """
+    units: List[tuple[str, List[Path], Any]] = []
+    
+    for text_file in sorted(kb_path.glob("PTM Video *.txt")):
+        # Find corresponding video folder
+        video_number = text_file.stem.replace("PTM Video ", "").split(" - ")[0]
+        # Handle both "Video 4" and "Video 04" formats
+        video_folder = kb_path / f"Video {video_number}"
+        if not video_folder.exists():
+            # Try with zero-padded format
+            video_folder = kb_path / f"Video {video_number.zfill(2)}"
+        
+        files = [text_file]
+        if video_folder.exists():
+            files.extend(p for pattern in ("*.pdf", "*.pptx", "*.docx") for p in video_folder.glob(pattern))
+            files.extend(_spreadsheet_files(video_folder, SETTINGS))
+        units.append((
+            str(text_file), files,
+            lambda text_file=text_file, video_folder=video_folder: process_text_file(
+                text_file, video_folder, SETTINGS, parser, sheet_pool
+            )
+        ))
+    
+    # Also process Trade Template directory
+    trade_template_dir = kb_path / "Trade Template"
+    if trade_template_dir.exists():
+        templates = sorted(list(trade_template_dir.glob("*.docx")) + list(trade_template_dir.glob("*.doc")))
+        for template_file in templates:
+            units.append((
+                str(template_file), [template_file],
+                lambda template_file=template_file: process_trade_template_file(template_file, SETTINGS, parser)
+            ))
+    
+    return units
+
+def _hydrate_chunks(store: ChunkStore, ids: List[int]) -> Optional[List[tuple[str, Dict[str, Any]]]]:
+    """Rebuild a unit's (text, payload) chunks from the chunk store, or None if any are missing."""
+    records = store.get_records(ids)
+    if len(records) != len(set(str(i) for i in ids)):
+        return None
+    return [(records[str(i)][0], {**records[str(i)][1], "text": records[str(i)][0]}) for i in ids]
+
+def ingest_advanced(
+    kb_root: str,
+    collection: str,
+    dry_run: bool = False,
+    blue_green: Optional[bool] = None,
+    resume: bool = False,
+    max_retries: int = 2
+) -> Dict[str, Any]:
+    """
+    Advanced ingestion process with proper file parsing.
+    
+    With blue/green rebuilds (the default, ``SETTINGS.qdrant_blue_green``),
+    ``collection`` is an alias: the KB is built into a new versioned
+    collection while the current one keeps serving, validated, and only then
+    is the alias swapped atomically and old generations garbage-collected.
+    The chunk store and the BM25 and summary indexes are written per
+    generation too (see ``generations.py``) and go live with the manifest
+    right after the swap. Otherwise ``collection`` is dropped and rebuilt in place.
+    
+    Progress is checkpointed in the ingest journal (``SETTINGS.ingest_journal_path``):
+    parsed files and upserted batches. With ``resume`` an interrupted run
+    continues into the same collection, skipping unchanged parsed files and
+    chunks that are already in Qdrant. Failed batches go to a retry queue that
+    is retried at the end and reported in the statistics.
+    
+    Args:
+        kb_root: Root directory of the knowledge base
+        collection: Collection name (the alias for blue/green rebuilds)
+        dry_run: Parse and embed without writing anything
+        blue_green: Override ``SETTINGS.qdrant_blue_green``
+        resume: Continue the unfinished run recorded in the journal
+        max_retries: Retry rounds for failed batches before giving up
+        
+    Returns:
+        Dictionary of ingestion statistics
+        
+    Raises:
+        RuntimeError: If ingestion fails
+    """
+    if blue_green is None:
+        blue_green = SETTINGS.qdrant_blue_green
+    
+    journal: Optional[IngestJournal] = None
+    run_settings = {
+        "alias": collection,
+        "kb_root": str(Path(kb_root).resolve()),
+        "blue_green": blue_green,
+        "embedding_model": SETTINGS.embedding_model,
+        "max_chunk_words": SETTINGS.max_chunk_words,
+        "chunk_overlap_words": SETTINGS.chunk_overlap_words,
+        "dedup": [SETTINGS.dedup_threshold, SETTINGS.dedup_shingle_words] if SETTINGS.dedup_enabled else None,
+        "transcript_compaction": SETTINGS.transcript_min_repeat_words if SETTINGS.transcript_compaction else None,
+    }
+    
+    if resume and dry_run:
+        raise ValueError("--resume cannot be combined with --dry-run")
+    
+    if resume:
+        journal = IngestJournal(SETTINGS.ingest_journal_path)
+        if not journal.resumable:
+            raise RuntimeError(f"No unfinished ingestion run to resume in {SETTINGS.ingest_journal_path}")
+        changed = {k: v for k, v in run_settings.items() if journal.run.get(k) != v}
+        if changed:
+            raise RuntimeError(f"Cannot resume: settings changed since the run started: {sorted(changed)}")
+        target = journal.run["collection"]
+    else:
+        target = versioned_collection_name(collection) if blue_green and not dry_run else collection
+    
     logger.info(f"Starting advanced ingestion process: {kb_root}")
-    logger.info(f"Target collection: {collection}")
+    logger.info(f"Target collection: {target}" + (f" (alias '{collection}')" if target != collection else ""))
     logger.info(f"Dry run mode: {dry_run}")
-    logger.info("Processing: TXT, PDF, PPTX, DOCX files only")
+    if resume:
+        logger.info(f"Resuming: {len(journal.files)} files parsed, {len(journal.done_ids)} chunks already indexed")
+    logger.info("Processing: TXT, PDF, PPTX, DOCX" + (", XLSX/XLSM/XLS" if SETTINGS.ingest_spreadsheets else "") + " files")
+    
+    store: Optional[ChunkStore] = None
+    parser: Optional[IsolatedParser] = None
+    sheet_pool: Optional[Executor] = None
     
     try:
+        # Parse documents in a worker process so a hung or crashing file cannot stall the run
+        if SETTINGS.parse_isolation:
+            parser = IsolatedParser(
+                timeout=SETTINGS.parse_timeout,
+                memory_mb=SETTINGS.parse_memory_mb,
+                quarantine=ParseQuarantine(SETTINGS.parse_quarantine_path)
+            )
+        if SETTINGS.ingest_spreadsheets:
+            sheet_pool = sheet_executor(SETTINGS.spreadsheet_workers)
+        
         # Initialize embedding model
         logger.info(f"Loading embedding model: {SETTINGS.embedding_model}")
-        embed = EmbeddingModel(SETTINGS.embedding_model)
+        embed = EmbeddingModel(
+            SETTINGS.embedding_model,
+            server_url=SETTINGS.embedding_server_url,
+            server_timeout=SETTINGS.embedding_server_timeout,
+            server_timeout_per_text=SETTINGS.embedding_server_timeout_per_text,
+            server_retries=SETTINGS.embedding_server_retries
+        )
         
         # Connect to Qdrant (unless dry run)
         client = None
         if not dry_run:
-            client = connect(SETTINGS.qdrant_host, SETTINGS.qdrant_port, SETTINGS.qdrant_api_key)
-            recreate_collection(client, collection, embed.get_embedding_dimension())
-        
-        # Get text files from KB root
-        kb_path = Path(kb_root)
-        text_files = list(kb_path.glob("PTM Video *.txt"))
-        logger.info(f"Found {len(text_files)} text files in {kb_root}")
-        
-        # Also process Trade Template directory
-        trade_template_dir = kb_path / "Trade Template"
-        trade_template_files = []
-        if trade_template_dir.exists():
-            trade_template_files = list(trade_template_dir.glob("*.docx")) + list(trade_template_dir.glob("*.doc"))
-            logger.info(f"Found {len(trade_template_files)} trade template files")
-        else:
-            logger.info("No Trade Template directory found")
+            client = connect_from_settings(SETTINGS)
+            # Texts go to this generation's own store; the live generation keeps serving its files
+            store = ChunkStore(generation_paths(target)["chunk_store_path"])
+            if resume:
+                if not any(c.name == target for c in client.get_collections().collections):
+                    raise RuntimeError(f"Collection '{target}' of the interrupted run no longer exists")
+            else:
+                if blue_green and target in list_generations(client, collection):
+                    raise RuntimeError(f"Generation '{target}' already exists; another rebuild started this second")
+                recreate_collection(
+                    client, target, embed.get_embedding_dimension(), **collection_options(SETTINGS)
+                )
+                create_payload_indexes(client, target)
+                journal = IngestJournal(SETTINGS.ingest_journal_path)
+                journal.start({"collection": target, **run_settings})
         
-        if not text_files and not trade_template_files:
+        units = _source_units(Path(kb_root), parser, sheet_pool)
+        logger.info(f"Found {len(units)} source units in {kb_root}")
+        
+        if not units:
             logger.warning("No text files or trade template files found")
             return {"status": "warning", "message": "No files found to process"}
         
-        # Process all text files
+        # Parse every unit, reusing units already parsed by the interrupted run
         all_texts: List[str] = []
         all_payloads: List[Dict[str, Any]] = []
         processed_files = 0
+        reused_files = 0
         
-        for text_file in tqdm(text_files, desc="Processing files", disable=not sys.stdout.isatty()):
+        for key, files, parse in tqdm(units, desc="Processing files", disable=not sys.stdout.isatty()):
             try:
-                # Find corresponding video folder
-                video_number = text_file.stem.replace("PTM Video ", "").split(" - ")[0]
-                # Handle both "Video 4" and "Video 04" formats
-                video_folder = kb_path / f"Video {video_number}"
-                if not video_folder.exists():
-                    # Try with zero-padded format
-                    video_folder = kb_path / f"Video {video_number.zfill(2)}"
+                signature = file_signature(files)
+                chunks_data = None
+                if journal is not None and resume:
+                    ids = journal.completed_file(key, signature)
+                    if ids is not None:
+                        chunks_data = _hydrate_chunks(store, ids)
+                        reused_files += chunks_data is not None
+                
+                if chunks_data is None:
+                    chunks_data = parse()
+                    if store is not None:
+                        # Texts are durable before the file is journaled as done
+                        store.put_many(
+                            (p["id"], t, {k: v for k, v in p.items() if k != "text"})
+                            for t, p in chunks_data
+                        )
+                        journal.file_done(key, signature, [p["id"] for _, p in chunks_data])
                 
-                chunks_data = process_text_file(text_file, video_folder, SETTINGS)
                 for text, payload in chunks_data:
                     all_texts.append(text)
                     all_payloads.append(payload)
                 processed_files += 1
                 
             except Exception as e:
-                logger.error(f"Failed to process text file {text_file}: {e}")
+                logger.error(f"Failed to process {key}: {e}")
                 continue
         
-        logger.info(f"Successfully processed {processed_files}/{len(text_files)} text files")
-        
-        # Process trade template files
-        if trade_template_files:
-            logger.info("Processing trade template files...")
-            for template_file in tqdm(trade_template_files, desc="Processing trade templates", disable=not sys.stdout.isatty()):
-                try:
-                    chunks_data = process_trade_template_file(template_file, SETTINGS)
-                    for text, payload in chunks_data:
-                        all_texts.append(text)
-                        all_payloads.append(payload)
-                    processed_files += 1
-                    logger.info(f"Processed trade template: {template_file.name}")
-                except Exception as e:
-                    logger.error(f"Failed to process trade template {template_file}: {e}")
-                    continue
-        
-        logger.info(f"Total processed files: {processed_files}")
-        logger.info(f"Total chunks to embed: {len(all_texts)}")
+        logger.info(f"Total processed files: {processed_files} ({reused_files} reused from the journal)")
+        logger.info(f"Total chunks parsed: {len(all_texts)}")
         
         if not all_texts:
             logger.warning("No chunks to process")
             return {"status": "warning", "message": "No chunks to process"}
         
-        # Process in batches
+        # Embed repeated material once; the first copy keeps the others as aliases
+        dedup_stats: Dict[str, Any] = {}
+        if SETTINGS.dedup_enabled:
+            canonical = find_duplicates(all_texts, SETTINGS.dedup_threshold, SETTINGS.dedup_shingle_words)
+            all_texts, all_payloads, dedup_stats = merge_duplicates(all_texts, all_payloads, canonical)
+            if store is not None and dedup_stats["merged_chunks"]:
+                # The sparse leg reads payloads from the chunk store, so it needs the aliases too
+                store.put_many(
+                    (p["id"], t, {k: v for k, v in p.items() if k != "text"})
+                    for t, p in zip(all_texts, all_payloads) if "aliases" in p
+                )
+            logger.info(
+                f"Merged {dedup_stats['duplicate_chunks']} near-duplicate chunks into "
+                f"{dedup_stats['merged_chunks']} canonical chunks; {len(all_texts)} chunks left to embed"
+            )
+        
+        done_ids = journal.done_ids if journal is not None else set()
+        pending = [(t, p) for t, p in zip(all_texts, all_payloads) if p["id"] not in done_ids]
+        skipped_chunks = len(all_texts) - len(pending)
+        if skipped_chunks:
+            logger.info(f"Skipping {skipped_chunks} chunks already indexed by the interrupted run")
+        
+        # Per-video and per-document centroids for two-stage retrieval, from the vectors computed below
+        summaries = SummaryBuilder()
+        
+        def index_batch(batch: List[tuple[str, Dict[str, Any]]]) -> None:
+            texts = [t for t, _ in batch]
+            payloads = [p for _, p in batch]
+            
+            # Generate embeddings with explicit batch size
+            vectors = embed.encode(texts, batch_size=SETTINGS.batch_size)
+            
+            # Upload slim payloads to Qdrant (unless dry run); texts are already in the chunk store
+            if not dry_run and client:
+                upsert_points(client, target, vectors.tolist(), [index_payload(p) for p in payloads])
+                journal.batch_done([p["id"] for p in payloads])
+                summaries.add(payloads, vectors)
+        
+        # Process in batches; failures go to the retry queue
         total_batches = 0
         successful_batches = 0
+        retry_queue: List[List[tuple[str, Dict[str, Any]]]] = []
         
         for batch in tqdm(
-            batched(zip(all_texts, all_payloads), SETTINGS.batch_size), 
+            batched(pending, SETTINGS.batch_size), 
             desc="Embedding and indexing" if not dry_run else "Processing embeddings",
             disable=not sys.stdout.isatty()
         ):
             total_batches += 1
             try:
-                texts = [t for t, _ in batch]
-                payloads = [p for _, p in batch]
-                
-                # Generate embeddings with explicit batch size
-                vectors = embed.encode(texts, batch_size=SETTINGS.batch_size)
-                
-                # Upload to Qdrant (unless dry run)
-                if not dry_run and client:
-                    upsert_points(client, collection, vectors.tolist(), payloads)
-                
+                index_batch(batch)
                 successful_batches += 1
-                logger.debug(f"Processed batch {total_batches} with {len(texts)} items")
+                logger.debug(f"Processed batch {total_batches} with {len(batch)} items")
                 
             except Exception as e:
-                logger.error(f"Failed to process batch {total_batches}: {e}")
-                continue
+                logger.error(f"Failed to process batch {total_batches}, queued for retry: {e}")
+                retry_queue.append(batch)
+                if journal is not None:
+                    journal.batch_failed([p["id"] for _, p in batch], str(e))
+        
+        for attempt in range(1, max_retries + 1):
+            if not retry_queue:
+                break
+            logger.info(f"Retry round {attempt}/{max_retries}: {len(retry_queue)} failed batches")
+            time.sleep(min(2 ** attempt, 30))
+            still_failing = []
+            for batch in retry_queue:
+                try:
+                    index_batch(batch)
+                    successful_batches += 1
+                except Exception as e:
+                    logger.error(f"Retry of batch with {len(batch)} chunks failed: {e}")
+                    still_failing.append(batch)
+            retry_queue = still_failing
+        
+        failed_chunk_ids = [p["id"] for batch in retry_queue for _, p in batch]
+        if retry_queue:
+            logger.error(
+                f"{len(retry_queue)} batches ({len(failed_chunk_ids)} chunks) still failed after "
+                f"{max_retries} retry rounds; re-run with --resume to retry them"
+            )
+        
+        indexed = [(t, p["id"]) for t, p in zip(all_texts, all_payloads)
+                   if journal is not None and p["id"] in journal.done_ids]
+        indexed_ids = [i for _, i in indexed]
+        indexed_texts = [t for t, _ in indexed]
+        
+        if blue_green and not dry_run and retry_queue:
+            raise RuntimeError(
+                f"{len(retry_queue)} batches failed; alias '{collection}' still points to "
+                f"{resolve_alias(client, collection) or 'nothing'}, partial build kept in '{target}' (use --resume)"
+            )
+        
+        # The BM25 and summary indexes are also written per generation, before the swap
+        paths = generation_paths(target)
+        
+        # Build the sparse BM25 index over every chunk that reached Qdrant
+        if not dry_run and indexed_ids:
+            BM25Index.build(indexed_ids, indexed_texts).save(paths["sparse_index_path"])
+        
+        # Summaries also cover chunks indexed by the interrupted run, whose vectors are only in Qdrant
+        if not dry_run and indexed_ids:
+            skipped = [p for p in all_payloads if p["id"] in done_ids]
+            for block in batched(skipped, SETTINGS.batch_size):
+                points = client.retrieve(
+                    collection_name=target, ids=[p["id"] for p in block], with_vectors=True, with_payload=False
+                )
+                vectors_by_id = {point.id: point.vector for point in points}
+                block = [p for p in block if p["id"] in vectors_by_id]
+                summaries.add(block, [vectors_by_id[p["id"]] for p in block])
+            summaries.build().save(paths["summary_index_path"])
+        
+        # Validate the new generation, then switch the alias to it
+        previous = None
+        if blue_green and not dry_run:
+            validate_collection(client, target, len(set(indexed_ids)), embed.get_embedding_dimension())
+            previous = swap_alias(client, collection, target)
+        
+        # Record what the live index was built with (checked when loading snapshots); this
+        # also switches query processes to the new generation's data files
+        if not dry_run:
+            dim = embed.get_embedding_dimension()
+            save_manifest({
+                "collection": target,
+                "alias": collection if target != collection else None,
+                "embedding_model": SETTINGS.embedding_model,
+                "dim": dim,
+                "fingerprint": model_fingerprint(SETTINGS.embedding_model, dim),
+                "max_chunk_words": SETTINGS.max_chunk_words,
+                "chunk_overlap_words": SETTINGS.chunk_overlap_words,
+                "points": len(set(indexed_ids)),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            })
+        
+        if blue_green and not dry_run:
+            for name in gc_generations(client, collection, keep=SETTINGS.qdrant_keep_generations):
+                remove_generation_files(name)
         
         # Return statistics
         stats = {
             "status": "success",
             "total_chunks": len(all_texts),
             "processed_files": processed_files,
-            "total_files": len(text_files),
+            "total_files": len(units),
+            "reused_files": reused_files,
+            "skipped_chunks": skipped_chunks,
+            "duplicate_chunks": dedup_stats.get("duplicate_chunks", 0),
+            "merged_chunks": dedup_stats.get("merged_chunks", 0),
             "successful_batches": successful_batches,
             "total_batches": total_batches,
+            "failed_batches": len(retry_queue),
+            "failed_chunk_ids": failed_chunk_ids,
+            "quarantined_files": len(parser.quarantine.entries) if parser is not None else 0,
+            "collection": target,
+            "previous_collection": previous,
+            "resumed": resume,
             "dry_run": dry_run
         }
         
+        # Keep the journal open for --resume while chunks are still missing
+        if journal is not None and not retry_queue:
+            journal.finish({k: v for k, v in stats.items() if k != "failed_chunk_ids"})
+        
         logger.info("Advanced ingestion completed successfully ✅")
         logger.info(f"Statistics: {stats}")
         
@@ -344,6 +759,15 @@ def ingest_advanced(kb_root: str, collection: str, dry_run: bool = False) -> Dic
     except Exception as e:
         logger.error(f"Advanced ingestion failed: {e}")
         raise RuntimeError(f"Advanced ingestion failed: {e}") from e
+    finally:
+        if store is not None:
+            store.close()
+        if journal is not None:
+            journal.close()
+        if parser is not None:
+            parser.close()
+        if sheet_pool is not None:
+            sheet_pool.shutdown()
 
 if __name__ == "__main__":
     # Configure logging
@@ -356,9 +780,15 @@ if __name__ == "__main__":
     parser.add_argument("--kb-root", type=str, default=SETTINGS.kb_root, 
                        help="Root directory of the knowledge base")
     parser.add_argument("--collection", type=str, default=SETTINGS.collection,
-                       help="Name of the Qdrant collection")
+                       help="Name of the Qdrant collection (the alias for blue/green rebuilds)")
     parser.add_argument("--dry-run", action="store_true",
                        help="Process data without uploading to Qdrant")
+    parser.add_argument("--in-place", action="store_true",
+                       help="Drop and rebuild the collection in place instead of a blue/green alias swap")
+    parser.add_argument("--resume", action="store_true",
+                       help="Continue the interrupted run recorded in the ingest journal")
+    parser.add_argument("--max-retries", type=int, default=2,
+                       help="Retry rounds for failed batches")
     parser.add_argument("--verbose", "-v", action="store_true",
                        help="Enable verbose logging")
     
@@ -368,13 +798,28 @@ if __name__ == "__main__":
         logging.getLogger().setLevel(logging.DEBUG)
     
     try:
-        stats = ingest_advanced(args.kb_root, args.collection, dry_run=args.dry_run)
+        stats = ingest_advanced(
+            args.kb_root, args.collection, dry_run=args.dry_run,
+            blue_green=False if args.in_place else None,
+            resume=args.resume, max_retries=args.max_retries
+        )
         
         if stats["status"] == "success":
             print(f"\n[SUCCESS] Advanced ingestion completed successfully!")
             print(f"   Total chunks processed: {stats['total_chunks']}")
             print(f"   Files processed: {stats['processed_files']}/{stats['total_files']}")
             print(f"   Successful batches: {stats['successful_batches']}/{stats['total_batches']}")
+            if stats['duplicate_chunks']:
+                print(f"   Near-duplicates merged: {stats['duplicate_chunks']} chunks "
+                      f"into {stats['merged_chunks']} canonical chunks")
+            if stats['resumed']:
+                print(f"   Resumed: {stats['reused_files']} files and {stats['skipped_chunks']} chunks reused")
+            if stats['failed_batches']:
+                print(f"   [WARNING] Retry queue: {stats['failed_batches']} batches "
+                      f"({len(stats['failed_chunk_ids'])} chunks) still failing; re-run with --resume")
+            if stats['collection'] != args.collection:
+                print(f"   Alias '{args.collection}' -> {stats['collection']} "
+                      f"(was {stats['previous_collection'] or 'unset'})")
             if args.dry_run:
                 print("   (Dry run mode - no data uploaded)")
         else:
@@ -0,0 +1,204 @@
+"""
+Local chunk-text store keyed by Qdrant point ID.
+
+Qdrant payloads only carry the small, filterable fields; the chunk text and the
+full file metadata live here in a single SQLite file. Query results fetch their
+texts lazily in one batched lookup.
+"""
+
+from __future__ import annotations
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_MAX_IDS_PER_QUERY = 900
+
+class ChunkStore:
+    """SQLite-backed store of chunk texts and metadata keyed by point ID."""
+
+    def __init__(self, path: Union[str, Path], readonly: bool = False) -> None:
+        """
+        Open (and, unless read-only, create) the store.
+
+        Args:
+            path: Path of the SQLite file
+            readonly: Open without creating or modifying the file
+
+        Raises:
+            FileNotFoundError: If readonly is set and the file does not exist
+            RuntimeError: If the database cannot be opened
+        """
+        self.path = Path(path)
+        self.readonly = readonly
+        self._lock = threading.Lock()
+
+        if readonly and not self.path.exists():
+            raise FileNotFoundError(f"Chunk store not found: {self.path}")
+
+        try:
+            if readonly:
+                self._conn = sqlite3.connect(
+                    f"file:{self.path.as_posix()}?mode=ro", uri=True, check_same_thread=False
+                )
+            else:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS chunks ("
+                    "id TEXT PRIMARY KEY, text TEXT NOT NULL, metadata TEXT NOT NULL"
+                    ") WITHOUT ROWID"
+                )
+                self._conn.commit()
+            logger.debug(f"Opened chunk store at {self.path} (readonly={readonly})")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open chunk store {self.path}: {e}")
+            raise RuntimeError(f"Failed to open chunk store {self.path}: {e}") from e
+
+    def put_many(self, records: Iterable[Tuple[Any, str, Dict[str, Any]]]) -> int:
+        """
+        Insert or replace chunk records.
+
+        Args:
+            records: Iterable of (point_id, text, metadata) tuples
+
+        Returns:
+            Number of records written
+
+        Raises:
+            RuntimeError: If the store is read-only or the write fails
+        """
+        if self.readonly:
+            raise RuntimeError("Chunk store is opened read-only")
+
+        rows = [
+            (str(point_id), text, json.dumps(metadata, ensure_ascii=False, default=str))
+            for point_id, text, metadata in records
+        ]
+        if not rows:
+            return 0
+
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chunks (id, text, metadata) VALUES (?, ?, ?)", rows
+                )
+                self._conn.commit()
+            logger.debug(f"Stored {len(rows)} chunks in {self.path}")
+            return len(rows)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write chunks to {self.path}: {e}")
+            raise RuntimeError(f"Failed to write chunks: {e}") from e
+
+    def clear(self) -> int:
+        """
+        Delete every stored chunk.
+
+        Returns:
+            Number of records deleted
+
+        Raises:
+            RuntimeError: If the store is read-only or the delete fails
+        """
+        if self.readonly:
+            raise RuntimeError("Chunk store is opened read-only")
+
+        try:
+            with self._lock:
+                deleted = self._conn.execute("DELETE FROM chunks").rowcount
+                self._conn.commit()
+            return deleted
+        except sqlite3.Error as e:
+            logger.error(f"Failed to clear chunk store {self.path}: {e}")
+            raise RuntimeError(f"Failed to clear chunk store: {e}") from e
+
+    def _select(self, columns: str, ids: Iterable[Any]) -> List[Tuple[Any, ...]]:
+        """Run a batched ``SELECT id, <columns> ... WHERE id IN (...)``."""
+        keys = list(dict.fromkeys(str(i) for i in ids))
+        rows: List[Tuple[Any, ...]] = []
+        with self._lock:
+            for start in range(0, len(keys), _MAX_IDS_PER_QUERY):
+                batch = keys[start:start + _MAX_IDS_PER_QUERY]
+                placeholders = ",".join("?" * len(batch))
+                rows.extend(self._conn.execute(
+                    f"SELECT id, {columns} FROM chunks WHERE id IN ({placeholders})", batch
+                ).fetchall())
+        return rows
+
+    def get_texts(self, ids: Iterable[Any]) -> Dict[str, str]:
+        """
+        Fetch texts for several point IDs in one batched lookup.
+
+        Args:
+            ids: Point IDs (ints or strings)
+
+        Returns:
+            Mapping of ``str(point_id)`` to text; unknown IDs are omitted
+        """
+        return {point_id: text for point_id, text in self._select("text", ids)}
+
+    def get_records(self, ids: Iterable[Any]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """
+        Fetch texts and metadata for several point IDs.
+
+        Args:
+            ids: Point IDs (ints or strings)
+
+        Returns:
+            Mapping of ``str(point_id)`` to (text, metadata)
+        """
+        return {
+            point_id: (text, json.loads(metadata))
+            for point_id, text, metadata in self._select("text, metadata", ids)
+        }
+
+    def count(self) -> int:
+        """Get the number of stored chunks."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "ChunkStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+class ChunkTextLoader:
+    """
+    Resolves texts for one set of query results on first access.
+
+    All results of a query share a loader, so touching ``.text`` on any of them
+    fetches every text in a single store lookup.
+    """
+
+    def __init__(self, store: Optional[ChunkStore], ids: Iterable[Any]) -> None:
+        self.store = store
+        self.ids = [i for i in ids if i is not None]
+        self._texts: Optional[Dict[str, str]] = None
+
+    def text_for(self, point_id: Any) -> str:
+        """Get the text for ``point_id``, loading the whole batch on first call."""
+        if self._texts is None:
+            if self.store is None:
+                self._texts = {}
+            else:
+                try:
+                    self._texts = self.store.get_texts(self.ids)
+                except Exception as e:
+                    logger.warning(f"Failed to load chunk texts from {self.store.path}: {e}")
+                    self._texts = {}
+            missing = len(self.ids) - len(self._texts)
+            if missing:
+                logger.warning(f"{missing} result texts not found in the chunk store")
+        return self._texts.get(str(point_id), "")
@@ -1,16 +1,10 @@
 from __future__ import annotations
 import logging
+import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
-try:
-    import pandas as pd
-except ImportError as e:
-    raise ImportError(
-        "pandas package is required for Excel processing. Install with: pip install pandas openpyxl"
-    ) from e
-
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -105,6 +99,9 @@ def excel_to_text_summaries(
     """
     Convert Excel file to text summaries for each sheet.
     
+    Sheets are streamed with a read-only reader and summarized in a single pass
+    (see ``spreadsheets.summarize_workbook``).
+    
     Args:
         xlsx_path: Path to the Excel file
         base_meta: Base metadata to include in chunks
@@ -119,6 +116,8 @@ def excel_to_text_summaries(
         ValueError: If the file is not a valid Excel file
         PermissionError: If the file cannot be accessed
     """
+    from .spreadsheets import summarize_workbook
+    
     file_path = Path(xlsx_path)
     
     if not file_path.exists():
@@ -127,123 +126,10 @@ def excel_to_text_summaries(
     if not file_path.suffix.lower() in ['.xlsx', '.xls', '.xlsm']:
         raise ValueError(f"File must be an Excel file (.xlsx, .xls, or .xlsm), got: {file_path.suffix}")
     
-    chunks: List[Chunk] = []
+    if not os.access(file_path, os.R_OK):
+        raise PermissionError(f"Permission denied accessing {file_path}")
     
-    try:
-        logger.info(f"Processing Excel file: {file_path}")
-        xl = pd.ExcelFile(file_path)
-        
-        if not xl.sheet_names:
-            logger.warning(f"No sheets found in {file_path}")
-            return chunks
-        
-        for sheet_name in xl.sheet_names:
-            try:
-                logger.debug(f"Processing sheet: {sheet_name}")
-                df = xl.parse(sheet_name)
-                
-                # Handle empty sheets
-                if df.empty:
-                    logger.debug(f"Sheet '{sheet_name}' is empty, skipping")
-                    continue
-                
-                # Clean column names and handle duplicates
-                df.columns = [str(col).strip() for col in df.columns]
-                if df.columns.duplicated().any():
-                    df.columns = pd.Index([f"{col}_{i}" if col in df.columns[:i] else col 
-                                         for i, col in enumerate(df.columns)])
-                
-                # Get preview data
-                preview_df = df.head(max_preview_rows)
-                
-                # Identify column types
-                numeric_cols = preview_df.select_dtypes(include=["number"]).columns.tolist()
-                text_cols = [c for c in preview_df.columns if c not in numeric_cols]
-                
-                # Build summary lines
-                lines = [f"Excel Sheet '{sheet_name}' Summary:"]
-                lines.append(f"Dimensions: {len(df)} rows × {len(df.columns)} columns")
-                
-                # Add column information
-                if text_cols:
-                    preview_text_cols = text_cols[:max_columns_preview]
-                    lines.append(f"Text columns ({len(text_cols)}): {', '.join(preview_text_cols)}")
-                    if len(text_cols) > max_columns_preview:
-                        lines.append(f"... and {len(text_cols) - max_columns_preview} more")
-                
-                if numeric_cols:
-                    lines.append(f"Numeric columns ({len(numeric_cols)}):")
-                    preview_numeric_cols = numeric_cols[:max_columns_preview]
-                    
-                    try:
-                        desc = df[preview_numeric_cols].describe()
-                        for col in preview_numeric_cols:
-                            try:
-                                stats = desc[col]
-                                mean_val = stats.get('mean', 'N/A')
-                                min_val = stats.get('min', 'N/A')
-                                max_val = stats.get('max', 'N/A')
-                                lines.append(f"  {col}: mean={mean_val}, min={min_val}, max={max_val}")
-                            except Exception as e:
-                                logger.debug(f"Could not get stats for column {col}: {e}")
-                                lines.append(f"  {col}: stats unavailable")
-                        
-                        if len(numeric_cols) > max_columns_preview:
-                            lines.append(f"  ... and {len(numeric_cols) - max_columns_preview} more numeric columns")
-                            
-                    except Exception as e:
-                        logger.warning(f"Could not generate numeric stats for sheet {sheet_name}: {e}")
-                        lines.append(f"Numeric statistics unavailable")
-                
-                # Add data preview
-                if not preview_df.empty:
-                    try:
-                        # Limit columns for preview
-                        preview_columns = preview_df.columns[:max_columns_preview]
-                        preview_data = preview_df[preview_columns]
-                        
-                        # Convert to CSV string
-                        preview_csv = preview_data.to_csv(index=False).strip()
-                        lines.append(f"Data Preview (first {len(preview_data)} rows):")
-                        lines.append(preview_csv)
-                        
-                        if len(preview_df.columns) > max_columns_preview:
-                            lines.append(f"... and {len(preview_df.columns) - max_columns_preview} more columns")
-                            
-                    except Exception as e:
-                        logger.warning(f"Could not generate preview for sheet {sheet_name}: {e}")
-                        lines.append("Data preview unavailable")
-                
-                # Create chunk
-                summary_text = "\n".join(lines)
-                meta = {
-                    **base_meta, 
-                    "source": "excel", 
-                    "sheet": sheet_name,
-                    "rows": len(df),
-                    "columns": len(df.columns)
-                }
-                chunks.append(Chunk(text=summary_text, metadata=meta))
-                logger.debug(f"Created summary for sheet '{sheet_name}' with {len(summary_text)} characters")
-                
-            except Exception as e:
-                logger.error(f"Error processing sheet '{sheet_name}' in {file_path}: {e}")
-                # Continue processing other sheets
-                continue
-        
-        logger.info(f"Successfully processed {len(chunks)} sheets from {file_path}")
-        return chunks
-        
-    except PermissionError as e:
-        logger.error(f"Permission denied accessing {file_path}: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"Failed to process Excel file {file_path}: {e}")
-        raise ValueError(f"Invalid Excel file: {e}") from e
-    finally:
-        # Ensure Excel file is properly closed
-        try:
-            if 'xl' in locals():
-                xl.close()
-        except Exception:
-            pass  # Ignore cleanup errors
+    logger.info(f"Processing Excel file: {file_path}")
+    return summarize_workbook(
+        file_path, base_meta, max_preview_rows=max_preview_rows, max_columns_preview=max_columns_preview
+    )
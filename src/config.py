@@ -8,6 +8,15 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def _env_bool(name: str, default: str) -> bool:
+    """Read a boolean flag from the environment."""
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+def _env_optional_int(name: str) -> Optional[int]:
+    """Read an optional integer from the environment (unset or empty means None)."""
+    value = os.getenv(name)
+    return int(value) if value else None
+
 @dataclass(frozen=True)
 class Settings:
     """Configuration settings for the knowledge base system."""
@@ -17,18 +26,120 @@ class Settings:
     qdrant_port: int = int(os.getenv("QDRANT_PORT", "6333"))
     qdrant_api_key: Optional[str] = os.getenv("QDRANT_API_KEY")
     collection: str = os.getenv("QDRANT_COLLECTION", "kb_vectors")
+    # Embedded Qdrant: a storage directory or ":memory:" (empty means use the server)
+    qdrant_path: Optional[str] = os.getenv("QDRANT_PATH") or None
+    # Blue/green rebuilds: ingest into a versioned collection, then swap the alias
+    qdrant_blue_green: bool = _env_bool("QDRANT_BLUE_GREEN", "true")
+    qdrant_keep_generations: int = int(os.getenv("QDRANT_KEEP_GENERATIONS", "2"))
+
+    # Qdrant collection storage settings (RAM vs recall trade-offs)
+    qdrant_quantization: str = os.getenv("QDRANT_QUANTIZATION", "none").lower()
+    qdrant_quantization_always_ram: bool = _env_bool("QDRANT_QUANTIZATION_ALWAYS_RAM", "true")
+    qdrant_quantization_rescore: bool = _env_bool("QDRANT_QUANTIZATION_RESCORE", "true")
+    qdrant_quantization_oversampling: float = float(os.getenv("QDRANT_QUANTIZATION_OVERSAMPLING", "2.0"))
+    qdrant_on_disk: bool = _env_bool("QDRANT_ON_DISK", "false")
+    qdrant_hnsw_m: Optional[int] = _env_optional_int("QDRANT_HNSW_M")
+    qdrant_hnsw_ef_construct: Optional[int] = _env_optional_int("QDRANT_HNSW_EF_CONSTRUCT")
+    qdrant_hnsw_ef: Optional[int] = _env_optional_int("QDRANT_HNSW_EF")
+
+    # Search backend: "qdrant" (server) or "local" (memory-mapped export, no server)
+    search_backend: str = os.getenv("SEARCH_BACKEND", "qdrant").lower()
+    local_index_dir: str = os.getenv(
+        "LOCAL_INDEX_DIR", os.path.join(os.getenv("DATA_DIR", "./data"), "local_index")
+    )
 
     # Embedding model settings
     embedding_model: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-mpnet-base-v2")
     batch_size: int = int(os.getenv("BATCH_SIZE", "64"))
 
+    # Shared embedding server settings
+    embedding_server_url: Optional[str] = os.getenv("EMBEDDING_SERVER_URL") or None
+    embedding_server_host: str = os.getenv("EMBEDDING_SERVER_HOST", "127.0.0.1")
+    embedding_server_port: int = int(os.getenv("EMBEDDING_SERVER_PORT", "8765"))
+    embedding_server_max_batch: int = int(os.getenv("EMBEDDING_SERVER_MAX_BATCH", "64"))
+    embedding_server_max_wait_ms: float = float(os.getenv("EMBEDDING_SERVER_MAX_WAIT_MS", "5"))
+    embedding_server_timeout: float = float(os.getenv("EMBEDDING_SERVER_TIMEOUT", "30"))
+    embedding_server_timeout_per_text: float = float(os.getenv("EMBEDDING_SERVER_TIMEOUT_PER_TEXT", "0.5"))
+    embedding_server_retries: int = int(os.getenv("EMBEDDING_SERVER_RETRIES", "2"))
+
     # Knowledge base settings
     kb_root: str = os.getenv("KB_ROOT", "./KB")
     max_chunk_words: int = int(os.getenv("MAX_CHUNK_WORDS", "1000"))
     chunk_overlap_words: int = int(os.getenv("CHUNK_OVERLAP_WORDS", "200"))
 
+    # Document parsing isolation (worker process with per-file limits)
+    parse_isolation: bool = _env_bool("PARSE_ISOLATION", "true")
+    parse_timeout: float = float(os.getenv("PARSE_TIMEOUT", "120"))
+    parse_memory_mb: int = int(os.getenv("PARSE_MEMORY_MB", "2048"))  # 0 disables the limit
+
+    # Spreadsheet ingestion (one summary chunk per sheet)
+    ingest_spreadsheets: bool = _env_bool("INGEST_SPREADSHEETS", "true")
+    spreadsheet_workers: int = int(os.getenv("SPREADSHEET_WORKERS", "0"))  # 0 = one per CPU
+
+    # Near-duplicate chunks (MinHash over word shingles) are merged into one indexed chunk
+    dedup_enabled: bool = _env_bool("DEDUP_ENABLED", "true")
+    dedup_threshold: float = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+    dedup_shingle_words: int = int(os.getenv("DEDUP_SHINGLE_WORDS", "5"))
+
+    # Transcript compaction before chunking (fillers, timestamps, repeated phrases; 0 keeps repeats).
+    # Opt-in: it rewrites the text that is embedded and quoted
+    transcript_compaction: bool = _env_bool("TRANSCRIPT_COMPACTION", "false")
+    transcript_min_repeat_words: int = int(os.getenv("TRANSCRIPT_MIN_REPEAT_WORDS", "2"))
+
+    # Local data files (chunk texts, indexes, journals)
+    data_dir: str = os.getenv("DATA_DIR", "./data")
+    chunk_store_path: str = os.getenv(
+        "CHUNK_STORE_PATH", os.path.join(os.getenv("DATA_DIR", "./data"), "chunk_store.sqlite")
+    )
+    ingest_manifest_path: str = os.getenv(
+        "INGEST_MANIFEST_PATH", os.path.join(os.getenv("DATA_DIR", "./data"), "ingest_manifest.json")
+    )
+    ingest_journal_path: str = os.getenv(
+        "INGEST_JOURNAL_PATH", os.path.join(os.getenv("DATA_DIR", "./data"), "ingest_journal.jsonl")
+    )
+    timeseries_cache_dir: str = os.getenv(
+        "TIMESERIES_CACHE_DIR", os.path.join(os.getenv("DATA_DIR", "./data"), "timeseries")
+    )
+    parse_quarantine_path: str = os.getenv(
+        "PARSE_QUARANTINE_PATH", os.path.join(os.getenv("DATA_DIR", "./data"), "parse_quarantine.json")
+    )
+
     # Query settings
     top_k: int = int(os.getenv("TOP_K", "5"))
+    query_cache_size: int = int(os.getenv("QUERY_CACHE_SIZE", "512"))
+    query_cache_warmup: bool = _env_bool("QUERY_CACHE_WARMUP", "true")
+    structured_routing: bool = _env_bool("STRUCTURED_ROUTING", "true")
+
+    # Hybrid retrieval settings (dense + sparse BM25 fused with RRF)
+    retrieval_mode: str = os.getenv("RETRIEVAL_MODE", "dense").lower()
+    sparse_index_path: str = os.getenv(
+        "SPARSE_INDEX_PATH", os.path.join(os.getenv("DATA_DIR", "./data"), "sparse_index.npz")
+    )
+    rrf_k: int = int(os.getenv("RRF_K", "60"))
+    hybrid_candidates: int = int(os.getenv("HYBRID_CANDIDATES", "30"))
+
+    # Two-stage retrieval: pick the best videos from summary vectors, then search their chunks.
+    # Off until its recall is checked against flat search on the full KB.
+    hierarchical_retrieval: bool = _env_bool("HIERARCHICAL_RETRIEVAL", "false")
+    summary_index_path: str = os.getenv(
+        "SUMMARY_INDEX_PATH", os.path.join(os.getenv("DATA_DIR", "./data"), "summary_index.npz")
+    )
+    summary_top_groups: int = int(os.getenv("SUMMARY_TOP_GROUPS", "8"))
+
+    # Result diversification (MMR over the candidates' vectors) and neighbor expansion.
+    # MMR is opt-in until its effect on answer quality is measured on the full KB.
+    mmr_enabled: bool = _env_bool("MMR_ENABLED", "false")
+    mmr_lambda: float = float(os.getenv("MMR_LAMBDA", "0.7"))
+    mmr_candidates: int = int(os.getenv("MMR_CANDIDATES", "30"))
+    neighbor_radius: int = int(os.getenv("NEIGHBOR_RADIUS", "0"))
+
+    # Cross-encoder reranking of a bounded candidate set, with a latency budget
+    rerank_enabled: bool = _env_bool("RERANK_ENABLED", "false")
+    rerank_model: str = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    rerank_candidates: int = int(os.getenv("RERANK_CANDIDATES", "30"))
+    rerank_budget_ms: float = float(os.getenv("RERANK_BUDGET_MS", "300"))
+    rerank_batch_size: int = int(os.getenv("RERANK_BATCH_SIZE", "16"))
+    rerank_cache_size: int = int(os.getenv("RERANK_CACHE_SIZE", "4096"))
 
     def __post_init__(self) -> None:
         """Validate configuration settings after initialization."""
@@ -46,6 +157,44 @@ class Settings:
         elif self.batch_size > 1000:
             warnings.warn(f"Large batch size {self.batch_size} may cause memory issues")
         
+        # Validate collection storage settings
+        if self.qdrant_quantization not in ("none", "scalar", "binary"):
+            warnings.warn(f"Unknown quantization '{self.qdrant_quantization}' (expected none, scalar or binary)")
+        
+        if self.qdrant_quantization_oversampling < 1.0:
+            warnings.warn(f"Quantization oversampling {self.qdrant_quantization_oversampling} should be at least 1.0")
+        
+        if self.qdrant_hnsw_m is not None and self.qdrant_hnsw_m < 0:
+            warnings.warn(f"HNSW m {self.qdrant_hnsw_m} should be non-negative (0 disables the graph)")
+        
+        for name in ("qdrant_hnsw_ef_construct", "qdrant_hnsw_ef"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                warnings.warn(f"{name} {value} should be positive")
+        
+        if self.qdrant_keep_generations < 1:
+            warnings.warn(f"Keep generations {self.qdrant_keep_generations} should be at least 1")
+        
+        # Validate search backend
+        if self.search_backend not in ("qdrant", "local"):
+            warnings.warn(f"Unknown search backend '{self.search_backend}' (expected qdrant or local)")
+        
+        # Validate embedding server settings
+        if not (1 <= self.embedding_server_port <= 65535):
+            warnings.warn(f"Embedding server port {self.embedding_server_port} is outside valid range (1-65535)")
+        
+        if self.embedding_server_max_batch <= 0:
+            warnings.warn(f"Embedding server max batch {self.embedding_server_max_batch} should be positive")
+        
+        if self.embedding_server_max_wait_ms < 0:
+            warnings.warn(f"Embedding server max wait {self.embedding_server_max_wait_ms}ms should be non-negative")
+        
+        if self.embedding_server_timeout_per_text < 0:
+            warnings.warn(f"Embedding server timeout per text {self.embedding_server_timeout_per_text}s should be non-negative")
+        
+        if self.embedding_server_retries < 0:
+            warnings.warn(f"Embedding server retries {self.embedding_server_retries} should be non-negative")
+        
         # Validate chunk settings
         if self.max_chunk_words <= 0:
             warnings.warn(f"Max chunk words {self.max_chunk_words} should be positive")
@@ -56,10 +205,54 @@ class Settings:
         if self.chunk_overlap_words >= self.max_chunk_words:
             warnings.warn(f"Chunk overlap {self.chunk_overlap_words} should be less than max chunk size {self.max_chunk_words}")
         
+        if self.parse_timeout <= 0:
+            warnings.warn(f"Parse timeout {self.parse_timeout}s should be positive")
+        
+        if self.spreadsheet_workers < 0:
+            warnings.warn(f"Spreadsheet workers {self.spreadsheet_workers} should be non-negative")
+        
         # Validate top_k
         if self.top_k <= 0:
             warnings.warn(f"Top K {self.top_k} should be positive")
         
+        if self.query_cache_size < 0:
+            warnings.warn(f"Query cache size {self.query_cache_size} should be non-negative")
+        
+        # Validate hybrid retrieval settings
+        if self.retrieval_mode not in ("dense", "sparse", "hybrid"):
+            warnings.warn(f"Unknown retrieval mode '{self.retrieval_mode}' (expected dense, sparse or hybrid)")
+        
+        if self.rrf_k <= 0:
+            warnings.warn(f"RRF k {self.rrf_k} should be positive")
+        
+        if self.hybrid_candidates <= 0:
+            warnings.warn(f"Hybrid candidates {self.hybrid_candidates} should be positive")
+        
+        if self.summary_top_groups <= 0:
+            warnings.warn(f"Summary top groups {self.summary_top_groups} should be positive")
+        
+        if not 0.0 <= self.mmr_lambda <= 1.0:
+            warnings.warn(f"MMR lambda {self.mmr_lambda} should be between 0 and 1")
+        
+        if self.mmr_candidates <= 0:
+            warnings.warn(f"MMR candidates {self.mmr_candidates} should be positive")
+        
+        if self.neighbor_radius < 0:
+            warnings.warn(f"Neighbor radius {self.neighbor_radius} should be non-negative")
+        
+        for name in ("rerank_candidates", "rerank_budget_ms", "rerank_batch_size"):
+            if getattr(self, name) <= 0:
+                warnings.warn(f"{name} {getattr(self, name)} should be positive")
+        
+        if not 0 < self.dedup_threshold <= 1:
+            warnings.warn(f"Dedup threshold {self.dedup_threshold} should be in (0, 1]")
+        
+        if self.dedup_shingle_words <= 0:
+            warnings.warn(f"Dedup shingle words {self.dedup_shingle_words} should be positive")
+        
+        if self.transcript_min_repeat_words < 0:
+            warnings.warn(f"Transcript min repeat words {self.transcript_min_repeat_words} should be non-negative")
+        
         # Check if KB root exists
         kb_path = Path(self.kb_root)
         if not kb_path.exists():
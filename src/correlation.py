@@ -0,0 +1,492 @@
+"""
+Vectorized rolling and lagged correlations across many series at once.
+
+This automates the analysis in ``GDP_Correlations.xlsx`` and
+``SP500_Correl.xlsx``: how well leading indicators, shifted by a number of
+periods, track a target such as GDP growth or the S&P 500.
+
+Series come from the KB time-series cache or from TradeStation bar responses.
+They are aligned on a common period grid (daily, monthly, quarterly or yearly,
+using the last observation of each period) into a ``Panel``: a T x N matrix
+with NaN where a series has no value.
+
+All statistics come from sums over pairs where both sides are present. Full-sample
+lagged correlations use masked matrix products. Rolling windows use block
+prefix and suffix cumulative sums, so a window of any length costs one
+addition per cell, with no loop over windows. Each window's sums only ever
+touch values inside it, so an outlier does not pollute the windows after it.
+
+Usage:
+    python -m src.correlation --target "GDP_Correlations/S&P500_USGDP Correlation/GDP YoY" \\
+        --match "ISM" --freq Q --transform pct --periods 4 --lags 0-8
+"""
+
+from __future__ import annotations
+import argparse
+import logging
+import re
+import sys
+import time
+import warnings
+from datetime import date
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = ("D", "M", "Q", "Y")
+
+_LAG_RANGE = re.compile(r"^(-?\d+)-(-?\d+)$")
+
+class Panel(NamedTuple):
+    """Series aligned on one period grid; ``values`` is T x N with NaN gaps."""
+    dates: np.ndarray
+    names: List[str]
+    values: np.ndarray
+
+def _period_keys(dates: np.ndarray, freq: str) -> np.ndarray:
+    """Integer period number of each date (days, months, quarters or years since 1970)."""
+    days = np.asarray(dates, dtype="datetime64[D]")
+    if freq == "D":
+        return days.astype(np.int64)
+    months = days.astype("datetime64[M]").astype(np.int64)
+    if freq == "M":
+        return months
+    if freq == "Q":
+        return months // 3
+    if freq == "Y":
+        return months // 12
+    raise ValueError(f"Unsupported frequency {freq!r}; use one of {', '.join(FREQUENCIES)}")
+
+def _period_ends(keys: np.ndarray, freq: str) -> np.ndarray:
+    """Last calendar day of each period number."""
+    if freq == "D":
+        return keys.astype("datetime64[D]")
+    months_per_period = {"M": 1, "Q": 3, "Y": 12}[freq]
+    next_start = ((keys + 1) * months_per_period).astype("datetime64[M]").astype("datetime64[D]")
+    return next_start - np.timedelta64(1, "D")
+
+def align(
+    series: Mapping[str, Tuple[np.ndarray, np.ndarray]],
+    freq: str = "M",
+    start: Union[str, date, None] = None,
+    end: Union[str, date, None] = None
+) -> Panel:
+    """
+    Align date-indexed series on a common period grid.
+
+    Each series contributes its last observation in every period. The grid is
+    the union of periods observed by any series, so trading-day bars aligned
+    at "D" frequency skip weekends and holidays.
+
+    Args:
+        series: Mapping of name to (dates, values), each sorted by date
+        freq: Period of the grid: "D", "M", "Q" or "Y"
+        start: First date to include
+        end: Last date to include
+
+    Returns:
+        Panel labelled by period end dates
+
+    Raises:
+        ValueError: If the frequency is unsupported or no series is given
+    """
+    if not series:
+        raise ValueError("No series to align")
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Unsupported frequency {freq!r}; use one of {', '.join(FREQUENCIES)}")
+
+    lo = np.datetime64(start, "D") if start is not None else None
+    hi = np.datetime64(end, "D") if end is not None else None
+
+    names = list(series)
+    per_series = []
+    for name in names:
+        dates, values = series[name]
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        values = np.asarray(values, dtype=np.float64)
+        keep = np.ones(len(dates), dtype=bool)
+        if lo is not None:
+            keep &= dates >= lo
+        if hi is not None:
+            keep &= dates <= hi
+        keys = _period_keys(dates[keep], freq)
+        values = values[keep]
+        # Dates are sorted, so the last entry of each run of equal keys is the period's last observation
+        last = np.r_[keys[1:] != keys[:-1], True] if len(keys) else np.zeros(0, dtype=bool)
+        per_series.append((keys[last], values[last]))
+
+    grid = np.unique(np.concatenate([keys for keys, _ in per_series]))
+    matrix = np.full((len(grid), len(names)), np.nan)
+    for col, (keys, values) in enumerate(per_series):
+        matrix[np.searchsorted(grid, keys), col] = values
+    return Panel(_period_ends(grid, freq), names, matrix)
+
+def transform(values: np.ndarray, how: str = "level", periods: int = 1) -> np.ndarray:
+    """
+    Turn levels into changes, column by column.
+
+    Args:
+        values: T x N matrix (or length-T vector)
+        how: "level" (unchanged), "diff" (x[t] - x[t-p]) or "pct" (x[t] / x[t-p] - 1)
+        periods: Lag p of the change, in grid rows
+
+    Returns:
+        Matrix of the same shape; the first ``periods`` rows are NaN
+
+    Raises:
+        ValueError: If ``how`` is unknown or ``periods`` is not positive
+    """
+    if how == "level":
+        return values
+    if periods < 1:
+        raise ValueError("periods must be positive")
+    if how not in ("diff", "pct"):
+        raise ValueError(f"Unknown transform {how!r}; use level, diff or pct")
+
+    out = np.full(values.shape, np.nan)
+    if periods >= len(values):
+        return out
+    current, previous = values[periods:], values[:-periods]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[periods:] = current - previous if how == "diff" else current / previous - 1.0
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+def shift(values: np.ndarray, lag: int) -> np.ndarray:
+    """
+    Shift rows forward by ``lag`` periods: row t holds row t - lag of the input.
+
+    Args:
+        values: T x N matrix (or length-T vector)
+        lag: Number of periods; positive values look back in time
+
+    Returns:
+        Shifted copy padded with NaN
+    """
+    out = np.full(values.shape, np.nan)
+    if lag == 0:
+        out[:] = values
+    elif 0 < lag < len(values):
+        out[lag:] = values[:-lag]
+    elif -len(values) < lag < 0:
+        out[:lag] = values[-lag:]
+    return out
+
+def _centre(values: np.ndarray) -> np.ndarray:
+    """
+    Column medians (0 for empty columns), subtracted before summing.
+
+    Shifting a column leaves its correlations unchanged but keeps the sums
+    small; the median is used because one outlier can drag the mean far
+    from the bulk of the data.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        centre = np.nanmedian(values, axis=0)
+    return np.nan_to_num(centre)
+
+def _pair_sums(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Per-row terms of the pairwise-complete sums: count, x, y, x^2, y^2, xy (each T x N)."""
+    both = ~np.isnan(x) & ~np.isnan(y)
+    x = np.where(both, x, 0.0)
+    y = np.where(both, y, 0.0)
+    return both.astype(np.float64), x, y, x * x, y * y, x * y
+
+def _correlation(n: np.ndarray, sx: np.ndarray, sy: np.ndarray, sxx: np.ndarray, syy: np.ndarray,
+                 sxy: np.ndarray, min_periods: int) -> np.ndarray:
+    """Pearson correlation from pairwise sums; NaN where too few pairs or no variance."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * sxy - sx * sy
+        var_x = n * sxx - sx * sx
+        var_y = n * syy - sy * sy
+        corr = cov / np.sqrt(var_x * var_y)
+    # Relative tolerance: a constant window leaves only rounding noise in the variance
+    flat = (var_x <= 1e-12 * n * sxx) | (var_y <= 1e-12 * n * syy)
+    corr[(n < max(min_periods, 2)) | flat | ~np.isfinite(corr)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing window sums along axis 0 from block prefix and suffix cumulative sums.
+
+    With blocks of ``window`` rows, every window is the suffix of one block plus
+    the prefix of the next. Unlike a single running cumsum, no sum ever
+    includes values outside the window, so an outlier cannot leave rounding
+    error behind in later windows.
+    """
+    rows, cols = values.shape
+    blocks = -(-rows // window)
+    padded = np.zeros((blocks, window, cols))
+    padded.reshape(-1, cols)[:rows] = values
+
+    prefix = np.cumsum(padded, axis=1)
+    suffix = np.cumsum(padded[:, ::-1], axis=1)[:, ::-1]
+    # Row j of block b ends a window starting at row j + 1 of block b - 1 (a block start when j is last)
+    prefix[1:, :-1] += suffix[:-1, 1:]
+    return prefix.reshape(-1, cols)[:rows]
+
+def _as_columns(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Validate shapes and return centred 2-D copies of ``x`` and ``y``."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[:, None]
+    if y.ndim == 1:
+        y = y[:, None]
+    if x.shape[0] != y.shape[0]:
+        raise ValueError(f"Row counts differ: {x.shape[0]} vs {y.shape[0]}")
+    return x - _centre(x), y - _centre(y)
+
+def rolling_correlation(
+    x: np.ndarray,
+    y: np.ndarray,
+    window: int,
+    min_periods: Optional[int] = None
+) -> np.ndarray:
+    """
+    Rolling Pearson correlation of every column of ``x`` with ``y``.
+
+    Windows are trailing and span ``window`` grid rows; NaN rows in either
+    input are left out of the window's sums rather than invalidating it.
+
+    Args:
+        x: T x N matrix (or length-T vector)
+        y: Length-T target, or T x N matrix correlated column by column
+        window: Window length in rows
+        min_periods: Fewest complete pairs for a value (defaults to ``window``)
+
+    Returns:
+        T x N correlations; NaN until a window holds ``min_periods`` pairs
+
+    Raises:
+        ValueError: If the window is not positive or the shapes disagree
+    """
+    if window < 2:
+        raise ValueError("window must be at least 2")
+    x, y = _as_columns(x, y)
+    min_periods = window if min_periods is None else min_periods
+    return _rolling(x, y, window, min_periods)
+
+def _rolling(x: np.ndarray, y: np.ndarray, window: int, min_periods: int) -> np.ndarray:
+    sums = [_window_sums(term, window) for term in _pair_sums(x, y)]
+    return _correlation(*sums, min_periods=min_periods)
+
+def _full_sample(x: np.ndarray, y: np.ndarray, min_periods: int) -> np.ndarray:
+    sums = [term.sum(axis=0) for term in _pair_sums(x, y)]
+    return _correlation(*sums, min_periods=min_periods)
+
+def correlation(x: np.ndarray, y: np.ndarray, min_periods: int = 3) -> np.ndarray:
+    """
+    Full-sample Pearson correlation of every column of ``x`` with ``y``.
+
+    Args:
+        x: T x N matrix (or length-T vector)
+        y: Length-T target, or T x N matrix correlated column by column
+        min_periods: Fewest complete pairs for a value
+
+    Returns:
+        Length-N correlations (NaN where undefined)
+    """
+    x, y = _as_columns(x, y)
+    return _full_sample(x, y, min_periods)
+
+def lagged_correlations(
+    x: np.ndarray,
+    y: np.ndarray,
+    lags: Sequence[int],
+    window: Optional[int] = None,
+    min_periods: Optional[int] = None
+) -> np.ndarray:
+    """
+    Correlation of each column of ``x``, lagged by each lag, with ``y``.
+
+    A lag of k correlates x[t - k] with y[t], so positive lags measure how far
+    ``x`` leads the target.
+
+    Args:
+        x: T x N indicator matrix
+        y: Length-T target
+        lags: Lags in grid rows
+        window: Rolling window in rows, or None for full-sample correlations
+        min_periods: Fewest complete pairs for a value (defaults to ``window``, or 3 full-sample)
+
+    Returns:
+        L x N full-sample correlations, or L x T x N rolling correlations
+    """
+    # Centre once; each lag is then one shift plus a pass of vectorized sums
+    x, y = _as_columns(x, y)
+    if window is None:
+        min_periods = 3 if min_periods is None else min_periods
+        return np.stack([_full_sample(shift(x, lag), y, min_periods) for lag in lags])
+    if window < 2:
+        raise ValueError("window must be at least 2")
+    min_periods = window if min_periods is None else min_periods
+    return np.stack([_rolling(shift(x, lag), y, window, min_periods) for lag in lags])
+
+def correlation_matrix(values: np.ndarray, min_periods: int = 3) -> np.ndarray:
+    """
+    Pairwise-complete correlation matrix of all columns in a few matrix products.
+
+    Args:
+        values: T x N matrix with NaN gaps
+        min_periods: Fewest complete pairs for a value
+
+    Returns:
+        N x N correlation matrix
+    """
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    centred = np.where(present, values - _centre(values), 0.0)
+    mask = present.astype(np.float64)
+
+    # Entry (i, j) of each product sums over the rows where both column i and column j are present
+    n = mask.T @ mask
+    sx = centred.T @ mask
+    sxx = (centred * centred).T @ mask
+    sxy = centred.T @ centred
+    return _correlation(n, sx, sx.T, sxx, sxx.T, sxy, min_periods=min_periods)
+
+def store_series(store: Any, names: Iterable[str]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Collect series from a ``TimeSeriesStore`` for ``align``.
+
+    Args:
+        store: Loaded time-series store
+        names: Series names
+
+    Returns:
+        Mapping of name to (dates, values)
+    """
+    series = {}
+    for name in names:
+        item = store.get(name)
+        series[name] = (item.dates, item.values)
+    return series
+
+def bars_series(
+    bars_by_symbol: Mapping[str, Union[Dict[str, Any], List[Dict[str, Any]]]],
+    field: str = "Close"
+) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Convert TradeStation barchart responses into series for ``align``.
+
+    Args:
+        bars_by_symbol: Mapping of symbol to a barcharts response (``{"Bars": [...]}``) or its bar list
+        field: Bar field to use as the value
+
+    Returns:
+        Mapping of symbol to (dates, values), sorted by date
+
+    Raises:
+        ValueError: If a bar lacks the date or the field
+    """
+    series = {}
+    for symbol, response in bars_by_symbol.items():
+        bars = response.get("Bars", []) if isinstance(response, dict) else response
+        try:
+            dates = np.array([str(bar["DateTime"])[:10] for bar in bars], dtype="datetime64[D]")
+            values = np.array([float(bar[field]) for bar in bars], dtype=np.float64)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Malformed bars for {symbol}: {e}") from e
+        order = np.argsort(dates, kind="stable")
+        series[symbol] = (dates[order], values[order])
+    return series
+
+def parse_lags(spec: str) -> List[int]:
+    """
+    Parse a lag list such as "0,3,6" or "0-8".
+
+    Args:
+        spec: Comma-separated lags or inclusive ranges
+
+    Returns:
+        Sorted unique lags
+
+    Raises:
+        ValueError: If the spec is malformed
+    """
+    lags = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        match = _LAG_RANGE.match(part)
+        if match:
+            lags.update(range(int(match.group(1)), int(match.group(2)) + 1))
+        else:
+            try:
+                lags.add(int(part))
+            except ValueError:
+                raise ValueError(f"Invalid lag {part!r} in {spec!r}") from None
+    if not lags:
+        raise ValueError(f"No lags in {spec!r}")
+    return sorted(lags)
+
+if __name__ == "__main__":
+    from .config import SETTINGS
+    from .timeseries_store import TimeSeriesStore
+
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Rank KB indicators by lagged correlation with a target series")
+    parser.add_argument("--target", type=str, required=True, help="Target series name (see timeseries_store list)")
+    parser.add_argument("--match", type=str, default="", help="Terms every candidate series name must contain")
+    parser.add_argument("--freq", type=str, default="M", choices=FREQUENCIES, help="Alignment period")
+    parser.add_argument("--transform", type=str, default="level", choices=("level", "diff", "pct"),
+                        help="Apply to every series before correlating")
+    parser.add_argument("--periods", type=int, default=1, help="Change horizon for diff/pct, in periods")
+    parser.add_argument("--lags", type=str, default="0-12", help="Lags in periods, e.g. 0-12 or 0,3,6")
+    parser.add_argument("--window", type=int, default=None, help="Rolling window in periods (report the latest value)")
+    parser.add_argument("--min-periods", type=int, default=None,
+                        help="Fewest overlapping observations (default: the window, or 20 full-sample)")
+    parser.add_argument("--start", type=str, default=None, help="First date (YYYY-MM-DD)")
+    parser.add_argument("--top", type=int, default=20, help="Number of results to print")
+    parser.add_argument("--kb", type=str, default=SETTINGS.kb_root, help="Knowledge base root")
+    parser.add_argument("--cache", type=str, default=SETTINGS.timeseries_cache_dir, help="Time-series cache directory")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        store = TimeSeriesStore(args.cache)
+        store.load_directory(args.kb)
+        if args.target not in store:
+            raise ValueError(f"Unknown target series: {args.target}")
+        candidates = [n for n in (store.find(args.match) if args.match else store.names()) if n != args.target]
+        if not candidates:
+            raise ValueError(f"No series match {args.match!r}")
+
+        started = time.perf_counter()
+        panel = align(store_series(store, [args.target] + candidates), args.freq, start=args.start)
+        values = transform(panel.values, args.transform, args.periods)
+        lags = parse_lags(args.lags)
+        min_periods = args.min_periods if args.min_periods is not None else (args.window or 20)
+        corr = lagged_correlations(values[:, 1:], values[:, 0], lags, args.window, min_periods)
+        if args.window is not None:
+            # Latest complete window of each lag and series
+            corr = corr[:, -1, :]
+        elapsed = time.perf_counter() - started
+
+        strength = np.where(np.isnan(corr), -1.0, np.abs(corr))
+        best_lag = strength.argmax(axis=0)
+        best = corr[best_lag, np.arange(len(candidates))]
+        order = [i for i in np.argsort(-strength.max(axis=0), kind="stable") if not np.isnan(best[i])]
+
+        label = f"rolling {args.window}-period" if args.window else "full-sample"
+        print(f"\nStrongest {label} correlations with {args.target} ({args.transform}, freq {args.freq}):")
+        for i in order[:args.top]:
+            print(f"  {best[i]:+.3f}  lag {lags[best_lag[i]]:>3}  {candidates[i]}")
+        print(f"\n[STATS] {len(candidates)} series x {len(lags)} lags over {len(panel.dates)} periods "
+              f"in {elapsed:.3f}s ({len(order)} with enough overlap)")
+    except Exception as e:
+        print(f"\n[ERROR] Correlation scan failed: {e}")
+        sys.exit(1)
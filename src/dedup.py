@@ -0,0 +1,352 @@
+"""
+Near-duplicate chunk detection for ingestion.
+
+The KB repeats material across folders: the same workbooks ship with several
+videos and the trade templates overlap heavily. Embedding every copy wastes
+encoder time, grows the index and fills the answer context with the same
+passage several times.
+
+Each chunk is reduced to a MinHash signature over hashed word shingles, and
+an LSH index (banded signatures) proposes candidate pairs, so a chunk is only
+compared with chunks that share at least one band. A candidate whose
+estimated Jaccard similarity reaches the threshold is a duplicate of the
+first (canonical) chunk seen; only the canonical chunk is embedded, and its
+payload records where the other copies came from:
+
+- ``aliases``: ``{"class_id", "file_name", "chunk_index"}`` of every dropped copy
+- ``alias_class_ids``: the other videos holding a copy, so a ``class_id``
+  filter still finds the material (see ``index_qdrant.build_filter``)
+
+Usage:
+    python -m src.dedup --kb-root ./KB --threshold 0.8
+"""
+
+from __future__ import annotations
+import argparse
+import logging
+import re
+import sys
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Hashes live below this Mersenne prime so (a * h + b) fits in 64 bits
+_PRIME = np.uint64((1 << 31) - 1)
+_BASE = np.uint64(1_000_003)
+_TOKEN = re.compile(r"\w+")
+
+ALIAS_KEYS = ("class_id", "file_name", "chunk_index")
+
+def shingle_hashes(text: str, size: int = 5) -> np.ndarray:
+    """
+    Hash the word shingles of a text.
+
+    Words are lowercased; texts shorter than ``size`` words become a single
+    shingle, so they only match exact copies.
+
+    Args:
+        text: Chunk text
+        size: Words per shingle
+
+    Returns:
+        Unique shingle hashes (uint64, below 2^31 - 1)
+    """
+    tokens = _TOKEN.findall(text.lower())
+    if not tokens:
+        return np.zeros(0, dtype="uint64")
+
+    words = np.fromiter((zlib.crc32(t.encode()) for t in tokens), dtype="uint64", count=len(tokens)) % _PRIME
+    width = min(size, len(words))
+    count = len(words) - width + 1
+    # Polynomial rolling hash over every window of `width` words at once
+    hashes = np.zeros(count, dtype="uint64")
+    for offset in range(width):
+        hashes = (hashes * _BASE + words[offset:offset + count]) % _PRIME
+    return np.unique(hashes)
+
+class MinHasher:
+    """MinHash signatures from universal hashes ``(a * h + b) mod p``."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1) -> None:
+        """
+        Initialize the hash permutations.
+
+        Args:
+            num_perm: Signature length
+            seed: Random seed (signatures are only comparable for equal seeds)
+
+        Raises:
+            ValueError: If num_perm is not positive
+        """
+        if num_perm <= 0:
+            raise ValueError("num_perm must be positive")
+
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, int(_PRIME), size=num_perm, dtype="uint64")[:, None]
+        self._b = rng.integers(0, int(_PRIME), size=num_perm, dtype="uint64")[:, None]
+
+    def signature(self, hashes: np.ndarray, block: int = 4096) -> np.ndarray:
+        """
+        MinHash signature of a set of shingle hashes.
+
+        Args:
+            hashes: Shingle hashes from ``shingle_hashes``
+            block: Shingles permuted per vectorized step (bounds memory)
+
+        Returns:
+            Signature of ``num_perm`` uint32 values (all ``2^31 - 1`` for an empty set)
+        """
+        signature = np.full(self.num_perm, _PRIME, dtype="uint64")
+        for start in range(0, len(hashes), block):
+            permuted = (self._a * hashes[None, start:start + block] + self._b) % _PRIME
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        return signature.astype("uint32")
+
+def jaccard_estimate(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.mean(first == second))
+
+class LSHIndex:
+    """Banded LSH over MinHash signatures: keys that share any band are candidates."""
+
+    def __init__(self, num_perm: int = 128, bands: int = 32) -> None:
+        """
+        Initialize an empty index.
+
+        With ``r = num_perm / bands`` rows per band, a pair with Jaccard
+        similarity ``s`` becomes a candidate with probability
+        ``1 - (1 - s^r)^bands``; the defaults catch pairs above ~0.6 almost surely.
+
+        Args:
+            num_perm: Signature length
+            bands: Number of bands (must divide num_perm)
+
+        Raises:
+            ValueError: If bands does not divide num_perm
+        """
+        if bands <= 0 or num_perm % bands:
+            raise ValueError(f"bands ({bands}) must be a positive divisor of num_perm ({num_perm})")
+
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[bytes, List[Any]]] = [defaultdict(list) for _ in range(bands)]
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [row.tobytes() for row in signature.reshape(self.bands, self.rows)]
+
+    def add(self, key: Any, signature: np.ndarray) -> None:
+        """Insert a signature under ``key``."""
+        for bucket, band in zip(self._buckets, self._band_keys(signature)):
+            bucket[band].append(key)
+
+    def candidates(self, signature: np.ndarray) -> List[Any]:
+        """Keys sharing at least one band with a signature, in insertion order."""
+        found: Dict[Any, None] = {}
+        for bucket, band in zip(self._buckets, self._band_keys(signature)):
+            for key in bucket.get(band, ()):
+                found[key] = None
+        return list(found)
+
+class NearDuplicateDetector:
+    """Finds near-duplicate chunks against the chunks seen so far."""
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        shingle_size: int = 5,
+        num_perm: int = 128,
+        bands: int = 32,
+        seed: int = 1
+    ) -> None:
+        """
+        Initialize the detector.
+
+        Args:
+            threshold: Estimated Jaccard similarity at which a chunk is a duplicate
+            shingle_size: Words per shingle
+            num_perm: MinHash signature length
+            bands: LSH bands
+            seed: MinHash seed
+
+        Raises:
+            ValueError: If parameters are invalid
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        if shingle_size <= 0:
+            raise ValueError("shingle_size must be positive")
+
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm, seed)
+        self.index = LSHIndex(num_perm, bands)
+        self._signatures: List[np.ndarray] = []
+        self.compared = 0
+
+    def add(self, text: str) -> Tuple[int, Optional[int], float]:
+        """
+        Check a chunk against the canonical chunks added so far.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Tuple of (position, canonical position or None, similarity); a
+            chunk without a canonical match becomes canonical itself
+        """
+        position = len(self._signatures)
+        signature = self.hasher.signature(shingle_hashes(text, self.shingle_size))
+        self._signatures.append(signature)
+
+        best, best_score = None, 0.0
+        for candidate in self.index.candidates(signature):
+            self.compared += 1
+            score = jaccard_estimate(signature, self._signatures[candidate])
+            if score >= self.threshold and score > best_score:
+                best, best_score = candidate, score
+
+        if best is None:
+            self.index.add(position, signature)
+        return position, best, best_score
+
+def find_duplicates(
+    texts: Sequence[str],
+    threshold: float = 0.8,
+    shingle_size: int = 5,
+    num_perm: int = 128,
+    bands: int = 32
+) -> List[Optional[int]]:
+    """
+    Map every text to the canonical text it duplicates.
+
+    The first copy of any material is canonical, so the result only depends
+    on the order of ``texts``.
+
+    Args:
+        texts: Chunk texts in ingestion order
+        threshold: Estimated Jaccard similarity at which a chunk is a duplicate
+        shingle_size: Words per shingle
+        num_perm: MinHash signature length
+        bands: LSH bands
+
+    Returns:
+        For each text, the index of its canonical text, or None if it is canonical
+    """
+    detector = NearDuplicateDetector(threshold, shingle_size, num_perm, bands)
+    canonical = [detector.add(text)[1] for text in texts]
+    logger.debug(f"Near-duplicate check: {len(texts)} chunks, {detector.compared} candidate comparisons")
+    return canonical
+
+def merge_duplicates(
+    texts: Sequence[str],
+    payloads: Sequence[Dict[str, Any]],
+    canonical: Sequence[Optional[int]]
+) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Drop duplicate chunks and record them as aliases on their canonical chunk.
+
+    Args:
+        texts: Chunk texts
+        payloads: Chunk payloads aligned with texts (need ``class_id``)
+        canonical: Output of ``find_duplicates``
+
+    Returns:
+        Tuple of (kept texts, kept payloads, statistics); kept payloads that
+        absorbed duplicates are copies with ``aliases`` and ``alias_class_ids``
+
+    Raises:
+        ValueError: If the inputs differ in length
+    """
+    if not len(texts) == len(payloads) == len(canonical):
+        raise ValueError(
+            f"Texts ({len(texts)}), payloads ({len(payloads)}) and canonical map ({len(canonical)}) "
+            f"must have the same length"
+        )
+
+    aliases: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for position, target in enumerate(canonical):
+        if target is not None:
+            aliases[target].append({k: payloads[position][k] for k in ALIAS_KEYS if k in payloads[position]})
+
+    kept_texts: List[str] = []
+    kept_payloads: List[Dict[str, Any]] = []
+    for position, (text, payload) in enumerate(zip(texts, payloads)):
+        if canonical[position] is not None:
+            continue
+        if position in aliases:
+            own = payload.get("class_id")
+            payload = {
+                **payload,
+                "aliases": aliases[position],
+                "alias_class_ids": sorted({a["class_id"] for a in aliases[position] if a.get("class_id") != own}),
+            }
+        kept_texts.append(text)
+        kept_payloads.append(payload)
+
+    dropped = len(texts) - len(kept_texts)
+    stats = {
+        "duplicate_chunks": dropped,
+        "merged_chunks": len(aliases),
+        "duplicate_words": sum(len(t.split()) for t, c in zip(texts, canonical) if c is not None),
+        "cross_video_chunks": sum(1 for p in kept_payloads if p.get("alias_class_ids")),
+    }
+    return kept_texts, kept_payloads, stats
+
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Report near-duplicate chunks in the knowledge base")
+    parser.add_argument("--kb-root", type=str, default=None,
+                       help="Root directory of the knowledge base (defaults to KB_ROOT)")
+    parser.add_argument("--threshold", type=float, default=None,
+                       help="Estimated Jaccard similarity for duplicates (defaults to DEDUP_THRESHOLD)")
+    parser.add_argument("--shingle-size", type=int, default=None,
+                       help="Words per shingle (defaults to DEDUP_SHINGLE_WORDS)")
+    parser.add_argument("--show", type=int, default=20,
+                       help="Duplicate groups to list")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                       help="Enable verbose logging")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        from pathlib import Path
+        from .config import SETTINGS
+        from .advanced_ingest import _source_units
+
+        threshold = SETTINGS.dedup_threshold if args.threshold is None else args.threshold
+        shingle_size = SETTINGS.dedup_shingle_words if args.shingle_size is None else args.shingle_size
+
+        texts: List[str] = []
+        payloads: List[Dict[str, Any]] = []
+        for _, _, parse in _source_units(Path(args.kb_root or SETTINGS.kb_root)):
+            for text, payload in parse():
+                texts.append(text)
+                payloads.append(payload)
+
+        canonical = find_duplicates(texts, threshold, shingle_size)
+        kept_texts, kept_payloads, stats = merge_duplicates(texts, payloads, canonical)
+        total_words = sum(len(t.split()) for t in texts)
+
+        print(f"\n[STATS] {len(texts)} chunks, {stats['duplicate_chunks']} near-duplicates "
+              f"merged into {stats['merged_chunks']} canonical chunks (threshold {threshold})")
+        print(f"   Words to embed: {total_words} -> {total_words - stats['duplicate_words']}")
+        print(f"   Canonical chunks shared across videos: {stats['cross_video_chunks']}")
+        for payload in [p for p in kept_payloads if p.get("aliases")][:args.show]:
+            copies = ", ".join(f"{a.get('class_id')}/{a.get('file_name')}" for a in payload["aliases"])
+            print(f"   {payload.get('class_id')}/{payload.get('file_name')} #{payload.get('chunk_index')}: {copies}")
+    except Exception as e:
+        print(f"\n[ERROR] Near-duplicate report failed: {e}")
+        sys.exit(1)
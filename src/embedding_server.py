@@ -0,0 +1,324 @@
+"""
+Local embedding server shared by the chatbots, the query CLI and ingest.
+
+Keeps a single SentenceTransformers model warm in one long-running process and
+serves it over localhost HTTP. Concurrent requests are merged into dynamic
+micro-batches: the first request opens a batch, which is flushed as soon as it
+holds ``max_batch_size`` texts or ``max_wait_ms`` has elapsed.
+
+Run with:
+    python -m src.embedding_server --port 8765
+
+and point clients at it with ``EMBEDDING_SERVER_URL=http://127.0.0.1:8765``.
+"""
+
+from __future__ import annotations
+import argparse
+import base64
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .config import SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+def _encode_array(array: np.ndarray) -> str:
+    """Serialize a float32 matrix as base64 for the wire format."""
+    return base64.b64encode(np.ascontiguousarray(array, dtype="float32").tobytes()).decode("ascii")
+
+
+def _decode_array(data: str, count: int, dim: int) -> np.ndarray:
+    """Deserialize a base64 float32 matrix from the wire format."""
+    return np.frombuffer(base64.b64decode(data), dtype="float32").reshape(count, dim).copy()
+
+
+class _PendingRequest:
+    """A single client request waiting to be encoded."""
+
+    def __init__(self, texts: List[str]) -> None:
+        self.texts = texts
+        self.done = threading.Event()
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatcher:
+    """Merges concurrent encode requests into dynamic micro-batches."""
+
+    def __init__(self, model: Any, max_batch_size: int = 64, max_wait_ms: float = 5.0) -> None:
+        """
+        Initialize the batcher and start its worker thread.
+
+        Args:
+            model: Loaded EmbeddingModel used for encoding
+            max_batch_size: Flush a batch once it holds this many texts
+            max_wait_ms: Maximum time to wait for more requests after the first one
+
+        Raises:
+            ValueError: If batching parameters are invalid
+        """
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be non-negative")
+
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches_run = 0
+        self.texts_encoded = 0
+        self._queue: "queue.Queue[_PendingRequest]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts, blocking until the batch containing them is processed.
+
+        Args:
+            texts: Texts to encode
+
+        Returns:
+            numpy array of embeddings with shape (len(texts), embedding_dim)
+
+        Raises:
+            RuntimeError: If encoding the batch fails
+        """
+        request = _PendingRequest(texts)
+        self._queue.put(request)
+        request.done.wait()
+
+        if request.error is not None:
+            raise RuntimeError(f"Batch encoding failed: {request.error}") from request.error
+        return request.result
+
+    def _collect(self) -> List[_PendingRequest]:
+        """Block for the first request, then gather more until the batch is full or the window closes."""
+        batch = [self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+
+        return batch
+
+    def _run(self) -> None:
+        """Worker loop: encode each micro-batch in one model call and fan results out."""
+        while True:
+            batch = self._collect()
+            texts = [text for request in batch for text in request.texts]
+
+            try:
+                embeddings = self.model.encode(texts, batch_size=self.max_batch_size)
+                offset = 0
+                for request in batch:
+                    request.result = embeddings[offset:offset + len(request.texts)]
+                    offset += len(request.texts)
+                self.batches_run += 1
+                self.texts_encoded += len(texts)
+                logger.debug(f"Encoded micro-batch of {len(texts)} texts from {len(batch)} requests")
+            except Exception as e:
+                logger.error(f"Failed to encode micro-batch: {e}")
+                for request in batch:
+                    request.error = e
+            finally:
+                for request in batch:
+                    request.done.set()
+
+
+class EmbeddingRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler exposing ``GET /health`` and ``POST /embed``."""
+
+    server_version = "EmbeddingServer/1.0"
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+
+        batcher: MicroBatcher = self.server.batcher
+        self._send_json(200, {
+            "status": "ok",
+            "model": batcher.model.get_model_name(),
+            "dim": batcher.model.get_embedding_dimension(),
+            "batches_run": batcher.batches_run,
+            "texts_encoded": batcher.texts_encoded,
+        })
+
+    def do_POST(self) -> None:
+        if self.path != "/embed":
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            texts = body.get("texts")
+            if not texts or not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError("'texts' must be a non-empty list of strings")
+        except Exception as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            embeddings = self.server.batcher.submit(texts)
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        self._send_json(200, {
+            "count": int(embeddings.shape[0]),
+            "dim": int(embeddings.shape[1]),
+            "data": _encode_array(embeddings),
+        })
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class EmbeddingServerClient:
+    """Thin HTTP client for the embedding server."""
+
+    def __init__(self, url: str, timeout: float = 30.0, timeout_per_text: float = 0.5) -> None:
+        """
+        Initialize the client.
+
+        Args:
+            url: Base URL of the server, e.g. ``http://127.0.0.1:8765``
+            timeout: Base request timeout in seconds
+            timeout_per_text: Seconds added to the timeout of an encode request
+                per text, so large ingest batches are not cut off
+        """
+        if not url or not isinstance(url, str):
+            raise ValueError("Server URL must be a non-empty string")
+
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.timeout_per_text = timeout_per_text
+
+    def encode_timeout(self, count: int) -> float:
+        """Timeout in seconds for encoding ``count`` texts."""
+        return self.timeout + self.timeout_per_text * count
+
+    def health(self) -> Dict[str, Any]:
+        """Return the server's health payload (model name and dimension)."""
+        with urllib.request.urlopen(f"{self.url}/health", timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Encode texts on the server.
+
+        Args:
+            texts: Texts to encode
+            batch_size: Ignored; the server sizes its own micro-batches
+
+        Returns:
+            numpy array of embeddings with shape (len(texts), embedding_dim)
+        """
+        request = urllib.request.Request(
+            f"{self.url}/embed",
+            data=json.dumps({"texts": texts}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.encode_timeout(len(texts))) as response:
+            body = json.loads(response.read())
+        return _decode_array(body["data"], body["count"], body["dim"])
+
+
+def serve(
+    host: str,
+    port: int,
+    model_name: str,
+    max_batch_size: int = 64,
+    max_wait_ms: float = 5.0
+) -> None:
+    """
+    Load the model and serve embeddings until interrupted.
+
+    Args:
+        host: Interface to bind (keep this on localhost)
+        port: Port to listen on
+        model_name: SentenceTransformers model to keep warm
+        max_batch_size: Maximum texts per micro-batch
+        max_wait_ms: Maximum batching window in milliseconds
+    """
+    from .embeddings import EmbeddingModel
+
+    model = EmbeddingModel(model_name)
+    httpd = ThreadingHTTPServer((host, port), EmbeddingRequestHandler)
+    httpd.daemon_threads = True
+    httpd.batcher = MicroBatcher(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    logger.info(
+        f"Embedding server listening on http://{host}:{port} "
+        f"(model={model_name}, max_batch={max_batch_size}, max_wait={max_wait_ms}ms)"
+    )
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down embedding server")
+    finally:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Serve a shared embedding model over localhost HTTP")
+    parser.add_argument("--host", type=str, default=SETTINGS.embedding_server_host,
+                       help="Interface to bind")
+    parser.add_argument("--port", type=int, default=SETTINGS.embedding_server_port,
+                       help="Port to listen on")
+    parser.add_argument("--model", type=str, default=SETTINGS.embedding_model,
+                       help="Embedding model to serve")
+    parser.add_argument("--max-batch", type=int, default=SETTINGS.embedding_server_max_batch,
+                       help="Maximum texts per micro-batch")
+    parser.add_argument("--max-wait-ms", type=float, default=SETTINGS.embedding_server_max_wait_ms,
+                       help="Maximum batching window in milliseconds")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                       help="Enable verbose logging")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        serve(args.host, args.port, args.model, args.max_batch, args.max_wait_ms)
+    except Exception as e:
+        print(f"\n[ERROR] Embedding server failed: {e}")
+        sys.exit(1)
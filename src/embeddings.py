@@ -1,26 +1,41 @@
 from __future__ import annotations
+import hashlib
 import logging
-from typing import List, Optional
+import threading
+import time
+import urllib.error
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import numpy as np
 
-try:
-    from sentence_transformers import SentenceTransformer
-except ImportError as e:
-    raise ImportError(
-        "sentence-transformers package is required. Install with: pip install sentence-transformers"
-    ) from e
-
 logger = logging.getLogger(__name__)
 
 class EmbeddingModel:
     """Handles text embeddings using SentenceTransformers models."""
     
-    def __init__(self, model_name: str = "sentence-transformers/all-mpnet-base-v2") -> None:
+    def __init__(
+        self, 
+        model_name: str = "sentence-transformers/all-mpnet-base-v2",
+        server_url: Optional[str] = None,
+        server_timeout: float = 30.0,
+        server_timeout_per_text: float = 0.5,
+        server_retries: int = 2
+    ) -> None:
         """
         Initialize the embedding model.
         
+        When ``server_url`` is given the model runs in client mode: texts are sent
+        to a shared embedding server (see ``src.embedding_server``) and the
+        transformer is only loaded in-process if the server is unreachable or
+        serves a different model, or if an encode request still fails after
+        ``server_retries`` retries.
+        
         Args:
             model_name: Name of the SentenceTransformers model to use
+            server_url: Optional URL of a running embedding server
+            server_timeout: Base timeout in seconds for embedding server requests
+            server_timeout_per_text: Seconds added to an encode request's timeout per text
+            server_retries: Retries of a failed encode request before falling back
             
         Raises:
             ValueError: If model_name is empty or invalid
@@ -29,15 +44,57 @@ class EmbeddingModel:
         if not model_name or not isinstance(model_name, str):
             raise ValueError("Model name must be a non-empty string")
         
+        self.model_name = model_name
+        self.model = None
+        self.server = None
+        self.server_retries = max(int(server_retries), 0)
+        
+        if server_url:
+            self.server = self._connect_server(server_url, server_timeout, server_timeout_per_text)
+        
+        if self.server is None:
+            self._load_local_model()
+
+    def _connect_server(self, server_url: str, timeout: float, timeout_per_text: float) -> Optional[Any]:
+        """Connect to the embedding server, returning None if it cannot be used."""
+        from .embedding_server import EmbeddingServerClient
+        
+        client = EmbeddingServerClient(server_url, timeout=timeout, timeout_per_text=timeout_per_text)
+        try:
+            health = client.health()
+        except Exception as e:
+            logger.warning(f"Embedding server at {server_url} unavailable ({e}); using in-process model")
+            return None
+        
+        if health.get("model") != self.model_name:
+            logger.warning(
+                f"Embedding server at {server_url} serves '{health.get('model')}', "
+                f"expected '{self.model_name}'; using in-process model"
+            )
+            return None
+        
+        self.dim = int(health["dim"])
+        logger.info(f"Using embedding server at {server_url} (dimension: {self.dim})")
+        return client
+
+    def _load_local_model(self) -> None:
+        """Load the SentenceTransformers model into this process."""
+        # Imported here so client mode and lightweight commands never load torch
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "sentence-transformers package is required. Install with: pip install sentence-transformers"
+            ) from e
+        
         try:
-            logger.info(f"Loading embedding model: {model_name}")
-            self.model = SentenceTransformer(model_name)
+            logger.info(f"Loading embedding model: {self.model_name}")
+            self.model = SentenceTransformer(self.model_name)
             self.dim = self.model.get_sentence_embedding_dimension()
-            self.model_name = model_name
             logger.info(f"Model loaded successfully. Embedding dimension: {self.dim}")
         except Exception as e:
-            logger.error(f"Failed to load model {model_name}: {e}")
-            raise RuntimeError(f"Failed to load embedding model '{model_name}'") from e
+            logger.error(f"Failed to load model {self.model_name}: {e}")
+            raise RuntimeError(f"Failed to load embedding model '{self.model_name}'") from e
 
     def encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
         """
@@ -60,6 +117,17 @@ class EmbeddingModel:
         if not all(isinstance(text, str) for text in texts):
             raise ValueError("All texts must be strings")
         
+        if self.server is not None:
+            try:
+                return self._encode_remote(texts, batch_size)
+            except Exception as e:
+                logger.warning(
+                    f"Embedding server at {self.server.url} failed ({e}); "
+                    f"using the in-process model for the rest of this process"
+                )
+                self.server = None
+                self._load_local_model()
+        
         try:
             # Filter out empty strings
             filtered_texts = [text for text in texts if text.strip()]
@@ -101,6 +169,24 @@ class EmbeddingModel:
             logger.error(f"Failed to encode texts: {e}")
             raise RuntimeError("Failed to encode texts") from e
 
+    def _encode_remote(self, texts: List[str], batch_size: Optional[int]) -> np.ndarray:
+        """Encode on the embedding server, retrying transient failures with backoff."""
+        for attempt in range(self.server_retries + 1):
+            try:
+                return self.server.encode(texts, batch_size=batch_size)
+            except urllib.error.HTTPError as e:
+                # Client errors are deterministic; retrying would fail the same way
+                if e.code < 500 or attempt == self.server_retries:
+                    raise
+                error = e
+            except Exception as e:
+                if attempt == self.server_retries:
+                    raise
+                error = e
+            delay = 0.5 * 2 ** attempt
+            logger.info(f"Embedding server request failed ({error}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
     def get_embedding_dimension(self) -> int:
         """Get the embedding dimension of the model."""
         return self.dim
@@ -108,3 +194,146 @@ class EmbeddingModel:
     def get_model_name(self) -> str:
         """Get the name of the loaded model."""
         return self.model_name
+
+    @property
+    def is_remote(self) -> bool:
+        """Whether encoding is delegated to the embedding server."""
+        return self.server is not None
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize query text into a cache key.
+    
+    Collapses whitespace and case-folds so trivially different spellings of the
+    same question share one cache entry. Only the key is normalized; the
+    encoder sees the question as typed, since case carries meaning for
+    tickers and acronyms ("US", "CPI").
+    
+    Args:
+        text: Raw query text
+        
+    Returns:
+        Normalized query text
+    """
+    if not isinstance(text, str):
+        raise TypeError("Query text must be a string")
+    
+    return " ".join(text.split()).casefold()
+
+def model_fingerprint(model_name: str, dim: int) -> str:
+    """
+    Fingerprint of an embedding space (model name and vector dimension).
+    
+    Vectors are only comparable when the index and the query encoder share
+    a fingerprint, so it is recorded by ingest and checked when loading snapshots.
+    
+    Args:
+        model_name: Embedding model name
+        dim: Vector dimension
+        
+    Returns:
+        16-character hex fingerprint
+    """
+    return hashlib.sha1(f"{model_name}|{dim}|cosine".encode("utf-8")).hexdigest()[:16]
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU cache of query embeddings keyed by (model, normalized text)."""
+    
+    def __init__(self, max_size: int = 512) -> None:
+        """
+        Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of embeddings to keep (0 disables caching)
+            
+        Raises:
+            ValueError: If max_size is negative
+        """
+        if max_size < 0:
+            raise ValueError("max_size must be non-negative")
+        
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, model_name: str, text: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for a normalized query key or None, updating counters."""
+        key = (model_name, text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+    
+    def put(self, model_name: str, text: str, vector: np.ndarray) -> None:
+        """Store an embedding under a normalized query key, evicting the least recently used entry."""
+        if self.max_size == 0:
+            return
+        
+        key = (model_name, text)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def get_or_encode(self, model: EmbeddingModel, texts: Iterable[str]) -> np.ndarray:
+        """
+        Return embeddings for ``texts``, encoding only cache misses in one batch.
+        
+        Args:
+            model: Embedding model used for misses
+            texts: Query texts (keyed by ``normalize_query``, encoded as given)
+            
+        Returns:
+            numpy array of embeddings with shape (len(texts), embedding_dim)
+        """
+        texts = list(texts)
+        normalized = [normalize_query(text) for text in texts]
+        model_name = model.get_model_name()
+        vectors: List[Optional[np.ndarray]] = [self.get(model_name, key) for key in normalized]
+        
+        # One original spelling per missing key (the first seen) is encoded
+        missing: Dict[str, str] = {}
+        for text, key, vector in zip(texts, normalized, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+        if missing:
+            logger.debug(f"Query cache miss for {len(missing)} texts; encoding")
+            encoded = dict(zip(missing, model.encode(list(missing.values()))))
+            for key, vector in encoded.items():
+                self.put(model_name, key, vector)
+            vectors = [encoded[key] if vector is None else vector for key, vector in zip(normalized, vectors)]
+        
+        return np.vstack(vectors)
+    
+    def clear(self) -> None:
+        """Drop all cached embeddings and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size and hit-rate counters."""
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
@@ -1,51 +1,124 @@
 """
 Advanced file parsers for PPTX, DOCX, and PDF files.
+
+DOCX and PPTX text is streamed straight from the package XML; the
+python-docx / python-pptx object models are the fallback for packages the
+streaming path cannot read.
 """
 
 from __future__ import annotations
 import logging
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
-def parse_pdf_file(pdf_path: Path) -> str:
+# pdfplumber's default table settings ignore ruling segments shorter than this (points)
+_MIN_EDGE_LENGTH = 3
+
+def _distinct_positions(positions: List[float], tolerance: float = 1.0) -> int:
+    """Number of positions that are more than ``tolerance`` apart (a thin drawn rule counts once)."""
+    count = 0
+    last = None
+    for position in sorted(positions):
+        if last is None or position - last > tolerance:
+            count += 1
+        last = position
+    return count
+
+def _has_ruling(page: Any) -> bool:
     """
-    Parse a PDF file and extract text content.
+    Cheaply decide whether a PDF page may contain a ruled table.
+    
+    pdfplumber's default table finder builds cells from line, rectangle and
+    curve edges. A page needs rules at two or more distinct heights and two or
+    more distinct horizontal positions, and at least three in one direction:
+    a lone box or frame (one cell) is decoration, not a table. Diagonal curve
+    segments (chart lines) are not ruling.
     
     Args:
-        pdf_path: Path to the PDF file
+        page: pdfplumber page
         
     Returns:
-        Extracted text content
+        True if the page has enough ruling to form a grid of two or more cells
     """
-    try:
-        import pdfplumber
+    horizontal: List[float] = []
+    vertical: List[float] = []
+    for edge in page.edges:
+        if edge["orientation"] == "h" and edge["width"] >= _MIN_EDGE_LENGTH:
+            horizontal.append(edge["top"])
+        elif (edge["orientation"] == "v" and edge["height"] >= _MIN_EDGE_LENGTH
+              and abs(edge["x1"] - edge["x0"]) < 1):
+            # pdfplumber labels every non-horizontal line "v", diagonals included
+            vertical.append(edge["x0"])
+    rows, columns = _distinct_positions(horizontal), _distinct_positions(vertical)
+    return rows >= 2 and columns >= 2 and max(rows, columns) >= 3
+
+def iter_pdf_pages(pdf_path: Path, tables: str = "auto") -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream a PDF page by page, releasing each page's parsed objects as it goes.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        tables: "auto" to extract tables only on pages with ruling lines,
+            "always" to try every page, or "never"
         
-        text_content = []
+    Yields:
+        Tuple of (page segment text, metadata with ``page_number`` and ``table_count``);
+        pages without text or tables are skipped
         
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                try:
-                    # Extract text from the page
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content.append(f"--- Page {page_num} ---\n{page_text}")
-                    
-                    # Extract tables if any
-                    tables = page.extract_tables()
-                    if tables:
-                        for table_num, table in enumerate(tables, 1):
-                            text_content.append(f"\n--- Table {table_num} on Page {page_num} ---")
-                            for row in table:
-                                if row:
-                                    text_content.append(" | ".join(str(cell) if cell else "" for cell in row))
+    Raises:
+        ValueError: If ``tables`` is not a known mode
+    """
+    if tables not in ("auto", "always", "never"):
+        raise ValueError(f"Unknown table extraction mode: {tables}")
+    
+    import pdfplumber
+    
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_num, page in enumerate(pdf.pages, 1):
+            parts = []
+            table_count = 0
+            try:
+                # Extract text from the page
+                page_text = page.extract_text()
+                if page_text:
+                    parts.append(f"--- Page {page_num} ---\n{page_text}")
                 
-                except Exception as e:
-                    logger.warning(f"Error processing page {page_num} of {pdf_path}: {e}")
-                    continue
+                # Extract tables where the page has the ruling to hold one
+                if tables == "always" or (tables == "auto" and _has_ruling(page)):
+                    for table_num, table in enumerate(page.extract_tables(), 1):
+                        table_count += 1
+                        parts.append(f"\n--- Table {table_num} on Page {page_num} ---")
+                        for row in table:
+                            if row:
+                                parts.append(" | ".join(str(cell) if cell else "" for cell in row))
+            
+            except Exception as e:
+                logger.warning(f"Error processing page {page_num} of {pdf_path}: {e}")
+            finally:
+                # Drop the page's layout objects and text map before moving on
+                page.close()
+            
+            if parts:
+                yield "\n\n".join(parts), {"page_number": page_num, "table_count": table_count}
+
+def parse_pdf_file(pdf_path: Path, tables: str = "auto") -> str:
+    """
+    Parse a PDF file and extract text content.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        tables: Table extraction mode passed to ``iter_pdf_pages``
         
-        return "\n\n".join(text_content)
+    Returns:
+        Extracted text content
+    """
+    try:
+        return "\n\n".join(segment for segment, _ in iter_pdf_pages(pdf_path, tables))
         
     except ImportError:
         logger.error("pdfplumber not installed. Install with: pip install pdfplumber")
@@ -54,6 +127,201 @@ def parse_pdf_file(pdf_path: Path) -> str:
         logger.error(f"Error parsing PDF {pdf_path}: {e}")
         return ""
 
+# OOXML namespaces used by the streaming DOCX/PPTX extractors
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_TABLE_URI = "http://schemas.openxmlformats.org/drawingml/2006/table"
+_DC = "{http://purl.org/dc/elements/1.1/}"
+
+def _iter_top_level(stream: Any, container: str) -> Iterator[ET.Element]:
+    """
+    Iteratively parse an XML part, yielding each direct child of ``container``.
+    
+    Children are cleared after the caller has handled them, so memory stays
+    bounded by the largest single paragraph, table or shape.
+    """
+    stack: List[str] = []
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            stack.append(elem.tag)
+            continue
+        stack.pop()
+        if stack and stack[-1] == container:
+            yield elem
+            elem.clear()
+
+def _docx_run_text(run: ET.Element) -> str:
+    """Text of a ``w:r`` element, translated the way python-docx does."""
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == f"{_W}t":
+            parts.append(child.text or "")
+        elif tag in (f"{_W}tab", f"{_W}ptab"):
+            parts.append("\t")
+        elif tag == f"{_W}br":
+            parts.append("\n" if child.get(f"{_W}type", "textWrapping") == "textWrapping" else "")
+        elif tag == f"{_W}cr":
+            parts.append("\n")
+        elif tag == f"{_W}noBreakHyphen":
+            parts.append("-")
+    return "".join(parts)
+
+def _docx_paragraph_text(paragraph: ET.Element) -> str:
+    """Text of a ``w:p`` element from its direct runs and hyperlinks."""
+    parts = []
+    for child in paragraph:
+        if child.tag == f"{_W}r":
+            parts.append(_docx_run_text(child))
+        elif child.tag == f"{_W}hyperlink":
+            parts.extend(_docx_run_text(run) for run in child.findall(f"{_W}r"))
+    return "".join(parts)
+
+def _docx_table_rows(table: ET.Element) -> Iterator[List[str]]:
+    """
+    Cell texts of each row of a ``w:tbl``, one entry per layout-grid column.
+    
+    Like python-docx, a horizontally spanned cell repeats for every grid column
+    it covers and a vertically merged cell repeats the text of the cell above.
+    """
+    above: Dict[int, str] = {}
+    for row in table.findall(f"{_W}tr"):
+        grid_before = row.find(f"{_W}trPr/{_W}gridBefore")
+        offset = int(grid_before.get(f"{_W}val", "0")) if grid_before is not None else 0
+        texts: List[str] = []
+        current: Dict[int, str] = {}
+        for cell in row.findall(f"{_W}tc"):
+            grid_span = cell.find(f"{_W}tcPr/{_W}gridSpan")
+            span = int(grid_span.get(f"{_W}val", "1")) if grid_span is not None else 1
+            v_merge = cell.find(f"{_W}tcPr/{_W}vMerge")
+            if v_merge is not None and v_merge.get(f"{_W}val", "continue") == "continue":
+                # KeyError on a malformed merge sends the caller to the python-docx fallback
+                text = above[offset]
+            else:
+                text = "\n".join(_docx_paragraph_text(p) for p in cell.findall(f"{_W}p"))
+            texts.extend([text] * span)
+            current[offset] = text
+            offset += span
+        above = current
+        yield texts
+
+def _parse_docx_fast(docx_path: Path) -> str:
+    """
+    Extract DOCX text by streaming ``word/document.xml``.
+    
+    Produces the same layout as the python-docx path: body paragraphs first,
+    then each body table.
+    
+    Raises:
+        KeyError, zipfile.BadZipFile, ET.ParseError, ValueError: If the package
+            is not a readable WordprocessingML document
+    """
+    text_content = []
+    tables: List[str] = []
+    table_num = 0
+    
+    with zipfile.ZipFile(docx_path) as package, package.open("word/document.xml") as stream:
+        for elem in _iter_top_level(stream, f"{_W}body"):
+            if elem.tag == f"{_W}p":
+                paragraph = _docx_paragraph_text(elem).strip()
+                if paragraph:
+                    text_content.append(paragraph)
+            elif elem.tag == f"{_W}tbl":
+                table_num += 1
+                tables.append(f"\n--- Table {table_num} ---")
+                for row in _docx_table_rows(elem):
+                    row_text = [cell.strip() for cell in row if cell.strip()]
+                    if row_text:
+                        tables.append(" | ".join(row_text))
+    
+    return "\n\n".join(text_content + tables)
+
+def _drawing_paragraph_text(paragraph: ET.Element) -> str:
+    """Text of an ``a:p`` element; line breaks become vertical tabs as in python-pptx."""
+    parts = []
+    for child in paragraph:
+        if child.tag in (f"{_A}r", f"{_A}fld"):
+            t = child.find(f"{_A}t")
+            parts.append(t.text or "" if t is not None else "")
+        elif child.tag == f"{_A}br":
+            parts.append("\v")
+    return "".join(parts)
+
+def _text_body_text(container: ET.Element, tx_body: str) -> str:
+    """Text of the text body of a shape or table cell, one line per paragraph."""
+    body = container.find(tx_body)
+    if body is None:
+        return ""
+    return "\n".join(_drawing_paragraph_text(p) for p in body.findall(f"{_A}p"))
+
+def _pptx_slide_parts(package: zipfile.ZipFile) -> List[str]:
+    """Slide part names in presentation order."""
+    with package.open("ppt/_rels/presentation.xml.rels") as stream:
+        targets = {
+            rel.get("Id"): rel.get("Target")
+            for rel in ET.parse(stream).getroot().iter(f"{_PKG_REL}Relationship")
+        }
+    with package.open("ppt/presentation.xml") as stream:
+        slide_ids = ET.parse(stream).getroot().findall(f"{_P}sldIdLst/{_P}sldId")
+    
+    parts = []
+    for slide_id in slide_ids:
+        target = targets[slide_id.get(f"{_R}id")]
+        if target.startswith("/"):
+            parts.append(target.lstrip("/"))
+        else:
+            parts.append(posixpath.normpath(posixpath.join("ppt", target)))
+    return parts
+
+def _parse_pptx_fast(pptx_path: Path) -> str:
+    """
+    Extract PPTX text by streaming each slide's XML in presentation order.
+    
+    Produces the same layout as the python-pptx path. Only top-level shapes
+    count: text of ``p:sp`` shapes and tables in ``p:graphicFrame`` shapes.
+    
+    Raises:
+        KeyError, zipfile.BadZipFile, ET.ParseError, ValueError: If the package
+            is not a readable PresentationML document
+    """
+    text_content = []
+    
+    with zipfile.ZipFile(pptx_path) as package:
+        for slide_num, part in enumerate(_pptx_slide_parts(package), 1):
+            slide_text = [f"--- Slide {slide_num} ---"]
+            
+            with package.open(part) as stream:
+                for shape in _iter_top_level(stream, f"{_P}spTree"):
+                    if shape.tag == f"{_P}sp":
+                        shape_text = _text_body_text(shape, f"{_P}txBody").strip()
+                        if shape_text:
+                            slide_text.append(shape_text)
+                    
+                    elif shape.tag == f"{_P}graphicFrame":
+                        graphic_data = shape.find(f"{_A}graphic/{_A}graphicData")
+                        if graphic_data is None or graphic_data.get("uri") != _TABLE_URI:
+                            continue
+                        table_text = []
+                        for row in graphic_data.findall(f"{_A}tbl/{_A}tr"):
+                            row_text = []
+                            for cell in row.findall(f"{_A}tc"):
+                                cell_text = _text_body_text(cell, f"{_A}txBody").strip()
+                                if cell_text:
+                                    row_text.append(cell_text)
+                            if row_text:
+                                table_text.append(" | ".join(row_text))
+                        if table_text:
+                            slide_text.append("Table:")
+                            slide_text.extend(table_text)
+            
+            if len(slide_text) > 1:  # More than just the slide header
+                text_content.append("\n".join(slide_text))
+    
+    return "\n\n".join(text_content)
+
 def parse_pptx_file(pptx_path: Path) -> str:
     """
     Parse a PPTX file and extract text content.
@@ -64,6 +332,11 @@ def parse_pptx_file(pptx_path: Path) -> str:
     Returns:
         Extracted text content
     """
+    try:
+        return _parse_pptx_fast(pptx_path)
+    except (KeyError, OSError, zipfile.BadZipFile, ET.ParseError, ValueError) as e:
+        logger.debug(f"Streaming PPTX extraction failed for {pptx_path}, falling back to python-pptx: {e}")
+    
     try:
         from pptx import Presentation
         
@@ -116,6 +389,11 @@ def parse_docx_file(docx_path: Path) -> str:
     Returns:
         Extracted text content
     """
+    try:
+        return _parse_docx_fast(docx_path)
+    except (KeyError, OSError, zipfile.BadZipFile, ET.ParseError, ValueError) as e:
+        logger.debug(f"Streaming DOCX extraction failed for {docx_path}, falling back to python-docx: {e}")
+    
     try:
         from docx import Document
         
@@ -147,6 +425,69 @@ def parse_docx_file(docx_path: Path) -> str:
         logger.error(f"Error parsing DOCX {docx_path}: {e}")
         return ""
 
+def _core_properties(package: zipfile.ZipFile) -> Dict[str, str]:
+    """
+    Title, author and subject from ``docProps/core.xml``.
+    
+    Raises:
+        KeyError: If the package has no core properties part (the object-model
+            libraries substitute their own defaults in that case)
+    """
+    with package.open("docProps/core.xml") as stream:
+        root = ET.parse(stream).getroot()
+    
+    def value(tag: str) -> str:
+        elem = root.find(f"{_DC}{tag}")
+        return (elem.text or "") if elem is not None else ""
+    
+    return {"title": value("title"), "author": value("creator"), "subject": value("subject")}
+
+def _office_metadata_fast(file_path: Path) -> Dict[str, Any]:
+    """
+    DOCX/PPTX metadata read straight from the package parts.
+    
+    Raises:
+        KeyError, zipfile.BadZipFile, ET.ParseError, ValueError: If a part is
+            missing or unreadable
+    """
+    with zipfile.ZipFile(file_path) as package:
+        if file_path.suffix.lower() == ".pptx":
+            counts = {"slide_count": len(_pptx_slide_parts(package))}
+        else:
+            paragraphs = tables = 0
+            with package.open("word/document.xml") as stream:
+                for elem in _iter_top_level(stream, f"{_W}body"):
+                    paragraphs += elem.tag == f"{_W}p"
+                    tables += elem.tag == f"{_W}tbl"
+            counts = {"paragraph_count": paragraphs, "table_count": tables}
+        return {**counts, **_core_properties(package)}
+
+def parse_file_segments(file_path: Path) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Parse a file into segments that are chunked separately.
+    
+    PDFs give one segment per page, with ``page_number`` and ``table_count``
+    metadata; other types give their whole text as a single segment.
+    
+    Args:
+        file_path: Path to the file to parse
+        
+    Returns:
+        List of (segment text, segment metadata); empty if nothing was extracted
+    """
+    if file_path.suffix.lower() == '.pdf':
+        try:
+            return list(iter_pdf_pages(file_path))
+        except ImportError:
+            logger.error("pdfplumber not installed. Install with: pip install pdfplumber")
+            return []
+        except Exception as e:
+            logger.error(f"Error parsing PDF {file_path}: {e}")
+            return []
+    
+    text = parse_file_by_type(file_path)
+    return [(text, {})] if text.strip() else []
+
 def parse_file_by_type(file_path: Path) -> str:
     """
     Parse a file based on its extension.
@@ -202,7 +543,14 @@ def get_file_metadata(file_path: Path) -> Dict[str, Any]:
         except Exception as e:
             logger.warning(f"Could not extract PDF metadata: {e}")
     
-    elif file_extension == '.pptx':
+    elif file_extension in ('.pptx', '.docx'):
+        try:
+            metadata.update(_office_metadata_fast(file_path))
+            return metadata
+        except (KeyError, OSError, zipfile.BadZipFile, ET.ParseError, ValueError) as e:
+            logger.debug(f"Streaming metadata extraction failed for {file_path}, using the object model: {e}")
+    
+    if file_extension == '.pptx':
         try:
             from pptx import Presentation
             prs = Presentation(file_path)
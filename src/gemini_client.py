@@ -75,7 +75,8 @@ class GeminiClient:
         self, 
         question: str, 
         context_chunks: List[Dict[str, Any]], 
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        brief: bool = False
     ) -> Dict[str, Any]:
         """
         Generate a response using Gemini with context from retrieved chunks.
@@ -84,6 +85,7 @@ class GeminiClient:
             question: User's question
             context_chunks: List of context chunks from vector search
             system_prompt: Optional system prompt to guide the response
+            brief: Expect a short answer; skips the re-prompt for incomplete responses
             
         Returns:
             Dictionary containing the generated response and metadata
@@ -182,7 +184,7 @@ Please give a clear, direct response about trading and finance."""
                 logger.warning("Gemini response has no text content")
                 
             # Check for incomplete responses
-            if self._is_incomplete_response(response_text):
+            if not brief and self._is_incomplete_response(response_text):
                 logger.warning("Detected potentially incomplete response, attempting to complete...")
                 # Try to get a more complete response
                 try:
@@ -247,6 +249,11 @@ Please give a clear, direct response about trading and finance."""
             source = chunk.get("source", "unknown")
             class_id = chunk.get("class_id", "unknown")
             
+            # Merged duplicates: the same material also appears in these videos
+            also_in = chunk.get("alias_class_ids") or []
+            if also_in:
+                source = f"{source}; also in {', '.join(also_in)}"
+            
             if text:
                 context_parts.append(f"[Source {i} - {class_id} ({source})]\n{text}\n")
         
@@ -353,6 +360,8 @@ Please provide a complete, detailed answer that thoroughly addresses the questio
                 "chunk_index": chunk.get("chunk_index"),
                 "score": chunk.get("score", 0.0)
             }
+            if chunk.get("alias_class_ids"):
+                source_info["also_in"] = list(chunk["alias_class_ids"])
             sources.append(source_info)
         return sources
 
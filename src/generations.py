@@ -0,0 +1,143 @@
+"""
+Per-generation local data files.
+
+Blue/green rebuilds version the Qdrant collection (``kb_vectors_v20250101T120000``).
+The chunk store, BM25 index and summary index are versioned with it, so a
+build never writes to the files the live generation serves from:
+
+- a build writes ``chunk_store_v20250101T120000.sqlite``,
+  ``sparse_index_v20250101T120000.npz`` and ``summary_index_v20250101T120000.npz``
+- the ingest manifest (``INGEST_MANIFEST_PATH``) names the live collection; it is
+  rewritten atomically right after the alias swap and query processes follow it
+- garbage collection deletes a generation's files together with its collection
+
+Collections without a version suffix (in-place rebuilds, the local backend)
+use the configured paths unchanged.
+"""
+
+from __future__ import annotations
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# Settings holding the paths of per-generation data files
+DATA_FILES = ("chunk_store_path", "sparse_index_path", "summary_index_path")
+
+_GENERATION_SUFFIX = re.compile(r"_v\d{8}T\d{6}$")
+
+# SQLite side files that belong to a chunk store
+_SQLITE_SIDE_FILES = ("-wal", "-shm", "-journal")
+
+_live_lock = threading.Lock()
+_live_cache: Tuple[Optional[float], Optional[str]] = (None, None)
+
+def generation_path(path: str, collection: Optional[str]) -> str:
+    """
+    Path of a data file for a collection generation.
+
+    Args:
+        path: Configured path, e.g. ``./data/chunk_store.sqlite``
+        collection: Collection name, e.g. ``kb_vectors_v20250101T120000`` (or None)
+
+    Returns:
+        ``./data/chunk_store_v20250101T120000.sqlite`` for a versioned
+        collection, otherwise ``path`` unchanged
+    """
+    suffix = _GENERATION_SUFFIX.search(collection or "")
+    if suffix is None:
+        return path
+    base = Path(path)
+    return str(base.with_name(f"{base.stem}{suffix.group()}{base.suffix}"))
+
+def generation_paths(collection: Optional[str]) -> Dict[str, str]:
+    """Paths of every per-generation data file (keyed by setting name) for a collection."""
+    return {name: generation_path(getattr(SETTINGS, name), collection) for name in DATA_FILES}
+
+def save_manifest(manifest: Dict[str, Any]) -> None:
+    """
+    Write the ingest manifest atomically, switching readers to its ``collection``.
+
+    Args:
+        manifest: Manifest with at least a ``collection`` key
+    """
+    path = Path(SETTINGS.ingest_manifest_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    tmp_path.replace(path)
+
+def live_generation() -> Optional[str]:
+    """
+    The collection the ingest manifest marks as live, or None without a manifest.
+
+    The manifest is re-read only when its modification time changes.
+    """
+    global _live_cache
+    path = Path(SETTINGS.ingest_manifest_path)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+    with _live_lock:
+        if _live_cache[0] != mtime:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    _live_cache = (mtime, json.load(f).get("collection"))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read ingest manifest {path}: {e}")
+        return _live_cache[1]
+
+def live_path(name: str) -> str:
+    """
+    Path of a data file for the live generation.
+
+    Args:
+        name: One of ``DATA_FILES``
+
+    Returns:
+        Path for the collection named in the ingest manifest
+
+    Raises:
+        ValueError: If name is not a per-generation data file
+    """
+    if name not in DATA_FILES:
+        raise ValueError(f"Unknown data file '{name}' (expected one of {DATA_FILES})")
+    return generation_path(getattr(SETTINGS, name), live_generation())
+
+def remove_generation_files(collection: str) -> List[str]:
+    """
+    Delete the data files of a collection generation.
+
+    Unversioned collections are ignored, so the configured paths are never deleted.
+
+    Args:
+        collection: Generation collection name
+
+    Returns:
+        Paths that were deleted
+    """
+    if _GENERATION_SUFFIX.search(collection or "") is None:
+        return []
+
+    removed = []
+    for name, path in generation_paths(collection).items():
+        candidates = [path] + ([path + side for side in _SQLITE_SIDE_FILES] if name == "chunk_store_path" else [])
+        for candidate in candidates:
+            try:
+                os.remove(candidate)
+                removed.append(candidate)
+            except FileNotFoundError:
+                continue
+    if removed:
+        logger.info(f"Removed data files of generation '{collection}': {removed}")
+    return removed
@@ -1,26 +1,62 @@
 from __future__ import annotations
 import logging
-from typing import Any, Dict, List, Optional, Union
+import re
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
-try:
+if TYPE_CHECKING:
     from qdrant_client import QdrantClient
-    from qdrant_client.http import models as rest
-    from qdrant_client.http.exceptions import UnexpectedResponse
-except ImportError as e:
-    raise ImportError(
-        "qdrant-client package is required. Install with: pip install qdrant-client"
-    ) from e
 
 logger = logging.getLogger(__name__)
 
-def connect(host: str, port: int, api_key: Optional[str] = None) -> QdrantClient:
+def _require_qdrant() -> Any:
+    """
+    Import qdrant-client on first use.
+    
+    Keeping the import out of module scope means importing this module (and
+    the ``src`` package) stays cheap for commands that never touch Qdrant.
+    
+    Returns:
+        The ``qdrant_client`` module
+        
+    Raises:
+        ImportError: If qdrant-client is not installed
+    """
+    try:
+        import qdrant_client
+        from qdrant_client.http import models  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "qdrant-client package is required. Install with: pip install qdrant-client"
+        ) from e
+    return qdrant_client
+
+def _models() -> Any:
+    """Return qdrant-client's REST models module, importing it on first use."""
+    return _require_qdrant().http.models
+
+# Embedded clients hold a file lock on their storage, so one per path is shared per process
+_EMBEDDED_CLIENTS: Dict[str, Any] = {}
+
+def connect(
+    host: str,
+    port: int,
+    api_key: Optional[str] = None,
+    path: Optional[str] = None
+) -> QdrantClient:
     """
     Connect to Qdrant server with error handling.
     
+    When ``path`` is set, no server is contacted: qdrant-client runs embedded
+    in this process, persisting to that directory, or purely in memory when
+    ``path`` is ``":memory:"``. Embedded clients are cached per path because
+    local storage can only be opened by one client at a time.
+    
     Args:
         host: Qdrant server host
         port: Qdrant server port
         api_key: Optional API key for authentication
+        path: Optional embedded storage directory or ":memory:" (overrides host/port)
         
     Returns:
         Connected QdrantClient instance
@@ -29,6 +65,27 @@ def connect(host: str, port: int, api_key: Optional[str] = None) -> QdrantClient
         ConnectionError: If connection to Qdrant fails
         ValueError: If connection parameters are invalid
     """
+    QdrantClient = _require_qdrant().QdrantClient
+    
+    if path:
+        client = _EMBEDDED_CLIENTS.get(path)
+        if client is not None:
+            return client
+        
+        try:
+            if path == ":memory:":
+                logger.info("Starting embedded in-memory Qdrant")
+                client = QdrantClient(location=":memory:")
+            else:
+                logger.info(f"Opening embedded Qdrant storage at {path}")
+                client = QdrantClient(path=path)
+            _EMBEDDED_CLIENTS[path] = client
+            return client
+        
+        except Exception as e:
+            logger.error(f"Failed to open embedded Qdrant at {path}: {e}")
+            raise ConnectionError(f"Failed to open embedded Qdrant at {path}: {e}") from e
+    
     if not isinstance(host, str) or not host.strip():
         raise ValueError("Host must be a non-empty string")
     
@@ -49,7 +106,97 @@ def connect(host: str, port: int, api_key: Optional[str] = None) -> QdrantClient
         logger.error(f"Failed to connect to Qdrant at {host}:{port}: {e}")
         raise ConnectionError(f"Failed to connect to Qdrant: {e}") from e
 
-def recreate_collection(client: QdrantClient, collection: str, vector_size: int) -> None:
+def connect_from_settings(settings: Any) -> QdrantClient:
+    """
+    Connect using the Qdrant settings (server, or embedded when ``qdrant_path`` is set).
+    
+    Args:
+        settings: Settings instance
+        
+    Returns:
+        Connected QdrantClient instance
+    """
+    return connect(settings.qdrant_host, settings.qdrant_port, settings.qdrant_api_key, path=settings.qdrant_path)
+
+def collection_options(settings: Any) -> Dict[str, Any]:
+    """
+    Collect collection-level storage options from a Settings object.
+    
+    Args:
+        settings: Settings instance (usually ``SETTINGS``)
+        
+    Returns:
+        Keyword arguments for ``recreate_collection``
+    """
+    return {
+        "quantization": settings.qdrant_quantization,
+        "always_ram": settings.qdrant_quantization_always_ram,
+        "on_disk": settings.qdrant_on_disk,
+        "hnsw_m": settings.qdrant_hnsw_m,
+        "hnsw_ef_construct": settings.qdrant_hnsw_ef_construct,
+    }
+
+def search_options(settings: Any) -> Dict[str, Any]:
+    """
+    Collect query-time search options from a Settings object.
+    
+    Args:
+        settings: Settings instance (usually ``SETTINGS``)
+        
+    Returns:
+        Keyword arguments for ``search``
+    """
+    quantized = settings.qdrant_quantization != "none"
+    return {
+        "hnsw_ef": settings.qdrant_hnsw_ef,
+        "rescore": settings.qdrant_quantization_rescore if quantized else None,
+        "oversampling": settings.qdrant_quantization_oversampling if quantized else None,
+    }
+
+def build_quantization_config(quantization: str, always_ram: bool = True) -> Optional[Any]:
+    """
+    Build a Qdrant quantization config.
+    
+    Args:
+        quantization: One of "none", "scalar" (int8) or "binary"
+        always_ram: Keep quantized vectors in RAM even when originals are on disk
+        
+    Returns:
+        Quantization config, or None for "none"
+        
+    Raises:
+        ValueError: If the quantization mode is unknown
+    """
+    rest = _models()
+    mode = (quantization or "none").lower()
+    
+    if mode == "none":
+        return None
+    if mode == "scalar":
+        return rest.ScalarQuantization(
+            scalar=rest.ScalarQuantizationConfig(
+                type=rest.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=always_ram
+            )
+        )
+    if mode == "binary":
+        return rest.BinaryQuantization(
+            binary=rest.BinaryQuantizationConfig(always_ram=always_ram)
+        )
+    raise ValueError(f"Unknown quantization '{quantization}' (expected none, scalar or binary)")
+
+def recreate_collection(
+    client: QdrantClient, 
+    collection: str, 
+    vector_size: int,
+    *,
+    quantization: str = "none",
+    always_ram: bool = True,
+    on_disk: bool = False,
+    hnsw_m: Optional[int] = None,
+    hnsw_ef_construct: Optional[int] = None
+) -> None:
     """
     Recreate a Qdrant collection with the specified vector configuration.
     
@@ -57,6 +204,11 @@ def recreate_collection(client: QdrantClient, collection: str, vector_size: int)
         client: Connected QdrantClient instance
         collection: Name of the collection to recreate
         vector_size: Dimension of the vectors
+        quantization: "none", "scalar" (int8) or "binary"
+        always_ram: Keep quantized vectors in RAM
+        on_disk: Store original float32 vectors on disk (memmap) instead of RAM
+        hnsw_m: Optional HNSW graph degree (Qdrant default when None)
+        hnsw_ef_construct: Optional HNSW build-time beam width
         
     Raises:
         ValueError: If parameters are invalid
@@ -68,15 +220,29 @@ def recreate_collection(client: QdrantClient, collection: str, vector_size: int)
     if not isinstance(vector_size, int) or vector_size <= 0:
         raise ValueError("Vector size must be a positive integer")
     
+    rest = _models()
+    quantization_config = build_quantization_config(quantization, always_ram)
+    
+    hnsw_config = None
+    if hnsw_m is not None or hnsw_ef_construct is not None:
+        hnsw_config = rest.HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct)
+    
     try:
-        logger.info(f"Recreating collection '{collection}' with vector size {vector_size}")
+        logger.info(
+            f"Recreating collection '{collection}' with vector size {vector_size} "
+            f"(quantization={quantization}, on_disk={on_disk}, hnsw_m={hnsw_m}, "
+            f"hnsw_ef_construct={hnsw_ef_construct})"
+        )
         
         client.recreate_collection(
             collection_name=collection,
             vectors_config=rest.VectorParams(
                 size=vector_size, 
-                distance=rest.Distance.COSINE
+                distance=rest.Distance.COSINE,
+                on_disk=on_disk
             ),
+            hnsw_config=hnsw_config,
+            quantization_config=quantization_config,
         )
         
         logger.info(f"Successfully recreated collection '{collection}'")
@@ -114,6 +280,8 @@ def upsert_points(
         logger.warning("No vectors to upsert")
         return
     
+    rest = _models()
+    
     try:
         logger.debug(f"Upserting {len(vectors)} points to collection '{collection}'")
         
@@ -146,12 +314,271 @@ def upsert_points(
         logger.error(f"Failed to upsert points to collection '{collection}': {e}")
         raise RuntimeError(f"Failed to upsert points: {e}") from e
 
+# Small payload fields kept in Qdrant; chunk text and full file metadata live
+# in the local chunk store (see chunk_store.py)
+PAYLOAD_FIELDS = (
+    "id",
+    "class_id",
+    "source",
+    "video_number",
+    "video_label",
+    "file_name",
+    "sheet",
+    "page_number",
+    "table_count",
+    "chunk_index",
+    "word_count",
+    "text_length",
+    "content_type",
+    "aliases",
+    "alias_class_ids",
+)
+
+def index_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the small, filterable fields of a full chunk payload."""
+    return {key: payload[key] for key in PAYLOAD_FIELDS if key in payload}
+
+# Payload fields that ingest indexes for filtered search
+PAYLOAD_INDEX_FIELDS: Dict[str, str] = {
+    "class_id": "keyword",
+    "source": "keyword",
+    "video_number": "integer",
+    "alias_class_ids": "keyword",
+}
+
+# Fields whose value may also be listed in an alias field (merged duplicates,
+# see dedup.py): positive matches accept either, negations only the field itself
+FIELD_ALIASES: Dict[str, str] = {"class_id": "alias_class_ids"}
+
+_RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+_FILTER_OPERATORS = ("eq", "any", "not") + _RANGE_OPERATORS
+
+def create_payload_indexes(
+    client: QdrantClient, 
+    collection: str, 
+    fields: Optional[Dict[str, str]] = None
+) -> None:
+    """
+    Create payload indexes so filtered searches do not scan payloads.
+    
+    Args:
+        client: Connected QdrantClient instance
+        collection: Name of the collection
+        fields: Mapping of payload field to schema type ("keyword", "integer", ...);
+            defaults to ``PAYLOAD_INDEX_FIELDS``
+        
+    Raises:
+        ValueError: If a schema type is unknown
+        RuntimeError: If index creation fails
+    """
+    rest = _models()
+    fields = PAYLOAD_INDEX_FIELDS if fields is None else fields
+    
+    for field_name, schema in fields.items():
+        try:
+            field_schema = rest.PayloadSchemaType(schema)
+        except ValueError as e:
+            raise ValueError(f"Unknown payload schema '{schema}' for field '{field_name}'") from e
+        
+        try:
+            client.create_payload_index(
+                collection_name=collection,
+                field_name=field_name,
+                field_schema=field_schema,
+                wait=True,
+            )
+            logger.info(f"Created {schema} payload index on '{field_name}' in '{collection}'")
+        except Exception as e:
+            logger.error(f"Failed to create payload index on '{field_name}': {e}")
+            raise RuntimeError(f"Failed to create payload index on '{field_name}': {e}") from e
+
+def _match_condition(rest: Any, key: str, value: Any) -> Any:
+    """Build an equality (scalar) or match-any (list) condition."""
+    if isinstance(value, (list, tuple, set)):
+        values = list(value)
+        if not values:
+            raise ValueError(f"Filter list for '{key}' must not be empty")
+        return rest.FieldCondition(key=key, match=rest.MatchAny(any=values))
+    
+    if not isinstance(value, (str, int, bool)):
+        raise ValueError(f"Filter value for '{key}' must be a string, integer, boolean or list, got: {value!r}")
+    
+    return rest.FieldCondition(key=key, match=rest.MatchValue(value=value))
+
+def _field_conditions(rest: Any, key: str, spec: Any) -> tuple[List[Any], List[Any]]:
+    """Translate one filter spec into (must, must_not) condition lists."""
+    if not isinstance(spec, dict):
+        return [_match_condition(rest, key, spec)], []
+    
+    unknown = set(spec) - set(_FILTER_OPERATORS)
+    if unknown:
+        raise ValueError(f"Unknown filter operators for '{key}': {sorted(unknown)}")
+    
+    must: List[Any] = []
+    must_not: List[Any] = []
+    
+    if "eq" in spec:
+        must.append(_match_condition(rest, key, spec["eq"]))
+    
+    if "any" in spec:
+        must.append(_match_condition(rest, key, list(spec["any"])))
+    
+    bounds = {op: spec[op] for op in _RANGE_OPERATORS if op in spec}
+    if bounds:
+        if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in bounds.values()):
+            raise ValueError(f"Range bounds for '{key}' must be numbers, got: {bounds}")
+        must.append(rest.FieldCondition(key=key, range=rest.Range(**bounds)))
+    
+    if "not" in spec:
+        negated, nested_not = _field_conditions(rest, key, spec["not"])
+        if nested_not:
+            raise ValueError(f"Nested negation is not supported for '{key}'")
+        # NOT (a AND b) must stay one condition, so wrap multi-part specs
+        must_not.append(negated[0] if len(negated) == 1 else rest.Filter(must=negated))
+    
+    if not must and not must_not:
+        raise ValueError(f"Filter for '{key}' has no conditions")
+    
+    return must, must_not
+
+def _positive_spec(spec: Any) -> Any:
+    """A filter spec without its ``not`` part."""
+    if isinstance(spec, dict):
+        return {op: value for op, value in spec.items() if op != "not"}
+    return spec
+
+def build_filter(filters: Optional[Dict[str, Any]]) -> Optional[Any]:
+    """
+    Build a Qdrant filter from a small dictionary DSL.
+    
+    Each key is a payload field; all keys are ANDed. Values may be:
+    
+    - a scalar: exact match, e.g. ``{"class_id": "PTM_Video_7"}``
+    - a list: match any, e.g. ``{"source": ["pdf", "docx"]}``
+    - a dict of operators, ANDed together:
+      ``eq`` (scalar), ``any`` (list), ``gt``/``gte``/``lt``/``lte`` (numeric range)
+      and ``not`` (any of the above, negated), e.g.
+      ``{"video_number": {"gte": 16, "lte": 21}, "class_id": {"not": "Trade_Template"}}``
+    
+    A positive ``class_id`` match also accepts chunks that list the video in
+    ``alias_class_ids`` (material merged from several videos at ingest).
+    
+    Args:
+        filters: Filter dictionary or None
+        
+    Returns:
+        Qdrant Filter, or None if no filters were given
+        
+    Raises:
+        ValueError: If the filter specification is invalid
+    """
+    if not filters:
+        return None
+    
+    if not isinstance(filters, dict):
+        raise ValueError("Filters must be a dictionary")
+    
+    rest = _models()
+    must: List[Any] = []
+    must_not: List[Any] = []
+    
+    for key, spec in filters.items():
+        if not isinstance(key, str) or not key.strip():
+            raise ValueError(f"Filter key must be a non-empty string, got: {key}")
+        
+        key_must, key_must_not = _field_conditions(rest, key, spec)
+        alias = FIELD_ALIASES.get(key)
+        if alias and key_must:
+            alias_must, _ = _field_conditions(rest, alias, _positive_spec(spec))
+            key_must = [rest.Filter(should=[rest.Filter(must=key_must), rest.Filter(must=alias_must)])]
+        must.extend(key_must)
+        must_not.extend(key_must_not)
+    
+    return rest.Filter(must=must or None, must_not=must_not or None)
+
+def _spec_matches(value: Any, spec: Any) -> bool:
+    """Evaluate one filter spec against a payload value (mirrors ``_field_conditions``)."""
+    if not isinstance(spec, dict):
+        if isinstance(spec, (list, tuple, set)):
+            return value in list(spec)
+        return value == spec
+    
+    unknown = set(spec) - set(_FILTER_OPERATORS)
+    if unknown:
+        raise ValueError(f"Unknown filter operators: {sorted(unknown)}")
+    
+    if "eq" in spec and value != spec["eq"]:
+        return False
+    
+    if "any" in spec and value not in list(spec["any"]):
+        return False
+    
+    for op in _RANGE_OPERATORS:
+        if op not in spec:
+            continue
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return False
+        bound = spec[op]
+        if ((op == "gt" and not value > bound) or (op == "gte" and not value >= bound)
+                or (op == "lt" and not value < bound) or (op == "lte" and not value <= bound)):
+            return False
+    
+    if "not" in spec and _spec_matches(value, spec["not"]):
+        return False
+    
+    return True
+
+def _field_matches(payload: Dict[str, Any], key: str, spec: Any) -> bool:
+    """Evaluate one filter key, honouring ``FIELD_ALIASES`` like ``build_filter``."""
+    value = payload.get(key)
+    if _spec_matches(value, spec):
+        return True
+    
+    alias = FIELD_ALIASES.get(key)
+    positive = _positive_spec(spec)
+    if alias is None or not positive:
+        return False
+    if isinstance(spec, dict) and "not" in spec and _spec_matches(value, spec["not"]):
+        return False
+    return any(_spec_matches(v, positive) for v in payload.get(alias) or ())
+
+def matches_filter(payload: Dict[str, Any], filters: Optional[Dict[str, Any]]) -> bool:
+    """
+    Check a payload against the ``build_filter`` DSL without a Qdrant round trip.
+    
+    Used to apply the same filters to retrieval legs that do not run inside
+    Qdrant (for example the local BM25 index).
+    
+    Args:
+        payload: Point payload
+        filters: Filter dictionary or None
+        
+    Returns:
+        True if the payload satisfies every filter
+        
+    Raises:
+        ValueError: If the filter specification is invalid
+    """
+    if not filters:
+        return True
+    
+    if not isinstance(filters, dict):
+        raise ValueError("Filters must be a dictionary")
+    
+    return all(_field_matches(payload, key, spec) for key, spec in filters.items())
+
 def search(
     client: QdrantClient, 
     collection: str, 
     query_vector: List[float], 
     top_k: int, 
-    filters: Optional[Dict[str, Any]] = None
+    filters: Optional[Dict[str, Any]] = None,
+    *,
+    hnsw_ef: Optional[int] = None,
+    rescore: Optional[bool] = None,
+    oversampling: Optional[float] = None,
+    with_payload: Union[bool, List[str]] = True,
+    with_vectors: bool = False
 ) -> List[Any]:
     """
     Search for similar vectors in a Qdrant collection.
@@ -161,7 +588,12 @@ def search(
         collection: Name of the collection to search
         query_vector: Query vector for similarity search
         top_k: Number of results to return
-        filters: Optional filters to apply
+        filters: Optional filters to apply (see ``build_filter`` for the syntax)
+        hnsw_ef: Optional per-query HNSW beam width (higher = better recall, slower)
+        rescore: Rescore quantized candidates with original vectors
+        oversampling: Fetch ``top_k * oversampling`` quantized candidates before rescoring
+        with_payload: True for the full payload, or a list of payload fields to return
+        with_vectors: Also return the stored vectors (e.g. for MMR reranking)
         
     Returns:
         List of search results
@@ -176,36 +608,36 @@ def search(
     if not isinstance(top_k, int) or top_k <= 0:
         raise ValueError("Top K must be a positive integer")
     
+    rest = _models()
+    
     try:
         logger.debug(f"Searching collection '{collection}' with top_k={top_k}")
         
         # Build query filter if provided
-        qp_filter = None
-        if filters:
-            if not isinstance(filters, dict):
-                raise ValueError("Filters must be a dictionary")
-            
-            must_conditions = []
-            for key, value in filters.items():
-                if not isinstance(key, str) or not key.strip():
-                    raise ValueError(f"Filter key must be a non-empty string, got: {key}")
-                
-                must_conditions.append(
-                    rest.FieldCondition(
-                        key=key, 
-                        match=rest.MatchValue(value=value)
-                    )
-                )
-            
-            qp_filter = rest.Filter(must=must_conditions)
+        qp_filter = build_filter(filters)
+        if qp_filter is not None:
             logger.debug(f"Applied filters: {list(filters.keys())}")
         
+        # Build search params only when something overrides the defaults
+        search_params = None
+        if hnsw_ef is not None or rescore is not None or oversampling is not None:
+            quantization_params = None
+            if rescore is not None or oversampling is not None:
+                quantization_params = rest.QuantizationSearchParams(
+                    rescore=rescore,
+                    oversampling=oversampling
+                )
+            search_params = rest.SearchParams(hnsw_ef=hnsw_ef, quantization=quantization_params)
+        
         # Perform search
         results = client.search(
             collection_name=collection,
             query_vector=query_vector,
             limit=top_k,
             query_filter=qp_filter,
+            search_params=search_params,
+            with_payload=with_payload,
+            with_vectors=with_vectors,
         )
         
         logger.info(f"Search returned {len(results)} results")
@@ -215,6 +647,78 @@ def search(
         logger.error(f"Failed to search collection '{collection}': {e}")
         raise RuntimeError(f"Failed to search collection: {e}") from e
 
+def scroll_matching(
+    client: QdrantClient,
+    collection: str,
+    alternatives: List[Dict[str, Any]],
+    limit: int,
+    with_payload: Union[bool, List[str]] = True
+) -> List[Any]:
+    """
+    Fetch the points matching any of several filters in one batched scroll.
+    
+    Args:
+        client: Connected QdrantClient instance
+        collection: Name of the collection
+        alternatives: Filter dictionaries (``build_filter`` syntax), ORed together
+        limit: Maximum number of points to return
+        with_payload: True for the full payload, or a list of payload fields to return
+        
+    Returns:
+        List of records (id, payload)
+        
+    Raises:
+        RuntimeError: If the scroll fails
+    """
+    if not alternatives or limit <= 0:
+        return []
+    
+    rest = _models()
+    
+    try:
+        scroll_filter = rest.Filter(should=[build_filter(f) for f in alternatives])
+        points: List[Any] = []
+        offset = None
+        while len(points) < limit:
+            page, offset = client.scroll(
+                collection_name=collection, scroll_filter=scroll_filter, limit=limit - len(points),
+                offset=offset, with_payload=with_payload, with_vectors=False,
+            )
+            points.extend(page)
+            if offset is None or not page:
+                break
+        return points
+        
+    except Exception as e:
+        logger.error(f"Failed to scroll collection '{collection}': {e}")
+        raise RuntimeError(f"Failed to scroll collection: {e}") from e
+
+def retrieve_vectors(client: QdrantClient, collection: str, ids: List[Any]) -> Dict[str, List[float]]:
+    """
+    Fetch the stored vectors of points by ID.
+    
+    Args:
+        client: Connected QdrantClient instance
+        collection: Name of the collection
+        ids: Point IDs
+        
+    Returns:
+        Dictionary of point ID (as a string) to vector; missing points are left out
+        
+    Raises:
+        RuntimeError: If the lookup fails
+    """
+    if not ids:
+        return {}
+    
+    try:
+        points = client.retrieve(collection_name=collection, ids=list(ids), with_vectors=True, with_payload=False)
+        return {str(point.id): point.vector for point in points}
+        
+    except Exception as e:
+        logger.error(f"Failed to retrieve vectors from '{collection}': {e}")
+        raise RuntimeError(f"Failed to retrieve vectors: {e}") from e
+
 def get_collection_info(client: QdrantClient, collection: str) -> Dict[str, Any]:
     """
     Get information about a collection.
@@ -265,3 +769,157 @@ def delete_collection(client: QdrantClient, collection: str) -> None:
     except Exception as e:
         logger.error(f"Failed to delete collection '{collection}': {e}")
         raise RuntimeError(f"Failed to delete collection: {e}") from e
+
+def versioned_collection_name(alias: str) -> str:
+    """
+    Build a new generation name for an alias, e.g. ``kb_vectors_v20250101T120000``.
+    
+    Args:
+        alias: Alias that queries use
+        
+    Returns:
+        Collection name for a new generation
+    """
+    return f"{alias}_v{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}"
+
+def resolve_alias(client: QdrantClient, alias: str) -> Optional[str]:
+    """
+    Get the collection an alias currently points to.
+    
+    Args:
+        client: Connected QdrantClient instance
+        alias: Alias name
+        
+    Returns:
+        Collection name, or None if the alias does not exist
+    """
+    for description in client.get_aliases().aliases:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+def list_generations(client: QdrantClient, alias: str) -> List[str]:
+    """
+    List the versioned collections built for an alias, oldest first.
+    
+    Args:
+        client: Connected QdrantClient instance
+        alias: Alias name
+        
+    Returns:
+        Sorted list of generation collection names
+    """
+    pattern = re.compile(rf"^{re.escape(alias)}_v\d{{8}}T\d{{6}}$")
+    return sorted(c.name for c in client.get_collections().collections if pattern.match(c.name))
+
+def validate_collection(
+    client: QdrantClient,
+    collection: str,
+    expected_points: int,
+    vector_size: int
+) -> None:
+    """
+    Check that a freshly built collection is complete before it goes live.
+    
+    Args:
+        client: Connected QdrantClient instance
+        collection: Collection to validate
+        expected_points: Number of distinct points that were upserted
+        vector_size: Expected vector dimension
+        
+    Raises:
+        RuntimeError: If the collection is incomplete or misconfigured
+    """
+    try:
+        vectors_config = client.get_collection(collection).config.params.vectors
+        points = client.count(collection_name=collection, exact=True).count
+    except Exception as e:
+        raise RuntimeError(f"Failed to inspect collection '{collection}': {e}") from e
+    
+    if vectors_config.size != vector_size:
+        raise RuntimeError(
+            f"Collection '{collection}' has vector size {vectors_config.size}, expected {vector_size}"
+        )
+    
+    if points == 0 or points != expected_points:
+        raise RuntimeError(f"Collection '{collection}' has {points} points, expected {expected_points}")
+    
+    logger.info(f"Validated collection '{collection}': {points} points of size {vector_size}")
+
+def swap_alias(client: QdrantClient, alias: str, collection: str) -> Optional[str]:
+    """
+    Atomically point an alias at a collection.
+    
+    The delete and create operations are sent in one request, so queries see
+    either the old or the new collection, never neither. A pre-alias
+    deployment where a real collection carries the alias name is migrated by
+    deleting that collection first (a one-off gap of one request).
+    
+    Args:
+        client: Connected QdrantClient instance
+        alias: Alias that queries use
+        collection: Collection the alias should point to
+        
+    Returns:
+        The collection the alias pointed to before, or None
+        
+    Raises:
+        RuntimeError: If the alias update fails
+    """
+    rest = _models()
+    
+    try:
+        previous = resolve_alias(client, alias)
+        operations = []
+        if previous is not None:
+            operations.append(rest.DeleteAliasOperation(delete_alias=rest.DeleteAlias(alias_name=alias)))
+        elif any(c.name == alias for c in client.get_collections().collections):
+            logger.warning(f"Replacing legacy collection '{alias}' with an alias to '{collection}'")
+            client.delete_collection(alias)
+        operations.append(rest.CreateAliasOperation(
+            create_alias=rest.CreateAlias(collection_name=collection, alias_name=alias)
+        ))
+        
+        client.update_collection_aliases(change_aliases_operations=operations)
+        logger.info(f"Alias '{alias}' now points to '{collection}' (was {previous or 'unset'})")
+        return previous
+        
+    except Exception as e:
+        logger.error(f"Failed to point alias '{alias}' at '{collection}': {e}")
+        raise RuntimeError(f"Failed to point alias '{alias}' at '{collection}': {e}") from e
+
+def gc_generations(client: QdrantClient, alias: str, keep: int = 2) -> List[str]:
+    """
+    Delete old generations of an alias, keeping the newest ``keep`` (including the live one).
+    
+    Generations newer than the live collection (for example an interrupted
+    rebuild) are left alone so they can be resumed.
+    
+    Args:
+        client: Connected QdrantClient instance
+        alias: Alias name
+        keep: Number of generations to keep, counting the live one
+        
+    Returns:
+        Names of the deleted collections
+        
+    Raises:
+        ValueError: If keep is less than 1
+    """
+    if keep < 1:
+        raise ValueError("At least one generation must be kept")
+    
+    live = resolve_alias(client, alias)
+    generations = list_generations(client, alias)
+    if live not in generations:
+        return []
+    
+    older = generations[:generations.index(live) + 1]
+    deleted = []
+    for name in older[:-keep]:
+        delete_collection(client, name)
+        deleted.append(name)
+    
+    if deleted:
+        logger.info(f"Garbage-collected {len(deleted)} old generations of '{alias}': {deleted}")
+    return deleted
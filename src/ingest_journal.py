@@ -0,0 +1,150 @@
+"""
+Append-only checkpoint journal for resumable ingestion runs.
+
+Each line is one JSON record, flushed and fsync'ed before ingest moves on, so
+after a crash the journal holds exactly the work that is durable:
+
+- ``run``: target collection and the settings the run was started with
+- ``file``: a parsed source unit, its change signature and the IDs of its
+  chunks (whose texts are already in the chunk store)
+- ``batch``: chunk IDs whose vectors were upserted to Qdrant
+- ``batch_failed``: chunk IDs of a batch that failed and was queued for retry
+- ``done``: the run finished (a finished journal cannot be resumed)
+"""
+
+from __future__ import annotations
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+logger = logging.getLogger(__name__)
+
+def file_signature(paths: Iterable[Union[str, Path]]) -> str:
+    """
+    Build a change signature for a source unit from file names, sizes and mtimes.
+
+    Args:
+        paths: Files that make up the unit (for example a transcript and its video folder)
+
+    Returns:
+        Signature string; it changes when any file is added, removed or modified
+    """
+    parts = []
+    for path in sorted(str(p) for p in paths):
+        try:
+            stat = os.stat(path)
+            parts.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{path}:missing")
+    return "|".join(parts)
+
+class IngestJournal:
+    """Durable JSONL journal of one ingestion run."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """
+        Load the journal at ``path`` (if any) without modifying it.
+
+        Args:
+            path: Journal file path
+        """
+        self.path = Path(path)
+        self.run: Optional[Dict[str, Any]] = None
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.done_ids: Set[int] = set()
+        self.failed_batches = 0
+        self.finished = False
+        self._handle = None
+
+        if self.path.exists():
+            self._replay()
+
+    def _replay(self) -> None:
+        """Rebuild state from the records on disk, ignoring a torn last line."""
+        with open(self.path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring incomplete journal record at {self.path}:{line_number}")
+                    break
+
+                kind = record.get("type")
+                if kind == "run":
+                    self.run = record
+                elif kind == "file":
+                    self.files[record["key"]] = record
+                elif kind == "batch":
+                    self.done_ids.update(record["ids"])
+                elif kind == "batch_failed":
+                    self.failed_batches += 1
+                elif kind == "done":
+                    self.finished = True
+
+    @property
+    def resumable(self) -> bool:
+        """Whether the journal holds an unfinished run."""
+        return self.run is not None and not self.finished
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Write one record and make it durable before returning."""
+        if self._handle is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = open(self.path, "a", encoding="utf-8")
+        self._handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def start(self, run: Dict[str, Any]) -> None:
+        """
+        Start a fresh run, discarding any previous journal.
+
+        Args:
+            run: Run description (target collection, settings)
+        """
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+        self.run = {"type": "run", "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), **run}
+        self.files = {}
+        self.done_ids = set()
+        self.failed_batches = 0
+        self.finished = False
+        self._append(self.run)
+
+    def file_done(self, key: str, signature: str, ids: List[int]) -> None:
+        """Record that a source unit was parsed and its chunks stored."""
+        record = {"type": "file", "key": key, "signature": signature, "ids": ids}
+        self.files[key] = record
+        self._append(record)
+
+    def completed_file(self, key: str, signature: str) -> Optional[List[int]]:
+        """Chunk IDs of a unit parsed earlier in this run, or None if it changed or was never parsed."""
+        record = self.files.get(key)
+        if record is None or record["signature"] != signature:
+            return None
+        return record["ids"]
+
+    def batch_done(self, ids: List[int]) -> None:
+        """Record that a batch of chunk vectors was upserted."""
+        self.done_ids.update(ids)
+        self._append({"type": "batch", "ids": ids})
+
+    def batch_failed(self, ids: List[int], error: str) -> None:
+        """Record a failed batch that was queued for retry."""
+        self.failed_batches += 1
+        self._append({"type": "batch_failed", "ids": ids, "error": error})
+
+    def finish(self, stats: Dict[str, Any]) -> None:
+        """Mark the run as finished."""
+        self.finished = True
+        self._append({"type": "done", "finished_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), **stats})
+
+    def close(self) -> None:
+        """Close the journal file."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
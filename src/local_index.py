@@ -0,0 +1,363 @@
+"""
+In-process local vector index for serving queries without a Qdrant server.
+
+``export`` snapshots a Qdrant collection into a directory of plain files:
+
+- ``vectors.npy``: float32 matrix of L2-normalized vectors (one row per point)
+- ``ids.npy``: uint64 point IDs aligned with the rows
+- ``payloads.jsonl``: one slim payload per line, aligned with the rows
+- ``manifest.json``: collection name, point count, dimension and export time
+
+``LocalVectorIndex`` memory-maps ``vectors.npy`` instead of reading it into RAM
+and answers queries with exact top-k: one matrix-vector product followed by
+``argpartition``. Filters use the same dictionary DSL as ``index_qdrant.search``.
+
+Usage:
+    python -m src.local_index export --collection kb_vectors --out ./data/local_index
+    python -m src.local_index info
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from .config import SETTINGS
+from .index_qdrant import matches_filter
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.npy"
+IDS_FILE = "ids.npy"
+PAYLOADS_FILE = "payloads.jsonl"
+
+# Number of distinct filter masks kept per index
+_MASK_CACHE_SIZE = 64
+
+class LocalHit(NamedTuple):
+    """A search hit with the same attributes as Qdrant's ScoredPoint."""
+    id: int
+    score: float
+    payload: Dict[str, Any]
+    vector: Optional[List[float]] = None
+
+def export_collection(
+    client: Any,
+    collection: str,
+    out_dir: Union[str, Path],
+    batch_size: int = 256
+) -> Dict[str, Any]:
+    """
+    Snapshot a Qdrant collection into a local index directory.
+
+    The files are written to a temporary sibling directory and swapped into
+    place at the end, so readers never see a half-written index.
+
+    Args:
+        client: Connected QdrantClient instance
+        collection: Name of the collection to export
+        out_dir: Destination directory
+        batch_size: Points fetched per scroll request
+
+    Returns:
+        The manifest of the written index
+
+    Raises:
+        ValueError: If parameters are invalid or the collection has non-integer IDs
+        RuntimeError: If the export fails
+    """
+    if not isinstance(collection, str) or not collection.strip():
+        raise ValueError("Collection name must be a non-empty string")
+
+    if batch_size <= 0:
+        raise ValueError("Batch size must be positive")
+
+    out_dir = Path(out_dir)
+    tmp_dir = out_dir.with_name(f"{out_dir.name}.tmp-{os.getpid()}")
+
+    try:
+        count = client.count(collection_name=collection, exact=True).count
+        if count == 0:
+            raise ValueError(f"Collection '{collection}' is empty")
+
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        logger.info(f"Exporting {count} points from '{collection}' to {out_dir}")
+
+        vectors: Optional[np.ndarray] = None
+        ids = np.zeros(count, dtype="uint64")
+        row = 0
+        offset = None
+
+        with open(tmp_dir / PAYLOADS_FILE, "w", encoding="utf-8") as payload_file:
+            while row < count:
+                points, offset = client.scroll(
+                    collection_name=collection, limit=batch_size, offset=offset,
+                    with_vectors=True, with_payload=True,
+                )
+                if not points:
+                    break
+
+                block = np.asarray([p.vector for p in points], dtype="float32")
+                if vectors is None:
+                    # Preallocate on disk once the dimension is known
+                    vectors = np.lib.format.open_memmap(
+                        tmp_dir / VECTORS_FILE, mode="w+", dtype="float32", shape=(count, block.shape[1])
+                    )
+
+                block /= np.maximum(np.linalg.norm(block, axis=1, keepdims=True), 1e-12)
+                take = min(len(points), count - row)
+                vectors[row:row + take] = block[:take]
+                for point in points[:take]:
+                    if not isinstance(point.id, int):
+                        raise ValueError(f"Only integer point IDs can be exported, got: {point.id!r}")
+                    ids[row] = point.id
+                    payload_file.write(json.dumps(point.payload or {}, ensure_ascii=False) + "\n")
+                    row += 1
+
+                if offset is None:
+                    break
+
+        if row != count:
+            raise RuntimeError(f"Expected {count} points but exported {row}")
+
+        vectors.flush()
+        dim = int(vectors.shape[1])
+        del vectors
+        np.save(tmp_dir / IDS_FILE, ids)
+
+        manifest = {
+            "collection": collection,
+            "count": count,
+            "dim": dim,
+            "normalized": True,
+            "exported_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        (tmp_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+        # Swap the new index into place
+        old_dir = out_dir.with_name(f"{out_dir.name}.old-{os.getpid()}")
+        if out_dir.exists():
+            out_dir.rename(old_dir)
+        tmp_dir.rename(out_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+        logger.info(f"Exported {count} x {dim} vectors to {out_dir}")
+        return manifest
+
+    except ValueError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    except Exception as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        logger.error(f"Failed to export collection '{collection}': {e}")
+        raise RuntimeError(f"Failed to export collection '{collection}': {e}") from e
+
+class LocalVectorIndex:
+    """Exact cosine search over a memory-mapped vector matrix."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """
+        Open an exported index; vectors are memory-mapped, not loaded.
+
+        Args:
+            path: Index directory written by ``export_collection``
+
+        Raises:
+            FileNotFoundError: If the directory or one of its files is missing
+            RuntimeError: If the files are inconsistent
+        """
+        self.path = Path(path)
+        manifest_path = self.path / MANIFEST_FILE
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"Local index not found: {self.path}")
+
+        self.manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        self.vectors = np.load(self.path / VECTORS_FILE, mmap_mode="r")
+        self.ids = np.load(self.path / IDS_FILE)
+        with open(self.path / PAYLOADS_FILE, encoding="utf-8") as f:
+            self.payloads: List[Dict[str, Any]] = [json.loads(line) for line in f]
+
+        if not (len(self.vectors) == len(self.ids) == len(self.payloads) == self.manifest["count"]):
+            raise RuntimeError(f"Local index at {self.path} is inconsistent; re-run the export")
+
+        self._masks: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._rows: Optional[Dict[int, int]] = None
+        self._positions: Optional[Dict[Tuple[Any, Any, Any], int]] = None
+        logger.info(
+            f"Opened local index {self.path} ({len(self.ids)} x {self.dim} vectors, "
+            f"collection '{self.collection}')"
+        )
+
+    @property
+    def collection(self) -> str:
+        """Name of the collection the index was exported from."""
+        return self.manifest["collection"]
+
+    @property
+    def dim(self) -> int:
+        """Vector dimension."""
+        return int(self.manifest["dim"])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _filter_mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Boolean row mask for a filter, cached per distinct filter."""
+        key = json.dumps(filters, sort_keys=True, default=str)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = np.fromiter((matches_filter(p, filters) for p in self.payloads), dtype=bool, count=len(self.payloads))
+            self._masks[key] = mask
+            if len(self._masks) > _MASK_CACHE_SIZE:
+                self._masks.popitem(last=False)
+        else:
+            self._masks.move_to_end(key)
+        return mask
+
+    def search(
+        self,
+        query_vector: List[float],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        with_payload: Union[bool, List[str]] = True,
+        with_vectors: bool = False
+    ) -> List[LocalHit]:
+        """
+        Exact top-k cosine search.
+
+        Args:
+            query_vector: Query vector
+            top_k: Number of results to return
+            filters: Optional filters (see ``index_qdrant.build_filter`` for the syntax)
+            with_payload: True for the full payload, or a list of payload fields to return
+            with_vectors: Also return the (normalized) vectors
+
+        Returns:
+            List of LocalHit, best first
+
+        Raises:
+            ValueError: If parameters are invalid
+        """
+        if not isinstance(top_k, int) or top_k <= 0:
+            raise ValueError("Top K must be a positive integer")
+
+        query = np.array(query_vector, dtype="float32")
+        if query.shape != (self.dim,):
+            raise ValueError(f"Query vector has dimension {query.size}, index has {self.dim}")
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+
+        scores = np.asarray(self.vectors @ query)
+        if filters:
+            scores[~self._filter_mask(filters)] = -np.inf
+
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        top = top[np.isfinite(scores[top])]
+
+        return [self._hit(row, float(scores[row]), with_payload, with_vectors) for row in top]
+
+    def _hit(self, row: int, score: float, with_payload: Union[bool, List[str]], with_vectors: bool) -> LocalHit:
+        payload = self.payloads[row]
+        if with_payload is not True:
+            fields = set(with_payload or [])
+            payload = {k: v for k, v in payload.items() if k in fields}
+        vector = self.vectors[row].tolist() if with_vectors else None
+        return LocalHit(int(self.ids[row]), score, payload, vector)
+
+    def by_position(
+        self,
+        positions: List[Tuple[Any, Any, int]],
+        with_payload: Union[bool, List[str]] = True
+    ) -> List[LocalHit]:
+        """
+        Points at given (class_id, file_name, chunk_index) positions.
+
+        Args:
+            positions: Position keys to look up
+            with_payload: True for the full payload, or a list of payload fields to return
+
+        Returns:
+            List of LocalHit with a score of 0.0; unknown positions are left out
+        """
+        if self._positions is None:
+            self._positions = {
+                (p.get("class_id"), p.get("file_name"), p.get("chunk_index")): row
+                for row, p in enumerate(self.payloads)
+            }
+        rows = [self._positions.get(tuple(key)) for key in positions]
+        return [self._hit(row, 0.0, with_payload, False) for row in rows if row is not None]
+
+    def vectors_for(self, ids: List[Any]) -> Dict[str, List[float]]:
+        """
+        Vectors of points by ID.
+
+        Args:
+            ids: Point IDs
+
+        Returns:
+            Dictionary of point ID (as a string) to vector; unknown IDs are left out
+        """
+        if self._rows is None:
+            self._rows = {int(point_id): row for row, point_id in enumerate(self.ids)}
+        rows = [(str(i), self._rows.get(int(i))) for i in ids]
+        return {key: self.vectors[row].tolist() for key, row in rows if row is not None}
+
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Export and inspect the local vector index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Snapshot a Qdrant collection to local files")
+    export_parser.add_argument("--collection", type=str, default=SETTINGS.collection,
+                               help="Name of the Qdrant collection")
+    export_parser.add_argument("--out", type=str, default=SETTINGS.local_index_dir,
+                               help="Destination directory (defaults to LOCAL_INDEX_DIR)")
+    export_parser.add_argument("--batch-size", type=int, default=256,
+                               help="Points fetched per scroll request")
+
+    info_parser = subparsers.add_parser("info", help="Show the manifest of a local index")
+    info_parser.add_argument("--path", type=str, default=SETTINGS.local_index_dir,
+                             help="Index directory (defaults to LOCAL_INDEX_DIR)")
+
+    parser.add_argument("--verbose", "-v", action="store_true",
+                       help="Enable verbose logging")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        if args.command == "export":
+            from .index_qdrant import connect_from_settings
+
+            client = connect_from_settings(SETTINGS)
+            manifest = export_collection(client, args.collection, args.out, batch_size=args.batch_size)
+            print(f"\n[SUCCESS] Exported {manifest['count']} vectors ({manifest['dim']} dims) to {args.out}")
+        else:
+            index = LocalVectorIndex(args.path)
+            size_mb = index.vectors.nbytes / 2**20
+            print(f"\n[STATS] Local index {args.path}:")
+            print(f"   Collection: {index.collection}")
+            print(f"   Vectors: {len(index)} x {index.dim} ({size_mb:.1f}MB memory-mapped)")
+            print(f"   Exported at: {index.manifest['exported_at']}")
+    except Exception as e:
+        print(f"\n[ERROR] Local index {args.command} failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,286 @@
+"""
+Crash-isolated document parsing with per-file time and memory limits.
+
+pdfplumber, python-pptx and python-docx run in a separate worker process.
+A file that exceeds the wall-clock timeout gets its worker killed and
+replaced; a worker that dies (segfault, out-of-memory kill) is replaced too.
+Either way the file is recorded in a quarantine list and skipped by later runs
+until its size or modification time changes, so one broken file can no longer
+stall or abort ingestion.
+"""
+
+from __future__ import annotations
+import json
+import logging
+import multiprocessing
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+class ParseTimeout(RuntimeError):
+    """Parsing a file exceeded the wall-clock limit."""
+
+class ParseCrashed(RuntimeError):
+    """The worker process died while parsing a file."""
+
+def _limit_memory(memory_mb: Optional[int]) -> None:
+    """Cap the worker's address space where the platform supports it."""
+    if not memory_mb:
+        return
+    try:
+        import resource
+        limit = memory_mb * 2**20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        logger.debug(f"Could not set parse worker memory limit: {e}")
+
+def _peak_rss_mb() -> float:
+    """Peak resident memory of this process in MB (0 where unavailable)."""
+    try:
+        import resource
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return 0.0
+
+def _worker_main(conn: Any, memory_mb: Optional[int]) -> None:
+    """Worker loop: parse files sent over the pipe until told to stop."""
+    from .file_parsers import get_file_metadata, parse_file_segments
+
+    _limit_memory(memory_mb)
+    # Import the parser libraries up front so their start-up cost is not billed to the first file
+    for module in ("pdfplumber", "pptx", "docx"):
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+    conn.send("ready")
+
+    while True:
+        try:
+            path = conn.recv()
+        except EOFError:
+            return
+        if path is None:
+            return
+
+        try:
+            file_path = Path(path)
+            segments, metadata = parse_file_segments(file_path), get_file_metadata(file_path)
+            # Ask for a fresh worker before fragmentation pushes the next file over the limit
+            recycle = bool(memory_mb) and _peak_rss_mb() > 0.75 * memory_mb
+            conn.send(("ok", segments, metadata, recycle))
+        except MemoryError:
+            conn.send(("error", "memory limit exceeded", None, True))
+            return
+        except Exception as e:
+            conn.send(("error", str(e), None, False))
+            continue
+
+        if recycle:
+            return
+
+class ParseQuarantine:
+    """Files that timed out or crashed the parser, keyed by path, size and mtime."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignoring unreadable parse quarantine {self.path}: {e}")
+
+    @staticmethod
+    def _stamp(file_path: Path) -> Dict[str, int]:
+        stat = file_path.stat()
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def reason(self, file_path: Path) -> Optional[str]:
+        """Why the file is quarantined, or None if it is not (or has changed since)."""
+        entry = self.entries.get(str(file_path))
+        if entry is None:
+            return None
+        try:
+            if {k: entry[k] for k in ("size", "mtime_ns")} != self._stamp(file_path):
+                return None
+        except OSError:
+            return None
+        return entry["reason"]
+
+    def add(self, file_path: Path, reason: str) -> None:
+        """Quarantine a file in its current version."""
+        self.entries[str(file_path)] = {
+            **self._stamp(file_path),
+            "reason": reason,
+            "quarantined_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        self._save()
+
+    def discard(self, file_path: Path) -> None:
+        """Release a file that has parsed successfully."""
+        if self.entries.pop(str(file_path), None) is not None:
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self.entries, indent=2), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+class IsolatedParser:
+    """Parses documents in a recyclable worker process with time and memory limits."""
+
+    # Seconds a fresh worker may take to start and import the parser libraries
+    STARTUP_TIMEOUT = 60.0
+
+    def __init__(
+        self,
+        timeout: float = 120.0,
+        memory_mb: Optional[int] = 2048,
+        quarantine: Optional[ParseQuarantine] = None
+    ) -> None:
+        """
+        Initialize the parser; the worker starts on first use.
+
+        Args:
+            timeout: Wall-clock seconds allowed per file
+            memory_mb: Address-space limit of the worker in MB (None for no limit)
+            quarantine: Optional quarantine list to consult and update
+
+        Raises:
+            ValueError: If the timeout is not positive
+        """
+        if timeout <= 0:
+            raise ValueError("Parse timeout must be positive")
+
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.quarantine = quarantine
+        self.workers_started = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._process: Optional[Any] = None
+        self._conn: Optional[Any] = None
+
+    def _start(self) -> None:
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main, args=(child_conn, self.memory_mb), name="parse-worker", daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self.workers_started += 1
+
+        try:
+            ready = parent_conn.poll(self.STARTUP_TIMEOUT) and parent_conn.recv() == "ready"
+        except (EOFError, OSError):
+            ready = False
+        if not ready:
+            exit_code = self._process.exitcode
+            self._kill()
+            raise ParseCrashed(f"Parse worker failed to start (exit code {exit_code})")
+
+    def _kill(self) -> None:
+        if self._process is not None and self._process.pid is not None:
+            self._process.kill()
+            self._process.join(timeout=5)
+        if self._conn is not None:
+            self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def parse(self, file_path: Path) -> Tuple[List[Tuple[str, Dict[str, Any]]], Dict[str, Any]]:
+        """
+        Parse one file in the worker.
+
+        Args:
+            file_path: Document to parse
+
+        Returns:
+            Tuple of (segments, file metadata); see ``parse_file_segments``
+
+        Raises:
+            ParseTimeout: If the file exceeded the timeout (the worker was killed)
+            ParseCrashed: If the worker died or ran out of memory
+            RuntimeError: If the parser raised an error
+        """
+        if self._process is None or not self._process.is_alive():
+            self._kill()
+            self._start()
+
+        started = time.monotonic()
+        try:
+            self._conn.send(str(file_path))
+            if not self._conn.poll(self.timeout):
+                self._kill()
+                raise ParseTimeout(f"Parsing {file_path.name} exceeded {self.timeout:.0f}s")
+            status, segments, metadata, recycle = self._conn.recv()
+        except (EOFError, OSError) as e:
+            exit_code = self._process.exitcode if self._process is not None else None
+            self._kill()
+            raise ParseCrashed(f"Parse worker died on {file_path.name} (exit code {exit_code}): {e}") from e
+
+        if recycle:
+            # The worker exits on its own; reap it so the next file gets a fresh one
+            self._process.join(timeout=5)
+            self._kill()
+
+        if status != "ok":
+            # On errors the segments field carries the message
+            if segments == "memory limit exceeded":
+                raise ParseCrashed(f"Parsing {file_path.name} exceeded the {self.memory_mb}MB memory limit")
+            raise RuntimeError(f"Failed to parse {file_path.name}: {segments}")
+
+        logger.debug(f"Parsed {file_path.name} in {time.monotonic() - started:.2f}s")
+        return segments, metadata
+
+    def parse_or_skip(self, file_path: Path) -> Optional[Tuple[List[Tuple[str, Dict[str, Any]]], Dict[str, Any]]]:
+        """
+        Parse a file unless it is quarantined; quarantine it if it hangs or crashes the worker.
+
+        Args:
+            file_path: Document to parse
+
+        Returns:
+            Tuple of (segments, file metadata), or None if the file was skipped or failed
+        """
+        if self.quarantine is not None:
+            reason = self.quarantine.reason(file_path)
+            if reason is not None:
+                logger.warning(f"Skipping quarantined file {file_path} ({reason}); it is retried once it changes")
+                return None
+
+        try:
+            result = self.parse(file_path)
+        except (ParseTimeout, ParseCrashed) as e:
+            logger.error(f"{e}; quarantining {file_path}")
+            if self.quarantine is not None:
+                self.quarantine.add(file_path, str(e))
+            return None
+        except RuntimeError as e:
+            logger.error(str(e))
+            return None
+
+        if self.quarantine is not None:
+            self.quarantine.discard(file_path)
+        return result
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        if self._conn is not None and self._process is not None and self._process.is_alive():
+            try:
+                self._conn.send(None)
+                self._process.join(timeout=5)
+            except OSError:
+                pass
+        self._kill()
+
+    def __enter__(self) -> "IsolatedParser":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
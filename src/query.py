@@ -1,27 +1,182 @@
 from __future__ import annotations
 import argparse
 import logging
+import re
 import sys
-from typing import Any, Dict, List, Optional
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from .config import SETTINGS
-from .embeddings import EmbeddingModel
-from .index_qdrant import connect, search
+from .chunk_store import ChunkStore, ChunkTextLoader
+from .embeddings import EmbeddingModel, QueryEmbeddingCache
+from .generations import live_path
+from .local_index import LocalVectorIndex
+from .index_qdrant import (
+    PAYLOAD_FIELDS, connect_from_settings, index_payload, matches_filter, retrieve_vectors, scroll_matching, search,
+    search_options
+)
+from .sparse_index import BM25Index, reciprocal_rank_fusion
+from .reranker import CrossEncoderReranker, ranking_change
+from .summary_index import SummaryIndex
 
 logger = logging.getLogger(__name__)
 
+# Process-wide state shared by every query in this interpreter
+_EMBEDDING_MODEL: Optional[EmbeddingModel] = None
+_QUERY_CACHE = QueryEmbeddingCache(SETTINGS.query_cache_size)
+_CHUNK_STORE: Optional[ChunkStore] = None
+_SPARSE_INDEX: Optional[BM25Index] = None
+_SPARSE_INDEX_VERSION: Optional[Tuple[str, float]] = None
+_LOCAL_INDEX: Optional[LocalVectorIndex] = None
+_SUMMARY_INDEX: Optional[SummaryIndex] = None
+_SUMMARY_INDEX_VERSION: Optional[Tuple[str, float]] = None
+_RERANKER: Optional[CrossEncoderReranker] = None
+
+RETRIEVAL_MODES = ("dense", "sparse", "hybrid")
+
+# Payload fields requested from Qdrant; "text" only exists in collections
+# ingested before chunk texts moved to the local chunk store
+_QUERY_PAYLOAD_FIELDS = [field for field in PAYLOAD_FIELDS if field != "id"] + ["text"]
+
+def get_chunk_store() -> Optional[ChunkStore]:
+    """Get the live generation's read-only chunk store, or None if it does not exist."""
+    global _CHUNK_STORE
+    path = live_path("chunk_store_path")
+    if _CHUNK_STORE is None or str(_CHUNK_STORE.path) != str(Path(path)):
+        try:
+            _CHUNK_STORE = ChunkStore(path, readonly=True)
+        except FileNotFoundError:
+            logger.warning(f"Chunk store not found at {path}; results will have no text")
+            return None
+    return _CHUNK_STORE
+
+def get_sparse_index() -> Optional[BM25Index]:
+    """Get the live generation's BM25 index, reloading it when a new generation goes live."""
+    global _SPARSE_INDEX, _SPARSE_INDEX_VERSION
+    path = Path(live_path("sparse_index_path"))
+    try:
+        version = (str(path), path.stat().st_mtime)
+    except FileNotFoundError:
+        logger.warning(f"Sparse index not found at {path}; run ingest to build it")
+        return None
+    
+    if _SPARSE_INDEX is None or version != _SPARSE_INDEX_VERSION:
+        _SPARSE_INDEX = BM25Index.load(path)
+        _SPARSE_INDEX_VERSION = version
+        logger.info(f"Loaded sparse index with {len(_SPARSE_INDEX)} documents from {path}")
+    return _SPARSE_INDEX
+
+def get_summary_index() -> Optional[SummaryIndex]:
+    """Get the live generation's video/document summary index, reloading it when a new generation goes live."""
+    global _SUMMARY_INDEX, _SUMMARY_INDEX_VERSION
+    path = Path(live_path("summary_index_path"))
+    try:
+        version = (str(path), path.stat().st_mtime)
+    except FileNotFoundError:
+        logger.warning(f"Summary index not found at {path}; searching all videos (run ingest to build it)")
+        return None
+    
+    if _SUMMARY_INDEX is None or version != _SUMMARY_INDEX_VERSION:
+        _SUMMARY_INDEX = SummaryIndex.load(path)
+        _SUMMARY_INDEX_VERSION = version
+        logger.info(f"Loaded summary index with {len(_SUMMARY_INDEX.groups)} videos from {path}")
+    return _SUMMARY_INDEX
+
+def get_local_index() -> LocalVectorIndex:
+    """Get the process-wide memory-mapped local vector index, opening it on first use."""
+    global _LOCAL_INDEX
+    if _LOCAL_INDEX is None:
+        _LOCAL_INDEX = LocalVectorIndex(SETTINGS.local_index_dir)
+    return _LOCAL_INDEX
+
+def get_reranker() -> CrossEncoderReranker:
+    """Get the process-wide cross-encoder reranker (its model loads on first rerank)."""
+    global _RERANKER
+    if _RERANKER is None:
+        _RERANKER = CrossEncoderReranker(
+            SETTINGS.rerank_model,
+            max_candidates=SETTINGS.rerank_candidates,
+            budget_ms=SETTINGS.rerank_budget_ms,
+            batch_size=SETTINGS.rerank_batch_size,
+            cache_size=SETTINGS.rerank_cache_size
+        )
+    return _RERANKER
+
+def get_embedding_model() -> EmbeddingModel:
+    """Get the process-wide query embedding model, loading it on first use."""
+    global _EMBEDDING_MODEL
+    if _EMBEDDING_MODEL is None:
+        _EMBEDDING_MODEL = EmbeddingModel(
+            SETTINGS.embedding_model,
+            server_url=SETTINGS.embedding_server_url,
+            server_timeout=SETTINGS.embedding_server_timeout,
+            server_timeout_per_text=SETTINGS.embedding_server_timeout_per_text,
+            server_retries=SETTINGS.embedding_server_retries
+        )
+    return _EMBEDDING_MODEL
+
+def embed_query(question: str) -> List[float]:
+    """
+    Embed a query, serving repeated questions from the LRU cache.
+    
+    Args:
+        question: Query question or text
+        
+    Returns:
+        Query vector as a list of floats
+    """
+    return _QUERY_CACHE.get_or_encode(get_embedding_model(), [question])[0].tolist()
+
+def warm_query_cache(questions: List[str]) -> int:
+    """
+    Pre-embed common questions so the first interactive queries skip the encoder.
+    
+    Args:
+        questions: Questions to embed (misses are encoded in a single batch)
+        
+    Returns:
+        Number of questions now cached
+    """
+    questions = [q for q in questions if q and q.strip()]
+    if not questions:
+        return 0
+    
+    _QUERY_CACHE.get_or_encode(get_embedding_model(), questions)
+    logger.info(f"Warmed query cache with {len(questions)} questions")
+    return len(questions)
+
+def get_query_cache_stats() -> Dict[str, Any]:
+    """Get size and hit-rate counters of the query embedding cache."""
+    return _QUERY_CACHE.stats()
+
 class QueryResult:
     """Represents a single query result with metadata."""
     
-    def __init__(self, score: float, payload: Dict[str, Any], result_id: Optional[str] = None):
+    def __init__(
+        self, 
+        score: float, 
+        payload: Dict[str, Any], 
+        result_id: Optional[str] = None,
+        text_loader: Optional[ChunkTextLoader] = None
+    ):
         self.score = score
         self.payload = payload or {}
         self.result_id = result_id
+        self._text_loader = text_loader
         
     @property
     def text(self) -> str:
-        """Get the text content of the result."""
-        return self.payload.get("text", "").strip()
+        """Get the text content of the result, loading it from the chunk store on first access."""
+        if "text" in self.payload:
+            return self.payload["text"].strip()
+        if self._text_loader is None:
+            return ""
+        return self._text_loader.text_for(self.result_id).strip()
     
     @property
     def source(self) -> str:
@@ -43,6 +198,76 @@ class QueryResult:
         """Get the chunk index."""
         return self.payload.get("chunk_index")
 
+def _video_bound(token: str) -> int:
+    """Extract the video number from a range bound such as "16" or "PTM_Video_16"."""
+    match = re.search(r"(\d+)[a-z]?$", token.strip(), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid video range bound: '{token}'")
+    return int(match.group(1))
+
+def parse_class_id_filter(value: str) -> Dict[str, Any]:
+    """
+    Parse the ``--class-id`` CLI value into search filters.
+    
+    The value is a comma-separated list of terms:
+    
+    - ``PTM_Video_7`` includes a class (several terms match any of them)
+    - ``16..21`` or ``PTM_Video_16..PTM_Video_21`` restricts ``video_number`` to a range
+    - a leading ``!`` excludes a class or range, e.g. ``!Trade_Template``
+    
+    Args:
+        value: Raw CLI value
+        
+    Returns:
+        Filters dictionary for ``run_query``
+        
+    Raises:
+        ValueError: If the value is empty or a range is malformed
+    """
+    include: List[str] = []
+    exclude: List[str] = []
+    video_spec: Dict[str, Any] = {}
+    
+    terms = [term.strip() for term in value.split(",") if term.strip()]
+    if not terms:
+        raise ValueError("--class-id must not be empty")
+    
+    for term in terms:
+        negate = term.startswith("!")
+        term = term[1:].strip() if negate else term
+        
+        if ".." in term:
+            low, high = (_video_bound(bound) for bound in term.split("..", 1))
+            if low > high:
+                raise ValueError(f"Invalid video range '{term}': start is after end")
+            bounds = {"gte": low, "lte": high}
+            if negate:
+                if "not" in video_spec:
+                    raise ValueError("Only one excluded video range is supported")
+                video_spec["not"] = bounds
+            else:
+                if "gte" in video_spec:
+                    raise ValueError("Only one video range is supported")
+                video_spec.update(bounds)
+        elif negate:
+            exclude.append(term)
+        else:
+            include.append(term)
+    
+    filters: Dict[str, Any] = {}
+    class_spec: Dict[str, Any] = {}
+    if include:
+        class_spec["any"] = include
+    if exclude:
+        class_spec["not"] = exclude
+    if class_spec:
+        # Keep the plain equality form for the common single-class case
+        filters["class_id"] = include[0] if list(class_spec) == ["any"] and len(include) == 1 else class_spec
+    if video_spec:
+        filters["video_number"] = video_spec
+    
+    return filters
+
 def pretty_print(results: List[QueryResult], max_text_length: int = 260) -> None:
     """
     Print query results in a formatted way.
@@ -76,26 +301,301 @@ def pretty_print(results: List[QueryResult], max_text_length: int = 260) -> None
         if result.word_count > 0:
             metadata_parts.append(f"words={result.word_count}")
         
+        if result.payload.get("neighbor_of") is not None:
+            metadata_parts.append("neighbor")
+        
+        if result.payload.get("alias_class_ids"):
+            metadata_parts.append(f"also in {','.join(result.payload['alias_class_ids'])}")
+        
         metadata_str = " | ".join(metadata_parts)
         
         print(f"[{i}] {metadata_str}")
         print(f"    {text}\n")
 
+def _dense_search(
+    client: Any,
+    collection: str,
+    question: str,
+    limit: int,
+    filters: Optional[Dict[str, Any]],
+    options: Dict[str, Any],
+    vectors: Optional[Dict[str, Any]] = None
+) -> List[Tuple[Any, float, Dict[str, Any]]]:
+    """Dense leg: embed the question and search Qdrant (or the local index when client is None).
+
+    When ``vectors`` is given, the hits' stored vectors are requested too and
+    collected into it, keyed by the point ID as a string.
+    """
+    query_vector = embed_query(question)
+    with_vectors = vectors is not None
+    if client is None:
+        raw_results = get_local_index().search(
+            query_vector, limit, filters, with_payload=_QUERY_PAYLOAD_FIELDS, with_vectors=with_vectors
+        )
+    else:
+        raw_results = search(
+            client, collection, query_vector, limit, filters,
+            with_payload=_QUERY_PAYLOAD_FIELDS, with_vectors=with_vectors, **options
+        )
+    if with_vectors:
+        vectors.update((str(getattr(r, 'id', None)), r.vector) for r in raw_results if r.vector is not None)
+    return [(getattr(r, 'id', None), r.score, r.payload) for r in raw_results]
+
+def _sparse_search(
+    question: str,
+    limit: int,
+    filters: Optional[Dict[str, Any]]
+) -> List[Tuple[Any, float, Dict[str, Any]]]:
+    """Sparse leg: BM25 over the local index, filtered on chunk-store metadata; returns (id, score, payload)."""
+    index = get_sparse_index()
+    store = get_chunk_store()
+    if index is None or store is None:
+        return []
+    
+    hits: List[Tuple[Any, float, Dict[str, Any]]] = []
+    ranked = index.ranked(question) if filters else iter(index.search(question, limit))
+    
+    # Hydrate payloads in blocks so filtered queries stop as soon as enough hits pass
+    block_size = max(limit * 4, 64) if filters else limit
+    while len(hits) < limit:
+        block = [pair for _, pair in zip(range(block_size), ranked)]
+        if not block:
+            break
+        records = store.get_records(point_id for point_id, _ in block)
+        for point_id, score in block:
+            record = records.get(str(point_id))
+            if record is None:
+                continue
+            payload = index_payload(record[1])
+            payload.pop("id", None)
+            if matches_filter(payload, filters):
+                hits.append((point_id, score, payload))
+                if len(hits) == limit:
+                    break
+    return hits
+
+def _narrow_to_groups(
+    question: str,
+    filters: Optional[Dict[str, Any]],
+    top_groups: int
+) -> Optional[Dict[str, Any]]:
+    """Stage one of hierarchical retrieval: restrict the filters to the best videos in the summary index."""
+    index = get_summary_index()
+    if index is None or len(index.groups) <= top_groups:
+        return filters
+    
+    groups = index.select_groups(embed_query(question), top_groups, filters)
+    if not groups:
+        return filters
+    logger.info(
+        f"Searching {len(groups)} of {len(index.groups)} videos: "
+        + ", ".join(f"{class_id} ({score:.3f})" for class_id, score in groups)
+    )
+    # The selection already honours any class_id/video filters, so it replaces the class_id spec
+    return {**(filters or {}), "class_id": {"any": [class_id for class_id, _ in groups]}}
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    """Rescale values to [0, 1] (all zeros when they are equal or empty)."""
+    if not len(values):
+        return values
+    return (values - values.min()) / max(float(np.ptp(values)), 1e-12)
+
+def maximal_marginal_relevance(
+    relevance: Any,
+    vectors: Any,
+    k: int,
+    lambda_mult: float = 0.7
+) -> List[int]:
+    """
+    Order candidates by maximal marginal relevance (MMR).
+    
+    Each step picks the candidate that maximizes
+    ``lambda_mult * relevance - (1 - lambda_mult) * max cosine similarity to
+    the candidates already picked``. Overlapping windows of one transcript are
+    nearly identical, so after the first of them is picked the others give way
+    to different passages.
+    
+    Args:
+        relevance: Relevance score of each candidate
+        vectors: Candidate vectors (rows; zero rows count as dissimilar to everything)
+        k: Number of candidates to pick
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0)
+        
+    Returns:
+        Indices of the picked candidates, in pick order
+        
+    Raises:
+        ValueError: If the inputs are inconsistent or lambda_mult is outside [0, 1]
+    """
+    relevance = np.asarray(relevance, dtype="float64")
+    vectors = np.asarray(vectors, dtype="float64")
+    if vectors.ndim != 2 or len(vectors) != len(relevance):
+        raise ValueError(f"Expected one vector per candidate, got {vectors.shape} for {len(relevance)} candidates")
+    if not 0.0 <= lambda_mult <= 1.0:
+        raise ValueError(f"lambda_mult must be between 0 and 1, got {lambda_mult}")
+    
+    unit = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    similarity = unit @ unit.T
+    redundancy = np.zeros(len(relevance))
+    available = np.ones(len(relevance), dtype=bool)
+    picked: List[int] = []
+    for _ in range(min(k, len(relevance))):
+        scores = np.where(available, lambda_mult * relevance - (1.0 - lambda_mult) * redundancy, -np.inf)
+        best = int(np.argmax(scores))
+        picked.append(best)
+        available[best] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+    return picked
+
+def _diversify(
+    hits: List[Tuple[Any, float, Dict[str, Any]]],
+    relevance: np.ndarray,
+    vectors: Dict[str, Any],
+    top_k: int,
+    lambda_mult: float
+) -> List[Tuple[Any, float, Dict[str, Any]]]:
+    """
+    MMR order of the first ``len(relevance)`` hits, followed by the rest in their current order.
+    
+    Args:
+        hits: (point ID, score, payload) tuples
+        relevance: Relevance of the leading hits that take part in MMR
+        vectors: Stored vectors keyed by point ID as a string (missing ones count as dissimilar)
+        top_k: Number of hits to return
+        lambda_mult: MMR relevance/diversity trade-off
+        
+    Returns:
+        At most top_k hits
+    """
+    head = len(relevance)
+    if head < 2:
+        return hits[:top_k]
+    dim = len(next(iter(vectors.values()))) if vectors else 1
+    matrix = np.array([vectors.get(str(point_id), np.zeros(dim)) for point_id, _, _ in hits[:head]])
+    picked = maximal_marginal_relevance(relevance, matrix, top_k, lambda_mult)
+    return ([hits[i] for i in picked] + hits[head:])[:top_k]
+
+def _position(payload: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+    """Document position of a chunk: (class_id, file_name, chunk_index)."""
+    return payload.get("class_id"), payload.get("file_name"), payload.get("chunk_index")
+
+def _expand_neighbors(
+    client: Any,
+    collection: str,
+    hits: List[Tuple[Any, float, Dict[str, Any]]],
+    radius: int
+) -> List[Tuple[Any, float, Dict[str, Any]]]:
+    """
+    Add the chunks within ``radius`` positions of each hit in the same document.
+    
+    All neighbors are fetched in one batched scroll (or position lookup in the
+    local index). Each hit is followed by its neighbors in document order; they
+    carry the hit's score and ``neighbor_of`` set to its point ID.
+    """
+    seen = {_position(payload) for _, _, payload in hits}
+    wanted: Dict[Tuple[Any, Any, Any], int] = {}
+    for rank, (_, _, payload) in enumerate(hits):
+        class_id, file_name, index = _position(payload)
+        if class_id is None or file_name is None or not isinstance(index, int):
+            continue
+        for offset in range(-radius, radius + 1):
+            key = (class_id, file_name, index + offset)
+            if index + offset >= 0 and key not in seen:
+                wanted.setdefault(key, rank)
+    if not wanted:
+        return hits
+    
+    if client is None:
+        found = get_local_index().by_position(list(wanted), with_payload=_QUERY_PAYLOAD_FIELDS)
+    else:
+        by_document: Dict[Tuple[Any, Any], List[int]] = defaultdict(list)
+        for class_id, file_name, index in wanted:
+            by_document[(class_id, file_name)].append(index)
+        alternatives = [
+            {"class_id": class_id, "file_name": file_name, "chunk_index": sorted(indexes)}
+            for (class_id, file_name), indexes in by_document.items()
+        ]
+        found = scroll_matching(client, collection, alternatives, len(wanted), with_payload=_QUERY_PAYLOAD_FIELDS)
+    
+    attached: Dict[int, List[Tuple[Any, float, Dict[str, Any]]]] = defaultdict(list)
+    for point in found:
+        payload = dict(point.payload or {})
+        rank = wanted.get(_position(payload))
+        if rank is not None:
+            anchor_id, anchor_score, _ = hits[rank]
+            attached[rank].append((point.id, anchor_score, {**payload, "neighbor_of": anchor_id}))
+    
+    expanded: List[Tuple[Any, float, Dict[str, Any]]] = []
+    for rank, hit in enumerate(hits):
+        expanded.extend(sorted([hit] + attached[rank], key=lambda h: h[2].get("chunk_index") or 0))
+    logger.info(f"Neighbor expansion added {len(expanded) - len(hits)} chunks (radius {radius})")
+    return expanded
+
+def _timed(leg: Any, *args: Any) -> Tuple[List[Tuple[Any, float, Dict[str, Any]]], float]:
+    """Run a retrieval leg and return its hits and latency in milliseconds."""
+    started = time.perf_counter()
+    hits = leg(*args)
+    return hits, (time.perf_counter() - started) * 1000
+
 def run_query(
     question: str, 
     *, 
     top_k: int, 
     filters: Optional[Dict[str, Any]] = None,
-    collection: Optional[str] = None
+    collection: Optional[str] = None,
+    hnsw_ef: Optional[int] = None,
+    mode: Optional[str] = None,
+    hierarchical: Optional[bool] = None,
+    mmr: Optional[bool] = None,
+    mmr_lambda: Optional[float] = None,
+    neighbors: Optional[int] = None,
+    rerank: Optional[bool] = None,
+    timings: Optional[Dict[str, float]] = None,
+    rerank_stats: Optional[Dict[str, Any]] = None
 ) -> List[QueryResult]:
     """
-    Run a semantic search query against the knowledge base.
+    Run a search query against the knowledge base.
+    
+    ``dense`` mode searches with the query embedding, in Qdrant or, when
+    ``SETTINGS.search_backend`` is "local", in the memory-mapped local index
+    exported by ``python -m src.local_index export``. ``sparse`` mode
+    uses the local BM25 index (exact tokens such as "ATRP" or "UMCSI"), and
+    ``hybrid`` runs both legs concurrently and fuses them with reciprocal-rank
+    fusion; hybrid scores are RRF scores rather than cosine similarities.
+    
+    With ``hierarchical`` dense and hybrid queries are two-stage: the question
+    is first matched against per-video and per-document summary vectors built
+    at ingest, and chunks are then searched only within the best
+    ``SETTINGS.summary_top_groups`` videos.
+    
+    With ``mmr`` dense and hybrid results are then diversified with maximal marginal
+    relevance over ``SETTINGS.mmr_candidates`` candidates, using their stored
+    vectors, so overlapping windows of one passage don't fill every slot.
+    With ``neighbors`` the adjacent chunks of each result (same document,
+    ``chunk_index`` within the radius) are added after it for wider context,
+    so more than ``top_k`` results may be returned.
+    
+    With ``rerank`` a cross-encoder rescores the first
+    ``SETTINGS.rerank_candidates`` candidates (within ``SETTINGS.rerank_budget_ms``)
+    before MMR, which then diversifies only the scored candidates; those the
+    budget left unscored follow in retrieval order. Results carry the
+    cross-encoder score, with the retrieval score kept in ``payload["retrieval_score"]``.
     
     Args:
         question: Query question or text
         top_k: Number of results to return
         filters: Optional filters to apply
         collection: Optional collection name (defaults to SETTINGS.collection)
+        hnsw_ef: Optional per-query HNSW beam width (defaults to SETTINGS.qdrant_hnsw_ef)
+        mode: Retrieval mode: dense, sparse or hybrid (defaults to SETTINGS.retrieval_mode)
+        hierarchical: Select videos from the summary index first (defaults to
+            SETTINGS.hierarchical_retrieval; ignored in sparse mode)
+        mmr: Diversify results with MMR (defaults to SETTINGS.mmr_enabled; ignored in sparse mode)
+        mmr_lambda: MMR relevance/diversity trade-off (defaults to SETTINGS.mmr_lambda)
+        neighbors: Neighbor-expansion radius in chunks, 0 to disable (defaults to SETTINGS.neighbor_radius)
+        rerank: Rescore candidates with the cross-encoder (defaults to SETTINGS.rerank_enabled)
+        timings: Optional dictionary that receives per-leg latencies in milliseconds
+        rerank_stats: Optional dictionary that receives how the reranker changed the ranking
         
     Returns:
         List of QueryResult objects
@@ -110,35 +610,151 @@ def run_query(
     if top_k <= 0:
         raise ValueError("top_k must be positive")
     
+    mode = (mode or SETTINGS.retrieval_mode).lower()
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode '{mode}' (expected one of {', '.join(RETRIEVAL_MODES)})")
+    
+    use_mmr = (SETTINGS.mmr_enabled if mmr is None else mmr) and mode != "sparse"
+    use_rerank = SETTINGS.rerank_enabled if rerank is None else rerank
+    mmr_lambda = SETTINGS.mmr_lambda if mmr_lambda is None else mmr_lambda
+    neighbors = SETTINGS.neighbor_radius if neighbors is None else neighbors
+    if neighbors < 0:
+        raise ValueError("neighbors must be non-negative")
+    
+    timings = timings if timings is not None else {}
+    
     try:
-        logger.info(f"Running query: '{question}' with top_k={top_k}")
+        logger.info(f"Running {mode} query: '{question}' with top_k={top_k}")
         if filters:
             logger.info(f"Applying filters: {filters}")
         
-        # Initialize embedding model
-        embed = EmbeddingModel(SETTINGS.embedding_model)
+        # Use provided collection or default
+        target_collection = collection or SETTINGS.collection
+        
+        # Collection-level search defaults with per-query overrides
+        options = search_options(SETTINGS)
+        if hnsw_ef is not None:
+            options["hnsw_ef"] = hnsw_ef
         
-        # Connect to Qdrant
-        client = connect(SETTINGS.qdrant_host, SETTINGS.qdrant_port, SETTINGS.qdrant_api_key)
+        # Connect to Qdrant unless serving from the memory-mapped local index
+        client = None
+        if mode != "sparse" or neighbors:
+            if SETTINGS.search_backend == "local":
+                if collection and collection != get_local_index().collection:
+                    logger.warning(
+                        f"Local index was exported from '{get_local_index().collection}', "
+                        f"ignoring collection '{collection}'"
+                    )
+            else:
+                client = connect_from_settings(SETTINGS)
         
-        # Generate query vector
-        query_vector = embed.encode([question])[0].tolist()
+        # MMR and the reranker pick top_k out of a deeper candidate pool
+        pool = max(
+            top_k,
+            SETTINGS.mmr_candidates if use_mmr else 0,
+            SETTINGS.rerank_candidates if use_rerank else 0
+        )
+        vectors: Optional[Dict[str, Any]] = {} if use_mmr else None
         
-        # Use provided collection or default
-        target_collection = collection or SETTINGS.collection
+        if mode == "sparse":
+            hits, timings["sparse_ms"] = _timed(_sparse_search, question, pool, filters)
+        else:
+            if SETTINGS.hierarchical_retrieval if hierarchical is None else hierarchical:
+                started = time.perf_counter()
+                filters = _narrow_to_groups(question, filters, SETTINGS.summary_top_groups)
+                timings["summary_ms"] = (time.perf_counter() - started) * 1000
+            
+            if mode == "dense":
+                hits, timings["dense_ms"] = _timed(
+                    _dense_search, client, target_collection, question, pool, filters, options, vectors
+                )
+            else:
+                # Both legs fetch a deeper candidate list, then RRF picks the top_k
+                limit = max(pool, SETTINGS.hybrid_candidates)
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    dense_future = executor.submit(
+                        _timed, _dense_search, client, target_collection, question, limit, filters, options, vectors
+                    )
+                    sparse_future = executor.submit(_timed, _sparse_search, question, limit, filters)
+                    dense_hits, timings["dense_ms"] = dense_future.result()
+                    sparse_hits, timings["sparse_ms"] = sparse_future.result()
+                
+                started = time.perf_counter()
+                # Dense payloads win when a chunk is found by both legs
+                points = {str(point_id): (point_id, payload) for point_id, _, payload in sparse_hits}
+                points.update((str(point_id), (point_id, payload)) for point_id, _, payload in dense_hits)
+                fused = reciprocal_rank_fusion(
+                    [[str(h[0]) for h in dense_hits], [str(h[0]) for h in sparse_hits]],
+                    k=SETTINGS.rrf_k
+                )[:pool]
+                hits = [(points[key][0], score, points[key][1]) for key, score in fused]
+                timings["fusion_ms"] = (time.perf_counter() - started) * 1000
+                
+                logger.info(
+                    f"Hybrid legs: dense {len(dense_hits)} hits in {timings['dense_ms']:.1f}ms, "
+                    f"sparse {len(sparse_hits)} hits in {timings['sparse_ms']:.1f}ms"
+                )
+            
         
-        # Perform search
-        raw_results = search(client, target_collection, query_vector, top_k, filters)
+        outcome = None
+        if use_rerank and len(hits) > 1:
+            retrieved = [point_id for point_id, _, _ in hits]
+            loader = ChunkTextLoader(get_chunk_store(), retrieved)
+            texts = [payload.get("text") or loader.text_for(point_id) for point_id, _, payload in hits]
+            try:
+                outcome = get_reranker().rerank(question, retrieved, texts)
+            except (ImportError, RuntimeError) as e:
+                logger.warning(f"Reranking unavailable, keeping retrieval order: {e}")
+        reranked = outcome is not None
+        if reranked:
+            # Scored candidates take the cross-encoder score and candidates left over by the
+            # budget sink below the lowest one; the retrieval score stays in the payload
+            floor = min(outcome.scores.values()) - 1.0
+            hits = [
+                (hits[i][0], outcome.scores.get(i, floor), {**hits[i][2], "retrieval_score": hits[i][1]})
+                for i in outcome.order
+            ]
+            timings["rerank_ms"] = outcome.latency_ms
+            if rerank_stats is not None:
+                rerank_stats.update(
+                    scored=outcome.scored, cached=outcome.cached, skipped=outcome.skipped,
+                    **ranking_change(retrieved, [point_id for point_id, _, _ in hits], top_k)
+                )
         
-        # Convert to QueryResult objects
-        results = []
-        for raw_result in raw_results:
-            result = QueryResult(
-                score=raw_result.score,
-                payload=raw_result.payload,
-                result_id=getattr(raw_result, 'id', None)
-            )
-            results.append(result)
+        if use_mmr and len(hits) > top_k:
+            started = time.perf_counter()
+            # After reranking only the cross-encoder-scored prefix is diversified: its logits and
+            # the retrieval scores of candidates left over by the budget are not comparable
+            head = len(outcome.scores) if reranked else len(hits)
+            # Sparse-only hybrid hits came without vectors
+            missing = [point_id for point_id, _, _ in hits[:head] if str(point_id) not in vectors]
+            if missing:
+                if client is None:
+                    vectors.update(get_local_index().vectors_for(missing))
+                else:
+                    vectors.update(retrieve_vectors(client, target_collection, missing))
+            relevance = np.array([score for _, score, _ in hits[:head]])
+            if reranked:
+                # Cross-encoder logits are unbounded; map them to the cosine range
+                relevance = _min_max(relevance)
+            elif mode == "hybrid":
+                # RRF scores are tiny rank-based numbers; scale them to the cosine range
+                relevance /= max(float(relevance.max()), 1e-12)
+            hits = _diversify(hits, relevance, vectors, top_k, mmr_lambda)
+            timings["mmr_ms"] = (time.perf_counter() - started) * 1000
+        hits = hits[:top_k]
+        
+        if neighbors and hits:
+            started = time.perf_counter()
+            hits = _expand_neighbors(client, target_collection, hits, neighbors)
+            timings["neighbors_ms"] = (time.perf_counter() - started) * 1000
+        
+        # Convert to QueryResult objects sharing one lazy, batched text lookup
+        text_loader = ChunkTextLoader(get_chunk_store(), [point_id for point_id, _, _ in hits])
+        results = [
+            QueryResult(score=score, payload=payload, result_id=point_id, text_loader=text_loader)
+            for point_id, score, payload in hits
+        ]
         
         logger.info(f"Query returned {len(results)} results")
         return results
@@ -152,7 +768,14 @@ def run_query_with_stats(
     *, 
     top_k: int, 
     filters: Optional[Dict[str, Any]] = None,
-    collection: Optional[str] = None
+    collection: Optional[str] = None,
+    hnsw_ef: Optional[int] = None,
+    mode: Optional[str] = None,
+    hierarchical: Optional[bool] = None,
+    mmr: Optional[bool] = None,
+    mmr_lambda: Optional[float] = None,
+    neighbors: Optional[int] = None,
+    rerank: Optional[bool] = None
 ) -> Dict[str, Any]:
     """
     Run a query and return results with statistics.
@@ -162,16 +785,28 @@ def run_query_with_stats(
         top_k: Number of results to return
         filters: Optional filters to apply
         collection: Optional collection name
+        hnsw_ef: Optional per-query HNSW beam width
+        mode: Retrieval mode: dense, sparse or hybrid
+        hierarchical: Select videos from the summary index first
+        mmr: Diversify results with MMR
+        mmr_lambda: MMR relevance/diversity trade-off
+        neighbors: Neighbor-expansion radius in chunks
+        rerank: Rescore candidates with the cross-encoder
         
     Returns:
         Dictionary containing results and statistics
     """
-    import time
-    
     start_time = time.time()
+    timings: Dict[str, float] = {}
+    rerank_stats: Dict[str, Any] = {}
     
     try:
-        results = run_query(question, top_k=top_k, filters=filters, collection=collection)
+        results = run_query(
+            question, top_k=top_k, filters=filters, collection=collection,
+            hnsw_ef=hnsw_ef, mode=mode, hierarchical=hierarchical,
+            mmr=mmr, mmr_lambda=mmr_lambda, neighbors=neighbors, rerank=rerank,
+            timings=timings, rerank_stats=rerank_stats
+        )
         
         # Calculate statistics
         if results:
@@ -202,7 +837,10 @@ def run_query_with_stats(
                 "min_score": min_score,
                 "max_score": max_score,
                 "source_counts": source_counts,
-                "class_counts": class_counts
+                "class_counts": class_counts,
+                "leg_timings_ms": timings,
+                "rerank": {**rerank_stats, "cache": get_reranker().cache.stats()} if rerank_stats else None,
+                "query_cache": get_query_cache_stats()
             }
         }
         
@@ -228,9 +866,30 @@ if __name__ == "__main__":
     parser.add_argument("--top-k", type=int, default=SETTINGS.top_k,
                        help="Number of results to return")
     parser.add_argument("--class-id", type=str, default=None,
-                       help="Filter results by class folder name")
+                       help="Filter by class: comma-separated IDs, video ranges like 16..21, "
+                            "'!' to exclude (e.g. 'PTM_Video_4,PTM_Video_5' or '16..21,!PTM_Video_18')")
     parser.add_argument("--collection", type=str, default=None,
                        help="Qdrant collection name (defaults to settings)")
+    parser.add_argument("--hnsw-ef", type=int, default=None,
+                       help="Per-query HNSW beam width (defaults to QDRANT_HNSW_EF)")
+    parser.add_argument("--mode", type=str, choices=RETRIEVAL_MODES, default=None,
+                       help="Retrieval mode: dense, sparse (BM25) or hybrid RRF (defaults to RETRIEVAL_MODE)")
+    parser.add_argument("--hierarchical", action="store_true", default=None,
+                       help="Select videos from the summary index first (defaults to HIERARCHICAL_RETRIEVAL)")
+    parser.add_argument("--flat", dest="hierarchical", action="store_false", default=None,
+                       help="Search all chunks even when HIERARCHICAL_RETRIEVAL is true")
+    parser.add_argument("--mmr", action="store_true", default=None,
+                       help="Diversify results with MMR (defaults to MMR_ENABLED)")
+    parser.add_argument("--no-mmr", dest="mmr", action="store_false", default=None,
+                       help="Return results by score even when MMR_ENABLED is true")
+    parser.add_argument("--mmr-lambda", type=float, default=None,
+                       help="MMR trade-off between relevance (1.0) and diversity (0.0) (defaults to MMR_LAMBDA)")
+    parser.add_argument("--rerank", action="store_true", default=None,
+                       help="Rescore candidates with the cross-encoder (defaults to RERANK_ENABLED)")
+    parser.add_argument("--no-rerank", dest="rerank", action="store_false", default=None,
+                       help="Skip the cross-encoder even when RERANK_ENABLED is true")
+    parser.add_argument("--neighbors", type=int, default=None,
+                       help="Add the chunks within N positions of each result (defaults to NEIGHBOR_RADIUS)")
     parser.add_argument("--verbose", "-v", action="store_true",
                        help="Enable verbose logging")
     parser.add_argument("--stats", action="store_true",
@@ -247,7 +906,7 @@ if __name__ == "__main__":
         # Build filters
         filters = None
         if args.class_id:
-            filters = {"class_id": args.class_id}
+            filters = parse_class_id_filter(args.class_id)
         
         if args.stats:
             # Run with statistics
@@ -255,7 +914,14 @@ if __name__ == "__main__":
                 args.question, 
                 top_k=args.top_k, 
                 filters=filters,
-                collection=args.collection
+                collection=args.collection,
+                hnsw_ef=args.hnsw_ef,
+                mode=args.mode,
+                hierarchical=args.hierarchical,
+                mmr=args.mmr,
+                mmr_lambda=args.mmr_lambda,
+                neighbors=args.neighbors,
+                rerank=args.rerank
             )
             
             if result["status"] == "success":
@@ -265,11 +931,24 @@ if __name__ == "__main__":
                 print(f"   Total results: {stats['total_results']}")
                 print(f"   Score range: {stats['min_score']:.4f} - {stats['max_score']:.4f}")
                 print(f"   Average score: {stats['avg_score']:.4f}")
+                if stats['leg_timings_ms']:
+                    legs = ", ".join(f"{name[:-3]}={ms:.1f}ms" for name, ms in stats['leg_timings_ms'].items())
+                    print(f"   Leg latency: {legs}")
                 
                 if stats['source_counts']:
                     print(f"   Results by source: {stats['source_counts']}")
                 if stats['class_counts']:
                     print(f"   Results by class: {stats['class_counts']}")
+                rerank = stats['rerank']
+                if rerank:
+                    print(f"   Rerank: {rerank['scored']} scored, {rerank['cached']} cached, "
+                          f"{rerank['skipped']} over budget; {rerank['promoted']} new in top-k, "
+                          f"top-1 {'changed' if rerank['top1_changed'] else 'kept'}, "
+                          f"Kendall tau {rerank['kendall_tau']:.2f} "
+                          f"(score cache hit rate {rerank['cache']['hit_rate']:.0%})")
+                cache = stats['query_cache']
+                print(f"   Query cache: {cache['hits']} hits / {cache['misses']} misses "
+                      f"(hit rate {cache['hit_rate']:.0%})")
                 
                 pretty_print(result["results"], max_text_length=args.max_text_length)
             else:
@@ -281,7 +960,14 @@ if __name__ == "__main__":
                 args.question, 
                 top_k=args.top_k, 
                 filters=filters,
-                collection=args.collection
+                collection=args.collection,
+                hnsw_ef=args.hnsw_ef,
+                mode=args.mode,
+                hierarchical=args.hierarchical,
+                mmr=args.mmr,
+                mmr_lambda=args.mmr_lambda,
+                neighbors=args.neighbors,
+                rerank=args.rerank
             )
             pretty_print(results, max_text_length=args.max_text_length)
             
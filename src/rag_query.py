@@ -10,14 +10,16 @@ import argparse
 import logging
 import os
 import sys
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 # Suppress gRPC warnings
 os.environ.setdefault("GRPC_VERBOSITY", "NONE")
 
 from .config import SETTINGS
-from .query import QueryResult, run_query
-from .gemini_client import create_gemini_client, GeminiClient
+from .query import QueryResult, parse_class_id_filter, run_query
+
+if TYPE_CHECKING:
+    from .gemini_client import GeminiClient
 
 logger = logging.getLogger(__name__)
 
@@ -82,7 +84,8 @@ class RAGQueryResult:
         if show_sources and self.sources:
             print(f"\nSources ({len(self.sources)}):")
             for i, source in enumerate(self.sources, 1):
-                print(f"  {i}. {source.get('class_id', 'unknown')} ({source.get('source', 'unknown')})")
+                also_in = f", also in {', '.join(source['also_in'])}" if source.get("also_in") else ""
+                print(f"  {i}. {source.get('class_id', 'unknown')} ({source.get('source', 'unknown')}{also_in})")
         
         if show_context and self.context_chunks:
             print(f"\nContext Chunks ({len(self.context_chunks)}):")
@@ -91,6 +94,67 @@ class RAGQueryResult:
                 print(f"  {i}. [{chunk.score:.3f}] {text}")
 
 
+def _run_structured_query(question: str, gemini_client: Optional[GeminiClient]) -> Optional[RAGQueryResult]:
+    """
+    Answer a time-series lookup from the KB tables instead of retrieved chunks.
+    
+    Args:
+        question: User's question
+        gemini_client: Optional pre-configured Gemini client
+        
+    Returns:
+        RAGQueryResult, or None if the question needs retrieval
+    """
+    from .structured_query import answer_question, phrase_answer
+    
+    answer = answer_question(question)
+    if answer is None:
+        return None
+    logger.info(f"Answering from series '{answer.match.name}' (coverage {answer.match.coverage:.2f})")
+    
+    chunk = QueryResult(
+        score=answer.match.coverage,
+        payload={
+            "text": answer.text,
+            "source": "timeseries",
+            "class_id": answer.class_id,
+            "chunk_index": 0
+        }
+    )
+    metadata: Dict[str, Any] = {
+        "success": True,
+        "route": "structured",
+        "series": answer.match.name,
+        "sources": [{
+            "class_id": answer.class_id,
+            "source": answer.info["source"],
+            "chunk_index": 0,
+            "score": answer.match.coverage
+        }],
+        "model": "none",
+        "prompt_length": 0
+    }
+    response = answer.text
+    try:
+        if gemini_client is None:
+            from .gemini_client import create_gemini_client
+            gemini_client = create_gemini_client()
+        gemini_result = phrase_answer(answer, gemini_client)
+        if gemini_result["success"]:
+            response = gemini_result["response"]
+            metadata["model"] = gemini_result["metadata"].get("model", "unknown")
+            metadata["prompt_length"] = gemini_result["metadata"].get("prompt_length", 0)
+    except Exception as e:
+        logger.warning(f"Gemini unavailable, returning the data rows: {e}")
+    
+    return RAGQueryResult(
+        question=question,
+        response=response,
+        context_chunks=[chunk],
+        metadata=metadata
+    )
+
+
 def run_rag_query(
     question: str,
     *,
@@ -98,11 +162,16 @@ def run_rag_query(
     filters: Optional[Dict[str, Any]] = None,
     collection: Optional[str] = None,
     gemini_client: Optional[GeminiClient] = None,
-    system_prompt: Optional[str] = None
+    system_prompt: Optional[str] = None,
+    structured: Optional[bool] = None,
+    history: Optional[str] = None
 ) -> RAGQueryResult:
     """
     Run a RAG query with Gemini generation.
     
+    Routing and retrieval use the bare question; conversation history is
+    only shown to the model when generating the answer.
+    
     Args:
         question: User's question
         top_k: Number of context chunks to retrieve
@@ -110,6 +179,10 @@ def run_rag_query(
         collection: Optional collection name
         gemini_client: Optional pre-configured Gemini client
         system_prompt: Optional custom system prompt
+        structured: Answer time-series lookups from the KB tables
+            (defaults to SETTINGS.structured_routing; skipped when filters
+            are given, since the tables cannot apply them)
+        history: Optional conversation context (e.g. previous questions)
         
     Returns:
         RAGQueryResult with generated response and context
@@ -117,6 +190,11 @@ def run_rag_query(
     try:
         logger.info(f"Running RAG query: '{question}'")
         
+        if not filters and (SETTINGS.structured_routing if structured is None else structured):
+            result = _run_structured_query(question, gemini_client)
+            if result is not None:
+                return result
+        
         # Step 1: Retrieve relevant chunks
         logger.debug("Retrieving context chunks...")
         context_chunks = run_query(
@@ -140,6 +218,7 @@ def run_rag_query(
         # Step 2: Generate response with Gemini
         if gemini_client is None:
             logger.debug("Creating Gemini client...")
+            from .gemini_client import create_gemini_client
             gemini_client = create_gemini_client()
         
         logger.debug("Generating response with Gemini...")
@@ -154,11 +233,14 @@ def run_rag_query(
                 "chunk_index": chunk.chunk_index,
                 "score": chunk.score
             }
+            if chunk.payload.get("alias_class_ids"):
+                chunk_dict["alias_class_ids"] = chunk.payload["alias_class_ids"]
             chunk_dicts.append(chunk_dict)
         
         # Generate response
+        prompt_question = f"{history}\n\nCurrent question: {question}" if history else question
         gemini_result = gemini_client.generate_response(
-            question=question,
+            question=prompt_question,
             context_chunks=chunk_dicts,
             system_prompt=system_prompt
         )
@@ -191,7 +273,9 @@ def run_rag_query_with_stats(
     filters: Optional[Dict[str, Any]] = None,
     collection: Optional[str] = None,
     gemini_client: Optional[GeminiClient] = None,
-    system_prompt: Optional[str] = None
+    system_prompt: Optional[str] = None,
+    structured: Optional[bool] = None,
+    history: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Run a RAG query with detailed statistics.
@@ -203,6 +287,8 @@ def run_rag_query_with_stats(
         collection: Optional collection name
         gemini_client: Optional pre-configured Gemini client
         system_prompt: Optional custom system prompt
+        structured: Answer time-series lookups from the KB tables
+        history: Optional conversation context for generation
         
     Returns:
         Dictionary containing results and comprehensive statistics
@@ -218,7 +304,9 @@ def run_rag_query_with_stats(
             filters=filters,
             collection=collection,
             gemini_client=gemini_client,
-            system_prompt=system_prompt
+            system_prompt=system_prompt,
+            structured=structured,
+            history=history
         )
         
         query_time = time.time() - start_time
@@ -269,11 +357,14 @@ if __name__ == "__main__":
     parser.add_argument("--top-k", type=int, default=SETTINGS.top_k,
                        help="Number of context chunks to retrieve")
     parser.add_argument("--class-id", type=str, default=None,
-                       help="Filter results by class folder name")
+                       help="Filter by class: comma-separated IDs, video ranges like 16..21, "
+                            "'!' to exclude")
     parser.add_argument("--collection", type=str, default=None,
                        help="Qdrant collection name")
     parser.add_argument("--system-prompt", type=str, default=None,
                        help="Custom system prompt for Gemini")
+    parser.add_argument("--no-structured", action="store_true",
+                       help="Always use retrieval, even for time-series lookups")
     parser.add_argument("--verbose", "-v", action="store_true",
                        help="Enable verbose logging")
     parser.add_argument("--stats", action="store_true",
@@ -292,7 +383,7 @@ if __name__ == "__main__":
         # Build filters
         filters = None
         if args.class_id:
-            filters = {"class_id": args.class_id}
+            filters = parse_class_id_filter(args.class_id)
         
         if args.stats:
             # Run with statistics
@@ -301,7 +392,8 @@ if __name__ == "__main__":
                 top_k=args.top_k,
                 filters=filters,
                 collection=args.collection,
-                system_prompt=args.system_prompt
+                system_prompt=args.system_prompt,
+                structured=not args.no_structured
             )
             
             if result["status"] == "success":
@@ -331,7 +423,8 @@ if __name__ == "__main__":
                 top_k=args.top_k,
                 filters=filters,
                 collection=args.collection,
-                system_prompt=args.system_prompt
+                system_prompt=args.system_prompt,
+                structured=not args.no_structured
             )
             
             result.print_response(
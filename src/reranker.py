@@ -0,0 +1,272 @@
+"""
+Cross-encoder reranking of retrieved chunks.
+
+The bi-encoder scores the question and each chunk separately, which is noisy
+for finance jargon. A cross-encoder reads each (question, chunk) pair
+together and ranks more precisely, but costs a model call per pair, so it
+only rescores a bounded candidate set:
+
+- at most ``max_candidates`` candidates, taken in retrieval order
+- scored in batches until ``budget_ms`` is spent; candidates left unscored
+  keep their retrieval order after the scored ones
+- scores are cached per (question, chunk ID), so repeated chat questions
+  skip the model entirely
+
+Usage:
+    python -m src.query --question "What does ATRP measure?" --rerank --stats
+"""
+
+from __future__ import annotations
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .embeddings import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Pairs in the first model call of a query, used to measure per-pair latency
+_PROBE_BATCH = 4
+
+class RerankScoreCache:
+    """Thread-safe LRU cache of cross-encoder scores keyed by (model, normalized question, chunk ID)."""
+
+    def __init__(self, max_size: int = 4096) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of scores to keep (0 disables caching)
+
+        Raises:
+            ValueError: If max_size is negative
+        """
+        if max_size < 0:
+            raise ValueError("max_size must be non-negative")
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, model_name: str, question: str, ids: Sequence[Any]) -> Dict[str, float]:
+        """Return the cached scores of ``ids`` for a normalized question, updating counters."""
+        found: Dict[str, float] = {}
+        with self._lock:
+            for point_id in ids:
+                key = (model_name, question, str(point_id))
+                score = self._entries.get(key)
+                if score is None:
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                found[str(point_id)] = score
+        return found
+
+    def put_many(self, model_name: str, question: str, scores: Dict[str, float]) -> None:
+        """Store scores for a normalized question, evicting the least recently used entries."""
+        if self.max_size == 0:
+            return
+
+        with self._lock:
+            for point_id, score in scores.items():
+                key = (model_name, question, str(point_id))
+                self._entries[key] = score
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached scores and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size and hit-rate counters."""
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+class RerankResult(NamedTuple):
+    """Outcome of one rerank call."""
+    order: List[int]
+    scores: Dict[int, float]
+    scored: int
+    cached: int
+    skipped: int
+    latency_ms: float
+
+def ranking_change(before: Sequence[Any], after: Sequence[Any], top_k: int) -> Dict[str, Any]:
+    """
+    Summarize how much a reranker changed a ranking.
+
+    Args:
+        before: Candidate IDs in retrieval order
+        after: The same IDs in reranked order
+        top_k: Number of results kept
+
+    Returns:
+        Dictionary with ``promoted`` (results in the new top-k that were not in
+        the old one), ``top1_changed`` and ``kendall_tau`` over all candidates
+    """
+    position = {str(point_id): rank for rank, point_id in enumerate(before)}
+    ranks = np.array([position[str(point_id)] for point_id in after if str(point_id) in position])
+    tau = 1.0
+    if len(ranks) > 1:
+        # Pairwise agreement between the two orders, in [-1, 1]
+        upper = np.triu_indices(len(ranks), k=1)
+        concordant = np.sign(ranks[upper[1]] - ranks[upper[0]])
+        tau = float(concordant.mean())
+    return {
+        "promoted": len({str(i) for i in after[:top_k]} - {str(i) for i in before[:top_k]}),
+        "top1_changed": bool(before and after and str(before[0]) != str(after[0])),
+        "kendall_tau": tau,
+    }
+
+class CrossEncoderReranker:
+    """Rescores (question, chunk) pairs with a sentence-transformers cross-encoder."""
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        max_candidates: int = 30,
+        budget_ms: float = 300.0,
+        batch_size: int = 16,
+        cache_size: int = 4096
+    ) -> None:
+        """
+        Initialize the reranker; the model is loaded on first use.
+
+        Args:
+            model_name: Cross-encoder model name
+            max_candidates: Most candidates rescored per query
+            budget_ms: Latency budget for scoring (a first probe batch is always scored)
+            batch_size: Largest batch per model call
+            cache_size: Cached (question, chunk) scores (0 disables caching)
+
+        Raises:
+            ValueError: If parameters are invalid
+        """
+        if not model_name or not isinstance(model_name, str):
+            raise ValueError("Model name must be a non-empty string")
+        if max_candidates <= 0 or batch_size <= 0:
+            raise ValueError("max_candidates and batch_size must be positive")
+        if budget_ms <= 0:
+            raise ValueError("budget_ms must be positive")
+
+        self.model_name = model_name
+        self.max_candidates = max_candidates
+        self.budget_ms = budget_ms
+        self.batch_size = batch_size
+        self.cache = RerankScoreCache(cache_size)
+        self.model: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def _load_model(self) -> Any:
+        """Load the cross-encoder into this process (once)."""
+        with self._lock:
+            if self.model is None:
+                # Imported here so processes that never rerank don't load torch
+                try:
+                    from sentence_transformers import CrossEncoder
+                except ImportError as e:
+                    raise ImportError(
+                        "sentence-transformers package is required. Install with: pip install sentence-transformers"
+                    ) from e
+
+                try:
+                    started = time.perf_counter()
+                    self.model = CrossEncoder(self.model_name, max_length=512)
+                    logger.info(f"Loaded cross-encoder {self.model_name} in {time.perf_counter() - started:.1f}s")
+                except Exception as e:
+                    logger.error(f"Failed to load cross-encoder {self.model_name}: {e}")
+                    raise RuntimeError(f"Failed to load cross-encoder: {e}") from e
+        return self.model
+
+    def rerank(self, question: str, ids: Sequence[Any], texts: Sequence[str]) -> RerankResult:
+        """
+        Rerank candidates for a question.
+
+        Cached scores are used first; the remaining candidates are scored in
+        retrieval order, with batch sizes fitted to the remaining budget from
+        the measured per-pair latency, until the budget is spent.
+
+        Args:
+            question: User question
+            ids: Candidate point IDs in retrieval order
+            texts: Candidate texts aligned with ids
+
+        Returns:
+            RerankResult whose ``order`` lists candidate indices, scored ones
+            by descending score followed by unscored ones in retrieval order
+
+        Raises:
+            ValueError: If ids and texts differ in length
+        """
+        if len(ids) != len(texts):
+            raise ValueError(f"IDs ({len(ids)}) and texts ({len(texts)}) must have the same length")
+
+        normalized = normalize_query(question)
+        candidates = list(range(min(len(ids), self.max_candidates)))
+        cached = self.cache.get_many(self.model_name, normalized, [ids[i] for i in candidates])
+        scores = {i: cached[str(ids[i])] for i in candidates if str(ids[i]) in cached}
+        pending = [i for i in candidates if i not in scores]
+
+        started = time.perf_counter()
+        if pending:
+            model = self._load_model()
+            started = time.perf_counter()
+            per_pair_ms: Optional[float] = None
+            fresh: Dict[str, float] = {}
+            while pending:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                size = min(self.batch_size, _PROBE_BATCH)
+                if per_pair_ms is not None:
+                    size = min(self.batch_size, int((self.budget_ms - elapsed_ms) / max(per_pair_ms, 1e-6)))
+                    if size <= 0:
+                        break
+                batch, pending = pending[:size], pending[size:]
+                batch_started = time.perf_counter()
+                predicted = model.predict([(question, texts[i]) for i in batch], batch_size=len(batch))
+                per_pair_ms = (time.perf_counter() - batch_started) * 1000 / len(batch)
+                for i, score in zip(batch, np.asarray(predicted, dtype="float64").ravel()):
+                    scores[i] = float(score)
+                    fresh[str(ids[i])] = float(score)
+            self.cache.put_many(self.model_name, normalized, fresh)
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        scored = sorted(scores, key=lambda i: (-scores[i], i))
+        order = scored + [i for i in range(len(ids)) if i not in scores]
+        skipped = len(pending)
+        if skipped:
+            logger.warning(f"Rerank budget of {self.budget_ms:.0f}ms spent; {skipped} candidates left unscored")
+        return RerankResult(order, scores, len(scores) - len(cached), len(cached), skipped, latency_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get reranker settings and score-cache counters."""
+        return {
+            "model": self.model_name,
+            "max_candidates": self.max_candidates,
+            "budget_ms": self.budget_ms,
+            "cache": self.cache.stats(),
+        }
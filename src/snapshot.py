@@ -0,0 +1,451 @@
+"""
+Index snapshots: bring up query nodes without re-embedding the knowledge base.
+
+``export`` packs everything a query node needs into one versioned archive:
+
+- ``index/``: vectors, IDs and payloads in the local-index layout (see local_index.py)
+- ``chunks.jsonl``: chunk texts and metadata from the chunk store
+- ``sparse_index.npz``: the BM25 index, if one was built
+- ``summary_index.npz``: the video/document summary vectors, if they were built
+- ``snapshot.json``: format version, index fingerprint and the ingest manifest
+
+``load`` bulk-loads an archive into a fresh Qdrant collection (behind the
+alias, like a blue/green rebuild) or into the memory-mapped local backend.
+Either way the chunk texts and indexes are written as a new generation (see
+generations.py) that goes live with the ingest manifest.
+
+The index fingerprint covers the embedding model, the vector dimension and the
+chunking settings. ``load`` refuses archives whose fingerprint differs from
+this node's configuration: their vectors would not match the query encoder,
+or their chunks would not line up with chunks ingested here later.
+
+Usage:
+    python -m src.snapshot export --out ./kb_snapshot.tar.gz
+    python -m src.snapshot load ./kb_snapshot.tar.gz --backend qdrant
+    python -m src.snapshot info ./kb_snapshot.tar.gz
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+from .config import SETTINGS
+from .chunk_store import ChunkStore
+from .embeddings import model_fingerprint
+from .generations import generation_paths, live_generation, remove_generation_files, save_manifest
+from .local_index import IDS_FILE, LocalVectorIndex, export_collection
+from .utils import batched, load_json, save_json
+
+logger = logging.getLogger(__name__)
+
+# Version 2 added chunking settings to the fingerprint
+SNAPSHOT_FORMAT_VERSION = 2
+SNAPSHOT_MANIFEST = "snapshot.json"
+INDEX_DIR = "index"
+CHUNKS_FILE = "chunks.jsonl"
+SPARSE_FILE = "sparse_index.npz"
+SUMMARY_FILE = "summary_index.npz"
+
+# Rows per chunk-store lookup and per Qdrant upsert while loading
+_EXPORT_BATCH = 5000
+_UPLOAD_BATCH = 512
+
+def index_fingerprint(model_name: str, dim: int, max_chunk_words: int, chunk_overlap_words: int) -> str:
+    """
+    Fingerprint of an index: its embedding space plus the chunking it was built with.
+
+    Args:
+        model_name: Embedding model name
+        dim: Vector dimension
+        max_chunk_words: Maximum words per chunk
+        chunk_overlap_words: Words shared by consecutive chunks
+
+    Returns:
+        16-character hex fingerprint
+    """
+    key = f"{model_fingerprint(model_name, dim)}|{max_chunk_words}|{chunk_overlap_words}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+def export_snapshot(client: Any, collection: str, archive_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Export a collection and its local data files to a snapshot archive.
+
+    Args:
+        client: Connected QdrantClient instance
+        collection: Collection or alias to export
+        archive_path: Destination ``.tar.gz`` path
+
+    Returns:
+        The snapshot manifest
+
+    Raises:
+        RuntimeError: If the export fails
+    """
+    archive_path = Path(archive_path)
+    store: Optional[ChunkStore] = None
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="kb_snapshot_") as tmp:
+            staging = Path(tmp)
+            index_manifest = export_collection(client, collection, staging / INDEX_DIR)
+
+            # Texts are not in Qdrant payloads, so take them from the exported generation's chunk store
+            from .index_qdrant import resolve_alias
+
+            paths = generation_paths(resolve_alias(client, collection) or collection)
+            store = ChunkStore(paths["chunk_store_path"], readonly=True)
+            ids = np.load(staging / INDEX_DIR / IDS_FILE)
+            missing = 0
+            with open(staging / CHUNKS_FILE, "w", encoding="utf-8") as f:
+                for block in batched((int(i) for i in ids), _EXPORT_BATCH):
+                    records = store.get_records(block)
+                    missing += len(block) - len(records)
+                    for point_id, (text, metadata) in records.items():
+                        f.write(json.dumps([point_id, text, metadata], ensure_ascii=False) + "\n")
+            if missing:
+                logger.warning(f"{missing} points have no text in the chunk store")
+
+            if Path(paths["sparse_index_path"]).exists():
+                shutil.copy2(paths["sparse_index_path"], staging / SPARSE_FILE)
+            if Path(paths["summary_index_path"]).exists():
+                shutil.copy2(paths["summary_index_path"], staging / SUMMARY_FILE)
+
+            ingest_manifest = None
+            if Path(SETTINGS.ingest_manifest_path).exists():
+                ingest_manifest = load_json(SETTINGS.ingest_manifest_path)
+            else:
+                logger.warning(
+                    f"No ingest manifest at {SETTINGS.ingest_manifest_path}; "
+                    f"assuming the collection was built with {SETTINGS.embedding_model} and the configured chunking"
+                )
+            built_with = ingest_manifest or {}
+            embedding_model = built_with.get("embedding_model", SETTINGS.embedding_model)
+            max_chunk_words = built_with.get("max_chunk_words", SETTINGS.max_chunk_words)
+            chunk_overlap_words = built_with.get("chunk_overlap_words", SETTINGS.chunk_overlap_words)
+
+            manifest = {
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                "collection": collection,
+                "count": index_manifest["count"],
+                "dim": index_manifest["dim"],
+                "embedding_model": embedding_model,
+                "max_chunk_words": max_chunk_words,
+                "chunk_overlap_words": chunk_overlap_words,
+                "fingerprint": index_fingerprint(
+                    embedding_model, index_manifest["dim"], max_chunk_words, chunk_overlap_words
+                ),
+                "has_sparse_index": (staging / SPARSE_FILE).exists(),
+                "has_summary_index": (staging / SUMMARY_FILE).exists(),
+                "ingest_manifest": ingest_manifest,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+            save_json(staging / SNAPSHOT_MANIFEST, manifest)
+
+            archive_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_archive = archive_path.with_name(archive_path.name + ".tmp")
+            with tarfile.open(tmp_archive, "w:gz") as tar:
+                # Manifest first so ``info`` can read it without scanning the archive
+                tar.add(staging / SNAPSHOT_MANIFEST, arcname=SNAPSHOT_MANIFEST)
+                for name in (INDEX_DIR, CHUNKS_FILE, SPARSE_FILE, SUMMARY_FILE):
+                    if (staging / name).exists():
+                        tar.add(staging / name, arcname=name)
+            tmp_archive.replace(archive_path)
+
+        logger.info(f"Exported snapshot of '{collection}' ({manifest['count']} points) to {archive_path}")
+        return manifest
+
+    except Exception as e:
+        logger.error(f"Failed to export snapshot of '{collection}': {e}")
+        raise RuntimeError(f"Failed to export snapshot of '{collection}': {e}") from e
+    finally:
+        if store is not None:
+            store.close()
+
+def read_snapshot_manifest(archive_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Read the manifest of a snapshot archive without extracting it.
+
+    Args:
+        archive_path: Snapshot ``.tar.gz`` path
+
+    Returns:
+        The snapshot manifest
+
+    Raises:
+        FileNotFoundError: If the archive does not exist
+        ValueError: If the archive is not a snapshot
+    """
+    archive_path = Path(archive_path)
+    if not archive_path.exists():
+        raise FileNotFoundError(f"Snapshot not found: {archive_path}")
+
+    with tarfile.open(archive_path, "r:gz") as tar:
+        try:
+            member = tar.getmember(SNAPSHOT_MANIFEST)
+        except KeyError:
+            raise ValueError(f"{archive_path} is not a knowledge base snapshot") from None
+        return json.load(tar.extractfile(member))
+
+def check_fingerprint(manifest: Dict[str, Any], settings: Any) -> None:
+    """
+    Refuse snapshots built with a different embedding model or chunking.
+
+    Version 1 archives only fingerprint the embedding model; their chunking
+    cannot be checked and a warning is logged instead.
+
+    Args:
+        manifest: Snapshot manifest
+        settings: Settings of this node (embedding model and chunking)
+
+    Raises:
+        ValueError: If the format is unsupported or the fingerprints differ
+    """
+    if manifest.get("format_version", 0) > SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(
+            f"Snapshot format {manifest.get('format_version')} is newer than supported "
+            f"({SNAPSHOT_FORMAT_VERSION}); upgrade this node"
+        )
+
+    model_name = settings.embedding_model
+    if manifest.get("format_version", 0) < 2:
+        logger.warning("Snapshot predates chunking fingerprints; only the embedding model is checked")
+        expected = model_fingerprint(model_name, manifest["dim"])
+    else:
+        expected = index_fingerprint(
+            model_name, manifest["dim"], settings.max_chunk_words, settings.chunk_overlap_words
+        )
+
+    if manifest["fingerprint"] != expected:
+        raise ValueError(
+            f"Snapshot was built with '{manifest['embedding_model']}', "
+            f"{manifest.get('max_chunk_words', '?')}-word chunks and {manifest.get('chunk_overlap_words', '?')} "
+            f"words of overlap (fingerprint {manifest['fingerprint']}), but this node uses '{model_name}', "
+            f"{settings.max_chunk_words}-word chunks and {settings.chunk_overlap_words} words of overlap "
+            f"(fingerprint {expected})"
+        )
+
+def _extract(archive_path: Path, destination: Path) -> None:
+    """Extract an archive, rejecting members that would escape the destination."""
+    with tarfile.open(archive_path, "r:gz") as tar:
+        for member in tar.getmembers():
+            target = (destination / member.name).resolve()
+            if not (member.isfile() or member.isdir()) or destination.resolve() not in (target, *target.parents):
+                raise ValueError(f"Unsafe member in snapshot: {member.name}")
+        tar.extractall(destination)
+
+def _replace_dir(source: Path, destination: Path) -> None:
+    """Move a directory into place, replacing any existing one."""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    old = destination.with_name(f"{destination.name}.old-{os.getpid()}")
+    if destination.exists():
+        destination.rename(old)
+    shutil.move(str(source), str(destination))
+    shutil.rmtree(old, ignore_errors=True)
+
+def _load_into_qdrant(client: Any, index_dir: Path, alias: str) -> str:
+    """Bulk-load exported vectors into a new, validated collection (the alias is not swapped yet)."""
+    from .index_qdrant import (
+        collection_options, create_payload_indexes, recreate_collection,
+        upsert_points, validate_collection, versioned_collection_name
+    )
+
+    index = LocalVectorIndex(index_dir)
+    target = versioned_collection_name(alias) if SETTINGS.qdrant_blue_green else alias
+    recreate_collection(client, target, index.dim, **collection_options(SETTINGS))
+    create_payload_indexes(client, target)
+
+    for start in range(0, len(index), _UPLOAD_BATCH):
+        end = min(start + _UPLOAD_BATCH, len(index))
+        payloads = [
+            {**index.payloads[row], "id": int(index.ids[row])} for row in range(start, end)
+        ]
+        upsert_points(client, target, np.asarray(index.vectors[start:end]).tolist(), payloads)
+
+    validate_collection(client, target, len(index), index.dim)
+    return target
+
+def load_snapshot(
+    archive_path: Union[str, Path],
+    *,
+    backend: str = "qdrant",
+    client: Any = None,
+    alias: Optional[str] = None,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Load a snapshot into Qdrant or the local backend, plus the local data files.
+
+    Args:
+        archive_path: Snapshot ``.tar.gz`` path
+        backend: "qdrant" (new collection behind ``alias``) or "local" (LOCAL_INDEX_DIR)
+        client: Connected QdrantClient instance (required for the qdrant backend)
+        alias: Collection alias to serve from (defaults to SETTINGS.collection)
+        force: Load even if the index fingerprint does not match
+
+    Returns:
+        Dictionary with the manifest and where the index was loaded
+
+    Raises:
+        ValueError: If the snapshot is incompatible or parameters are invalid
+        RuntimeError: If loading fails
+    """
+    if backend not in ("qdrant", "local"):
+        raise ValueError(f"Unknown backend '{backend}' (expected qdrant or local)")
+
+    if backend == "qdrant" and client is None:
+        raise ValueError("A Qdrant client is required for the qdrant backend")
+
+    archive_path = Path(archive_path)
+    manifest = read_snapshot_manifest(archive_path)
+    if force:
+        try:
+            check_fingerprint(manifest, SETTINGS)
+        except ValueError as e:
+            logger.warning(f"Loading incompatible snapshot because force is set: {e}")
+    else:
+        check_fingerprint(manifest, SETTINGS)
+
+    alias = alias or SETTINGS.collection
+    data_dir = Path(SETTINGS.data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="kb_snapshot_", dir=data_dir) as tmp:
+            staging = Path(tmp)
+            _extract(archive_path, staging)
+
+            if backend == "local":
+                from .index_qdrant import versioned_collection_name
+
+                # The local index has no collections, but its data files are versioned the same way
+                location = versioned_collection_name(alias)
+            else:
+                location = _load_into_qdrant(client, staging / INDEX_DIR, alias)
+
+            # Data files of a new generation go next to the live ones and switch with the manifest;
+            # the store is emptied first, so an in-place load keeps no records of the previous index
+            paths = generation_paths(location)
+            with ChunkStore(paths["chunk_store_path"]) as store, \
+                    open(staging / CHUNKS_FILE, encoding="utf-8") as f:
+                store.clear()
+                for block in batched((json.loads(line) for line in f), _EXPORT_BATCH):
+                    store.put_many(block)
+
+            if (staging / SPARSE_FILE).exists():
+                Path(paths["sparse_index_path"]).parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(staging / SPARSE_FILE), paths["sparse_index_path"])
+            if (staging / SUMMARY_FILE).exists():
+                Path(paths["summary_index_path"]).parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(staging / SUMMARY_FILE), paths["summary_index_path"])
+
+            if backend == "local":
+                _replace_dir(staging / INDEX_DIR, Path(SETTINGS.local_index_dir))
+            elif location != alias:
+                from .index_qdrant import swap_alias
+
+                swap_alias(client, alias, location)
+
+            previous = live_generation()
+            ingest_manifest = dict(manifest.get("ingest_manifest") or {})
+            ingest_manifest.update({"collection": location, "loaded_from_snapshot": str(archive_path)})
+            save_manifest(ingest_manifest)
+
+            if backend == "local":
+                # The replaced local index only had the previous generation's files
+                if previous and previous != location:
+                    remove_generation_files(previous)
+            elif location != alias:
+                from .index_qdrant import gc_generations
+
+                for name in gc_generations(client, alias, keep=SETTINGS.qdrant_keep_generations):
+                    remove_generation_files(name)
+
+        seconds = time.perf_counter() - started
+        logger.info(f"Loaded snapshot {archive_path} into {backend} ({location}) in {seconds:.1f}s")
+        return {"manifest": manifest, "backend": backend, "location": location, "seconds": seconds}
+
+    except Exception as e:
+        logger.error(f"Failed to load snapshot {archive_path}: {e}")
+        raise RuntimeError(f"Failed to load snapshot {archive_path}: {e}") from e
+
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Export and load knowledge base index snapshots")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export the collection and local data to an archive")
+    export_parser.add_argument("--collection", type=str, default=SETTINGS.collection,
+                               help="Collection or alias to export")
+    export_parser.add_argument("--out", type=str, required=True,
+                               help="Destination archive (.tar.gz)")
+
+    load_parser = subparsers.add_parser("load", help="Load an archive into Qdrant or the local backend")
+    load_parser.add_argument("archive", type=str, help="Snapshot archive (.tar.gz)")
+    load_parser.add_argument("--backend", choices=["qdrant", "local"], default=SETTINGS.search_backend,
+                             help="Where to load the vectors (defaults to SEARCH_BACKEND)")
+    load_parser.add_argument("--collection", type=str, default=SETTINGS.collection,
+                             help="Alias to serve the loaded collection from")
+    load_parser.add_argument("--force", action="store_true",
+                             help="Load even if the index fingerprint (model and chunking) does not match")
+
+    info_parser = subparsers.add_parser("info", help="Show the manifest of an archive")
+    info_parser.add_argument("archive", type=str, help="Snapshot archive (.tar.gz)")
+
+    parser.add_argument("--verbose", "-v", action="store_true",
+                       help="Enable verbose logging")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        if args.command == "info":
+            manifest = read_snapshot_manifest(args.archive)
+            print(f"\n[STATS] Snapshot {args.archive}:")
+            print(f"   Format version: {manifest['format_version']}")
+            print(f"   Collection: {manifest['collection']} ({manifest['count']} points x {manifest['dim']} dims)")
+            print(f"   Embedding model: {manifest['embedding_model']}")
+            if "max_chunk_words" in manifest:
+                print(f"   Chunking: {manifest['max_chunk_words']} words, {manifest['chunk_overlap_words']} overlap")
+            print(f"   Fingerprint: {manifest['fingerprint']}")
+            print(f"   Sparse index: {'yes' if manifest['has_sparse_index'] else 'no'}")
+            print(f"   Summary index: {'yes' if manifest.get('has_summary_index') else 'no'}")
+            print(f"   Created at: {manifest['created_at']}")
+        else:
+            from .index_qdrant import connect_from_settings
+
+            if args.command == "export":
+                client = connect_from_settings(SETTINGS)
+                manifest = export_snapshot(client, args.collection, args.out)
+                size_mb = Path(args.out).stat().st_size / 2**20
+                print(f"\n[SUCCESS] Exported {manifest['count']} points to {args.out} ({size_mb:.1f}MB)")
+            else:
+                client = connect_from_settings(SETTINGS) if args.backend == "qdrant" else None
+                result = load_snapshot(
+                    args.archive, backend=args.backend, client=client,
+                    alias=args.collection, force=args.force
+                )
+                print(f"\n[SUCCESS] Loaded {result['manifest']['count']} points into "
+                      f"{result['backend']} ({result['location']}) in {result['seconds']:.1f}s")
+    except Exception as e:
+        print(f"\n[ERROR] Snapshot {args.command} failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,264 @@
+"""
+Sparse lexical (BM25) index for exact-token retrieval.
+
+Dense mpnet retrieval tends to miss exact jargon such as "ATRP", "ISM", "UMCSI"
+or "Caixin". This module builds a BM25 inverted index over the chunk texts at
+ingest time and stores it as a compressed-sparse-row (CSR) posting matrix in a
+single ``.npz`` file, keyed by the same point IDs as Qdrant.
+"""
+
+from __future__ import annotations
+import logging
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Small English stopword list; finance acronyms are deliberately not included
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers herself him himself his how i if in into is it its itself
+just me more most my myself no nor not now of off on once only or other our ours ourselves out
+over own same she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your yours yourself yourselves
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase alphanumeric terms, dropping stopwords.
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of terms in document order
+    """
+    return [t for t in _TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+class BM25Index:
+    """BM25 inverted index stored as CSR postings (term -> documents)."""
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        vocabulary: Dict[str, int],
+        indptr: np.ndarray,
+        postings: np.ndarray,
+        term_freqs: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float = 1.2,
+        b: float = 0.75
+    ) -> None:
+        self.ids = ids
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.postings = postings
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+
+        doc_freqs = np.diff(indptr).astype("float64")
+        n_docs = max(len(ids), 1)
+        self.idf = np.log1p((n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5))
+        avg_length = float(doc_lengths.mean()) if len(doc_lengths) else 1.0
+        # Per-document BM25 length normalization, precomputed once
+        self._length_norm = k1 * (1.0 - b + b * doc_lengths / max(avg_length, 1e-9))
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[Any],
+        texts: Sequence[str],
+        k1: float = 1.2,
+        b: float = 0.75
+    ) -> "BM25Index":
+        """
+        Build an index from chunk texts.
+
+        Args:
+            ids: Point IDs, aligned with texts
+            texts: Chunk texts
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+
+        Returns:
+            Built BM25Index
+
+        Raises:
+            ValueError: If ids and texts differ in length
+        """
+        if len(ids) != len(texts):
+            raise ValueError(f"IDs ({len(ids)}) and texts ({len(texts)}) must have the same length")
+
+        vocabulary: Dict[str, int] = {}
+        term_docs: List[List[int]] = []
+        term_tfs: List[List[int]] = []
+        doc_lengths = np.zeros(len(texts), dtype="float32")
+
+        for doc, text in enumerate(texts):
+            terms = tokenize(text)
+            doc_lengths[doc] = len(terms)
+            for term, count in Counter(terms).items():
+                term_id = vocabulary.setdefault(term, len(vocabulary))
+                if term_id == len(term_docs):
+                    term_docs.append([])
+                    term_tfs.append([])
+                term_docs[term_id].append(doc)
+                term_tfs[term_id].append(count)
+
+        indptr = np.zeros(len(vocabulary) + 1, dtype="int64")
+        indptr[1:] = np.cumsum([len(d) for d in term_docs])
+        postings = np.fromiter((d for docs in term_docs for d in docs), dtype="int32", count=int(indptr[-1]))
+        term_freqs = np.fromiter((f for tfs in term_tfs for f in tfs), dtype="float32", count=int(indptr[-1]))
+
+        logger.info(f"Built BM25 index: {len(texts)} documents, {len(vocabulary)} terms, {len(postings)} postings")
+        return cls(
+            np.asarray([int(i) for i in ids], dtype="uint64"),
+            vocabulary, indptr, postings, term_freqs, doc_lengths, k1=k1, b=b
+        )
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Save the index to a compressed ``.npz`` file (written atomically).
+
+        Args:
+            path: Destination path
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        terms = np.empty(len(self.vocabulary), dtype=object)
+        for term, term_id in self.vocabulary.items():
+            terms[term_id] = term
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                ids=self.ids,
+                terms=terms.astype("U"),
+                indptr=self.indptr,
+                postings=self.postings,
+                term_freqs=self.term_freqs,
+                doc_lengths=self.doc_lengths,
+                params=np.array([self.k1, self.b], dtype="float64"),
+            )
+        tmp_path.replace(path)
+        logger.info(f"Saved BM25 index to {path}")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "BM25Index":
+        """
+        Load an index saved with ``save``.
+
+        Args:
+            path: Path of the ``.npz`` file
+
+        Returns:
+            Loaded BM25Index
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Sparse index not found: {path}")
+
+        with np.load(path) as data:
+            k1, b = data["params"].tolist()
+            return cls(
+                data["ids"],
+                {term: i for i, term in enumerate(data["terms"].tolist())},
+                data["indptr"],
+                data["postings"],
+                data["term_freqs"],
+                data["doc_lengths"],
+                k1=k1,
+                b=b,
+            )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def score(self, query: str) -> np.ndarray:
+        """
+        Compute BM25 scores of every document for a query.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Array of scores aligned with ``ids``
+        """
+        scores = np.zeros(len(self.ids), dtype="float32")
+        for term in set(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            docs = self.postings[start:end]
+            tf = self.term_freqs[start:end]
+            # Each document appears once per term, so fancy-index accumulation is safe
+            scores[docs] += self.idf[term_id] * tf * (self.k1 + 1.0) / (tf + self._length_norm[docs])
+        return scores
+
+    def ranked(self, query: str) -> Iterable[Tuple[int, float]]:
+        """
+        Yield (point_id, score) for every matching document, best first.
+
+        Args:
+            query: Query text
+
+        Yields:
+            Tuples of point ID and BM25 score
+        """
+        scores = self.score(query)
+        matched = np.flatnonzero(scores > 0)
+        for doc in matched[np.argsort(-scores[matched], kind="stable")]:
+            yield int(self.ids[doc]), float(scores[doc])
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """
+        Return the top-k (point_id, score) pairs for a query.
+
+        Args:
+            query: Query text
+            top_k: Number of results
+
+        Returns:
+            List of (point_id, score), best first
+        """
+        if top_k <= 0:
+            raise ValueError("top_k must be positive")
+
+        scores = self.score(query)
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(self.ids[doc]), float(scores[doc])) for doc in matched]
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[Any]], k: int = 60) -> List[Tuple[Any, float]]:
+    """
+    Fuse several ranked ID lists with reciprocal-rank fusion.
+
+    Args:
+        rankings: Ranked lists of IDs, best first
+        k: RRF constant (larger values flatten the contribution of top ranks)
+
+    Returns:
+        List of (id, fused_score), best first
+    """
+    fused: Dict[Any, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            fused[item] = fused.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda pair: pair[1], reverse=True)
@@ -0,0 +1,453 @@
+"""
+Streaming spreadsheet summaries for ingestion.
+
+Workbooks are read sheet by sheet with openpyxl's read-only reader (xlrd for
+legacy ``.xls`` when installed), so no sheet is ever materialized as a
+DataFrame. Each sheet becomes one summary chunk: dimensions, column types,
+per-column statistics gathered in a single pass over the rows, and a short
+preview. Sheets can be summarized in parallel worker processes.
+"""
+
+from __future__ import annotations
+import csv
+import io
+import logging
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .chunkers import Chunk
+
+logger = logging.getLogger(__name__)
+
+SPREADSHEET_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+
+# Leading rows searched for a header row (title blocks and notes often come first)
+HEADER_SCAN_ROWS = 20
+
+# Share of a column's values that must be numbers (or dates) for it to count as such
+_TYPE_MAJORITY = 0.8
+
+def column_letter(index: int) -> str:
+    """Excel column letter for a zero-based column index."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def _format_value(value: Any) -> str:
+    """Render a cell value compactly for summaries and previews."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value.time() == time() else value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).strip()
+
+@dataclass
+class ColumnStats:
+    """Running statistics of one column, updated one value at a time."""
+    name: str
+    values: int = 0
+    numbers: int = 0
+    total: float = 0.0
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    first: Optional[float] = None
+    last: Optional[float] = None
+    dates: int = 0
+    earliest: Optional[datetime] = None
+    latest: Optional[datetime] = None
+    examples: List[str] = field(default_factory=list)
+
+    def add(self, value: Any) -> None:
+        """Fold one non-empty cell value into the statistics."""
+        self.values += 1
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.numbers += 1
+            self.total += value
+            self.minimum = value if self.minimum is None else min(self.minimum, value)
+            self.maximum = value if self.maximum is None else max(self.maximum, value)
+            if self.first is None:
+                self.first = value
+            self.last = value
+        elif isinstance(value, (datetime, date)):
+            if not isinstance(value, datetime):
+                value = datetime.combine(value, time())
+            self.dates += 1
+            self.earliest = value if self.earliest is None else min(self.earliest, value)
+            self.latest = value if self.latest is None else max(self.latest, value)
+        elif len(self.examples) < 3:
+            text = _format_value(value)
+            if text and text not in self.examples:
+                self.examples.append(text)
+
+    @property
+    def kind(self) -> str:
+        """"numeric", "date" or "text", by the majority of the column's values."""
+        if self.values and self.numbers >= _TYPE_MAJORITY * self.values:
+            return "numeric"
+        if self.values and self.dates >= _TYPE_MAJORITY * self.values:
+            return "date"
+        return "text"
+
+    def describe(self) -> str:
+        """One summary line for the column."""
+        if self.kind == "numeric":
+            return (f"{self.name}: mean={_format_value(self.total / self.numbers)}, "
+                    f"min={_format_value(self.minimum)}, max={_format_value(self.maximum)}, "
+                    f"first={_format_value(self.first)}, last={_format_value(self.last)}")
+        if self.kind == "date":
+            return f"{self.name}: {_format_value(self.earliest)} to {_format_value(self.latest)}"
+        if self.examples:
+            return f"{self.name}: e.g. {', '.join(self.examples)}"
+        return self.name
+
+def is_header_row(row: Sequence[Any]) -> bool:
+    """A header row has at least two cells and all of them are labels."""
+    filled = [v for v in row if v is not None and _format_value(v)]
+    return len(filled) >= 2 and all(isinstance(v, str) for v in filled)
+
+def _require_xlrd() -> Any:
+    try:
+        import xlrd
+    except ImportError as e:
+        raise ImportError(
+            "xlrd package is required for legacy .xls workbooks. Install with: pip install xlrd"
+        ) from e
+    return xlrd
+
+class WorkbookReader:
+    """
+    Read-only, row-streaming access to the worksheets of one workbook.
+    
+    Opening a workbook parses its styles, shared strings and sheet dimensions,
+    so a reader is opened once and reused for all the sheets it summarizes.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """
+        Open a workbook for reading.
+
+        Args:
+            path: Workbook path (.xlsx, .xlsm or .xls)
+
+        Raises:
+            ImportError: If the reader for the file type is not installed
+        """
+        self.path = Path(path)
+        self._xlrd: Any = None
+        if self.path.suffix.lower() == ".xls":
+            self._xlrd = _require_xlrd()
+            self._book = self._xlrd.open_workbook(str(self.path), on_demand=True)
+        else:
+            import openpyxl
+            with warnings.catch_warnings():
+                # openpyxl warns about every workbook extension (data validation, slicers) it skips
+                warnings.simplefilter("ignore", UserWarning)
+                self._book = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+
+    @property
+    def sheet_names(self) -> List[str]:
+        """Worksheet names in workbook order (chart sheets are not included)."""
+        if self._xlrd is not None:
+            return self._book.sheet_names()
+        return [ws.title for ws in self._book.worksheets]
+
+    def rows(self, sheet_name: str) -> Iterator[Tuple[Any, ...]]:
+        """
+        Stream the cell values of one sheet row by row.
+
+        Args:
+            sheet_name: Worksheet name
+
+        Yields:
+            Tuple of cell values per row (None for empty cells, datetimes for dates)
+        """
+        if self._xlrd is None:
+            yield from self._book[sheet_name].iter_rows(values_only=True)
+            return
+
+        xlrd = self._xlrd
+        sheet = self._book.sheet_by_name(sheet_name)
+        try:
+            for r in range(sheet.nrows):
+                row = []
+                for cell in sheet.row(r):
+                    if cell.ctype == xlrd.XL_CELL_DATE:
+                        row.append(xlrd.xldate.xldate_as_datetime(cell.value, self._book.datemode))
+                    elif cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+                        row.append(None)
+                    else:
+                        row.append(cell.value)
+                yield tuple(row)
+        finally:
+            self._book.unload_sheet(sheet_name)
+
+    def close(self) -> None:
+        """Release the workbook."""
+        if self._xlrd is not None:
+            self._book.release_resources()
+        else:
+            self._book.close()
+
+    def __enter__(self) -> "WorkbookReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+def summarize_sheet(
+    reader: WorkbookReader,
+    sheet_name: str,
+    sheet_index: int = 0,
+    max_preview_rows: int = 10,
+    max_columns_preview: int = 8
+) -> Optional[Chunk]:
+    """
+    Summarize one sheet in a single streaming pass.
+
+    The header is the first all-label row among the leading rows; without one,
+    columns are named by letter and every row is data.
+
+    Args:
+        reader: Open workbook
+        sheet_name: Worksheet name
+        sheet_index: Position of the sheet in the workbook
+        max_preview_rows: Maximum number of data rows in the preview
+        max_columns_preview: Maximum number of columns listed per type and previewed
+
+    Returns:
+        Summary chunk with per-sheet metadata, or None if the sheet is empty
+    """
+    path = reader.path
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        rows = reader.rows(sheet_name)
+        return _summarize_rows(path, sheet_name, rows, sheet_index, max_preview_rows, max_columns_preview)
+
+def _summarize_rows(
+    path: Path,
+    sheet_name: str,
+    rows: Iterator[Tuple[Any, ...]],
+    sheet_index: int,
+    max_preview_rows: int,
+    max_columns_preview: int
+) -> Optional[Chunk]:
+    """Single pass over a sheet's rows behind ``summarize_sheet``."""
+    # Buffer the leading rows to find the header, then stream the rest
+    leading: List[Tuple[Any, ...]] = []
+    for row in rows:
+        leading.append(row)
+        if len(leading) >= HEADER_SCAN_ROWS:
+            break
+    header_index = next((i for i, row in enumerate(leading) if is_header_row(row)), None)
+    header = leading[header_index] if header_index is not None else ()
+    data_start = header_index + 1 if header_index is not None else 0
+
+    columns: Dict[int, ColumnStats] = {}
+    preview: List[Tuple[Any, ...]] = []
+    data_rows = 0
+
+    def consume(row: Tuple[Any, ...]) -> None:
+        nonlocal data_rows
+        filled = False
+        for col, value in enumerate(row):
+            if value is None or (isinstance(value, str) and not value.strip()):
+                continue
+            filled = True
+            stats = columns.get(col)
+            if stats is None:
+                label = _format_value(header[col]) if col < len(header) and header[col] is not None else ""
+                stats = columns[col] = ColumnStats(name=label or f"Column {column_letter(col)}")
+            stats.add(value)
+        if filled:
+            data_rows += 1
+            if len(preview) < max_preview_rows:
+                preview.append(row)
+
+    for row in leading[data_start:]:
+        consume(row)
+    for row in rows:
+        consume(row)
+
+    if not data_rows:
+        logger.debug(f"Sheet '{sheet_name}' in {path.name} is empty, skipping")
+        return None
+
+    ordered = [columns[col] for col in sorted(columns)]
+    by_kind: Dict[str, List[ColumnStats]] = {"date": [], "text": [], "numeric": []}
+    for stats in ordered:
+        by_kind[stats.kind].append(stats)
+
+    lines = [f"Excel Sheet '{sheet_name}' Summary ({path.name}):"]
+    lines.append(f"Dimensions: {data_rows} rows × {len(ordered)} columns")
+
+    for kind, title in (("date", "Date columns"), ("text", "Text columns"), ("numeric", "Numeric columns")):
+        kind_columns = by_kind[kind]
+        if not kind_columns:
+            continue
+        lines.append(f"{title} ({len(kind_columns)}):")
+        lines.extend(f"  {stats.describe()}" for stats in kind_columns[:max_columns_preview])
+        if len(kind_columns) > max_columns_preview:
+            lines.append(f"  ... and {len(kind_columns) - max_columns_preview} more")
+
+    # Preview the first populated columns as CSV
+    preview_cols = sorted(columns)[:max_columns_preview]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow([columns[col].name for col in preview_cols])
+    for row in preview:
+        writer.writerow([_format_value(row[col]) if col < len(row) else "" for col in preview_cols])
+    lines.append(f"Data Preview (first {len(preview)} rows):")
+    lines.append(buffer.getvalue().strip())
+    if len(columns) > max_columns_preview:
+        lines.append(f"... and {len(columns) - max_columns_preview} more columns")
+
+    metadata = {
+        "source": "excel",
+        "sheet": sheet_name,
+        "sheet_index": sheet_index,
+        "rows": data_rows,
+        "columns": len(ordered),
+        "header_row": header_index + 1 if header_index is not None else None,
+        "numeric_columns": [stats.name for stats in by_kind["numeric"]],
+    }
+    return Chunk(text="\n".join(lines), metadata=metadata)
+
+def sheet_executor(workers: Optional[int] = None) -> Optional[Executor]:
+    """
+    Create a process pool for summarizing sheets in parallel.
+
+    Workers are spawned rather than forked so the pool is safe to create after
+    the embedding model has started its threads.
+
+    Args:
+        workers: Number of worker processes (defaults to the CPU count)
+
+    Returns:
+        Executor, or None when a single worker is requested
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+def summarize_sheets(
+    path: Union[str, Path],
+    sheets: List[Tuple[int, str]],
+    max_preview_rows: int = 10,
+    max_columns_preview: int = 8
+) -> List[Optional[Chunk]]:
+    """
+    Summarize a group of sheets with one open workbook (the unit of work for pool workers).
+
+    Args:
+        path: Workbook path
+        sheets: (sheet index, sheet name) pairs
+        max_preview_rows: Maximum number of data rows in each preview
+        max_columns_preview: Maximum number of columns listed per type and previewed
+
+    Returns:
+        One summary (or None for an empty or unreadable sheet) per requested sheet
+    """
+    with WorkbookReader(path) as reader:
+        return _summarize_group(reader, sheets, max_preview_rows, max_columns_preview)
+
+def _summarize_group(
+    reader: WorkbookReader,
+    sheets: List[Tuple[int, str]],
+    max_preview_rows: int,
+    max_columns_preview: int
+) -> List[Optional[Chunk]]:
+    results: List[Optional[Chunk]] = []
+    for index, name in sheets:
+        try:
+            results.append(summarize_sheet(reader, name, index, max_preview_rows, max_columns_preview))
+        except Exception as e:
+            logger.error(f"Error processing sheet '{name}' in {reader.path}: {e}")
+            results.append(None)
+    return results
+
+def summarize_workbook(
+    path: Union[str, Path],
+    base_meta: Optional[Dict[str, Any]] = None,
+    executor: Optional[Executor] = None,
+    max_preview_rows: int = 10,
+    max_columns_preview: int = 8
+) -> List[Chunk]:
+    """
+    Summarize every sheet of a workbook, in parallel when an executor is given.
+
+    With an executor the sheets are split into one contiguous group per CPU;
+    each worker opens the workbook once and summarizes its group.
+
+    Args:
+        path: Workbook path (.xlsx, .xlsm or .xls)
+        base_meta: Metadata merged into every sheet chunk
+        executor: Optional process pool from ``sheet_executor``
+        max_preview_rows: Maximum number of data rows in each preview
+        max_columns_preview: Maximum number of columns listed per type and previewed
+
+    Returns:
+        One chunk per non-empty sheet, in workbook order
+
+    Raises:
+        ValueError: If the file is not a readable workbook
+        ImportError: If the reader for the file type is not installed
+    """
+    path = Path(path)
+    if path.suffix.lower() not in SPREADSHEET_EXTENSIONS:
+        raise ValueError(f"File must be an Excel file (.xlsx, .xls, or .xlsm), got: {path.suffix}")
+
+    try:
+        reader = WorkbookReader(path)
+    except ImportError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Invalid Excel file {path}: {e}") from e
+
+    results: Optional[List[Optional[Chunk]]] = None
+    try:
+        sheets = list(enumerate(reader.sheet_names))
+        # Legacy .xls files are read whole by xlrd, so extra workers would each re-read the file
+        if executor is not None and len(sheets) > 1 and path.suffix.lower() != ".xls":
+            group_count = min(len(sheets), os.cpu_count() or 1)
+            size = -(-len(sheets) // group_count)
+            groups = [sheets[start:start + size] for start in range(0, len(sheets), size)]
+            try:
+                futures = [
+                    executor.submit(summarize_sheets, path, group, max_preview_rows, max_columns_preview)
+                    for group in groups
+                ]
+                results = [chunk for future in futures for chunk in future.result()]
+            except BrokenProcessPool as e:
+                logger.warning(f"Sheet worker pool failed on {path.name} ({e}); summarizing in-process")
+                results = None
+
+        if results is None:
+            results = _summarize_group(reader, sheets, max_preview_rows, max_columns_preview)
+    finally:
+        reader.close()
+
+    chunks = []
+    for chunk in results:
+        if chunk is not None:
+            chunk.metadata = {**(base_meta or {}), **chunk.metadata}
+            chunks.append(chunk)
+
+    logger.info(f"Summarized {len(chunks)} of {len(sheets)} sheets from {path.name}")
+    return chunks
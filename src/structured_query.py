@@ -0,0 +1,573 @@
+"""
+Answer numeric time-series questions from the KB tables instead of embeddings.
+
+Questions such as "what was the ISM manufacturing index in April 2021" are
+detected by ``parse_question`` (a date expression or "latest", plus content
+terms), matched against series names through a token index, and answered
+from the time-series store's date index. Only the matching rows reach
+Gemini, which phrases the answer; without Gemini the rows are formatted
+directly. Yield-curve spreads (2s10s, 3m10y, 5s30s per country) are derived
+from the benchmark yield workbooks and answered the same way, so "latest
+German 2s10s spread" or "is the JGB curve inverted now" read one row.
+
+Usage:
+    python -m src.structured_query "what was the ISM manufacturing index in April 2021"
+"""
+
+from __future__ import annotations
+import argparse
+import calendar
+import logging
+import math
+import re
+import sys
+import threading
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from .config import SETTINGS
+from .timeseries_store import Series
+from .yield_curve import CURVE_PREFIX, SPREADS, compute_spreads, store_curves
+
+logger = logging.getLogger(__name__)
+
+# Rows passed on for a date range; longer ranges are summarized and sampled
+MAX_ROWS = 36
+
+# Share of the question's (IDF-weighted) content terms a series must match
+MIN_COVERAGE = 0.6
+
+_MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+_MONTHS["sept"] = 9
+_MONTH_PATTERN = "|".join(sorted(_MONTHS, key=len, reverse=True))
+
+_DATE_PATTERNS = [
+    ("day", re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")),
+    ("day_us", re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b")),
+    ("month_day", re.compile(rf"\b({_MONTH_PATTERN})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b", re.IGNORECASE)),
+    ("day_month", re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTH_PATTERN})\.?,?\s+(\d{{4}})\b", re.IGNORECASE)),
+    ("month", re.compile(rf"\b({_MONTH_PATTERN})\.?,?\s+(\d{{4}})\b", re.IGNORECASE)),
+    ("quarter", re.compile(r"\b(?:q([1-4])\s*[-/]?\s*(\d{4})|(\d{4})\s*[-/]?\s*q([1-4]))\b", re.IGNORECASE)),
+    ("year", re.compile(r"\b(?:in|for|during|of|from|to|between|and|since|until|year)\s+((?:19|20)\d{2})\b", re.IGNORECASE)),
+]
+# Explanations and comparisons need the transcripts, not a table lookup
+_EXPLANATORY = re.compile(
+    r"\b(why|how (?:did|does|do|to|can|could|should|would)|explain|describe|compare|versus|vs\.?|"
+    r"caused?|impact|affect(?:s|ed)?|should)\b",
+    re.IGNORECASE
+)
+_LATEST = re.compile(r"\b(latest|current|currently|most recent|last (?:reading|value|print|observation)|now|today)\b",
+                     re.IGNORECASE)
+
+# Maturities and countries as they appear in KB series names
+_TERM_REWRITES = [
+    (re.compile(r"\b(\d+)[\s-]*(?:year|yr)s?\b", re.IGNORECASE), r"\1yr"),
+    (re.compile(r"\b(\d+)[\s-]*(?:month|mo)s?\b", re.IGNORECASE), r"\1mo"),
+    (re.compile(r"\bfed(?:eral)?[\s-]*funds?\b", re.IGNORECASE), "fed fund"),
+]
+_ALIASES = {
+    "germany": "de", "german": "de", "bund": "de", "bunds": "de",
+    "australia": "au", "australian": "au",
+    "canada": "ca", "canadian": "ca",
+    "japan": "jp", "japanese": "jp", "jgb": "jp",
+    "eurozone": "eu", "euro": "eu", "europe": "eu", "european": "eu",
+    "us": "us", "usa": "us", "american": "us",
+    "china": "china", "chinese": "china",
+    "manufacturing": "manufacturing", "mfg": "manufacturing",
+    "nonmanufacturing": "nonmanufacturing", "services": "nonmanufacturing",
+    "sentiment": "sentiment", "confidence": "sentiment",
+    "inflation": "cpi",
+    "curve": "spread", "inverted": "spread", "inversion": "spread", "slope": "spread",
+}
+
+_STOPWORDS = frozenset("""
+a an the of in on at for to from by and or between during since until what was were is are be been how
+high low much many did does do which value values level levels reading readings print figure number
+show tell me give get find kb data series close closing average number rate as around about with
+year month quarter day week date dates q1 q2 q3 q4 st nd rd th latest current currently most recent last
+now today please
+""".split()) | frozenset(_MONTHS)
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+
+def _normalize(text: str) -> str:
+    for pattern, replacement in _TERM_REWRITES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _stem(token: str) -> str:
+    return token[:-1] if len(token) > 3 and token.endswith("s") and not token.endswith("ss") else token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase content tokens of a question or series name, with KB aliases applied.
+
+    Args:
+        text: Question or series name
+
+    Returns:
+        Tokens
+    """
+    text = _normalize(text.replace("_", " ").replace("&", " and "))
+    # Split camelCase so "NonManufacturing" matches "non manufacturing"
+    text = re.sub(r"(?<=[a-z])(?=[A-Z])", " ", text).lower().replace("non manufacturing", "nonmanufacturing")
+    return [_stem(_ALIASES.get(t, t)) for t in _TOKEN.findall(text)]
+
+
+class DateSpec(NamedTuple):
+    """Requested dates: an inclusive range, a single day (as-of lookup) or the latest value."""
+    kind: str
+    start: Optional[date]
+    end: Optional[date]
+    text: str
+
+
+class StructuredQuery(NamedTuple):
+    """A question recognized as a time-series lookup."""
+    question: str
+    terms: List[str]
+    dates: DateSpec
+
+
+def _month_end(year: int, month: int) -> date:
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _date_ranges(question: str) -> List[Tuple[int, str, date, date, bool]]:
+    """Date expressions in the question as (position, text, start, end, is_single_day)."""
+    found: List[Tuple[int, str, date, date, bool]] = []
+    taken: List[Tuple[int, int]] = []
+    for kind, pattern in _DATE_PATTERNS:
+        for match in pattern.finditer(question):
+            if any(s < match.end() and match.start() < e for s, e in taken):
+                continue
+            g = match.groups()
+            try:
+                if kind == "day":
+                    day = date(int(g[0]), int(g[1]), int(g[2]))
+                    found.append((match.start(), match.group(0), day, day, True))
+                elif kind == "day_us":
+                    day = date(int(g[2]), int(g[0]), int(g[1]))
+                    found.append((match.start(), match.group(0), day, day, True))
+                elif kind in ("month_day", "day_month"):
+                    month_name, day_number = (g[0], g[1]) if kind == "month_day" else (g[1], g[0])
+                    day = date(int(g[2]), _MONTHS[month_name.lower()], int(day_number))
+                    found.append((match.start(), match.group(0), day, day, True))
+                elif kind == "month":
+                    year, month = int(g[1]), _MONTHS[g[0].lower()]
+                    found.append((match.start(), match.group(0), date(year, month, 1), _month_end(year, month), False))
+                elif kind == "quarter":
+                    quarter, year = (int(g[0]), int(g[1])) if g[0] else (int(g[3]), int(g[2]))
+                    first = 3 * quarter - 2
+                    found.append((match.start(), match.group(0), date(year, first, 1), _month_end(year, first + 2), False))
+                else:
+                    year = int(g[0])
+                    found.append((match.start(1), g[0], date(year, 1, 1), date(year, 12, 31), False))
+            except ValueError:
+                continue
+            taken.append((match.start(), match.end()))
+    return sorted(found)
+
+
+def parse_question(question: str) -> Optional[StructuredQuery]:
+    """
+    Recognize a time-series lookup and extract its content terms and dates.
+
+    A question qualifies when it names a date (day, month, quarter, year, a
+    range between two of them) or asks for the latest value, is not asking
+    for an explanation or comparison, and has content terms left once dates
+    and question words are removed.
+
+    Args:
+        question: User question
+
+    Returns:
+        StructuredQuery, or None if the question is not a time-series lookup
+    """
+    if _EXPLANATORY.search(question):
+        return None
+    ranges = _date_ranges(question)
+    latest = _LATEST.search(question)
+    if not ranges and not latest:
+        return None
+
+    if len(ranges) >= 2:
+        first, last = ranges[0], ranges[-1]
+        spec = DateSpec("range", min(first[2], last[2]), max(first[3], last[3]), f"{first[1]} to {last[1]}")
+    elif ranges:
+        _, text, start, end, single_day = ranges[0]
+        spec = DateSpec("day" if single_day else "range", start, end, text)
+    else:
+        spec = DateSpec("latest", None, None, latest.group(0))
+
+    stripped = question
+    for _, text, _, _, _ in ranges:
+        stripped = stripped.replace(text, " ")
+    terms = [t for t in tokenize(stripped) if t not in _STOPWORDS and not re.fullmatch(r"(19|20)\d{2}", t)]
+    if not terms:
+        return None
+    return StructuredQuery(question, terms, spec)
+
+
+class Match(NamedTuple):
+    """A series chosen for a query, with the share of query terms it covers."""
+    name: str
+    coverage: float
+    score: float
+
+
+class StructuredAnswer(NamedTuple):
+    """Rows answering a query, formatted for a prompt or for direct display."""
+    query: StructuredQuery
+    match: Match
+    info: Dict[str, Any]
+    dates: np.ndarray
+    values: np.ndarray
+    as_of: bool
+    text: str
+
+    @property
+    def class_id(self) -> str:
+        """Class ID of the source workbook, in the form ingest uses."""
+        video = re.search(r"Video[ _]?(\w+)", self.info.get("source", ""))
+        return f"PTM_Video_{video.group(1)}" if video else "unknown"
+
+
+def spread_series(store: Any) -> Dict[str, Series]:
+    """
+    Yield-curve spreads of every country as series, derived from the benchmark yield workbooks.
+
+    Named ``<workbook>/Spreads/<spread> spread`` so the token index matches
+    questions naming the country and spread; values are long minus short
+    yield in percentage points.
+
+    Args:
+        store: Loaded ``TimeSeriesStore``
+
+    Returns:
+        Series name -> Series (empty if the store holds no yield curves)
+    """
+    try:
+        curves = store_curves(store)
+    except ValueError:
+        return {}
+    spreads = compute_spreads(curves)
+    derived = {}
+    for c, country in enumerate(curves.countries):
+        for s, spread in enumerate(SPREADS):
+            known = ~np.isnan(spreads[:, c, s])
+            if not known.any():
+                continue
+            dates = curves.dates[known]
+            name = f"{CURVE_PREFIX}{country}/Spreads/{spread} spread"
+            short, long = SPREADS[spread]
+            info = {
+                "source": f"{CURVE_PREFIX}{country}",
+                "sheet": "Spreads",
+                "column": f"{spread} spread",
+                "length": int(known.sum()),
+                "start": str(dates[0]),
+                "end": str(dates[-1]),
+                "note": f"{spread}: {long:g}mo minus {short:g}mo yield in percentage points; "
+                        f"negative means the curve is inverted",
+            }
+            derived[name] = Series(name, dates, spreads[known, c, s], info)
+    return derived
+
+
+class StructuredQueryEngine:
+    """Token index over series names on top of a ``TimeSeriesStore``'s date index."""
+
+    def __init__(self, store: Any) -> None:
+        """
+        Index the series names of a loaded store and of the spreads derived from it.
+
+        Args:
+            store: Loaded ``TimeSeriesStore``
+        """
+        self.store = store
+        self._derived = spread_series(store)
+        self._names = store.names() + sorted(self._derived)
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._column_terms: List[Set[str]] = []
+        for i, name in enumerate(self._names):
+            for token in tokenize(name):
+                self._postings[token].add(i)
+            self._column_terms.append(set(tokenize(name.rsplit("/", 1)[-1])))
+        self._idf = {
+            token: math.log(1 + len(self._names) / len(ids)) for token, ids in self._postings.items()
+        }
+        logger.info(f"Structured query index: {len(self._names)} series ({len(self._derived)} spreads), "
+                    f"{len(self._postings)} terms")
+
+    def _info(self, name: str) -> Dict[str, Any]:
+        return dict(self._derived[name].info) if name in self._derived else self.store.info(name)
+
+    def _get(self, name: str, start: Optional[date] = None, end: Optional[date] = None) -> Series:
+        """Rows of a stored or derived series within an inclusive date range."""
+        if name not in self._derived:
+            return self.store.get(name, start, end)
+        series = self._derived[name]
+        lo = 0 if start is None else int(np.searchsorted(series.dates, np.datetime64(start, "D"), side="left"))
+        hi = len(series.dates) if end is None else int(np.searchsorted(series.dates, np.datetime64(end, "D"), side="right"))
+        return Series(name, series.dates[lo:max(hi, lo)], series.values[lo:max(hi, lo)], series.info)
+
+    def _value_at(self, name: str, when: date) -> Optional[Tuple[np.datetime64, float]]:
+        found = self._get(name, end=when)
+        if not len(found.dates):
+            return None
+        return found.dates[-1], float(found.values[-1])
+
+    @classmethod
+    def from_settings(cls) -> "StructuredQueryEngine":
+        """Load the time-series store for the configured KB and index it."""
+        from .timeseries_store import TimeSeriesStore
+
+        store = TimeSeriesStore(SETTINGS.timeseries_cache_dir)
+        store.load_directory(SETTINGS.kb_root)
+        return cls(store)
+
+    def match(self, terms: List[str], dates: Optional[DateSpec] = None) -> Optional[Match]:
+        """
+        Best series for the query terms.
+
+        Series are ranked by the IDF-weighted share of terms found anywhere in
+        their name, then by whether they cover the requested dates, then by
+        terms found in the column label itself, then by length (the full
+        history beats summary sheets).
+
+        Args:
+            terms: Query content terms
+            dates: Requested dates, used to prefer series that cover them
+
+        Returns:
+            Match, or None if no series covers at least ``MIN_COVERAGE`` of the terms
+        """
+        known = list(dict.fromkeys(terms))
+        weights = {t: self._idf.get(t, max(self._idf.values(), default=1.0)) for t in known}
+        total = sum(weights.values())
+        if not total:
+            return None
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in known:
+            for i in self._postings.get(term, ()):
+                scores[i] += weights[term]
+        if not scores:
+            return None
+
+        def rank(i: int) -> Tuple[float, Any, float, int]:
+            info = self._info(self._names[i])
+            in_column = sum(weights[t] for t in known if t in self._column_terms[i])
+            if dates is None or dates.kind == "latest":
+                # Prefer the series that runs furthest
+                covers: Any = info["end"]
+            else:
+                covers = info["start"] <= str(dates.end) and info["end"] >= str(dates.start)
+            return scores[i], covers, in_column, info["length"]
+
+        best = max(scores, key=rank)
+        coverage = scores[best] / total
+        if coverage < MIN_COVERAGE:
+            logger.debug(f"Best series {self._names[best]} covers only {coverage:.0%} of {known}")
+            return None
+        return Match(self._names[best], coverage, scores[best])
+
+    def answer(self, query: StructuredQuery) -> Optional[StructuredAnswer]:
+        """
+        Look up the rows a query asks for.
+
+        Args:
+            query: Parsed question
+
+        Returns:
+            StructuredAnswer, or None if no series matches or it has no data for the dates
+        """
+        match = self.match(query.terms, query.dates)
+        if match is None:
+            return None
+
+        spec = query.dates
+        as_of = False
+        if spec.kind == "latest":
+            found = self._get(match.name)
+            series_dates, series_values = found.dates[-1:], found.values[-1:]
+            info = found.info
+        elif spec.kind == "day":
+            point = self._value_at(match.name, spec.end)
+            info = self._info(match.name)
+            if point is None:
+                return None
+            series_dates, series_values = np.array([point[0]]), np.array([point[1]])
+            as_of = point[0] != np.datetime64(spec.end, "D")
+        else:
+            found = self._get(match.name, spec.start, spec.end)
+            series_dates, series_values, info = found.dates, found.values, found.info
+            if not len(series_dates):
+                # Nothing inside the period (e.g. a quarterly series asked for a month): use the last value before it ends
+                point = self._value_at(match.name, spec.end)
+                if point is None or spec.end - point[0].astype(date) > timedelta(days=400):
+                    return None
+                series_dates, series_values = np.array([point[0]]), np.array([point[1]])
+                as_of = True
+
+        text = _format_rows(match.name, info, series_dates, series_values, spec, as_of)
+        return StructuredAnswer(query, match, info, series_dates, series_values, as_of, text)
+
+
+def _format_rows(
+    name: str,
+    info: Dict[str, Any],
+    dates: np.ndarray,
+    values: np.ndarray,
+    spec: DateSpec,
+    as_of: bool
+) -> str:
+    """Compact text of the result rows, summarized and sampled beyond ``MAX_ROWS``."""
+    lines = [f"Series: {name} (file {Path(info.get('source', '')).name}, "
+             f"{info.get('start')} to {info.get('end')}, {info.get('length')} observations)"]
+    if info.get("note"):
+        lines.append(info["note"])
+    if as_of:
+        lines.append(f"No observation on {spec.text}; latest earlier observation shown")
+    if len(dates) > MAX_ROWS:
+        lines.append(
+            f"{len(dates)} observations from {dates[0]} to {dates[-1]}: first {values[0]:.6g}, "
+            f"last {values[-1]:.6g}, min {values.min():.6g}, max {values.max():.6g}, mean {values.mean():.6g}"
+        )
+        keep = np.unique(np.linspace(0, len(dates) - 1, MAX_ROWS).round().astype(int))
+        lines.append(f"Sampled rows ({len(keep)}):")
+        dates, values = dates[keep], values[keep]
+    lines.extend(f"{d}: {v:.6g}" for d, v in zip(dates, values))
+    return "\n".join(lines)
+
+
+# Process-wide engine; loading the store hashes every workbook once
+_ENGINE: Optional[StructuredQueryEngine] = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_structured_engine() -> StructuredQueryEngine:
+    """Get the process-wide structured query engine, loading it on first use (or waiting for the warm-up)."""
+    global _ENGINE
+    with _ENGINE_LOCK:
+        if _ENGINE is None:
+            _ENGINE = StructuredQueryEngine.from_settings()
+        return _ENGINE
+
+
+def warm_structured_engine() -> threading.Thread:
+    """
+    Load the structured query engine in a background thread.
+
+    Loading the store takes tens of seconds on the full KB; starting it with
+    the chatbot lets the user type meanwhile, and a lookup asked before it
+    finishes waits for the same load instead of starting another.
+
+    Returns:
+        The started daemon thread
+    """
+    def load() -> None:
+        try:
+            get_structured_engine()
+        except Exception as e:
+            logger.warning(f"Structured query warm-up failed, lookups will retry on first use: {e}")
+
+    thread = threading.Thread(target=load, name="structured-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def answer_question(question: str, engine: Optional[StructuredQueryEngine] = None) -> Optional[StructuredAnswer]:
+    """
+    Answer a question from the KB tables if it is a time-series lookup.
+
+    Args:
+        question: User question
+        engine: Optional engine (defaults to the process-wide one)
+
+    Returns:
+        StructuredAnswer, or None if the question should go through retrieval instead
+    """
+    query = parse_question(question)
+    if query is None:
+        return None
+    try:
+        engine = engine or get_structured_engine()
+        return engine.answer(query)
+    except Exception as e:
+        logger.warning(f"Structured lookup failed, falling back to retrieval: {e}")
+        return None
+
+
+STRUCTURED_SYSTEM_PROMPT = """You answer questions about economic and market data.
+Use only the data rows given. State the value with its date and what the series is, in one or two sentences.
+If the rows are a range, summarize the level and direction and mention the notable values.
+If the rows say no observation was found on the requested date, say which date the value is from."""
+
+
+def phrase_answer(answer: StructuredAnswer, gemini_client: Any) -> Dict[str, Any]:
+    """
+    Have Gemini phrase the rows of an answer (a prompt of a few hundred characters).
+
+    Args:
+        answer: Structured answer
+        gemini_client: Gemini client
+
+    Returns:
+        Gemini result dict (response, metadata, success)
+    """
+    chunk = {
+        "text": answer.text,
+        "source": "timeseries",
+        "class_id": answer.class_id,
+        "chunk_index": 0,
+        "score": answer.match.coverage,
+    }
+    return gemini_client.generate_response(
+        question=answer.query.question,
+        context_chunks=[chunk],
+        system_prompt=STRUCTURED_SYSTEM_PROMPT,
+        brief=True
+    )
+
+
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Answer a time-series question from the KB tables")
+    parser.add_argument("question", type=str, help="Question, e.g. 'ISM manufacturing index in April 2021'")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        parsed = parse_question(args.question)
+        if parsed is None:
+            print("\n[ERROR] Not a time-series question (no date or 'latest', or no content terms)")
+            sys.exit(1)
+        print(f"\nTerms: {parsed.terms}  Dates: {parsed.dates.kind} {parsed.dates.start} .. {parsed.dates.end}")
+        result = get_structured_engine().answer(parsed)
+        if result is None:
+            print("\n[ERROR] No KB series matches the question; it would go through retrieval")
+            sys.exit(1)
+        print(f"\n{result.text}")
+        print(f"\n[STATS] Matched {result.match.name} (coverage {result.match.coverage:.0%}), "
+              f"{len(result.dates)} rows, {len(result.text)} chars of context")
+    except Exception as e:
+        print(f"\n[ERROR] Structured query failed: {e}")
+        sys.exit(1)
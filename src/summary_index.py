@@ -0,0 +1,339 @@
+"""
+Coarse summary index for two-stage (hierarchical) retrieval.
+
+Every video (``class_id``) and every document within it (transcript, PDF,
+slide deck, workbook, trade template) gets one summary vector: the
+normalized centroid of its chunk embeddings. The vectors are stored in a
+small ``.npz`` file next to the BM25 index, keyed by the chunk payload
+fields, and built at ingest time from the embeddings that are computed anyway.
+
+At query time ``select_groups`` scores the question against the summaries
+(a few hundred rows) and returns the best videos; ``run_query`` then searches
+chunks only within those ``class_id``s through a filtered query.
+
+Usage:
+    python -m src.summary_index build               # from the live Qdrant collection
+    python -m src.summary_index build --local       # from the local vector index
+    python -m src.summary_index info
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .config import SETTINGS
+from .index_qdrant import matches_filter
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("video", "document")
+
+# Chunk payload fields copied onto summaries; filters on other fields are not
+# applied when selecting videos
+SUMMARY_FIELDS = ("class_id", "video_number", "video_label", "source", "file_name")
+
+def _summary_keys(payload: Dict[str, Any]) -> List[Tuple[str, ...]]:
+    """Video-level and document-level keys of a chunk payload."""
+    class_id = str(payload.get("class_id", "unknown"))
+    document = str(payload.get("file_name") or payload.get("source") or "unknown")
+    return [("video", class_id), ("document", class_id, document)]
+
+class SummaryBuilder:
+    """Accumulates chunk vectors into per-video and per-document centroids."""
+
+    def __init__(self) -> None:
+        self._rows: Dict[Tuple[str, ...], int] = {}
+        self._payloads: List[Dict[str, Any]] = []
+        self._counts: List[int] = []
+        self._sums: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def _row(self, key: Tuple[str, ...], payload: Dict[str, Any]) -> int:
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = len(self._payloads)
+            fields = SUMMARY_FIELDS if key[0] == "document" else ("class_id", "video_number", "video_label")
+            self._payloads.append({"level": key[0], **{f: payload[f] for f in fields if f in payload}})
+            self._counts.append(0)
+        return row
+
+    def add(self, payloads: Sequence[Dict[str, Any]], vectors: Any) -> None:
+        """
+        Add a batch of embedded chunks.
+
+        Args:
+            payloads: Chunk payloads (need ``class_id``; ``file_name`` or ``source``)
+            vectors: Chunk embeddings aligned with payloads
+
+        Raises:
+            ValueError: If payloads and vectors differ in length
+        """
+        vectors = np.asarray(vectors, dtype="float32")
+        if len(payloads) != len(vectors):
+            raise ValueError(f"Payloads ({len(payloads)}) and vectors ({len(vectors)}) must have the same length")
+        if not len(payloads):
+            return
+
+        rows = np.array([[self._row(key, p) for key in _summary_keys(p)] for p in payloads])
+        unit = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+        if self._sums is None:
+            self._sums = np.zeros((len(self._payloads), unit.shape[1]), dtype="float64")
+        elif len(self._sums) < len(self._payloads):
+            grown = np.zeros((max(len(self._payloads), 2 * len(self._sums)), self._sums.shape[1]))
+            grown[:len(self._sums)] = self._sums
+            self._sums = grown
+
+        for level in range(rows.shape[1]):
+            np.add.at(self._sums, rows[:, level], unit)
+        for row in rows.ravel():
+            self._counts[row] += 1
+
+    def build(self) -> "SummaryIndex":
+        """
+        Build the summary index from the accumulated chunks.
+
+        Returns:
+            SummaryIndex with one normalized centroid per video and document
+
+        Raises:
+            ValueError: If no chunks were added
+        """
+        if self._sums is None:
+            raise ValueError("No chunks were added to the summary builder")
+        centroids = self._sums[:len(self._payloads)].astype("float32")
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        payloads = [{**p, "chunks": n} for p, n in zip(self._payloads, self._counts)]
+        return SummaryIndex(centroids, payloads)
+
+class SummaryIndex:
+    """Exact cosine search over per-video and per-document summary vectors."""
+
+    def __init__(self, vectors: np.ndarray, payloads: List[Dict[str, Any]]) -> None:
+        if len(vectors) != len(payloads):
+            raise ValueError(f"Vectors ({len(vectors)}) and payloads ({len(payloads)}) must have the same length")
+        self.vectors = vectors
+        self.payloads = payloads
+        self.groups = sorted({p["class_id"] for p in payloads})
+        group_index = {class_id: i for i, class_id in enumerate(self.groups)}
+        self._group_of = np.array([group_index[p["class_id"]] for p in payloads], dtype="int64")
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    @property
+    def dim(self) -> int:
+        """Vector dimension."""
+        return int(self.vectors.shape[1])
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Save the index to a ``.npz`` file (written atomically).
+
+        Args:
+            path: Destination path
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                vectors=self.vectors,
+                payloads=np.array([json.dumps(p, ensure_ascii=False) for p in self.payloads], dtype="U"),
+            )
+        tmp_path.replace(path)
+        logger.info(f"Saved summary index ({len(self.groups)} videos, {len(self)} summaries) to {path}")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SummaryIndex":
+        """
+        Load an index saved with ``save``.
+
+        Args:
+            path: Path of the ``.npz`` file
+
+        Returns:
+            Loaded SummaryIndex
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Summary index not found: {path}")
+        with np.load(path) as data:
+            return cls(data["vectors"], [json.loads(p) for p in data["payloads"].tolist()])
+
+    def _scores(self, query_vector: Any, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        query = np.asarray(query_vector, dtype="float32")
+        if query.shape != (self.dim,):
+            raise ValueError(f"Query vector has dimension {query.size}, summary index has {self.dim}")
+        scores = self.vectors @ (query / max(float(np.linalg.norm(query)), 1e-12))
+        if filters:
+            usable = {k: v for k, v in filters.items() if k in SUMMARY_FIELDS}
+            if usable:
+                # Video-level rows carry no source/file_name, so they drop out of such filters
+                mask = np.fromiter((matches_filter(p, usable) for p in self.payloads), dtype=bool, count=len(self))
+                scores[~mask] = -np.inf
+        return scores
+
+    def search(
+        self,
+        query_vector: Any,
+        limit: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Top summaries for a query vector.
+
+        Args:
+            query_vector: Query embedding
+            limit: Number of summaries to return
+            filters: Optional chunk filters (only summary fields are applied)
+
+        Returns:
+            List of (score, summary payload), best first
+        """
+        scores = self._scores(query_vector, filters)
+        top = np.argsort(-scores, kind="stable")[:limit]
+        return [(float(scores[i]), self.payloads[i]) for i in top if np.isfinite(scores[i])]
+
+    def select_groups(
+        self,
+        query_vector: Any,
+        top_groups: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Best videos for a query vector.
+
+        A video scores the best of its video-level and document-level
+        summaries, so a single relevant PDF can pull in its video.
+
+        Args:
+            query_vector: Query embedding
+            top_groups: Number of videos to return
+            filters: Optional chunk filters (only summary fields are applied)
+
+        Returns:
+            List of (class_id, score), best first
+
+        Raises:
+            ValueError: If top_groups is not positive
+        """
+        if top_groups <= 0:
+            raise ValueError("top_groups must be positive")
+        scores = self._scores(query_vector, filters)
+        best = np.full(len(self.groups), -np.inf, dtype="float32")
+        np.maximum.at(best, self._group_of, scores)
+        top = np.argsort(-best, kind="stable")[:top_groups]
+        return [(self.groups[i], float(best[i])) for i in top if np.isfinite(best[i])]
+
+def build_from_points(points: Iterable[Tuple[Dict[str, Any], Any]], batch_size: int = 1024) -> SummaryIndex:
+    """
+    Build a summary index from (payload, vector) pairs.
+
+    Args:
+        points: Iterable of chunk payloads with their vectors
+        batch_size: Points accumulated per vectorized update
+
+    Returns:
+        Built SummaryIndex
+    """
+    builder = SummaryBuilder()
+    payloads: List[Dict[str, Any]] = []
+    vectors: List[Any] = []
+    for payload, vector in points:
+        payloads.append(payload)
+        vectors.append(vector)
+        if len(payloads) == batch_size:
+            builder.add(payloads, vectors)
+            payloads, vectors = [], []
+    builder.add(payloads, vectors)
+    return builder.build()
+
+def _collection_points(client: Any, collection: str, batch_size: int = 256) -> Iterable[Tuple[Dict[str, Any], Any]]:
+    """Scroll every (payload, vector) pair of a Qdrant collection."""
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection, limit=batch_size, offset=offset,
+            with_vectors=True, with_payload=list(SUMMARY_FIELDS),
+        )
+        for point in points:
+            yield point.payload or {}, point.vector
+        if offset is None or not points:
+            break
+
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Build and inspect the video/document summary index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Rebuild summaries from an existing index")
+    build_parser.add_argument("--collection", type=str, default=SETTINGS.collection,
+                              help="Qdrant collection to read vectors from")
+    build_parser.add_argument("--local", action="store_true",
+                              help="Read vectors from the local index (LOCAL_INDEX_DIR) instead of Qdrant")
+
+    info_parser = subparsers.add_parser("info", help="Show the videos and documents in the summary index")
+    info_parser.add_argument("--documents", action="store_true",
+                             help="List document-level summaries too")
+
+    parser.add_argument("--path", type=str, default=None,
+                        help="Summary index file (defaults to the live generation's SUMMARY_INDEX_PATH)")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                       help="Enable verbose logging")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    if args.path is None:
+        from .generations import live_path
+
+        args.path = live_path("summary_index_path")
+
+    try:
+        if args.command == "build":
+            if args.local:
+                from .local_index import LocalVectorIndex
+
+                local = LocalVectorIndex(SETTINGS.local_index_dir)
+                index = build_from_points(zip(local.payloads, local.vectors))
+            else:
+                from .index_qdrant import connect_from_settings
+
+                index = build_from_points(_collection_points(connect_from_settings(SETTINGS), args.collection))
+            index.save(args.path)
+            print(f"\n[SUCCESS] Built {len(index)} summaries for {len(index.groups)} videos into {args.path}")
+        else:
+            index = SummaryIndex.load(args.path)
+            print(f"\n[STATS] Summary index {args.path}: {len(index.groups)} videos, {len(index)} summaries "
+                  f"({index.dim} dims)")
+            for class_id in index.groups:
+                members = [p for p in index.payloads if p["class_id"] == class_id]
+                video = next(p for p in members if p["level"] == "video")
+                documents = [p for p in members if p["level"] == "document"]
+                print(f"   {class_id}: {video['chunks']} chunks in {len(documents)} documents")
+                if args.documents:
+                    for payload in documents:
+                        print(f"      {payload.get('file_name') or payload.get('source')}: {payload['chunks']} chunks")
+    except Exception as e:
+        print(f"\n[ERROR] Summary index {args.command} failed: {e}")
+        sys.exit(1)
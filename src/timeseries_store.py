@@ -0,0 +1,532 @@
+"""
+Columnar cache of the date-indexed series in the KB's economic workbooks.
+
+Each workbook (or CSV) is parsed once into series: a numeric column paired
+with the nearest date column to its left, sorted by date with one value per
+day. The series of a workbook are stored under its content fingerprint:
+
+- ``dates.npy``: datetime64[D] dates of all series, concatenated
+- ``values.npy``: float64 values aligned with ``dates.npy``
+- ``series.json``: source file, fingerprint and each series' offset and length
+
+``TimeSeriesStore`` memory-maps the arrays, so repeat loads hash the files
+but never parse Excel again, and a date-range lookup is two binary searches
+over one series' slice.
+
+Usage:
+    python -m src.timeseries_store build --kb ./KB
+    python -m src.timeseries_store list --match "yields 10yr"
+    python -m src.timeseries_store show "Benchmark_Yields_DE/10yr/10yr" --start 2020-01-01
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import time
+import warnings
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from .config import SETTINGS
+from .spreadsheets import HEADER_SCAN_ROWS, SPREADSHEET_EXTENSIONS, WorkbookReader, column_letter, is_header_row
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction changes so cached workbooks are re-parsed
+EXTRACTOR_VERSION = 2
+
+SERIES_FILE = "series.json"
+DATES_FILE = "dates.npy"
+VALUES_FILE = "values.npy"
+
+TIMESERIES_EXTENSIONS = SPREADSHEET_EXTENSIONS + (".csv",)
+
+# Shortest run of dated values kept as a series
+MIN_POINTS = 5
+
+# Share of a column's values that must be dates (or numbers) to type it
+_TYPE_MAJORITY = 0.8
+
+# Cached formula errors; they mark missing observations, not text
+_EXCEL_ERRORS = frozenset(("#N/A", "#VALUE!", "#REF!", "#DIV/0!", "#NUM!", "#NAME?", "#NULL!"))
+
+# Longer text above a column is an instruction or note rather than its name
+_MAX_CAPTION = 40
+
+_DATE_LIKE = re.compile(r"^\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}$")
+_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%Y/%m/%d", "%d.%m.%Y", "%m/%d/%y")
+
+class Series(NamedTuple):
+    """One series (or a date range of it); arrays may be read-only memory maps."""
+    name: str
+    dates: np.ndarray
+    values: np.ndarray
+    info: Dict[str, Any]
+
+def _parse_date(text: str) -> Optional[date]:
+    """Parse a date-only string in one of the common formats, or None."""
+    if not _DATE_LIKE.match(text):
+        return None
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+def _coerce(value: Any) -> Any:
+    """Turn numeric and date strings (as found in CSVs) into numbers and dates."""
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    if not text:
+        return None
+    try:
+        return float(text.replace(",", ""))
+    except ValueError:
+        pass
+    return _parse_date(text) or text
+
+def _csv_rows(path: Path) -> Iterator[Tuple[Any, ...]]:
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        for row in csv.reader(f):
+            yield tuple(_coerce(v) for v in row)
+
+def file_fingerprint(path: Union[str, Path]) -> str:
+    """
+    Content fingerprint of a source file, including the extractor version.
+
+    Args:
+        path: Workbook or CSV path
+
+    Returns:
+        Hex SHA-1 digest
+    """
+    digest = hashlib.sha1(f"timeseries-v{EXTRACTOR_VERSION}".encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _column_label(header: Tuple[Any, ...], col: int, captions: Dict[int, str]) -> str:
+    label = str(header[col]).strip() if col < len(header) and header[col] is not None else ""
+    return label or captions.get(col) or f"Column {column_letter(col)}"
+
+def extract_sheet_series(rows: Iterable[Tuple[Any, ...]]) -> List[Tuple[str, np.ndarray, np.ndarray]]:
+    """
+    Extract date-indexed series from one sheet's rows in a single pass.
+
+    Each numeric column is paired with the nearest date column to its left,
+    which handles sheets that hold several side-by-side date/value blocks.
+
+    Args:
+        rows: Cell values row by row
+
+    Returns:
+        List of (column label, datetime64[D] dates, float64 values), sorted by
+        date with the last value kept for repeated dates
+    """
+    rows = iter(rows)
+    leading = []
+    for row in rows:
+        leading.append(row)
+        if len(leading) >= HEADER_SCAN_ROWS:
+            break
+    header_index = next((i for i, row in enumerate(leading) if is_header_row(row)), None)
+    header = leading[header_index] if header_index is not None else ()
+    data_start = header_index + 1 if header_index is not None else 0
+
+    filled: Dict[int, int] = {}
+    # Last text above a column's first value; names columns of sheets without a full header row
+    captions: Dict[int, str] = {}
+    dates: Dict[int, Dict[int, date]] = {}
+    numbers: Dict[int, List[Tuple[int, float]]] = {}
+
+    def consume(row_number: int, row: Tuple[Any, ...]) -> None:
+        for col, value in enumerate(row):
+            if value is None or (isinstance(value, str) and (not value.strip() or value in _EXCEL_ERRORS)):
+                continue
+            filled[col] = filled.get(col, 0) + 1
+            if isinstance(value, str):
+                if col not in numbers and col not in dates and len(value.strip()) <= _MAX_CAPTION:
+                    captions[col] = value.strip()
+            elif isinstance(value, (datetime, date)):
+                dates.setdefault(col, {})[row_number] = value.date() if isinstance(value, datetime) else value
+            elif isinstance(value, (int, float)) and not isinstance(value, bool) and np.isfinite(value):
+                numbers.setdefault(col, []).append((row_number, float(value)))
+
+    row_number = 0
+    for row in leading[data_start:]:
+        consume(row_number, row)
+        row_number += 1
+    for row in rows:
+        consume(row_number, row)
+        row_number += 1
+
+    date_cols = sorted(
+        col for col, by_row in dates.items()
+        if len(by_row) >= MIN_POINTS and len(by_row) >= _TYPE_MAJORITY * filled[col]
+    )
+    if not date_cols:
+        return []
+
+    series = []
+    for col in sorted(numbers):
+        points = numbers[col]
+        if len(points) < MIN_POINTS or len(points) < _TYPE_MAJORITY * filled[col]:
+            continue
+        left = [d for d in date_cols if d < col]
+        if not left:
+            continue
+        by_row = dates[left[-1]]
+        pairs = [(by_row[r], v) for r, v in points if r in by_row]
+        if len(pairs) < MIN_POINTS:
+            continue
+
+        day = np.array([p[0] for p in pairs], dtype="datetime64[D]")
+        value = np.array([p[1] for p in pairs], dtype="float64")
+        order = np.argsort(day, kind="stable")
+        day, value = day[order], value[order]
+        # Stable order keeps the last occurrence of a repeated date last
+        keep = np.r_[day[1:] != day[:-1], True]
+        series.append((_column_label(header, col, captions), day[keep], value[keep]))
+    return series
+
+def extract_file_series(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """
+    Extract every date-indexed series from a workbook or CSV.
+
+    Args:
+        path: Source file
+
+    Returns:
+        List of dicts with name, sheet, column, dates and values
+
+    Raises:
+        ValueError: If the file type is not supported
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix not in TIMESERIES_EXTENSIONS:
+        raise ValueError(f"Unsupported time-series source: {path}")
+
+    extracted = []
+    if suffix == ".csv":
+        sheets = [(path.stem, extract_sheet_series(_csv_rows(path)))]
+        with_sheet = False
+    else:
+        with WorkbookReader(path) as reader, warnings.catch_warnings():
+            # openpyxl warns about every workbook extension it skips
+            warnings.simplefilter("ignore", UserWarning)
+            sheets = []
+            for sheet in reader.sheet_names:
+                try:
+                    sheets.append((sheet, extract_sheet_series(reader.rows(sheet))))
+                except Exception as e:
+                    logger.warning(f"Skipping sheet '{sheet}' of {path.name}: {e}")
+        with_sheet = True
+
+    seen = set()
+    for sheet, sheet_series in sheets:
+        for column, dates, values in sheet_series:
+            name = f"{path.stem}/{sheet}/{column}" if with_sheet else f"{path.stem}/{column}"
+            base, n = name, 2
+            while name in seen:
+                name = f"{base} ({n})"
+                n += 1
+            seen.add(name)
+            extracted.append({"name": name, "sheet": sheet, "column": column, "dates": dates, "values": values})
+    return extracted
+
+def _write_entry(entry_dir: Path, source: Path, fingerprint: str, extracted: List[Dict[str, Any]]) -> None:
+    """Write one workbook's series to ``entry_dir`` through a temporary directory."""
+    tmp_dir = entry_dir.with_name(f"{entry_dir.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    offset = 0
+    catalog = []
+    for item in extracted:
+        length = len(item["dates"])
+        catalog.append({
+            "name": item["name"],
+            "sheet": item["sheet"],
+            "column": item["column"],
+            "offset": offset,
+            "length": length,
+            "start": str(item["dates"][0]),
+            "end": str(item["dates"][-1]),
+        })
+        offset += length
+
+    empty_dates = np.zeros(0, dtype="datetime64[D]")
+    np.save(tmp_dir / DATES_FILE, np.concatenate([i["dates"] for i in extracted]) if extracted else empty_dates)
+    np.save(tmp_dir / VALUES_FILE, np.concatenate([i["values"] for i in extracted]) if extracted else np.zeros(0))
+    manifest = {
+        "source": str(source),
+        "fingerprint": fingerprint,
+        "extractor_version": EXTRACTOR_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "series": catalog,
+    }
+    (tmp_dir / SERIES_FILE).write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    try:
+        tmp_dir.rename(entry_dir)
+    except OSError:
+        # Another process cached the same fingerprint first; its files are identical
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+class TimeSeriesStore:
+    """Memory-mapped, fingerprint-keyed cache of KB time series."""
+
+    def __init__(self, cache_dir: Union[str, Path, None] = None) -> None:
+        """
+        Initialize an empty store over a cache directory.
+
+        Args:
+            cache_dir: Cache root (defaults to TIMESERIES_CACHE_DIR)
+        """
+        self.cache_dir = Path(cache_dir or SETTINGS.timeseries_cache_dir)
+        self._series: Dict[str, Dict[str, Any]] = {}
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.parsed_files = 0
+        self.cached_files = 0
+
+    def load_file(self, path: Union[str, Path]) -> List[str]:
+        """
+        Add one workbook or CSV, parsing it only if its fingerprint is not cached.
+
+        Args:
+            path: Source file
+
+        Returns:
+            Names of the file's series
+
+        Raises:
+            RuntimeError: If the file cannot be parsed or the cache cannot be written
+        """
+        path = Path(path)
+        try:
+            fingerprint = file_fingerprint(path)
+            entry_dir = self.cache_dir / fingerprint
+            if (entry_dir / SERIES_FILE).exists():
+                self.cached_files += 1
+            else:
+                started = time.perf_counter()
+                extracted = extract_file_series(path)
+                _write_entry(entry_dir, path, fingerprint, extracted)
+                self.parsed_files += 1
+                logger.info(
+                    f"Cached {len(extracted)} series from {path.name} in {time.perf_counter() - started:.2f}s"
+                )
+
+            manifest = json.loads((entry_dir / SERIES_FILE).read_text(encoding="utf-8"))
+            self._arrays[fingerprint] = (
+                np.load(entry_dir / DATES_FILE, mmap_mode="r"),
+                np.load(entry_dir / VALUES_FILE, mmap_mode="r"),
+            )
+            names = []
+            for entry in manifest["series"]:
+                self._series[entry["name"]] = {**entry, "fingerprint": fingerprint, "source": str(path)}
+                names.append(entry["name"])
+            return names
+
+        except Exception as e:
+            logger.error(f"Failed to load time series from {path}: {e}")
+            raise RuntimeError(f"Failed to load time series from {path}: {e}") from e
+
+    def load_directory(self, root: Union[str, Path]) -> int:
+        """
+        Add every workbook and CSV under ``root``; unreadable files are skipped.
+
+        Args:
+            root: Directory to scan recursively
+
+        Returns:
+            Number of series in the store
+        """
+        root = Path(root)
+        files = sorted(
+            p for p in root.rglob("*")
+            if p.suffix.lower() in TIMESERIES_EXTENSIONS and not p.name.startswith("~$")
+        )
+        failed = 0
+        for path in files:
+            try:
+                self.load_file(path)
+            except RuntimeError:
+                # load_file has logged the cause
+                failed += 1
+        logger.info(
+            f"Time-series store: {len(self._series)} series from {len(files)} files "
+            f"({self.cached_files} cached, {self.parsed_files} parsed, {failed} failed)"
+        )
+        return len(self._series)
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._series
+
+    def names(self) -> List[str]:
+        """All series names, sorted."""
+        return sorted(self._series)
+
+    def find(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Series whose name contains every whitespace-separated term of ``query``.
+
+        Args:
+            query: Search terms (case-insensitive)
+            limit: Maximum number of names to return
+
+        Returns:
+            Matching names, sorted
+        """
+        terms = query.lower().split()
+        matches = [name for name in sorted(self._series) if all(t in name.lower() for t in terms)]
+        return matches[:limit] if limit else matches
+
+    def info(self, name: str) -> Dict[str, Any]:
+        """Catalog entry of a series (source, sheet, column, length, start, end)."""
+        if name not in self._series:
+            raise KeyError(f"Unknown series: {name}")
+        return dict(self._series[name])
+
+    def get(
+        self,
+        name: str,
+        start: Union[str, date, np.datetime64, None] = None,
+        end: Union[str, date, np.datetime64, None] = None
+    ) -> Series:
+        """
+        Values of a series, optionally limited to an inclusive date range.
+
+        Args:
+            name: Series name
+            start: First date to include
+            end: Last date to include
+
+        Returns:
+            Series whose arrays are read-only views of the memory-mapped cache
+
+        Raises:
+            KeyError: If the series is unknown
+            ValueError: If a date is invalid
+        """
+        entry = self.info(name)
+        all_dates, all_values = self._arrays[entry["fingerprint"]]
+        lo, hi = entry["offset"], entry["offset"] + entry["length"]
+        dates = all_dates[lo:hi]
+
+        try:
+            if start is not None:
+                lo += int(np.searchsorted(dates, np.datetime64(start, "D"), side="left"))
+            if end is not None:
+                hi = entry["offset"] + int(np.searchsorted(dates, np.datetime64(end, "D"), side="right"))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid date range {start!r} to {end!r}: {e}") from e
+
+        hi = max(hi, lo)
+        return Series(name, all_dates[lo:hi], all_values[lo:hi], entry)
+
+    def value_at(self, name: str, when: Union[str, date, np.datetime64]) -> Optional[Tuple[np.datetime64, float]]:
+        """
+        Latest observation on or before a date.
+
+        Args:
+            name: Series name
+            when: Date
+
+        Returns:
+            Tuple of (observation date, value), or None if the series starts later
+        """
+        series = self.get(name, end=when)
+        if not len(series.dates):
+            return None
+        return series.dates[-1], float(series.values[-1])
+
+    def prune(self) -> int:
+        """
+        Delete cache entries for fingerprints not loaded into this store.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        if not self.cache_dir.exists():
+            return removed
+        for entry_dir in self.cache_dir.iterdir():
+            if entry_dir.is_dir() and entry_dir.name not in self._arrays:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                removed += 1
+        return removed
+
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Build and query the KB time-series cache")
+    parser.add_argument("--kb", type=str, default=SETTINGS.kb_root, help="Knowledge base root")
+    parser.add_argument("--cache", type=str, default=SETTINGS.timeseries_cache_dir, help="Cache directory")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Parse new or changed workbooks into the cache")
+    build_parser.add_argument("--prune", action="store_true", help="Delete cache entries of removed files")
+
+    list_parser = subparsers.add_parser("list", help="List series names")
+    list_parser.add_argument("--match", type=str, default="", help="Terms every listed name must contain")
+
+    show_parser = subparsers.add_parser("show", help="Print a series")
+    show_parser.add_argument("name", type=str, help="Series name")
+    show_parser.add_argument("--start", type=str, default=None, help="First date (YYYY-MM-DD)")
+    show_parser.add_argument("--end", type=str, default=None, help="Last date (YYYY-MM-DD)")
+    show_parser.add_argument("--tail", type=int, default=20, help="Number of observations to print")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        store = TimeSeriesStore(args.cache)
+        started = time.perf_counter()
+        store.load_directory(args.kb)
+        load_seconds = time.perf_counter() - started
+
+        if args.command == "build":
+            removed = store.prune() if args.prune else 0
+            print(f"\n[SUCCESS] {len(store)} series cached in {args.cache} ({load_seconds:.2f}s)")
+            print(f"   Files parsed: {store.parsed_files}, reused from cache: {store.cached_files}")
+            if args.prune:
+                print(f"   Stale entries removed: {removed}")
+        elif args.command == "list":
+            names = store.find(args.match) if args.match else store.names()
+            for name in names:
+                entry = store.info(name)
+                print(f"{name}  [{entry['start']} .. {entry['end']}, {entry['length']} obs]")
+            print(f"\n[STATS] {len(names)} of {len(store)} series")
+        else:
+            series = store.get(args.name, args.start, args.end)
+            for day, value in zip(series.dates[-args.tail:], series.values[-args.tail:]):
+                print(f"{day}  {value:.6g}")
+            print(f"\n[STATS] {len(series.dates)} observations of {args.name} (from {series.info['source']})")
+    except Exception as e:
+        print(f"\n[ERROR] Time-series {args.command} failed: {e}")
+        sys.exit(1)
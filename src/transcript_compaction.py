@@ -0,0 +1,308 @@
+"""
+Transcript compaction before chunking.
+
+The PTM transcripts are raw speech-to-text: disfluencies ("um", "uh"),
+comma-delimited discourse fillers ("Okay guys,", ", you know,"), phrases
+spoken twice in a row and line breaks in the middle of sentences. All of it
+is embedded and sent to the LLM, and it inflates word and chunk counts.
+
+``compact_transcript`` removes:
+
+- disfluency words anywhere
+- filler phrases, only when they end with a comma and start a sentence (or
+  caption cue) or follow a comma (so "the trade was right, but" keeps its "right")
+- timestamps such as ``00:12:31`` or ``[01:02]`` and SRT ``-->`` arrows
+- the first copy of an immediately repeated run of ``min_repeat_words`` or
+  more words (compared without case and punctuation), only when that copy
+  ends a clause: at punctuation, a line break or a caption cue. That is the
+  caption-overlap pattern ("the yield curve.\nthe yield curve. It..."); lists
+  such as "low interest rates, negative interest rates" repeat words across
+  clauses and are kept
+
+and joins the remaining words with single spaces. Kept words are copied
+verbatim, so an ``OffsetMap`` maps any position in the compacted text back
+to the original; ingest stores each chunk's original character span.
+
+Usage:
+    python -m src.transcript_compaction --kb-root ./KB
+"""
+
+from __future__ import annotations
+import argparse
+import logging
+import re
+import sys
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Removed wherever they occur
+FILLER_WORDS: FrozenSet[str] = frozenset({
+    "um", "umm", "uh", "uhh", "uhm", "er", "erm", "ah", "hmm", "mm", "mhm",
+})
+
+# Removed only when comma-delimited (see module docstring)
+FILLER_PHRASES: Tuple[Tuple[str, ...], ...] = (
+    ("okay", "guys"), ("ok", "guys"), ("so", "guys"), ("right", "guys"), ("now", "guys"), ("alright", "guys"),
+    ("you", "know"), ("i", "mean"), ("all", "right"),
+    ("guys",), ("okay",), ("ok",), ("so",), ("right",), ("alright",), ("well",), ("basically",), ("actually",),
+)
+
+_WORD = re.compile(r"\S+")
+_TIMESTAMP = re.compile(r"^[\[(]?\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d{1,3})?[\])]?[,.]?$|^-->$")
+_SENTENCE_END = (".", "?", "!", ",", ":", ";")
+
+@dataclass
+class OffsetMap:
+    """Maps character offsets in compacted text back to the original text."""
+    compact_starts: np.ndarray
+    original_starts: np.ndarray
+    lengths: np.ndarray
+
+    def to_original(self, offset: int) -> int:
+        """
+        Original offset of a compacted-text offset.
+
+        Offsets inside a kept word map to the same character of the original;
+        offsets on a separating space map to the end of the preceding word.
+
+        Args:
+            offset: Character offset in the compacted text
+
+        Returns:
+            Character offset in the original text
+        """
+        if not len(self.compact_starts):
+            return 0
+        word = max(bisect_right(self.compact_starts, offset) - 1, 0)
+        within = min(max(offset - int(self.compact_starts[word]), 0), int(self.lengths[word]))
+        return int(self.original_starts[word]) + within
+
+    def span(self, start: int, end: int) -> Tuple[int, int]:
+        """Original (start, end) of a compacted-text span ``[start, end)``."""
+        if end <= start:
+            position = self.to_original(start)
+            return position, position
+        return self.to_original(start), self.to_original(end - 1) + 1
+
+class CompactedText(NamedTuple):
+    """Result of ``compact_transcript``."""
+    text: str
+    offsets: OffsetMap
+    original_words: int
+    removed: Dict[str, int]
+
+    @property
+    def words(self) -> int:
+        """Words left after compaction."""
+        return len(self.offsets.lengths)
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+def _filler_length(
+    raw: Sequence[str],
+    norm: Sequence[str],
+    i: int,
+    phrases: Sequence[Tuple[str, ...]]
+) -> int:
+    """Length of a comma-delimited filler phrase starting at word ``i``, or 0."""
+    # Caption timestamps start a new cue, so they count as a sentence boundary
+    if i and not raw[i - 1].endswith(_SENTENCE_END) and not _TIMESTAMP.match(raw[i - 1]):
+        return 0
+    for phrase in phrases:
+        n = len(phrase)
+        if tuple(norm[i:i + n]) == phrase and raw[i + n - 1].endswith(","):
+            return n
+    return 0
+
+def _clause_ends(
+    text: str,
+    matches: Sequence[re.Match],
+    raw: Sequence[str],
+    kept: np.ndarray
+) -> np.ndarray:
+    """Whether each kept word ends a clause: punctuation, a line break or a timestamp before the next kept word."""
+    breaks = np.ones(len(raw), dtype=bool)
+    for j in range(len(raw) - 1):
+        breaks[j] = (
+            raw[j].endswith(_SENTENCE_END) or bool(_TIMESTAMP.match(raw[j]))
+            or "\n" in text[matches[j].end():matches[j + 1].start()]
+        )
+    # Any break from a kept word up to (not including) the next kept word, removed words included
+    seen = np.concatenate([[0], np.cumsum(breaks)])
+    following = np.append(kept[1:], len(raw))
+    return seen[following] - seen[kept] > 0
+
+def compact_transcript(
+    text: str,
+    min_repeat_words: int = 2,
+    max_repeat_words: int = 40,
+    filler_words: FrozenSet[str] = FILLER_WORDS,
+    filler_phrases: Sequence[Tuple[str, ...]] = FILLER_PHRASES
+) -> CompactedText:
+    """
+    Strip disfluencies, fillers, timestamps and repeated phrases from a transcript.
+
+    Args:
+        text: Raw transcript text
+        min_repeat_words: Shortest immediately repeated run that is collapsed
+            when its first copy ends a clause (0 disables repeat removal)
+        max_repeat_words: Longest repeated run looked for
+        filler_words: Words removed wherever they occur
+        filler_phrases: Phrases removed when comma-delimited
+
+    Returns:
+        CompactedText with the compacted text, its offset map and counts of
+        removed words by kind (``filler``, ``timestamp``, ``repeat``)
+
+    Raises:
+        ValueError: If the repeat bounds are invalid
+    """
+    if min_repeat_words < 0 or (min_repeat_words and max_repeat_words < min_repeat_words):
+        raise ValueError("Repeat bounds must satisfy 0 <= min_repeat_words <= max_repeat_words")
+
+    matches = list(_WORD.finditer(text))
+    raw = [m.group() for m in matches]
+    norm = [_normalize(w) for w in raw]
+    removed = {"filler": 0, "timestamp": 0, "repeat": 0}
+    keep = np.ones(len(raw), dtype=bool)
+
+    phrases = sorted(filler_phrases, key=len, reverse=True)
+    i = 0
+    while i < len(raw):
+        if _TIMESTAMP.match(raw[i]):
+            keep[i] = False
+            removed["timestamp"] += 1
+        elif norm[i] in filler_words:
+            keep[i] = False
+            removed["filler"] += 1
+        else:
+            n = _filler_length(raw, norm, i, phrases)
+            if n:
+                keep[i:i + n] = False
+                removed["filler"] += n
+                i += n
+                continue
+        i += 1
+
+    if min_repeat_words:
+        # Compare only the surviving words; drop the first copy of "A B C A B C" when it ends a clause
+        kept = np.flatnonzero(keep)
+        words = [norm[k] for k in kept]
+        clause_end = _clause_ends(text, matches, raw, kept)
+        i = 0
+        while i < len(words):
+            for n in range(min(max_repeat_words, (len(words) - i) // 2), min_repeat_words - 1, -1):
+                if (words[i] == words[i + n] and clause_end[i + n - 1] and words[i:i + n] == words[i + n:i + 2 * n]
+                        and all(words[i:i + n])):
+                    keep[kept[i:i + n]] = False
+                    removed["repeat"] += n
+                    i += n - 1
+                    break
+            i += 1
+
+    kept_words = [k for k in np.flatnonzero(keep)]
+    lengths = np.array([len(raw[k]) for k in kept_words], dtype="int64")
+    compact_starts = np.zeros(len(kept_words), dtype="int64")
+    if len(kept_words) > 1:
+        compact_starts[1:] = np.cumsum(lengths[:-1] + 1)
+    offsets = OffsetMap(
+        compact_starts=compact_starts,
+        original_starts=np.array([matches[k].start() for k in kept_words], dtype="int64"),
+        lengths=lengths,
+    )
+    return CompactedText(" ".join(raw[k] for k in kept_words), offsets, len(raw), removed)
+
+def chunk_spans(compacted: CompactedText, chunk_texts: Sequence[str]) -> List[Optional[Tuple[int, int]]]:
+    """
+    Original character spans of chunks cut from a compacted text.
+
+    Args:
+        compacted: Output of ``compact_transcript``
+        chunk_texts: Chunk texts in order (substrings of ``compacted.text``)
+
+    Returns:
+        (start, end) in the original text per chunk, or None if a chunk is not
+        found in the compacted text
+    """
+    spans: List[Optional[Tuple[int, int]]] = []
+    position = 0
+    for chunk in chunk_texts:
+        start = compacted.text.find(chunk, position)
+        if start < 0:
+            spans.append(None)
+            continue
+        spans.append(compacted.offsets.span(start, start + len(chunk)))
+        position = start + 1
+    return spans
+
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Report how much transcript compaction shrinks the KB")
+    parser.add_argument("--kb-root", type=str, default=None,
+                       help="Root directory of the knowledge base (defaults to KB_ROOT)")
+    parser.add_argument("--min-repeat-words", type=int, default=None,
+                       help="Shortest repeated run collapsed (defaults to TRANSCRIPT_MIN_REPEAT_WORDS)")
+    parser.add_argument("--show", type=str, default=None,
+                       help="Print the compacted text of transcripts whose name contains this string")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                       help="Enable verbose logging")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        from pathlib import Path
+        from .config import SETTINGS
+        from .chunkers import chunk_text
+
+        logging.getLogger("src.chunkers").setLevel(logging.WARNING)
+        min_repeat = SETTINGS.transcript_min_repeat_words if args.min_repeat_words is None else args.min_repeat_words
+        totals = {"files": 0, "words": 0, "compact_words": 0, "chars": 0, "compact_chars": 0,
+                  "chunks": 0, "compact_chunks": 0, "filler": 0, "timestamp": 0, "repeat": 0}
+
+        def count_chunks(text: str) -> int:
+            return len(chunk_text(
+                text, max_words=SETTINGS.max_chunk_words, overlap_words=SETTINGS.chunk_overlap_words
+            ))
+
+        for text_file in sorted(Path(args.kb_root or SETTINGS.kb_root).glob("PTM Video *.txt")):
+            with open(text_file, 'r', encoding='utf-8', errors='ignore') as f:
+                raw_text = f.read()
+            compacted = compact_transcript(raw_text, min_repeat)
+            totals["files"] += 1
+            totals["words"] += compacted.original_words
+            totals["compact_words"] += compacted.words
+            totals["chars"] += len(raw_text)
+            totals["compact_chars"] += len(compacted.text)
+            totals["chunks"] += count_chunks(raw_text)
+            totals["compact_chunks"] += count_chunks(compacted.text)
+            for kind, count in compacted.removed.items():
+                totals[kind] += count
+            if args.show and args.show in text_file.name:
+                print(f"\n--- {text_file.name}\n{compacted.text}")
+
+        words = max(totals["words"], 1)
+        print(f"\n[STATS] Compacted {totals['files']} transcripts (min repeat {min_repeat} words)")
+        print(f"   Words: {totals['words']} -> {totals['compact_words']} "
+              f"(-{100 * (1 - totals['compact_words'] / words):.1f}%)")
+        print(f"   Characters: {totals['chars']} -> {totals['compact_chars']} "
+              f"(-{100 * (1 - totals['compact_chars'] / max(totals['chars'], 1)):.1f}%)")
+        print(f"   Chunks: {totals['chunks']} -> {totals['compact_chunks']}")
+        print(f"   Removed words: {totals['filler']} filler, {totals['repeat']} repeated, "
+              f"{totals['timestamp']} timestamps")
+    except Exception as e:
+        print(f"\n[ERROR] Transcript compaction report failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,650 @@
+"""
+Yield-curve spreads, inversion episodes and real rates across countries.
+
+The benchmark yield workbooks (``Benchmark_Yields_AU/CA/DE/EU/JP``) are read
+from the time-series store into one T x C x K array of yields: dates x
+countries x tenors. Each cell holds the latest observation, carried forward
+for up to ``max_stale_days``, so countries that report on different calendars
+share one date grid. From that array a single vectorized pass produces:
+
+- spreads such as 2s10s and 3m10y for every country (T x C x S)
+- inversion episodes: when each spread turned negative and when it recovered,
+  with the deepest inversion
+- real yields (nominal minus the latest CPI YoY print) for every tenor
+
+``CurveMonitor`` keeps the end state of that pass (last yields, open
+inversions), so each new observation is folded in with O(C x K) work instead
+of recomputing history. Its state can be saved to JSON between runs.
+
+Usage:
+    python -m src.yield_curve summary
+    python -m src.yield_curve episodes --spread 2s10s --min-days 20
+    python -m src.yield_curve real
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import logging
+import re
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CURVE_PREFIX = "Benchmark_Yields_"
+
+# Spread name -> (short tenor, long tenor) in months
+SPREADS: Dict[str, Tuple[float, float]] = {
+    "3m10y": (3, 120),
+    "2s10s": (24, 120),
+    "5s30s": (60, 360),
+}
+
+# Country -> (nominal 10yr yield, CPI YoY) series in the KB, both in percent
+REAL_RATE_SOURCES: Dict[str, Tuple[str, str]] = {
+    "US": ("China_Real_Rates/US Real Rates/US 10yr Benchmark Yield %",
+           "China_Real_Rates/US Real Rates/US CPI YoY %"),
+    "CN": ("China_Real_Rates/China Real Rates/China 10yr Benchmark Yield %",
+           "China_Real_Rates/China Real Rates/China CPI YoY %"),
+}
+
+_TENOR = re.compile(r"^(\d+(?:\.\d+)?)\s*(mo|m|month|months|yr|y|year|years)$", re.IGNORECASE)
+_OVERNIGHT = re.compile(r"^(o/n|overnight)\b", re.IGNORECASE)
+
+def tenor_months(label: str) -> Optional[float]:
+    """
+    Maturity in months of a column label such as "3mo", "10yr" or "O/N".
+
+    Args:
+        label: Column label
+
+    Returns:
+        Months to maturity (0 for overnight rates), or None if the label is not a tenor
+    """
+    label = label.strip()
+    if _OVERNIGHT.match(label):
+        return 0.0
+    match = _TENOR.match(label)
+    if not match:
+        return None
+    number = float(match.group(1))
+    return number if match.group(2).lower().startswith("m") else number * 12
+
+def _tenor_label(months: float) -> str:
+    if months == 0:
+        return "O/N"
+    if months < 12 or months % 12:
+        return f"{months:g}mo"
+    return f"{months / 12:g}yr"
+
+class YieldCurves(NamedTuple):
+    """Yields on a shared date grid; ``values`` is T x C x K in percent, NaN where unknown."""
+    dates: np.ndarray
+    countries: List[str]
+    tenors: np.ndarray
+    values: np.ndarray
+    # C x K date of each cell's latest observation (NaT if never observed)
+    last_observed: np.ndarray
+
+    @property
+    def labels(self) -> List[str]:
+        """Display labels of the tenors."""
+        return [_tenor_label(m) for m in self.tenors]
+
+class Episode(NamedTuple):
+    """A spread below zero from ``start`` until it was non-negative again on ``end``."""
+    country: str
+    spread: str
+    start: np.datetime64
+    end: Optional[np.datetime64]
+    trough: float
+
+    @property
+    def days(self) -> Optional[int]:
+        """Calendar days inverted, or None while the episode is still open."""
+        return None if self.end is None else int((self.end - self.start) / np.timedelta64(1, "D"))
+
+def _as_of_fill(
+    dates: np.ndarray,
+    values: np.ndarray,
+    max_stale_days: Optional[int]
+) -> np.ndarray:
+    """Carry each cell's last observation forward along axis 0, up to ``max_stale_days``."""
+    rows = np.arange(len(dates)).reshape((-1,) + (1,) * (values.ndim - 1))
+    last = np.maximum.accumulate(np.where(np.isnan(values), -1, rows), axis=0)
+    filled = np.take_along_axis(values, np.maximum(last, 0), axis=0)
+    unknown = last < 0
+    if max_stale_days is not None:
+        age = dates.reshape(rows.shape) - dates[np.maximum(last, 0)]
+        unknown |= age > np.timedelta64(max_stale_days, "D")
+    filled[unknown] = np.nan
+    return filled
+
+def build_curves(
+    series: Mapping[str, Mapping[float, Tuple[np.ndarray, np.ndarray]]],
+    max_stale_days: Optional[int] = 10
+) -> YieldCurves:
+    """
+    Stack per-country, per-tenor yield series into one array on a shared date grid.
+
+    Args:
+        series: Country -> tenor in months -> (dates, yields), each sorted by date
+        max_stale_days: How long an observation stays current (None for no limit);
+            the default covers weekly series
+
+    Returns:
+        YieldCurves over the union of all observation dates
+
+    Raises:
+        ValueError: If no series is given
+    """
+    cells = [(c, m) for c in series for m in series[c]]
+    if not cells:
+        raise ValueError("No yield series to build curves from")
+
+    countries = sorted(series)
+    tenors = np.array(sorted({m for _, m in cells}), dtype=np.float64)
+    dates = np.unique(np.concatenate([np.asarray(series[c][m][0], dtype="datetime64[D]") for c, m in cells]))
+
+    values = np.full((len(dates), len(countries), len(tenors)), np.nan)
+    last_observed = np.full(values.shape[1:], np.datetime64("NaT"), dtype="datetime64[D]")
+    for c, m in cells:
+        obs_dates, obs_values = series[c][m]
+        obs_dates = np.asarray(obs_dates, dtype="datetime64[D]")
+        cell = (countries.index(c), int(np.searchsorted(tenors, m)))
+        values[(np.searchsorted(dates, obs_dates),) + cell] = obs_values
+        if len(obs_dates):
+            last_observed[cell] = obs_dates[-1]
+    return YieldCurves(dates, countries, tenors, _as_of_fill(dates, values, max_stale_days), last_observed)
+
+def store_curves(
+    store: Any,
+    prefix: str = CURVE_PREFIX,
+    max_stale_days: Optional[int] = 10
+) -> YieldCurves:
+    """
+    Build curves from the benchmark yield workbooks in a ``TimeSeriesStore``.
+
+    Series are named ``<prefix><country>/<sheet>/<tenor>``; where a tenor
+    appears on several sheets, the longest series is used.
+
+    Args:
+        store: Loaded time-series store
+        prefix: Workbook name prefix of the yield files
+        max_stale_days: How long an observation stays current
+
+    Returns:
+        YieldCurves
+
+    Raises:
+        ValueError: If the store holds no yield series
+    """
+    chosen: Dict[str, Dict[float, Tuple[int, str]]] = {}
+    for name in store.names():
+        workbook, _, rest = name.partition("/")
+        if not workbook.startswith(prefix):
+            continue
+        months = tenor_months(rest.rsplit("/", 1)[-1])
+        if months is None:
+            continue
+        country = workbook[len(prefix):]
+        length = store.info(name)["length"]
+        best = chosen.setdefault(country, {}).get(months)
+        if best is None or length > best[0]:
+            chosen[country][months] = (length, name)
+
+    series = {}
+    for country, by_tenor in chosen.items():
+        series[country] = {}
+        for months, (_, name) in by_tenor.items():
+            item = store.get(name)
+            series[country][months] = (item.dates, item.values)
+    return build_curves(series, max_stale_days)
+
+def _spread_index(tenors: np.ndarray, spreads: Mapping[str, Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Tenor positions of each spread's legs (-1 where the curve lacks the tenor)."""
+    def position(months: float) -> int:
+        hits = np.flatnonzero(tenors == months)
+        return int(hits[0]) if len(hits) else -1
+    short = np.array([position(s) for s, _ in spreads.values()], dtype=np.int64)
+    long = np.array([position(l) for _, l in spreads.values()], dtype=np.int64)
+    return short, long
+
+def _gather_spreads(values: np.ndarray, short: np.ndarray, long: np.ndarray) -> np.ndarray:
+    """Long minus short leg along the last axis; NaN for missing legs."""
+    spread = values[..., np.maximum(long, 0)] - values[..., np.maximum(short, 0)]
+    spread[..., (short < 0) | (long < 0)] = np.nan
+    return spread
+
+def compute_spreads(
+    curves: YieldCurves,
+    spreads: Mapping[str, Tuple[float, float]] = SPREADS
+) -> np.ndarray:
+    """
+    Spreads of every country in one gather.
+
+    Args:
+        curves: Yield curves
+        spreads: Spread name -> (short tenor, long tenor) in months
+
+    Returns:
+        T x C x S spreads in percentage points (NaN where a leg is unknown)
+    """
+    short, long = _spread_index(curves.tenors, spreads)
+    return _gather_spreads(curves.values, short, long)
+
+def _inversion_state(spread: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Inverted flag per row, holding the last known state through unknown rows.
+
+    Returns:
+        Tuple of (state after each row, state before each row)
+    """
+    known = ~np.isnan(spread)
+    rows = np.arange(spread.shape[0]).reshape((-1,) + (1,) * (spread.ndim - 1))
+    last = np.maximum.accumulate(np.where(known, rows, -1), axis=0)
+    inverted = np.take_along_axis(spread < 0, np.maximum(last, 0), axis=0) & (last >= 0)
+    before = np.zeros_like(inverted)
+    before[1:] = inverted[:-1]
+    return inverted, before
+
+def find_episodes(
+    curves: YieldCurves,
+    spread_values: np.ndarray,
+    spreads: Mapping[str, Tuple[float, float]] = SPREADS
+) -> List[Episode]:
+    """
+    Inversion episodes of every spread and country.
+
+    An episode starts on the first date a spread is negative and ends on the
+    first later date it is zero or positive; dates where the spread is unknown
+    do not interrupt it.
+
+    Args:
+        curves: Yield curves the spreads were computed from
+        spread_values: T x C x S output of ``compute_spreads``
+        spreads: Spread definitions used for ``spread_values``
+
+    Returns:
+        Episodes ordered by start date
+    """
+    inverted, before = _inversion_state(spread_values)
+    starts = inverted & ~before
+    ends = ~inverted & before
+    names = list(spreads)
+
+    episodes = []
+    for c, s in zip(*np.nonzero(starts.any(axis=0) | ends.any(axis=0))):
+        column = spread_values[:, c, s]
+        start_rows = np.flatnonzero(starts[:, c, s])
+        end_rows = np.flatnonzero(ends[:, c, s])
+        for i, start in enumerate(start_rows):
+            end = end_rows[i] if i < len(end_rows) else None
+            trough = float(np.nanmin(column[start:end]))
+            episodes.append(Episode(
+                curves.countries[c], names[s], curves.dates[start],
+                curves.dates[end] if end is not None else None, trough
+            ))
+    episodes.sort(key=lambda e: (e.start, e.country, e.spread))
+    return episodes
+
+def as_of(
+    dates: np.ndarray,
+    obs_dates: np.ndarray,
+    obs_values: np.ndarray,
+    max_lag_days: Optional[int] = None
+) -> np.ndarray:
+    """
+    Latest observation on or before each date.
+
+    Args:
+        dates: Dates to look up
+        obs_dates: Sorted observation dates
+        obs_values: Observed values
+        max_lag_days: Treat observations older than this as missing
+
+    Returns:
+        Values aligned with ``dates`` (NaN where none applies)
+    """
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    obs_dates = np.asarray(obs_dates, dtype="datetime64[D]")
+    index = np.searchsorted(obs_dates, dates, side="right") - 1
+    out = np.asarray(obs_values, dtype=np.float64)[np.maximum(index, 0)]
+    missing = index < 0
+    if max_lag_days is not None:
+        missing |= dates - obs_dates[np.maximum(index, 0)] > np.timedelta64(max_lag_days, "D")
+    out[missing] = np.nan
+    return out
+
+def real_rates(
+    nominal_dates: np.ndarray,
+    nominal: np.ndarray,
+    inflation_dates: np.ndarray,
+    inflation: np.ndarray,
+    max_lag_days: Optional[int] = 62
+) -> np.ndarray:
+    """
+    Real yields: nominal yields minus the latest inflation print.
+
+    Args:
+        nominal_dates: Dates of the nominal yields (axis 0 of ``nominal``)
+        nominal: Yields in percent, T or T x ... (for example T x C x K curves of one country)
+        inflation_dates: Sorted dates of the inflation prints
+        inflation: CPI YoY in percent
+        max_lag_days: Ignore prints older than this
+
+    Returns:
+        Real yields with the shape of ``nominal``
+    """
+    cpi = as_of(nominal_dates, inflation_dates, inflation, max_lag_days)
+    return np.asarray(nominal, dtype=np.float64) - cpi.reshape((-1,) + (1,) * (np.ndim(nominal) - 1))
+
+def store_real_rates(store: Any, sources: Mapping[str, Tuple[str, str]] = REAL_RATE_SOURCES) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Real 10-year rates of the countries in ``sources`` found in a ``TimeSeriesStore``.
+
+    Args:
+        store: Loaded time-series store
+        sources: Country -> (nominal yield series, CPI YoY series)
+
+    Returns:
+        Country -> (dates, real rates); countries with missing series are skipped
+    """
+    rates = {}
+    for country, (nominal_name, cpi_name) in sources.items():
+        if nominal_name not in store or cpi_name not in store:
+            logger.warning(f"Skipping {country} real rates: series not in the store")
+            continue
+        nominal, cpi = store.get(nominal_name), store.get(cpi_name)
+        rates[country] = (nominal.dates, real_rates(nominal.dates, nominal.values, cpi.dates, cpi.values))
+    return rates
+
+class CurveMonitor:
+    """Incremental spreads and inversion tracking; each observation costs O(countries x tenors)."""
+
+    def __init__(
+        self,
+        countries: Sequence[str],
+        tenors: Sequence[float],
+        spreads: Mapping[str, Tuple[float, float]] = SPREADS,
+        max_stale_days: Optional[int] = 10
+    ) -> None:
+        """
+        Initialize an empty monitor.
+
+        Args:
+            countries: Country codes (axis 1 of observations)
+            tenors: Tenors in months (axis 2 of observations)
+            spreads: Spread name -> (short tenor, long tenor) in months
+            max_stale_days: How long an observation stays current
+        """
+        self.countries = list(countries)
+        self.tenors = np.asarray(tenors, dtype=np.float64)
+        self.spreads = dict(spreads)
+        self.max_stale_days = max_stale_days
+        self._short, self._long = _spread_index(self.tenors, self.spreads)
+
+        shape = (len(self.countries), len(self.tenors))
+        self.last_date: Optional[np.datetime64] = None
+        self.yields = np.full(shape, np.nan)
+        self.observed = np.full(shape, np.datetime64("NaT"), dtype="datetime64[D]")
+        self.inverted = np.zeros((len(self.countries), len(self.spreads)), dtype=bool)
+        self.open_since = np.full(self.inverted.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+        self.trough = np.full(self.inverted.shape, np.nan)
+        self.episodes: List[Episode] = []
+
+    @classmethod
+    def from_history(
+        cls,
+        curves: YieldCurves,
+        spreads: Mapping[str, Tuple[float, float]] = SPREADS,
+        max_stale_days: Optional[int] = 10
+    ) -> "CurveMonitor":
+        """
+        Run the vectorized pass over ``curves`` and keep its end state.
+
+        Args:
+            curves: Historical yield curves (built with the same ``max_stale_days``)
+            spreads: Spread definitions
+            max_stale_days: How long an observation stays current
+
+        Returns:
+            Monitor positioned after the last date of ``curves``
+        """
+        monitor = cls(curves.countries, curves.tenors, spreads, max_stale_days)
+        if not len(curves.dates):
+            return monitor
+
+        spread_values = compute_spreads(curves, spreads)
+        episodes = find_episodes(curves, spread_values, spreads)
+        monitor.episodes = [e for e in episodes if e.end is not None]
+        for e in episodes:
+            if e.end is None:
+                c, s = monitor.countries.index(e.country), list(spreads).index(e.spread)
+                monitor.inverted[c, s] = True
+                monitor.open_since[c, s] = e.start
+                monitor.trough[c, s] = e.trough
+
+        # Keep each cell's last observation even if it has gone stale, as update() does
+        monitor.last_date = curves.dates[-1]
+        monitor.observed = curves.last_observed.copy()
+        rows = np.searchsorted(curves.dates, np.where(np.isnat(monitor.observed), curves.dates[0], monitor.observed))
+        last = curves.values[rows, np.arange(len(curves.countries))[:, None], np.arange(len(curves.tenors))]
+        monitor.yields = np.where(np.isnat(monitor.observed), np.nan, last)
+        return monitor
+
+    def update(self, when: Union[str, date, np.datetime64], yields: np.ndarray) -> List[Episode]:
+        """
+        Fold in one date's observations.
+
+        Args:
+            when: Observation date, after the last one seen
+            yields: C x K yields in percent (NaN where not observed on this date)
+
+        Returns:
+            Episodes that started or ended on this date (open ones have ``end`` None)
+
+        Raises:
+            ValueError: If the date is not after the last one or the shape is wrong
+        """
+        when = np.datetime64(when, "D")
+        yields = np.asarray(yields, dtype=np.float64)
+        if yields.shape != self.yields.shape:
+            raise ValueError(f"Expected yields of shape {self.yields.shape}, got {yields.shape}")
+        if self.last_date is not None and when <= self.last_date:
+            raise ValueError(f"Observation date {when} is not after {self.last_date}")
+        self.last_date = when
+
+        seen = ~np.isnan(yields)
+        self.yields[seen] = yields[seen]
+        self.observed[seen] = when
+        current = self.yields.copy()
+        if self.max_stale_days is not None:
+            current[np.isnat(self.observed) | (when - self.observed > np.timedelta64(self.max_stale_days, "D"))] = np.nan
+
+        spread = _gather_spreads(current, self._short, self._long)
+        known = ~np.isnan(spread)
+        starts = known & (spread < 0) & ~self.inverted
+        ends = known & (spread >= 0) & self.inverted
+        deeper = known & self.inverted & ~ends
+        self.trough[deeper] = np.fmin(self.trough[deeper], spread[deeper])
+
+        names = list(self.spreads)
+        events = []
+        for c, s in zip(*np.nonzero(ends)):
+            episode = Episode(self.countries[c], names[s], self.open_since[c, s], when, float(self.trough[c, s]))
+            self.episodes.append(episode)
+            events.append(episode)
+        for c, s in zip(*np.nonzero(starts)):
+            events.append(Episode(self.countries[c], names[s], when, None, float(spread[c, s])))
+
+        self.inverted[starts] = True
+        self.open_since[starts] = when
+        self.trough[starts] = spread[starts]
+        self.inverted[ends] = False
+        self.open_since[ends] = np.datetime64("NaT")
+        self.trough[ends] = np.nan
+        return events
+
+    def open_episodes(self) -> List[Episode]:
+        """Inversions still in progress."""
+        names = list(self.spreads)
+        return [
+            Episode(self.countries[c], names[s], self.open_since[c, s], None, float(self.trough[c, s]))
+            for c, s in zip(*np.nonzero(self.inverted))
+        ]
+
+    def current_spreads(self) -> np.ndarray:
+        """C x S spreads as of the last update (NaN where stale or unknown)."""
+        current = self.yields.copy()
+        if self.max_stale_days is not None and self.last_date is not None:
+            stale = np.isnat(self.observed) | (self.last_date - self.observed > np.timedelta64(self.max_stale_days, "D"))
+            current[stale] = np.nan
+        return _gather_spreads(current, self._short, self._long)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Write the monitor state to a JSON file.
+
+        Args:
+            path: Output path
+        """
+        def dates(array: np.ndarray) -> List[Optional[str]]:
+            return [None if np.isnat(d) else str(d) for d in array.ravel()]
+
+        state = {
+            "countries": self.countries,
+            "tenors": self.tenors.tolist(),
+            "spreads": self.spreads,
+            "max_stale_days": self.max_stale_days,
+            "last_date": None if self.last_date is None else str(self.last_date),
+            "yields": [None if np.isnan(v) else float(v) for v in self.yields.ravel()],
+            "observed": dates(self.observed),
+            "inverted": self.inverted.ravel().tolist(),
+            "open_since": dates(self.open_since),
+            "trough": [None if np.isnan(v) else float(v) for v in self.trough.ravel()],
+            "episodes": [[e.country, e.spread, str(e.start), str(e.end), e.trough] for e in self.episodes],
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "CurveMonitor":
+        """
+        Restore a monitor saved with ``save``.
+
+        Args:
+            path: State file
+
+        Returns:
+            CurveMonitor
+
+        Raises:
+            RuntimeError: If the file cannot be read
+        """
+        try:
+            state = json.loads(Path(path).read_text(encoding="utf-8"))
+            monitor = cls(
+                state["countries"], state["tenors"],
+                {k: tuple(v) for k, v in state["spreads"].items()}, state["max_stale_days"]
+            )
+            monitor.last_date = np.datetime64(state["last_date"], "D") if state["last_date"] else None
+            monitor.yields = np.array(state["yields"], dtype=np.float64).reshape(monitor.yields.shape)
+            monitor.observed = np.array(state["observed"], dtype="datetime64[D]").reshape(monitor.observed.shape)
+            monitor.inverted = np.array(state["inverted"], dtype=bool).reshape(monitor.inverted.shape)
+            monitor.open_since = np.array(state["open_since"], dtype="datetime64[D]").reshape(monitor.open_since.shape)
+            monitor.trough = np.array(state["trough"], dtype=np.float64).reshape(monitor.trough.shape)
+            monitor.episodes = [
+                Episode(c, s, np.datetime64(start, "D"), np.datetime64(end, "D"), trough)
+                for c, s, start, end, trough in state["episodes"]
+            ]
+            return monitor
+        except Exception as e:
+            logger.error(f"Failed to load curve monitor state from {path}: {e}")
+            raise RuntimeError(f"Failed to load curve monitor state from {path}: {e}") from e
+
+if __name__ == "__main__":
+    from .config import SETTINGS
+    from .timeseries_store import TimeSeriesStore
+
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Yield-curve spreads, inversions and real rates from the KB")
+    parser.add_argument("--kb", type=str, default=SETTINGS.kb_root, help="Knowledge base root")
+    parser.add_argument("--cache", type=str, default=SETTINGS.timeseries_cache_dir, help="Time-series cache directory")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("summary", help="Latest curves, spreads and open inversions")
+
+    episodes_parser = subparsers.add_parser("episodes", help="List inversion episodes")
+    episodes_parser.add_argument("--country", type=str, default=None, help="Only this country (e.g. DE)")
+    episodes_parser.add_argument("--spread", type=str, default=None, choices=list(SPREADS), help="Only this spread")
+    episodes_parser.add_argument("--min-days", type=int, default=0, help="Hide shorter closed episodes")
+
+    real_parser = subparsers.add_parser("real", help="Real 10yr rates (nominal minus CPI YoY)")
+    real_parser.add_argument("--tail", type=int, default=12, help="Number of observations per country")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        store = TimeSeriesStore(args.cache)
+        store.load_directory(args.kb)
+
+        if args.command == "real":
+            rates = store_real_rates(store)
+            for country, (dates, real) in rates.items():
+                print(f"\n{country} real 10yr rate (%):")
+                for day, rate in zip(dates[-args.tail:], real[-args.tail:]):
+                    print(f"  {day}  {rate:+.2f}")
+            print(f"\n[STATS] Real rates for {len(rates)} countries")
+        elif args.command == "summary":
+            curves = store_curves(store)
+            monitor = CurveMonitor.from_history(curves)
+            spread_now = monitor.current_spreads()
+            print(f"\nYield curves as of {monitor.last_date} (%):")
+            print("  " + " " * 8 + "".join(f"{label:>8}" for label in curves.labels))
+            for c, country in enumerate(curves.countries):
+                row = "".join(f"{'':>8}" if np.isnan(v) else f"{v:8.2f}" for v in monitor.yields[c])
+                spread_text = ", ".join(
+                    f"{name} {spread_now[c, s] * 100:+.0f}bp" for s, name in enumerate(SPREADS)
+                    if not np.isnan(spread_now[c, s])
+                )
+                print(f"  {country:<8}{row}   {spread_text}")
+            for e in monitor.open_episodes():
+                print(f"  [INVERTED] {e.country} {e.spread} since {e.start} (trough {e.trough * 100:+.0f}bp)")
+            print(f"\n[STATS] {len(curves.countries)} countries x {len(curves.tenors)} tenors over "
+                  f"{len(curves.dates)} dates; {len(monitor.episodes)} closed inversion episodes")
+        else:
+            curves = store_curves(store)
+            monitor = CurveMonitor.from_history(curves)
+            shown = [
+                e for e in monitor.episodes + monitor.open_episodes()
+                if (args.country is None or e.country == args.country)
+                and (args.spread is None or e.spread == args.spread)
+                and (e.days is None or e.days >= args.min_days)
+            ]
+            shown.sort(key=lambda e: (e.start, e.country, e.spread))
+            for e in shown:
+                end = str(e.end) if e.end is not None else "ongoing"
+                length = f"{e.days}d" if e.days is not None else ""
+                print(f"  {e.country:<4}{e.spread:<7}{e.start} -> {end:<10} {length:>6}  trough {e.trough * 100:+.0f}bp")
+            print(f"\n[STATS] {len(shown)} inversion episodes")
+    except Exception as e:
+        print(f"\n[ERROR] Yield-curve {args.command} failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,11 @@
+"""
+Shared pytest setup: make the ``src`` package importable from the repo root.
+
+Run with:
+    python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,81 @@
+"""Tests for the local chunk-text store and lazy result texts."""
+
+import pytest
+
+from src.chunk_store import ChunkStore, ChunkTextLoader
+from src.query import QueryResult
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ChunkStore(tmp_path / "chunks.sqlite") as store:
+        yield store
+
+
+def test_put_many_and_get(store):
+    written = store.put_many([
+        (1, "first chunk", {"file_name": "a.txt", "page": 1}),
+        ("2", "second chunk", {"file_name": "b.pdf"}),
+    ])
+    assert written == 2
+    assert store.count() == 2
+    assert store.get_texts([1, 2, 3]) == {"1": "first chunk", "2": "second chunk"}
+    assert store.get_records(["1"]) == {"1": ("first chunk", {"file_name": "a.txt", "page": 1})}
+    assert store.put_many([]) == 0
+
+
+def test_put_many_replaces_existing_ids(store):
+    store.put_many([(1, "old", {})])
+    store.put_many([(1, "new", {"v": 2})])
+    assert store.count() == 1
+    assert store.get_records([1])["1"] == ("new", {"v": 2})
+
+
+def test_get_batches_past_the_parameter_limit(store):
+    store.put_many((i, f"text {i}", {}) for i in range(2500))
+    texts = store.get_texts(list(range(2500)) + [1, 2, 99999])
+    assert len(texts) == 2500
+    assert texts["2499"] == "text 2499"
+
+
+def test_readonly_store(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ChunkStore(tmp_path / "missing.sqlite", readonly=True)
+
+    path = tmp_path / "chunks.sqlite"
+    with ChunkStore(path) as writer:
+        writer.put_many([(7, "seven", {})])
+    with ChunkStore(path, readonly=True) as reader:
+        assert reader.get_texts([7]) == {"7": "seven"}
+        with pytest.raises(RuntimeError):
+            reader.put_many([(8, "eight", {})])
+
+
+class _CountingStore:
+    def __init__(self, store):
+        self.store = store
+        self.path = store.path
+        self.lookups = []
+
+    def get_texts(self, ids):
+        self.lookups.append(list(ids))
+        return self.store.get_texts(ids)
+
+
+def test_query_results_load_texts_in_one_lookup(store):
+    store.put_many([(i, f"  chunk {i}  ", {}) for i in range(5)])
+    counting = _CountingStore(store)
+    loader = ChunkTextLoader(counting, [0, 1, 2, 3, 4])
+    results = [QueryResult(1.0, {"class_id": "PTM_Video_1"}, result_id=i, text_loader=loader) for i in range(5)]
+
+    assert counting.lookups == []
+    assert [r.text for r in results] == [f"chunk {i}" for i in range(5)]
+    assert counting.lookups == [[0, 1, 2, 3, 4]]
+
+
+def test_query_result_text_fallbacks(store):
+    assert QueryResult(1.0, {"text": " inline "}).text == "inline"
+    assert QueryResult(1.0, {}, result_id=1).text == ""
+    # Unknown IDs and a missing store give empty texts instead of raising
+    assert QueryResult(1.0, {}, result_id=9, text_loader=ChunkTextLoader(store, [9])).text == ""
+    assert QueryResult(1.0, {}, result_id=9, text_loader=ChunkTextLoader(None, [9])).text == ""
@@ -0,0 +1,96 @@
+"""Tests for vectorized correlations, checked against pandas."""
+
+import numpy as np
+import pytest
+
+from src.correlation import (
+    align, correlation, correlation_matrix, lagged_correlations, rolling_correlation, shift, transform
+)
+
+pd = pytest.importorskip("pandas")
+
+ROWS = 120
+COLUMNS = 5
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(17)
+    y = np.cumsum(rng.normal(size=ROWS))
+    x = np.column_stack([y + rng.normal(scale=s, size=ROWS) for s in (0.5, 1.0, 3.0, 10.0, 30.0)])
+    x[rng.random(x.shape) < 0.1] = np.nan
+    x[40:55, 2] = np.nan  # a gap longer than the window
+    x[:, 4] += 1e6  # a large offset must not cost precision
+    y[rng.random(ROWS) < 0.05] = np.nan
+    return x, y
+
+
+def _assert_same(actual, expected):
+    assert actual.shape == expected.shape
+    assert np.array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual[~np.isnan(actual)], expected[~np.isnan(expected)], atol=1e-9)
+
+
+@pytest.mark.parametrize("window,min_periods", [(12, None), (12, 8), (30, 20)])
+def test_rolling_correlation_matches_pandas(data, window, min_periods):
+    x, y = data
+    expected = pd.DataFrame(x).rolling(window, min_periods=min_periods or window).corr(pd.Series(y))
+    _assert_same(rolling_correlation(x, y, window, min_periods), expected.to_numpy())
+
+
+def test_rolling_correlation_recovers_after_an_outlier():
+    rng = np.random.default_rng(3)
+    y = rng.normal(size=200)
+    x = y + rng.normal(scale=0.3, size=200)
+    x[50] = 1e9
+    # Windows clear of the outlier match pandas computed on the clean tail alone
+    expected = pd.Series(x[100:]).rolling(20).corr(pd.Series(y[100:])).to_numpy()[19:]
+    _assert_same(rolling_correlation(x, y, 20)[119:, 0], expected)
+
+
+def test_lagged_correlations_match_pandas(data):
+    x, y = data
+    lags = [-2, 0, 1, 4]
+    frame, target = pd.DataFrame(x), pd.Series(y)
+    expected = np.array([[frame[col].shift(lag).corr(target, min_periods=3) for col in frame] for lag in lags])
+    _assert_same(lagged_correlations(x, y, lags), expected)
+
+    rolling = lagged_correlations(x, y, lags, window=24, min_periods=12)
+    assert rolling.shape == (len(lags), ROWS, COLUMNS)
+    for i, lag in enumerate(lags):
+        _assert_same(rolling[i], frame.shift(lag).rolling(24, min_periods=12).corr(target).to_numpy())
+
+
+def test_correlation_matrix_matches_pandas(data):
+    x, y = data
+    values = np.column_stack([x, y, np.full(ROWS, 2.0)])  # a constant column has no correlation
+    for min_periods in (3, 100):
+        _assert_same(correlation_matrix(values, min_periods), pd.DataFrame(values).corr(min_periods=min_periods).to_numpy())
+    _assert_same(correlation(x, y), pd.DataFrame(x).corrwith(pd.Series(y)).to_numpy())
+
+
+def test_too_few_pairs_give_nan():
+    x = np.array([1.0, np.nan, 3.0, np.nan, 5.0])
+    y = np.array([2.0, 4.0, np.nan, 8.0, 10.0])
+    assert np.isnan(correlation(x, y)[0])
+    assert correlation(x, y, min_periods=2)[0] == pytest.approx(1.0)
+
+
+def test_shift_and_transform():
+    values = np.array([1.0, 2.0, 4.0, 8.0])
+    np.testing.assert_array_equal(shift(values, 1), [np.nan, 1.0, 2.0, 4.0])
+    np.testing.assert_array_equal(shift(values, -2), [4.0, 8.0, np.nan, np.nan])
+    np.testing.assert_array_equal(transform(values, "diff"), [np.nan, 1.0, 2.0, 4.0])
+    np.testing.assert_array_equal(transform(values, "pct", 2), [np.nan, np.nan, 3.0, 3.0])
+    with pytest.raises(ValueError):
+        transform(values, "log")
+
+
+def test_align_takes_the_last_observation_of_each_period():
+    monthly = (np.array(["2024-01-05", "2024-01-31", "2024-02-10"], dtype="datetime64[D]"), np.array([1.0, 2.0, 3.0]))
+    quarterly = (np.array(["2024-03-31"], dtype="datetime64[D]"), np.array([9.0]))
+    panel = align({"m": monthly, "q": quarterly}, freq="M")
+    assert panel.dates.tolist() == list(np.array(["2024-01-31", "2024-02-29", "2024-03-31"], dtype="datetime64[D]"))
+    np.testing.assert_array_equal(panel.values, [[2.0, np.nan], [3.0, np.nan], [np.nan, 9.0]])
+    with pytest.raises(ValueError):
+        align({"m": monthly}, freq="W")
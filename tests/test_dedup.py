@@ -0,0 +1,67 @@
+"""Tests for MinHash/LSH near-duplicate detection and merging."""
+
+import random
+
+import pytest
+
+from src.dedup import MinHasher, find_duplicates, jaccard_estimate, merge_duplicates, shingle_hashes
+
+_WORDS = ("price volume trend yield curve spread inflation rate risk position stop entry exit "
+          "breakout support resistance momentum average range sector earnings guidance").split()
+
+
+def _passage(seed, words=120):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def test_minhash_estimates_jaccard():
+    base = _passage(1, 400).split()
+    edited = base[:360] + _passage(2, 40).split()
+    first, second = set(zip(*[base[i:] for i in range(3)])), set(zip(*[edited[i:] for i in range(3)]))
+    exact = len(first & second) / len(first | second)
+
+    hasher = MinHasher(num_perm=256)
+    estimate = jaccard_estimate(
+        hasher.signature(shingle_hashes(" ".join(base), 3)),
+        hasher.signature(shingle_hashes(" ".join(edited), 3)),
+    )
+    assert estimate == pytest.approx(exact, abs=0.1)
+
+
+def test_find_duplicates_maps_copies_to_the_first_one():
+    original = _passage(1)
+    near_copy = original.replace("price", "PRICE,", 1) + " extra"
+    texts = [original, _passage(2), near_copy, original, _passage(3)]
+    assert find_duplicates(texts, threshold=0.8) == [None, None, 0, 0, None]
+
+
+def test_different_texts_are_not_merged():
+    assert find_duplicates([_passage(seed) for seed in range(10)], threshold=0.8) == [None] * 10
+
+
+def test_merge_duplicates_records_aliases():
+    texts = ["a " * 10, "b " * 10, "a " * 10, "a " * 10]
+    payloads = [
+        {"class_id": "PTM_Video_3", "file_name": "ATRP.xlsx", "chunk_index": 0, "source": "xlsx"},
+        {"class_id": "PTM_Video_3", "file_name": "notes.txt", "chunk_index": 0, "source": "transcript"},
+        {"class_id": "PTM_Video_7", "file_name": "ATRP.xlsx", "chunk_index": 0, "source": "xlsx"},
+        {"class_id": "PTM_Video_3", "file_name": "ATRP copy.xlsx", "chunk_index": 2, "source": "xlsx"},
+    ]
+    kept_texts, kept_payloads, stats = merge_duplicates(texts, payloads, [None, None, 0, 0])
+
+    assert kept_texts == texts[:2]
+    assert kept_payloads[0]["aliases"] == [
+        {"class_id": "PTM_Video_7", "file_name": "ATRP.xlsx", "chunk_index": 0},
+        {"class_id": "PTM_Video_3", "file_name": "ATRP copy.xlsx", "chunk_index": 2},
+    ]
+    # Copies from the chunk's own video are aliases but not alias videos
+    assert kept_payloads[0]["alias_class_ids"] == ["PTM_Video_7"]
+    assert "aliases" not in kept_payloads[1]
+    assert "aliases" not in payloads[0], "input payloads must not be modified"
+    assert stats == {"duplicate_chunks": 2, "merged_chunks": 1, "duplicate_words": 20, "cross_video_chunks": 1}
+
+
+def test_merge_duplicates_checks_lengths():
+    with pytest.raises(ValueError):
+        merge_duplicates(["a"], [{}], [None, None])
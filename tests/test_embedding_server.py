@@ -0,0 +1,142 @@
+"""Tests for the embedding server, its client and the client-mode fallback."""
+
+import logging
+import threading
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from src import embeddings as embeddings_module
+from src.embedding_server import EmbeddingRequestHandler, EmbeddingServerClient, MicroBatcher
+from src.embeddings import EmbeddingModel
+
+
+class _FakeModel:
+    """Two-dimensional embeddings; the first ``failures`` encode calls raise."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+
+    def get_model_name(self):
+        return "fake-model"
+
+    def get_embedding_dimension(self):
+        return 2
+
+    def encode(self, texts, batch_size=None, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("model busy")
+        return np.array([[len(t), 1.0] for t in texts], dtype="float32")
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), EmbeddingRequestHandler)
+    httpd.daemon_threads = True
+    httpd.batcher = MicroBatcher(_FakeModel(), max_batch_size=8, max_wait_ms=1)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(embeddings_module.time, "sleep", lambda seconds: None)
+
+
+def _url(httpd):
+    return f"http://127.0.0.1:{httpd.server_address[1]}"
+
+
+def _local_model(self):
+    self.model = _FakeModel()
+    self.dim = 2
+
+
+def test_client_round_trip(server):
+    client = EmbeddingServerClient(_url(server))
+    assert client.health()["model"] == "fake-model"
+    assert client.encode(["ab", "abcd"]).tolist() == [[2.0, 1.0], [4.0, 1.0]]
+
+
+def test_concurrent_requests_share_batches(server):
+    client = EmbeddingServerClient(_url(server))
+    results = {}
+
+    def encode(i):
+        results[i] = client.encode(["x" * i])
+
+    threads = [threading.Thread(target=encode, args=(i,)) for i in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(results[i].tolist() == [[float(i), 1.0]] for i in range(1, 9))
+    assert server.batcher.texts_encoded == 8
+
+
+def test_remote_model_uses_the_server(server, monkeypatch):
+    monkeypatch.setattr(EmbeddingModel, "_load_local_model", _local_model)
+    model = EmbeddingModel("fake-model", server_url=_url(server))
+    assert model.is_remote
+    assert model.get_embedding_dimension() == 2
+    assert model.encode(["abc"]).tolist() == [[3.0, 1.0]]
+
+
+def test_encode_timeout_scales_with_batch_size():
+    client = EmbeddingServerClient("http://127.0.0.1:1", timeout=30, timeout_per_text=0.5)
+    assert client.encode_timeout(1) == 30.5
+    assert client.encode_timeout(64) == 62.0
+
+
+def test_transient_failures_are_retried(server, monkeypatch):
+    monkeypatch.setattr(EmbeddingModel, "_load_local_model", _local_model)
+    server.batcher.model.failures = 2
+    model = EmbeddingModel("fake-model", server_url=_url(server), server_retries=2)
+
+    assert model.encode(["abc"]).tolist() == [[3.0, 1.0]]
+    assert model.is_remote
+
+
+def test_persistent_failure_falls_back_with_a_warning(server, monkeypatch, caplog):
+    monkeypatch.setattr(EmbeddingModel, "_load_local_model", _local_model)
+    server.batcher.model.failures = 3
+    model = EmbeddingModel("fake-model", server_url=_url(server), server_retries=1)
+
+    with caplog.at_level(logging.WARNING, logger="src.embeddings"):
+        assert model.encode(["abc"]).tolist() == [[3.0, 1.0]]
+    assert not model.is_remote
+    assert any("rest of this process" in r.getMessage() for r in caplog.records if r.levelno == logging.WARNING)
+
+
+def test_client_errors_are_not_retried(server, monkeypatch):
+    monkeypatch.setattr(EmbeddingModel, "_load_local_model", _local_model)
+    calls = []
+    original = EmbeddingServerClient.encode
+
+    def encode(self, texts, batch_size=None):
+        calls.append(texts)
+        return original(self, [], batch_size)  # an empty list is rejected with HTTP 400
+
+    monkeypatch.setattr(EmbeddingServerClient, "encode", encode)
+    model = EmbeddingModel("fake-model", server_url=_url(server), server_retries=3)
+    model.encode(["abc"])
+    assert len(calls) == 1
+    assert not model.is_remote
+
+
+def test_unreachable_server_uses_local_model(monkeypatch):
+    monkeypatch.setattr(EmbeddingModel, "_load_local_model", _local_model)
+    model = EmbeddingModel("fake-model", server_url="http://127.0.0.1:1", server_timeout=1)
+    assert not model.is_remote
+
+
+def test_model_mismatch_uses_local_model(server, monkeypatch):
+    monkeypatch.setattr(EmbeddingModel, "_load_local_model", _local_model)
+    model = EmbeddingModel("other-model", server_url=_url(server))
+    assert not model.is_remote
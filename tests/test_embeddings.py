@@ -0,0 +1,56 @@
+"""Tests for the query embedding cache."""
+
+import numpy as np
+import pytest
+
+from src.embeddings import QueryEmbeddingCache, normalize_query
+
+
+class _FakeModel:
+    """Encodes a text as (length, uppercase letters) and records what it was asked to encode."""
+
+    def __init__(self):
+        self.batches = []
+
+    def get_model_name(self):
+        return "fake"
+
+    def encode(self, texts):
+        self.batches.append(list(texts))
+        return np.array([[len(t), sum(c.isupper() for c in t)] for t in texts], dtype="float32")
+
+
+def test_normalize_query():
+    assert normalize_query("  What is   ATRP?\n") == "what is atrp?"
+    with pytest.raises(TypeError):
+        normalize_query(None)
+
+
+def test_keys_are_normalized_but_originals_are_encoded():
+    cache, model = QueryEmbeddingCache(8), _FakeModel()
+    vectors = cache.get_or_encode(model, ["US CPI  trend", "us cpi trend", "ATRP"])
+
+    assert model.batches == [["US CPI  trend", "ATRP"]]
+    assert vectors[0].tolist() == vectors[1].tolist() == [13.0, 5.0]
+
+    cache.get_or_encode(model, ["us  CPI trend"])
+    assert len(model.batches) == 1
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_lru_eviction():
+    cache, model = QueryEmbeddingCache(2), _FakeModel()
+    for text in ("a", "b", "a", "c"):
+        cache.get_or_encode(model, [text])
+    assert cache.get("fake", "b") is None
+    assert cache.get("fake", "a") is not None
+    assert cache.stats()["size"] == 2
+
+
+def test_zero_size_disables_caching():
+    cache, model = QueryEmbeddingCache(0), _FakeModel()
+    cache.get_or_encode(model, ["a"])
+    cache.get_or_encode(model, ["a"])
+    assert len(model.batches) == 2
+    with pytest.raises(ValueError):
+        QueryEmbeddingCache(-1)
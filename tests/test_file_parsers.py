@@ -0,0 +1,114 @@
+"""Tests for PDF page segments, table detection and per-page chunking."""
+
+import dataclasses
+
+import pytest
+
+from src.advanced_ingest import process_advanced_file
+from src.config import SETTINGS
+from src.file_parsers import _has_ruling, iter_pdf_pages, parse_file_segments
+
+pdfplumber = pytest.importorskip("pdfplumber")
+
+SENTENCE = "The yield curve inverted as front end rates rose faster than long end rates"
+
+
+def _text(lines, y=750):
+    ops = ["BT /F1 11 Tf 14 TL", f"72 {y} Td"]
+    for line in lines:
+        ops.append(f"({line}) Tj T*")
+    ops.append("ET")
+    return "\n".join(ops)
+
+
+# A 2x2 ruled table: three horizontal and three vertical rules, with a word per cell
+TABLE = "\n".join([
+    "1 w",
+    *(f"72 {y} m 272 {y} l S" for y in (500, 470, 440)),
+    *(f"{x} 500 m {x} 440 l S" for x in (72, 172, 272)),
+    "BT /F1 11 Tf 80 480 Td (Tenor) Tj 100 0 Td (Yield) Tj -100 -30 Td (10yr) Tj 100 0 Td (4.2) Tj ET",
+])
+# A single framed box and a diagonal chart line: neither is a table
+BOX = "72 400 200 80 re S"
+DIAGONAL = "72 300 m 272 380 l S 72 380 m 272 300 l S"
+
+
+def _write_pdf(path, pages):
+    """Write a minimal PDF with one content stream per page."""
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for content in pages:
+        data = content.encode("latin-1")
+        objects.append(f"<< /Length {len(data)} >>\nstream\n{content}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    path.write_bytes(bytes(out))
+    return path
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    return _write_pdf(tmp_path / "Lesson Notes.pdf", [
+        _text([SENTENCE, "The table below shows the curve"]) + "\n" + TABLE,
+        _text([SENTENCE, "No tables on this page"]),
+        _text(["Appendix"]),
+        _text([SENTENCE, "A framed note and a chart"]) + "\n" + BOX + "\n" + DIAGONAL,
+    ])
+
+
+def test_pages_carry_page_number_and_table_count(pdf):
+    pages = list(iter_pdf_pages(pdf))
+    assert [meta for _, meta in pages] == [
+        {"page_number": 1, "table_count": 1},
+        {"page_number": 2, "table_count": 0},
+        {"page_number": 3, "table_count": 0},
+        {"page_number": 4, "table_count": 0},
+    ]
+    assert "Tenor | Yield" in pages[0][0]
+    assert "10yr | 4.2" in pages[0][0]
+    assert parse_file_segments(pdf) == pages
+
+
+def test_ruling_needs_a_grid(pdf):
+    with pdfplumber.open(pdf) as document:
+        assert [_has_ruling(page) for page in document.pages] == [True, False, False, False]
+
+
+def test_chunks_keep_their_page(pdf):
+    settings = dataclasses.replace(SETTINGS, max_chunk_words=20, chunk_overlap_words=10)
+    chunks = process_advanced_file(pdf, "PTM_Video_7", "7", settings)
+
+    pages = [payload["page_number"] for _, payload in chunks]
+    assert pages == sorted(pages)
+    # The one-word appendix page is merged into the page after it instead of being dropped
+    assert set(pages) == {1, 2, 3}
+    merged = " ".join(text for text, payload in chunks if payload["page_number"] == 3)
+    assert merged.index("Appendix") < merged.index("framed note")
+    assert [payload["chunk_index"] for _, payload in chunks] == list(range(len(chunks)))
+    assert len({payload["id"] for _, payload in chunks}) == len(chunks)
+
+    first_page = [payload for _, payload in chunks if payload["page_number"] == 1]
+    assert all(payload["table_count"] == 1 for payload in first_page)
+    assert all(payload["file_name"] == "Lesson Notes.pdf" for _, payload in chunks)
+
+
+def test_non_pdf_files_are_one_segment(tmp_path):
+    assert parse_file_segments(tmp_path / "notes.txt") == []
@@ -0,0 +1,116 @@
+"""Tests for the filter DSL shared by Qdrant searches and local retrieval legs."""
+
+import pytest
+
+from src.index_qdrant import build_filter, matches_filter
+
+VIDEO_7 = {"class_id": "PTM_Video_7", "source": "transcript", "video_number": 7}
+MERGED = {"class_id": "PTM_Video_3", "source": "transcript", "video_number": 3,
+          "alias_class_ids": ["PTM_Video_7", "PTM_Video_9"]}
+
+
+@pytest.fixture
+def qdrant_models():
+    pytest.importorskip("qdrant_client")
+
+
+def test_build_filter_without_filters(qdrant_models):
+    assert build_filter(None) is None
+    assert build_filter({}) is None
+
+
+def test_scalar_list_and_range_conditions(qdrant_models):
+    flt = build_filter({"file_name": "ATRP.xlsx", "source": ["pdf", "docx"], "video_number": {"gte": 16, "lte": 21}})
+    by_key = {condition.key: condition for condition in flt.must}
+    assert by_key["file_name"].match.value == "ATRP.xlsx"
+    assert by_key["source"].match.any == ["pdf", "docx"]
+    assert (by_key["video_number"].range.gte, by_key["video_number"].range.lte) == (16, 21)
+    assert flt.must_not is None
+
+
+def test_negation(qdrant_models):
+    flt = build_filter({"class_id": {"not": "Trade_Template"}, "video_number": {"not": {"any": [1, 2], "gte": 1}}})
+    assert flt.must is None
+    single, wrapped = flt.must_not
+    assert single.match.value == "Trade_Template"
+    # NOT (a AND b) stays one condition
+    assert [c.match.any if c.match else c.range.gte for c in wrapped.must] == [[1, 2], 1]
+
+
+def test_class_id_also_matches_alias_field(qdrant_models):
+    flt = build_filter({"class_id": "PTM_Video_7", "video_number": {"gte": 1, "not": 3}})
+    assert len(flt.must) == 2
+    assert len(flt.must_not) == 1
+    # Positive class_id matches are an OR over the field and its alias field
+    assert {c.must[0].key for c in flt.must[0].should} == {"class_id", "alias_class_ids"}
+
+
+def test_class_id_negation_is_not_aliased(qdrant_models):
+    flt = build_filter({"class_id": {"not": "PTM_Video_3"}})
+    assert flt.must is None
+    assert flt.must_not[0].key == "class_id"
+
+
+@pytest.mark.parametrize("filters", [
+    {"video_number": {"gte": "seven"}},
+    {"video_number": {"between": [1, 9]}},
+    {"source": []},
+    {"class_id": {"not": {"not": "x"}}},
+    {"class_id": 1.5},
+    {"class_id": {}},
+])
+def test_invalid_filters_raise(qdrant_models, filters):
+    with pytest.raises(ValueError):
+        build_filter(filters)
+
+
+def test_matches_without_filters():
+    assert matches_filter(VIDEO_7, None)
+    assert matches_filter(VIDEO_7, {})
+
+
+def test_matches_scalar_and_list_values():
+    assert matches_filter(VIDEO_7, {"source": "transcript"})
+    assert not matches_filter(VIDEO_7, {"source": "pdf"})
+    assert matches_filter(VIDEO_7, {"source": ["pdf", "transcript"]})
+    assert not matches_filter(VIDEO_7, {"source": ["pdf", "docx"]})
+
+
+def test_matches_ands_keys():
+    assert matches_filter(VIDEO_7, {"source": "transcript", "video_number": 7})
+    assert not matches_filter(VIDEO_7, {"source": "transcript", "video_number": 8})
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ({"gte": 7, "lte": 7}, True),
+    ({"gt": 7}, False),
+    ({"gte": 5, "lt": 10}, True),
+    ({"lt": 7}, False),
+    ({"any": [1, 7], "not": 1}, True),
+    ({"not": {"gte": 5, "lte": 9}}, False),
+])
+def test_matches_operators(spec, expected):
+    assert matches_filter(VIDEO_7, {"video_number": spec}) is expected
+
+
+def test_range_on_missing_field_fails():
+    assert not matches_filter({"class_id": "Trade_Template"}, {"video_number": {"gte": 1}})
+
+
+def test_matches_rejects_unknown_operators():
+    with pytest.raises(ValueError):
+        matches_filter(VIDEO_7, {"video_number": {"between": [1, 9]}})
+
+
+def test_class_id_matches_alias_field():
+    assert matches_filter(MERGED, {"class_id": "PTM_Video_7"})
+    assert matches_filter(MERGED, {"class_id": ["PTM_Video_1", "PTM_Video_9"]})
+    assert not matches_filter(MERGED, {"class_id": "PTM_Video_8"})
+
+
+def test_negation_only_applies_to_the_field_itself():
+    # Excluding the chunk's own video excludes it, even though it is an alias of others
+    assert not matches_filter(MERGED, {"class_id": {"not": "PTM_Video_3"}})
+    # Excluding an alias video keeps the chunk: its own class_id is different
+    assert matches_filter(MERGED, {"class_id": {"not": "PTM_Video_7"}})
+    assert not matches_filter(MERGED, {"class_id": {"eq": "PTM_Video_7", "not": "PTM_Video_3"}})
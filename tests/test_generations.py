@@ -0,0 +1,59 @@
+"""Tests for per-generation data file paths and the live-generation manifest."""
+
+import dataclasses
+import os
+
+import pytest
+
+from src import generations
+from src.config import SETTINGS
+
+GENERATION = "kb_vectors_v20250101T120000"
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    settings = dataclasses.replace(
+        SETTINGS,
+        chunk_store_path=str(tmp_path / "chunk_store.sqlite"),
+        sparse_index_path=str(tmp_path / "sparse_index.npz"),
+        summary_index_path=str(tmp_path / "summary_index.npz"),
+        ingest_manifest_path=str(tmp_path / "ingest_manifest.json"),
+    )
+    monkeypatch.setattr(generations, "SETTINGS", settings)
+    monkeypatch.setattr(generations, "_live_cache", (None, None))
+    return tmp_path
+
+
+def test_generation_path():
+    assert generations.generation_path("./data/chunk_store.sqlite", GENERATION) == \
+        os.path.join("data", "chunk_store_v20250101T120000.sqlite")
+    assert generations.generation_path("./data/chunk_store.sqlite", "kb_vectors") == "./data/chunk_store.sqlite"
+    assert generations.generation_path("./data/chunk_store.sqlite", None) == "./data/chunk_store.sqlite"
+
+
+def test_live_path_follows_the_manifest(data_dir):
+    assert generations.live_generation() is None
+    assert generations.live_path("chunk_store_path") == str(data_dir / "chunk_store.sqlite")
+
+    generations.save_manifest({"collection": GENERATION})
+    assert generations.live_generation() == GENERATION
+    assert generations.live_path("sparse_index_path") == str(data_dir / "sparse_index_v20250101T120000.npz")
+    assert not (data_dir / "ingest_manifest.json.tmp").exists()
+
+    with pytest.raises(ValueError):
+        generations.live_path("ingest_manifest_path")
+
+
+def test_remove_generation_files(data_dir):
+    paths = generations.generation_paths(GENERATION)
+    created = list(paths.values()) + [paths["chunk_store_path"] + "-wal"]
+    for path in created:
+        open(path, "w").close()
+    (data_dir / "chunk_store.sqlite").touch()
+
+    assert sorted(generations.remove_generation_files(GENERATION)) == sorted(created)
+    assert not any(os.path.exists(path) for path in created)
+    # Unversioned collections never delete the configured paths
+    assert generations.remove_generation_files("kb_vectors") == []
+    assert (data_dir / "chunk_store.sqlite").exists()
@@ -0,0 +1,179 @@
+"""Tests for the ingest journal and resumable ingestion runs."""
+
+import dataclasses
+import json
+
+import numpy as np
+import pytest
+
+from src import advanced_ingest, generations
+from src.config import SETTINGS
+from src.ingest_journal import IngestJournal, file_signature
+
+DIM = 8
+
+
+def test_journal_round_trip(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = IngestJournal(path)
+    assert not journal.resumable
+
+    journal.start({"collection": "kb_test", "max_chunk_words": 100})
+    journal.file_done("a.txt", "sig-a", [1, 2])
+    journal.batch_done([1])
+    journal.batch_failed([2], "timeout")
+    journal.close()
+
+    replayed = IngestJournal(path)
+    assert replayed.resumable
+    assert replayed.run["collection"] == "kb_test"
+    assert replayed.run["max_chunk_words"] == 100
+    assert replayed.done_ids == {1}
+    assert replayed.failed_batches == 1
+    assert replayed.completed_file("a.txt", "sig-a") == [1, 2]
+    assert replayed.completed_file("a.txt", "sig-changed") is None
+    assert replayed.completed_file("b.txt", "sig-b") is None
+
+    replayed.finish({"status": "success"})
+    replayed.close()
+    assert not IngestJournal(path).resumable
+
+
+def test_torn_last_record_is_ignored(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = IngestJournal(path)
+    journal.start({"collection": "kb_test"})
+    journal.batch_done([1, 2])
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "batch", "ids": [3')
+
+    replayed = IngestJournal(path)
+    assert replayed.done_ids == {1, 2}
+    assert replayed.resumable
+
+
+def test_start_discards_the_previous_run(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = IngestJournal(path)
+    journal.start({"collection": "old"})
+    journal.file_done("a.txt", "sig-a", [1])
+    journal.start({"collection": "new"})
+    journal.close()
+
+    records = [json.loads(line) for line in open(path, encoding="utf-8")]
+    assert [r["type"] for r in records] == ["run"]
+    assert IngestJournal(path).files == {}
+
+
+def test_file_signature_tracks_changes(tmp_path):
+    first, second = tmp_path / "a.txt", tmp_path / "b.pdf"
+    first.write_text("one")
+    signature = file_signature([first, second])
+    assert signature == file_signature([second, first])
+
+    second.write_text("two")
+    with_pdf = file_signature([first, second])
+    assert with_pdf != signature
+
+    first.write_text("one, edited")
+    assert file_signature([first, second]) != with_pdf
+
+
+class _FakeEmbeddingModel:
+    """Deterministic embedder that fails on chunks containing ``fail_on`` while it is set."""
+
+    fail_on = None
+
+    def __init__(self, model_name, **kwargs):
+        pass
+
+    def get_embedding_dimension(self):
+        return DIM
+
+    def encode(self, texts, batch_size=32):
+        if _FakeEmbeddingModel.fail_on and any(_FakeEmbeddingModel.fail_on in t for t in texts):
+            raise RuntimeError("embedding server unavailable")
+        rows = [np.random.default_rng(abs(hash(t)) % 2**32).normal(size=DIM) for t in texts]
+        return np.asarray(rows, dtype="float32")
+
+
+@pytest.fixture
+def kb(tmp_path, monkeypatch):
+    qdrant_client = pytest.importorskip("qdrant_client")
+
+    root = tmp_path / "kb"
+    root.mkdir()
+    for number, topic in ((1, "yield curve"), (2, "ATRP sizing POISON"), (3, "china credit")):
+        words = " ".join(f"{topic} word{i}" for i in range(30))
+        (root / f"PTM Video {number} - Lesson.txt").write_text(words, encoding="utf-8")
+
+    data = tmp_path / "data"
+    settings = dataclasses.replace(
+        SETTINGS,
+        batch_size=2,
+        max_chunk_words=20,
+        chunk_overlap_words=5,
+        parse_isolation=False,
+        ingest_spreadsheets=False,
+        dedup_enabled=False,
+        transcript_compaction=False,
+        chunk_store_path=str(data / "chunk_store.sqlite"),
+        sparse_index_path=str(data / "sparse_index.npz"),
+        summary_index_path=str(data / "summary_index.npz"),
+        ingest_manifest_path=str(data / "ingest_manifest.json"),
+        ingest_journal_path=str(data / "ingest_journal.jsonl"),
+    )
+    client = qdrant_client.QdrantClient(":memory:")
+    for module in (advanced_ingest, generations):
+        monkeypatch.setattr(module, "SETTINGS", settings)
+    monkeypatch.setattr(generations, "_live_cache", (None, None))
+    monkeypatch.setattr(advanced_ingest, "EmbeddingModel", _FakeEmbeddingModel)
+    monkeypatch.setattr(advanced_ingest, "connect_from_settings", lambda settings: client)
+    monkeypatch.setattr(advanced_ingest.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(_FakeEmbeddingModel, "fail_on", None)
+    return root, client, settings
+
+
+def test_failed_batches_are_reported_and_resumed(kb):
+    root, client, settings = kb
+
+    _FakeEmbeddingModel.fail_on = "POISON"
+    stats = advanced_ingest.ingest_advanced(str(root), "kb_test", blue_green=False, max_retries=1)
+    assert stats["failed_batches"] > 0
+    failed = set(stats["failed_chunk_ids"])
+    assert failed
+    assert client.count("kb_test").count == stats["total_chunks"] - len(failed)
+
+    # The run stays resumable, with the failed chunks missing from the journal
+    journal = IngestJournal(settings.ingest_journal_path)
+    assert journal.resumable
+    assert journal.failed_batches >= stats["failed_batches"]
+    assert not failed & journal.done_ids
+    assert len(journal.files) == 3
+
+    _FakeEmbeddingModel.fail_on = None
+    resumed = advanced_ingest.ingest_advanced(str(root), "kb_test", blue_green=False, resume=True)
+    assert resumed["resumed"]
+    assert resumed["reused_files"] == 3
+    assert resumed["skipped_chunks"] == stats["total_chunks"] - len(failed)
+    assert resumed["failed_batches"] == 0
+    assert client.count("kb_test").count == resumed["total_chunks"] == stats["total_chunks"]
+    assert not IngestJournal(settings.ingest_journal_path).resumable
+
+
+def test_resume_refuses_changed_settings(kb, monkeypatch):
+    root, _, settings = kb
+
+    _FakeEmbeddingModel.fail_on = "POISON"
+    advanced_ingest.ingest_advanced(str(root), "kb_test", blue_green=False, max_retries=0)
+
+    monkeypatch.setattr(advanced_ingest, "SETTINGS", dataclasses.replace(settings, max_chunk_words=50))
+    with pytest.raises(RuntimeError, match="max_chunk_words"):
+        advanced_ingest.ingest_advanced(str(root), "kb_test", blue_green=False, resume=True)
+
+
+def test_resume_without_an_unfinished_run(kb):
+    root, _, _ = kb
+    with pytest.raises(RuntimeError, match="No unfinished ingestion run"):
+        advanced_ingest.ingest_advanced(str(root), "kb_test", blue_green=False, resume=True)
@@ -0,0 +1,99 @@
+"""Tests for the memory-mapped local vector index."""
+
+import numpy as np
+import pytest
+
+from src.index_qdrant import matches_filter
+from src.local_index import LocalVectorIndex, export_collection
+
+DIM = 16
+COUNT = 300
+
+
+def _payload(i):
+    return {"class_id": f"PTM_Video_{i % 10}", "video_number": i % 10, "file_name": f"video_{i % 10}.txt",
+            "chunk_index": i // 10, "source": "pdf" if i % 3 == 0 else "transcript"}
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    return np.random.default_rng(7).normal(size=(COUNT, DIM)).astype("float32")
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory, vectors):
+    qdrant_client = pytest.importorskip("qdrant_client")
+    from qdrant_client.http import models
+
+    client = qdrant_client.QdrantClient(":memory:")
+    client.create_collection(
+        "kb_test", vectors_config=models.VectorParams(size=DIM, distance=models.Distance.COSINE)
+    )
+    client.upsert("kb_test", points=[
+        models.PointStruct(id=i + 1, vector=vectors[i].tolist(), payload=_payload(i)) for i in range(COUNT)
+    ])
+    out_dir = tmp_path_factory.mktemp("local") / "index"
+    manifest = export_collection(client, "kb_test", out_dir, batch_size=64)
+    assert (manifest["count"], manifest["dim"]) == (COUNT, DIM)
+    return LocalVectorIndex(out_dir)
+
+
+def _brute_force(vectors, query, top_k, keep=None):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit @ (query / np.linalg.norm(query))
+    rows = [r for r in np.argsort(-scores) if keep is None or keep[r]]
+    return [int(r) + 1 for r in rows[:top_k]], scores
+
+
+def test_top_k_matches_brute_force(index, vectors):
+    rng = np.random.default_rng(11)
+    for _ in range(20):
+        query = rng.normal(size=DIM).astype("float32")
+        expected, scores = _brute_force(vectors, query, 10)
+        hits = index.search(query.tolist(), top_k=10)
+        assert [hit.id for hit in hits] == expected
+        assert [hit.score for hit in hits] == pytest.approx([scores[i - 1] for i in expected], abs=1e-5)
+
+
+@pytest.mark.parametrize("filters", [
+    {"class_id": "PTM_Video_3"},
+    {"video_number": {"gte": 2, "lte": 4}, "source": "pdf"},
+    {"class_id": {"not": "PTM_Video_0"}},
+])
+def test_filtered_search_matches_masked_brute_force(index, vectors, filters):
+    keep = np.array([matches_filter(_payload(i), filters) for i in range(COUNT)])
+    query = np.random.default_rng(3).normal(size=DIM).astype("float32")
+    expected, _ = _brute_force(vectors, query, 8, keep)
+    hits = index.search(query.tolist(), top_k=8, filters=filters)
+    assert [hit.id for hit in hits] == expected
+    assert all(matches_filter(hit.payload, filters) for hit in hits)
+
+
+def test_filter_with_fewer_matches_than_top_k(index, vectors):
+    filters = {"class_id": "PTM_Video_5", "chunk_index": {"lt": 3}}
+    hits = index.search(vectors[0].tolist(), top_k=10, filters=filters)
+    assert sorted(hit.id for hit in hits) == [6, 16, 26]
+    assert index.search(vectors[0].tolist(), top_k=5, filters={"class_id": "nope"}) == []
+
+
+def test_payload_fields_vectors_and_lookups(index, vectors):
+    hit = index.search(vectors[41].tolist(), top_k=1, with_payload=["class_id"], with_vectors=True)[0]
+    assert hit.id == 42
+    assert hit.payload == {"class_id": "PTM_Video_1"}
+    assert np.allclose(hit.vector, vectors[41] / np.linalg.norm(vectors[41]), atol=1e-6)
+
+    assert set(index.vectors_for([42, 9999])) == {"42"}
+    found = index.by_position([("PTM_Video_1", "video_1.txt", 4), ("PTM_Video_1", "video_1.txt", 99)])
+    assert [h.id for h in found] == [42]
+
+
+def test_invalid_queries(index):
+    with pytest.raises(ValueError):
+        index.search([0.0] * (DIM + 1), top_k=3)
+    with pytest.raises(ValueError):
+        index.search([0.0] * DIM, top_k=0)
+
+
+def test_missing_index(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        LocalVectorIndex(tmp_path / "missing")
@@ -0,0 +1,132 @@
+"""Tests for crash-isolated parsing and the parse quarantine."""
+
+import os
+import time
+
+import pytest
+
+from src import parse_worker
+from src.parse_worker import IsolatedParser, ParseCrashed, ParseQuarantine, ParseTimeout
+
+_peak_rss = 0.0
+
+
+def _fake_parse(file_path):
+    """Stand-in for parse_file_segments whose behaviour is chosen by the file's content."""
+    global _peak_rss
+    text = file_path.read_text(encoding="utf-8")
+    _peak_rss = 10_000.0 if text == "BIG" else 0.0
+    if text == "HANG":
+        time.sleep(3600)
+    if text == "CRASH":
+        os._exit(1)
+    if text == "ERROR":
+        raise ValueError("not a valid document")
+    return [(f"{text} (pid {os.getpid()})", {"page_number": 1})]
+
+
+def _fake_worker(conn, memory_mb):
+    """The real worker loop, with the fake parser and no address-space limit."""
+    from src import file_parsers
+
+    file_parsers.parse_file_segments = _fake_parse
+    file_parsers.get_file_metadata = lambda file_path: {"file_name": file_path.name}
+    parse_worker._limit_memory = lambda memory_mb: None
+    parse_worker._peak_rss_mb = lambda: _peak_rss
+    parse_worker._worker_main(conn, memory_mb)
+
+
+@pytest.fixture
+def parser(monkeypatch, tmp_path):
+    # The spawned worker looks its target up by module and name, so it finds this module's fake
+    monkeypatch.setattr(parse_worker, "_worker_main", _fake_worker)
+    with IsolatedParser(timeout=2.0, memory_mb=1024, quarantine=ParseQuarantine(tmp_path / "q.json")) as parser:
+        yield parser
+
+
+def _document(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def _text(parsed):
+    segments, _ = parsed
+    return segments[0][0]
+
+
+def _pid(text):
+    return text.rsplit("pid ", 1)[1].rstrip(")")
+
+
+def test_worker_is_reused_between_files(parser, tmp_path):
+    segments, metadata = parser.parse(_document(tmp_path, "a.pdf", "first"))
+    first = segments[0][0]
+    second = _text(parser.parse(_document(tmp_path, "b.pdf", "second")))
+    assert first.startswith("first") and second.startswith("second")
+    assert segments[0][1] == {"page_number": 1}
+    assert metadata == {"file_name": "a.pdf"}
+    assert _pid(first) == _pid(second) != str(os.getpid())
+    assert parser.workers_started == 1
+
+
+def test_hanging_file_times_out_and_the_worker_is_replaced(parser, tmp_path):
+    parser.parse(_document(tmp_path, "ok.pdf", "ok"))
+    started = time.monotonic()
+    with pytest.raises(ParseTimeout):
+        parser.parse(_document(tmp_path, "hang.pdf", "HANG"))
+    assert time.monotonic() - started < 10
+
+    assert _text(parser.parse(_document(tmp_path, "next.pdf", "next"))).startswith("next")
+    assert parser.workers_started == 2
+
+
+def test_crashed_worker_is_replaced(parser, tmp_path):
+    with pytest.raises(ParseCrashed):
+        parser.parse(_document(tmp_path, "crash.pdf", "CRASH"))
+    assert _text(parser.parse(_document(tmp_path, "next.pdf", "next"))).startswith("next")
+    assert parser.workers_started == 2
+
+
+def test_worker_is_recycled_near_the_memory_limit(parser, tmp_path):
+    big = _text(parser.parse(_document(tmp_path, "big.pdf", "BIG")))
+    after = _text(parser.parse(_document(tmp_path, "after.pdf", "after")))
+    assert _pid(big) != _pid(after)
+    assert parser.workers_started == 2
+
+
+def test_parser_errors_keep_the_worker_and_skip_quarantine(parser, tmp_path):
+    bad = _document(tmp_path, "bad.pdf", "ERROR")
+    with pytest.raises(RuntimeError, match="not a valid document"):
+        parser.parse(bad)
+    assert parser.parse_or_skip(bad) is None
+    assert parser.quarantine.reason(bad) is None
+    assert parser.workers_started == 1
+
+
+def test_quarantined_file_is_skipped_until_it_changes(parser, tmp_path):
+    path = _document(tmp_path, "hang.pdf", "HANG")
+    assert parser.parse_or_skip(path) is None
+    assert "exceeded" in parser.quarantine.reason(path)
+    # The quarantine is persisted for later runs
+    assert ParseQuarantine(tmp_path / "q.json").reason(path) is not None
+
+    started = parser.workers_started
+    assert parser.parse_or_skip(path) is None
+    assert parser.workers_started == started
+
+    path.write_text("fixed", encoding="utf-8")
+    assert _text(parser.parse_or_skip(path)).startswith("fixed")
+    assert parser.quarantine.reason(path) is None
+    assert ParseQuarantine(tmp_path / "q.json").entries == {}
+
+
+def test_unreadable_quarantine_starts_empty(tmp_path):
+    path = tmp_path / "q.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert ParseQuarantine(path).entries == {}
+
+
+def test_invalid_timeout():
+    with pytest.raises(ValueError):
+        IsolatedParser(timeout=0)
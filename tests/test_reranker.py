@@ -0,0 +1,143 @@
+"""Tests for budgeted cross-encoder reranking and MMR ordering."""
+
+import dataclasses
+
+import pytest
+
+from src import query
+from src import reranker as reranker_module
+from src.config import SETTINGS
+from src.query import maximal_marginal_relevance
+from src.reranker import CrossEncoderReranker, RerankResult, ranking_change
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _FakeCrossEncoder:
+    """Scores a pair by the number in its text; each pair costs ``pair_ms`` on the clock."""
+
+    def __init__(self, clock, pair_ms=10.0):
+        self.clock = clock
+        self.pair_ms = pair_ms
+        self.calls = []
+
+    def predict(self, pairs, batch_size=None):
+        self.calls.append(len(pairs))
+        self.clock.now += self.pair_ms * len(pairs) / 1000
+        return [float(text.split()[-1]) for _, text in pairs]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(reranker_module.time, "perf_counter", clock)
+    return clock
+
+
+def _reranker(clock, budget_ms, **kwargs):
+    reranker = CrossEncoderReranker(budget_ms=budget_ms, **kwargs)
+    reranker.model = _FakeCrossEncoder(clock)
+    return reranker
+
+
+def test_scores_everything_within_budget(clock):
+    reranker = _reranker(clock, budget_ms=1000)
+    result = reranker.rerank("q", [10, 11, 12], ["chunk 1", "chunk 3", "chunk 2"])
+    assert result.order == [1, 2, 0]
+    assert (result.scored, result.skipped) == (3, 0)
+
+
+def test_budget_ordering(clock):
+    # 10ms per pair and a 100ms budget: the 4-pair probe, then one batch of 6
+    reranker = _reranker(clock, budget_ms=100, batch_size=16)
+    texts = [f"chunk {score}" for score in range(20)]
+    result = reranker.rerank("q", list(range(20)), texts)
+
+    assert reranker.model.calls == [4, 6]
+    assert (result.scored, result.skipped) == (10, 10)
+    # Scored candidates by descending score, then the rest in retrieval order
+    assert result.order == list(range(9, -1, -1)) + list(range(10, 20))
+    assert set(result.scores) == set(range(10))
+
+
+def test_cached_scores_are_not_recomputed(clock):
+    reranker = _reranker(clock, budget_ms=1000)
+    reranker.rerank("Which ATRP?", [1, 2], ["chunk 1", "chunk 2"])
+    result = reranker.rerank("which  atrp?", [1, 2, 3], ["chunk 1", "chunk 2", "chunk 5"])
+    assert (result.cached, result.scored) == (2, 1)
+    assert reranker.model.calls == [2, 1]
+    assert result.order == [2, 1, 0]
+
+
+def test_max_candidates_limits_scoring(clock):
+    reranker = _reranker(clock, budget_ms=1000, max_candidates=2)
+    result = reranker.rerank("q", [1, 2, 3], ["chunk 1", "chunk 2", "chunk 9"])
+    assert result.order == [1, 0, 2]
+    assert 2 not in result.scores
+
+
+def test_ranking_change():
+    change = ranking_change([1, 2, 3, 4], [3, 1, 2, 4], top_k=2)
+    assert change["promoted"] == 1
+    assert change["top1_changed"]
+    assert ranking_change([1, 2, 3], [1, 2, 3], top_k=2)["kendall_tau"] == 1.0
+
+
+def test_mmr_skips_near_duplicates():
+    relevance = [1.0, 0.99, 0.5]
+    vectors = [[1.0, 0.0], [1.0, 0.01], [0.0, 1.0]]
+    assert maximal_marginal_relevance(relevance, vectors, k=2, lambda_mult=0.5) == [0, 2]
+    assert maximal_marginal_relevance(relevance, vectors, k=2, lambda_mult=1.0) == [0, 1]
+
+
+def test_mmr_rejects_bad_inputs():
+    with pytest.raises(ValueError):
+        maximal_marginal_relevance([1.0, 0.5], [[1.0, 0.0]], k=1)
+    with pytest.raises(ValueError):
+        maximal_marginal_relevance([1.0], [[1.0]], k=1, lambda_mult=1.5)
+
+
+class _FakeBudgetReranker:
+    """Reranker that scores only the first candidates, as if the budget ran out."""
+
+    def __init__(self, logits):
+        self.logits = logits
+
+    def rerank(self, question, ids, texts):
+        scores = dict(enumerate(self.logits))
+        order = sorted(scores, key=scores.get, reverse=True) + list(range(len(scores), len(ids)))
+        return RerankResult(order, scores, len(scores), 0, len(ids) - len(scores), 1.0)
+
+
+def test_mmr_after_reranking_never_promotes_unscored_candidates(monkeypatch):
+    # Three scored near-duplicates, then two unscored candidates pointing elsewhere
+    vectors = {"a": [1.0, 0.0, 0.0], "b": [1.0, 0.02, 0.0], "c": [1.0, 0.0, 0.02], "d": [0.0, 1.0, 0.0], "e": [0.0, 0.0, 1.0]}
+    retrieved = [(key, 0.9 - i / 10, {"text": key, "chunk_index": i}) for i, key in enumerate(vectors)]
+
+    def dense_search(client, collection, question, limit, filters, options, found=None):
+        if found is not None:
+            found.update(vectors)
+        return retrieved[:limit]
+
+    monkeypatch.setattr(query, "connect_from_settings", lambda settings: None)
+    monkeypatch.setattr(query, "_dense_search", dense_search)
+    monkeypatch.setattr(query, "get_chunk_store", lambda: None)
+    monkeypatch.setattr(query, "get_reranker", lambda: _FakeBudgetReranker([8.0, 7.9, 2.0]))
+    monkeypatch.setattr(query, "SETTINGS", dataclasses.replace(
+        SETTINGS, search_backend="qdrant", hierarchical_retrieval=False, mmr_candidates=5, rerank_candidates=5
+    ))
+
+    results = query.run_query("q", top_k=4, mode="dense", mmr=True, mmr_lambda=0.7, rerank=True, neighbors=0)
+    # Banding the unscored candidates below the scored ones still let "d" jump ahead of "c"
+    assert [r.result_id for r in results] == ["a", "b", "c", "d"]
+    assert [r.payload["retrieval_score"] for r in results[2:]] == [pytest.approx(0.7), pytest.approx(0.6)]
+
+    # Without the reranker MMR runs over every candidate and skips the duplicates
+    plain = query.run_query("q", top_k=4, mode="dense", mmr=True, mmr_lambda=0.7, rerank=False, neighbors=0)
+    assert [r.result_id for r in plain][:3] == ["a", "d", "e"]
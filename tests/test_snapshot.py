@@ -0,0 +1,113 @@
+"""Tests for exporting and loading index snapshots."""
+
+import dataclasses
+import json
+
+import numpy as np
+import pytest
+
+from src import generations, snapshot
+from src.chunk_store import ChunkStore
+from src.config import SETTINGS
+from src.local_index import LocalVectorIndex
+
+qdrant_client = pytest.importorskip("qdrant_client")
+from qdrant_client.http import models  # noqa: E402
+
+DIM = 8
+COUNT = 20
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    settings = dataclasses.replace(
+        SETTINGS,
+        collection="kb_test",
+        data_dir=str(tmp_path),
+        chunk_store_path=str(tmp_path / "chunk_store.sqlite"),
+        sparse_index_path=str(tmp_path / "sparse_index.npz"),
+        summary_index_path=str(tmp_path / "summary_index.npz"),
+        ingest_manifest_path=str(tmp_path / "ingest_manifest.json"),
+        local_index_dir=str(tmp_path / "local_index"),
+        qdrant_blue_green=False,
+    )
+    for module in (generations, snapshot):
+        monkeypatch.setattr(module, "SETTINGS", settings)
+    monkeypatch.setattr(generations, "_live_cache", (None, None))
+    return settings
+
+
+@pytest.fixture
+def archive(settings, tmp_path):
+    """A snapshot of a small collection, built with the configured model and chunking."""
+    vectors = np.random.default_rng(5).normal(size=(COUNT, DIM)).astype("float32")
+    client = qdrant_client.QdrantClient(":memory:")
+    client.create_collection(
+        "kb_test", vectors_config=models.VectorParams(size=DIM, distance=models.Distance.COSINE)
+    )
+    client.upsert("kb_test", points=[
+        models.PointStruct(id=i + 1, vector=vectors[i].tolist(), payload={"class_id": f"PTM_Video_{i}"})
+        for i in range(COUNT)
+    ])
+    with ChunkStore(settings.chunk_store_path) as store:
+        store.put_many((i + 1, f"chunk {i + 1}", {"chunk_index": i}) for i in range(COUNT))
+    with open(settings.ingest_manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"collection": "kb_test", "embedding_model": settings.embedding_model,
+                   "max_chunk_words": settings.max_chunk_words,
+                   "chunk_overlap_words": settings.chunk_overlap_words}, f)
+
+    path = tmp_path / "kb_snapshot.tar.gz"
+    manifest = snapshot.export_snapshot(client, "kb_test", path)
+    assert (manifest["count"], manifest["dim"]) == (COUNT, DIM)
+    return path
+
+
+def test_local_round_trip_writes_a_new_generation(settings, archive):
+    result = snapshot.load_snapshot(archive, backend="local")
+
+    # The manifest names a collection generation, not the local index directory
+    location = result["location"]
+    assert location.startswith("kb_test_v")
+    assert generations.live_generation() == location
+
+    index = LocalVectorIndex(settings.local_index_dir)
+    assert len(index) == COUNT
+    with ChunkStore(generations.live_path("chunk_store_path"), readonly=True) as store:
+        assert store.count() == COUNT
+        assert store.get_records([3]) == {"3": ("chunk 3", {"chunk_index": 2})}
+
+
+def test_in_place_load_drops_stale_records(settings, archive):
+    with ChunkStore(settings.chunk_store_path) as store:
+        store.put_many([(999, "from an older index", {})])
+
+    target = qdrant_client.QdrantClient(":memory:")
+    result = snapshot.load_snapshot(archive, backend="qdrant", client=target)
+
+    assert result["location"] == "kb_test"
+    assert target.count("kb_test").count == COUNT
+    with ChunkStore(settings.chunk_store_path, readonly=True) as store:
+        assert store.count() == COUNT
+        assert store.get_texts([999]) == {}
+
+
+def test_incompatible_fingerprint_is_refused(settings, archive, monkeypatch):
+    rechunked = dataclasses.replace(settings, max_chunk_words=settings.max_chunk_words + 100)
+    monkeypatch.setattr(snapshot, "SETTINGS", rechunked)
+
+    with pytest.raises(ValueError, match="fingerprint"):
+        snapshot.load_snapshot(archive, backend="local")
+    assert generations.live_generation() == "kb_test"
+
+    # force loads it anyway
+    assert snapshot.load_snapshot(archive, backend="local", force=True)["manifest"]["count"] == COUNT
+
+
+def test_fingerprint_covers_model_and_chunking():
+    base = snapshot.index_fingerprint("model-a", 384, 1000, 200)
+    assert base == snapshot.index_fingerprint("model-a", 384, 1000, 200)
+    assert len({base,
+                snapshot.index_fingerprint("model-b", 384, 1000, 200),
+                snapshot.index_fingerprint("model-a", 768, 1000, 200),
+                snapshot.index_fingerprint("model-a", 384, 800, 200),
+                snapshot.index_fingerprint("model-a", 384, 1000, 100)}) == 5
@@ -0,0 +1,53 @@
+"""Tests for the BM25 index and reciprocal-rank fusion."""
+
+import pytest
+
+from src.sparse_index import BM25Index, reciprocal_rank_fusion
+
+
+def test_rrf_scores_sum_reciprocal_ranks():
+    fused = dict(reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60))
+    assert fused["a"] == pytest.approx(1 / 61)
+    assert fused["b"] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused["c"] == pytest.approx(1 / 63)
+    assert fused["d"] == pytest.approx(1 / 62)
+
+
+def test_rrf_rewards_agreement_between_legs():
+    # "b" is second in both lists and beats each list's own winner
+    fused = reciprocal_rank_fusion([["a", "b"], ["c", "b"]])
+    assert fused[0][0] == "b"
+    assert [score for _, score in fused] == sorted((score for _, score in fused), reverse=True)
+
+
+def test_rrf_single_ranking_keeps_order():
+    assert [item for item, _ in reciprocal_rank_fusion([[3, 1, 2]])] == [3, 1, 2]
+
+
+def test_rrf_empty_input():
+    assert reciprocal_rank_fusion([]) == []
+    assert reciprocal_rank_fusion([[], []]) == []
+
+
+def test_rrf_larger_k_flattens_top_ranks():
+    def top_gap(k):
+        fused = reciprocal_rank_fusion([["a", "b"]], k=k)
+        return fused[0][1] - fused[1][1]
+
+    assert top_gap(1) > top_gap(60)
+
+
+def test_bm25_ranks_exact_terms(tmp_path):
+    index = BM25Index.build(
+        [11, 12, 13],
+        ["the ATRP shows average true range percent",
+         "yields and the curve inverted",
+         "ATRP ATRP for position sizing"],
+    )
+    hits = index.search("ATRP", top_k=5)
+    assert [point_id for point_id, _ in hits] == [13, 11]
+    assert index.search("caixin", top_k=5) == []
+
+    path = tmp_path / "sparse.npz"
+    index.save(path)
+    assert BM25Index.load(path).search("ATRP", top_k=5) == hits
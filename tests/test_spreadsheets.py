@@ -0,0 +1,104 @@
+"""Tests for streaming spreadsheet summaries."""
+
+from datetime import datetime
+
+import pytest
+
+from src.advanced_ingest import process_spreadsheet_file
+from src.config import SETTINGS
+from src.spreadsheets import ColumnStats, column_letter, sheet_executor, summarize_workbook
+
+openpyxl = pytest.importorskip("openpyxl")
+
+LONG_SHEET = "Benchmark yields, curve spreads"
+
+
+def _workbook(path, sheets):
+    book = openpyxl.Workbook()
+    book.remove(book.active)
+    for name, rows in sheets:
+        sheet = book.create_sheet(name)
+        for row in rows:
+            sheet.append(row)
+    book.save(path)
+    return path
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    yields = [[datetime(2024, 1, day), 4.0 + day / 10, 3.5, "DE" if day % 2 else "US"] for day in range(1, 11)]
+    return _workbook(tmp_path / "Yields.xlsx", [
+        ("Yields", [["Benchmark yields"], [], ["Date", "10yr", "2yr", "Country"], *yields]),
+        ("Empty", []),
+        ("Raw", [[1, 2], [3, 4], [5, 6]]),
+    ])
+
+
+def test_column_letters():
+    assert [column_letter(i) for i in (0, 25, 26, 27, 701, 702)] == ["A", "Z", "AA", "AB", "ZZ", "AAA"]
+
+
+def test_column_stats_kinds():
+    numeric = ColumnStats("10yr")
+    for value in (3.0, 5.0, 4.0, "n/a"):
+        numeric.add(value)
+    assert numeric.kind == "text"  # 3 of 4 values are numbers, under the 80% majority
+    numeric.add(6.0)
+    assert numeric.kind == "numeric"
+    assert numeric.describe() == "10yr: mean=4.5, min=3, max=6, first=3, last=6"
+
+
+def test_sheet_summaries(workbook):
+    chunks = summarize_workbook(workbook, {"class_id": "PTM_Video_7"})
+    assert [c.metadata["sheet"] for c in chunks] == ["Yields", "Raw"]
+
+    yields = chunks[0]
+    assert yields.metadata == {
+        "class_id": "PTM_Video_7", "source": "excel", "sheet": "Yields", "sheet_index": 0,
+        "rows": 10, "columns": 4, "header_row": 3, "numeric_columns": ["10yr", "2yr"],
+    }
+    lines = yields.text.splitlines()
+    assert lines[0] == "Excel Sheet 'Yields' Summary (Yields.xlsx):"
+    assert "Dimensions: 10 rows × 4 columns" in lines
+    assert "  Date: 2024-01-01 to 2024-01-10" in lines
+    assert "  Country: e.g. DE, US" in lines
+    assert "  10yr: mean=4.55, min=4.1, max=5, first=4.1, last=5" in lines
+    assert "  2yr: mean=3.5, min=3.5, max=3.5, first=3.5, last=3.5" in lines
+    assert "2024-01-01,4.1,3.5,DE" in lines
+
+    raw = chunks[1]
+    assert raw.metadata["header_row"] is None
+    assert raw.metadata["sheet_index"] == 2
+    assert "  Column A: mean=3, min=1, max=5, first=1, last=5" in raw.text.splitlines()
+
+
+def test_parallel_summaries_match_in_process(workbook):
+    executor = sheet_executor(2)
+    try:
+        parallel = summarize_workbook(workbook, executor=executor)
+    finally:
+        executor.shutdown()
+    in_process = summarize_workbook(workbook)
+    assert [(c.text, c.metadata) for c in parallel] == [(c.text, c.metadata) for c in in_process]
+
+
+def test_invalid_workbooks(tmp_path):
+    with pytest.raises(ValueError):
+        summarize_workbook(tmp_path / "data.csv")
+    broken = tmp_path / "broken.xlsx"
+    broken.write_text("not a workbook")
+    with pytest.raises(ValueError):
+        summarize_workbook(broken)
+
+
+def test_sheet_chunk_ids_include_file_and_sheet(tmp_path):
+    # Same long sheet name and contents in two workbooks of one video: the text prefix is identical
+    rows = [["Tenor", "Yield"], ["10yr", 4.2]]
+    first = process_spreadsheet_file(
+        _workbook(tmp_path / "Yields_DE_daily_2024.xlsx", [(LONG_SHEET, rows)]), "PTM_Video_7", "7", SETTINGS
+    )
+    second = process_spreadsheet_file(
+        _workbook(tmp_path / "Yields_DE_daily_2025.xlsx", [(LONG_SHEET, rows)]), "PTM_Video_7", "7", SETTINGS
+    )
+    assert first[0][0][:64] == second[0][0][:64]
+    assert first[0][1]["id"] != second[0][1]["id"]
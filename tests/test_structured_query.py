@@ -0,0 +1,143 @@
+"""Tests for time-series question parsing and structured routing."""
+
+import threading
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src import rag_query, structured_query
+from src.structured_query import StructuredQueryEngine, answer_question, parse_question
+from src.timeseries_store import TimeSeriesStore
+
+
+@pytest.mark.parametrize("question, kind, start, end", [
+    ("what was the ISM manufacturing index in April 2021", "range", date(2021, 4, 1), date(2021, 4, 30)),
+    ("German 10 year yield on 2020-03-16", "day", date(2020, 3, 16), date(2020, 3, 16)),
+    ("ISM on 3/15/2021", "day", date(2021, 3, 15), date(2021, 3, 15)),
+    ("ISM on 15th March 2021", "day", date(2021, 3, 15), date(2021, 3, 15)),
+    ("US CPI between March 2020 and June 2020", "range", date(2020, 3, 1), date(2020, 6, 30)),
+    ("Caixin PMI Q3 2019", "range", date(2019, 7, 1), date(2019, 9, 30)),
+    ("UMCSI for 2018", "range", date(2018, 1, 1), date(2018, 12, 31)),
+    ("US CPI in Feb 2020", "range", date(2020, 2, 1), date(2020, 2, 29)),
+])
+def test_date_ranges(question, kind, start, end):
+    parsed = parse_question(question)
+    assert parsed is not None
+    assert (parsed.dates.kind, parsed.dates.start, parsed.dates.end) == (kind, start, end)
+
+
+def test_dates_and_years_are_not_content_terms():
+    parsed = parse_question("German 10 year yield on 2020-03-16")
+    assert parsed.terms == ["de", "10yr", "yield"]
+
+
+def test_latest_value():
+    parsed = parse_question("latest US CPI")
+    assert parsed.dates.kind == "latest"
+    assert parsed.terms == ["us", "cpi"]
+
+
+@pytest.mark.parametrize("question", [
+    "why did yields fall in 2020",
+    "compare US CPI in 2020 and 2021",
+    "what was the value in 2020",
+    "what is a yield curve inversion",
+])
+def test_non_lookups(question):
+    assert parse_question(question) is None
+
+
+class _Recorder:
+    def __init__(self):
+        self.structured = []
+        self.retrieval = []
+
+    def structured_query(self, question, gemini_client):
+        self.structured.append(question)
+        return None
+
+    def run_query(self, question, **kwargs):
+        self.retrieval.append((question, kwargs.get("filters")))
+        return []
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = _Recorder()
+    monkeypatch.setattr(rag_query, "_run_structured_query", recorder.structured_query)
+    monkeypatch.setattr(rag_query, "run_query", recorder.run_query)
+    return recorder
+
+
+def test_routing_uses_the_bare_question(recorder):
+    rag_query.run_rag_query("latest US CPI", structured=True, history="Previous questions: why in 2008")
+    assert recorder.structured == ["latest US CPI"]
+    assert recorder.retrieval == [("latest US CPI", None)]
+
+
+def test_filtered_queries_skip_structured_routing(recorder):
+    filters = {"class_id": "PTM_Video_7"}
+    rag_query.run_rag_query("latest US CPI", structured=True, filters=filters)
+    assert recorder.structured == []
+    assert recorder.retrieval == [("latest US CPI", filters)]
+
+
+def _yields_workbook(path, two_year, ten_year):
+    openpyxl = pytest.importorskip("openpyxl")
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.title = "Yields"
+    sheet.append(["Date", "2yr", "10yr"])
+    for i, (short, long) in enumerate(zip(two_year, ten_year)):
+        sheet.append([datetime(2024, 1, 1) + timedelta(days=i), short, long])
+    book.save(path)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    kb = tmp_path / "kb"
+    kb.mkdir()
+    days = 40
+    _yields_workbook(kb / "Benchmark_Yields_DE.xlsx", [2.0 + i / 100 for i in range(days)], [2.5] * days)
+    _yields_workbook(kb / "Benchmark_Yields_JP.xlsx", [0.5] * days, [0.4 + i / 100 for i in range(days)])
+    store = TimeSeriesStore(tmp_path / "cache")
+    store.load_directory(kb)
+    return StructuredQueryEngine(store)
+
+
+def test_spread_questions_read_the_derived_series(engine):
+    latest = answer_question("latest German 2s10s spread", engine)
+    assert latest.match.name == "Benchmark_Yields_DE/Spreads/2s10s spread"
+    assert latest.values.tolist() == [pytest.approx(2.5 - 2.39)]
+    assert "negative means the curve is inverted" in latest.text
+
+    inverted = answer_question("is the JGB curve inverted now", engine)
+    assert inverted.match.name == "Benchmark_Yields_JP/Spreads/2s10s spread"
+
+    january = answer_question("DE 2s10s spread between 2024-01-10 and 2024-01-12", engine)
+    assert january.dates.tolist() == list(np.arange("2024-01-10", "2024-01-13", dtype="datetime64[D]"))
+    np.testing.assert_allclose(january.values, [0.41, 0.40, 0.39])
+
+    # The tenors themselves are still answered from the workbooks
+    assert answer_question("German 10 year yield on 2024-01-05", engine).match.name == "Benchmark_Yields_DE/Yields/10yr"
+
+
+def test_warm_up_and_first_lookup_share_one_load(monkeypatch):
+    loads = []
+    release = threading.Event()
+
+    def slow_load():
+        loads.append(threading.current_thread().name)
+        release.wait(5)
+        return "engine"
+
+    monkeypatch.setattr(structured_query, "_ENGINE", None)
+    monkeypatch.setattr(StructuredQueryEngine, "from_settings", staticmethod(slow_load))
+    thread = structured_query.warm_structured_engine()
+    while not loads:
+        thread.join(0.01)
+    threading.Timer(0.05, release.set).start()
+    assert structured_query.get_structured_engine() == "engine"
+    thread.join(5)
+    assert loads == ["structured-warmup"]
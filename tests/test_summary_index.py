@@ -0,0 +1,111 @@
+"""Tests for the video/document summary index and the first retrieval stage."""
+
+import numpy as np
+import pytest
+
+from src import query
+from src.summary_index import SummaryBuilder, SummaryIndex, build_from_points
+
+
+def _chunk(class_id, file_name, source="transcript"):
+    return {"class_id": class_id, "video_number": class_id[-1], "file_name": file_name, "source": source}
+
+
+@pytest.fixture
+def chunks():
+    """Three videos; video 2's PDF points the other way from its transcript."""
+    payloads = [
+        _chunk("PTM_Video_1", "v1.txt"), _chunk("PTM_Video_1", "v1.txt"),
+        _chunk("PTM_Video_2", "v2.txt"), _chunk("PTM_Video_2", "notes.pdf", source="pdf"),
+        _chunk("PTM_Video_3", "v3.txt"),
+    ]
+    vectors = np.array([
+        [1, 0, 0, 0], [3, 1, 0, 0],
+        [0, 1, 0, 0], [0, 0, 0, 2],
+        [0, 0, 1, 0],
+    ], dtype="float32")
+    return payloads, vectors
+
+
+def test_summaries_are_normalized_centroids(chunks):
+    payloads, vectors = chunks
+    index = SummaryBuilder()
+    index.add(payloads[:3], vectors[:3])  # batches grow the accumulator
+    index.add(payloads[3:], vectors[3:])
+    index = index.build()
+
+    assert index.groups == ["PTM_Video_1", "PTM_Video_2", "PTM_Video_3"]
+    rows = {(p["level"], p["class_id"], p.get("file_name")): i for i, p in enumerate(index.payloads)}
+    assert len(rows) == 3 + 4
+    np.testing.assert_allclose(np.linalg.norm(index.vectors, axis=1), 1.0, rtol=1e-6)
+
+    # Chunks are normalized before averaging, so a long vector doesn't outweigh a short one
+    unit = np.array([1, 0, 0, 0]) + np.array([3, 1, 0, 0]) / np.sqrt(10)
+    np.testing.assert_allclose(index.vectors[rows[("video", "PTM_Video_1", None)]], unit / np.linalg.norm(unit), rtol=1e-6)
+    np.testing.assert_allclose(index.vectors[rows[("video", "PTM_Video_2", None)]], [0, 1 / np.sqrt(2), 0, 1 / np.sqrt(2)],
+                               rtol=1e-6)
+    np.testing.assert_allclose(index.vectors[rows[("document", "PTM_Video_2", "notes.pdf")]], [0, 0, 0, 1])
+
+    video = index.payloads[rows[("video", "PTM_Video_1", None)]]
+    assert video == {"level": "video", "class_id": "PTM_Video_1", "video_number": "1", "chunks": 2}
+    assert index.payloads[rows[("document", "PTM_Video_2", "notes.pdf")]]["source"] == "pdf"
+
+    same = build_from_points(zip(payloads, vectors), batch_size=2)
+    np.testing.assert_allclose(same.vectors, index.vectors, rtol=1e-6)
+
+
+def test_select_groups_uses_the_best_summary_of_each_video(chunks):
+    index = build_from_points(zip(*chunks))
+    # The PDF alone pulls video 2 to the top
+    groups = index.select_groups([0, 0, 0.1, 1], 2)
+    assert [class_id for class_id, _ in groups] == ["PTM_Video_2", "PTM_Video_3"]
+    assert groups[0][1] == pytest.approx(1 / np.sqrt(1.01), rel=1e-5)
+
+    assert [g for g, _ in index.select_groups([0, 0, 0.1, 1], 2, {"class_id": ["PTM_Video_1", "PTM_Video_3"]})] == \
+        ["PTM_Video_3", "PTM_Video_1"]
+    # Only document rows carry a source, so a source filter scores videos by their matching documents
+    assert index.select_groups([1, 0, 0, 0], 5, {"source": "pdf"}) == [("PTM_Video_2", 0.0)]
+    # Filters on fields the summaries don't carry are left to the chunk search
+    assert len(index.select_groups([1, 0, 0, 0], 5, {"chunk_index": 3})) == 3
+
+    with pytest.raises(ValueError):
+        index.select_groups([1, 0, 0, 0], 0)
+    with pytest.raises(ValueError):
+        index.select_groups([1, 0, 0], 1)
+
+
+def test_save_and_load(chunks, tmp_path):
+    index = build_from_points(zip(*chunks))
+    path = tmp_path / "summary_index.npz"
+    index.save(path)
+    loaded = SummaryIndex.load(path)
+    np.testing.assert_array_equal(loaded.vectors, index.vectors)
+    assert loaded.payloads == index.payloads
+    with pytest.raises(FileNotFoundError):
+        SummaryIndex.load(tmp_path / "missing.npz")
+
+
+@pytest.fixture
+def stage_one(monkeypatch, tmp_path):
+    path = tmp_path / "summary_index.npz"
+    monkeypatch.setattr(query, "live_path", lambda key: str(path))
+    monkeypatch.setattr(query, "embed_query", lambda question: [0, 0, 0.1, 1])
+    monkeypatch.setattr(query, "_SUMMARY_INDEX", None)
+    monkeypatch.setattr(query, "_SUMMARY_INDEX_VERSION", None)
+    return path
+
+
+def test_search_is_flat_without_a_summary_index(stage_one):
+    filters = {"class_id": "PTM_Video_1"}
+    assert query._narrow_to_groups("what is on the pdf", filters, 2) is filters
+    assert query._narrow_to_groups("what is on the pdf", None, 2) is None
+
+
+def test_stage_one_narrows_the_chunk_filter(stage_one, chunks):
+    build_from_points(zip(*chunks)).save(stage_one)
+    assert query._narrow_to_groups("what is on the pdf", None, 2) == {"class_id": {"any": ["PTM_Video_2", "PTM_Video_3"]}}
+    # Other filters are kept for the chunk search and shape the selection: without its PDF, video 2 drops out
+    narrowed = query._narrow_to_groups("what is on the pdf", {"source": "transcript"}, 2)
+    assert narrowed == {"source": "transcript", "class_id": {"any": ["PTM_Video_3", "PTM_Video_1"]}}
+    # Asking for as many videos as the index has searches everything
+    assert query._narrow_to_groups("what is on the pdf", None, 3) is None
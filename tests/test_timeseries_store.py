@@ -0,0 +1,121 @@
+"""Tests for the fingerprint-keyed time-series cache."""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src import timeseries_store
+from src.timeseries_store import TimeSeriesStore, extract_sheet_series
+
+openpyxl = pytest.importorskip("openpyxl")
+
+START = date(2024, 1, 1)
+
+
+def _workbook(path, sheets):
+    book = openpyxl.Workbook()
+    book.remove(book.active)
+    for name, rows in sheets:
+        sheet = book.create_sheet(name)
+        for row in rows:
+            sheet.append(row)
+    book.save(path)
+    return path
+
+
+def _daily(days, value=lambda i: float(i)):
+    return [[datetime.combine(START + timedelta(days=i), datetime.min.time()), value(i)] for i in range(days)]
+
+
+@pytest.fixture
+def kb(tmp_path):
+    root = tmp_path / "kb"
+    root.mkdir()
+    _workbook(root / "Yields_DE.xlsx", [("10yr", [["Date", "10yr"], *_daily(30)])])
+    _workbook(root / "Yields_US.xlsx", [("10yr", [["Date", "10yr"], *_daily(20, lambda i: 4.0 + i / 100)])])
+    (root / "notes.txt").write_text("not a series")
+    return root
+
+
+def test_side_by_side_blocks_pair_with_the_date_to_their_left():
+    rows = [["Date", "DE", "US", "Date", "Spread"]]
+    for i in range(6):
+        day = START + timedelta(days=i)
+        rows.append((day, 1.0 + i, 2.0 + i, day + timedelta(days=100), 0.5))
+    rows.append((START, 9.0, 9.0, None, None))  # repeated date: the last value wins
+
+    series = {label: (dates, values) for label, dates, values in extract_sheet_series(rows)}
+    assert set(series) == {"DE", "US", "Spread"}
+    assert series["DE"][0][0] == np.datetime64(START)
+    assert series["DE"][1].tolist() == [9.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    assert series["Spread"][0][0] == np.datetime64(START + timedelta(days=100))
+
+
+def test_repeat_load_skips_parsing(kb, tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    first = TimeSeriesStore(cache)
+    assert first.load_directory(kb) == 2
+    assert (first.parsed_files, first.cached_files) == (2, 0)
+
+    def no_parsing(path):
+        raise AssertionError(f"{path} was parsed again")
+
+    monkeypatch.setattr(timeseries_store, "extract_file_series", no_parsing)
+    second = TimeSeriesStore(cache)
+    assert second.load_directory(kb) == 2
+    assert (second.parsed_files, second.cached_files) == (0, 2)
+    assert second.names() == first.names() == ["Yields_DE/10yr/10yr", "Yields_US/10yr/10yr"]
+    np.testing.assert_array_equal(second.get("Yields_DE/10yr/10yr").values, np.arange(30.0))
+
+
+def test_changed_workbook_invalidates_only_its_entry(kb, tmp_path):
+    cache = tmp_path / "cache"
+    TimeSeriesStore(cache).load_directory(kb)
+    before = {p.name for p in cache.iterdir()}
+
+    _workbook(kb / "Yields_DE.xlsx", [("10yr", [["Date", "10yr"], *_daily(31, lambda i: -float(i))])])
+    store = TimeSeriesStore(cache)
+    store.load_directory(kb)
+    assert (store.parsed_files, store.cached_files) == (1, 1)
+    assert store.get("Yields_DE/10yr/10yr").values[-1] == -30.0
+    assert store.info("Yields_US/10yr/10yr")["fingerprint"] in before
+
+    # Only the stale entry of the changed workbook is pruned
+    assert store.prune() == 1
+    after = {p.name for p in cache.iterdir()}
+    assert len(after) == 2
+    assert store.info("Yields_US/10yr/10yr")["fingerprint"] in after
+
+
+def test_get_slices_an_inclusive_date_range(kb, tmp_path):
+    store = TimeSeriesStore(tmp_path / "cache")
+    store.load_directory(kb)
+    name = "Yields_DE/10yr/10yr"
+
+    window = store.get(name, start="2024-01-05", end=date(2024, 1, 9))
+    assert window.dates[0] == np.datetime64("2024-01-05")
+    assert window.dates[-1] == np.datetime64("2024-01-09")
+    assert window.values.tolist() == [4.0, 5.0, 6.0, 7.0, 8.0]
+
+    # The second series' slice does not spill into the first one's values
+    us = store.get("Yields_US/10yr/10yr", start="2023-12-01")
+    assert len(us.dates) == 20
+    assert us.values[0] == pytest.approx(4.0)
+
+    assert len(store.get(name, start="2024-01-05", end="2024-01-04").dates) == 0
+    assert len(store.get(name, start="2025-01-01").dates) == 0
+    assert store.value_at(name, "2024-01-10") == (np.datetime64("2024-01-10"), 9.0)
+    assert store.value_at(name, "2023-12-31") is None
+
+    with pytest.raises(ValueError):
+        store.get(name, start="not a date")
+    with pytest.raises(KeyError):
+        store.get("missing")
+
+
+def test_find_matches_every_term(kb, tmp_path):
+    store = TimeSeriesStore(tmp_path / "cache")
+    store.load_directory(kb)
+    assert store.find("yields 10yr de") == ["Yields_DE/10yr/10yr"]
+    assert store.find("10YR", limit=1) == ["Yields_DE/10yr/10yr"]
@@ -0,0 +1,89 @@
+"""Tests for transcript compaction and its offset map."""
+
+import pytest
+
+from src.transcript_compaction import chunk_spans, compact_transcript
+
+RAW = ("00:00:01 so um today we look at the the yield curve. Okay guys, the\n"
+       "[00:12] curve was right, but uh the\n"
+       "spread was the spread was wide, I mean, very wide.\n"
+       "[00:15] very wide. It stayed wide.")
+
+
+def test_removes_fillers_timestamps_and_repeats():
+    compacted = compact_transcript(RAW)
+    # Single repeated words stay: they are often emphasis, not a restart. So do repeats
+    # whose first copy doesn't end a clause; only the caption overlap "very wide." goes
+    assert compacted.text == ("so today we look at the the yield curve. the curve was right, "
+                              "but the spread was the spread was wide, very wide. It stayed wide.")
+    assert compacted.removed == {"filler": 6, "timestamp": 3, "repeat": 2}
+    assert compacted.original_words == compacted.words + sum(compacted.removed.values())
+
+
+@pytest.mark.parametrize("text", [
+    "low interest rates, negative interest rates, negative real interest rates",
+    "US rates, German rates, German real rates",
+])
+def test_repeats_across_clauses_are_kept(text):
+    compacted = compact_transcript(text)
+    assert compacted.text == text
+    assert compacted.removed["repeat"] == 0
+
+
+def test_caption_overlap_is_collapsed():
+    text = "we look at the yield curve\n00:00:04 we look at the yield curve and the spread"
+    compacted = compact_transcript(text)
+    assert compacted.text == "we look at the yield curve and the spread"
+    assert compacted.removed["repeat"] == 6
+    assert compact_transcript("The curve inverted. the curve inverted, then steepened.").text == \
+        "the curve inverted, then steepened."
+
+
+def test_filler_phrases_need_a_comma_and_a_sentence_start():
+    assert compact_transcript("the trade was right, but so was I").text == "the trade was right, but so was I"
+    assert compact_transcript("Right, the trade worked. So, we hold.").text == "the trade worked. we hold."
+
+
+def test_timestamps_start_a_sentence_for_filler_phrases():
+    text = "00:00:01 Okay guys, today we look at the curve.\n[00:12] You know, it inverted."
+    assert compact_transcript(text).text == "today we look at the curve. it inverted."
+
+
+def test_offset_map_round_trips_every_kept_character():
+    compacted = compact_transcript(RAW)
+    for offset, char in enumerate(compacted.text):
+        if char != " ":
+            assert RAW[compacted.offsets.to_original(offset)] == char
+
+
+def test_spans_map_words_back_to_the_original():
+    compacted = compact_transcript(RAW)
+    for word in ("yield curve.", "right, but", "very wide."):
+        start = compacted.text.index(word)
+        original_start, original_end = compacted.offsets.span(start, start + len(word))
+        assert RAW[original_start:original_end].split() == word.split()
+
+
+def test_chunk_spans():
+    compacted = compact_transcript(RAW)
+    words = compacted.text.split()
+    chunks = [" ".join(words[:6]), " ".join(words[4:12]), "not in the text"]
+    spans = chunk_spans(compacted, chunks)
+    assert spans[2] is None
+    for chunk, (start, end) in zip(chunks, spans[:2]):
+        original = RAW[start:end].split()
+        assert original[0] == chunk.split()[0] and original[-1] == chunk.split()[-1]
+
+
+def test_empty_and_repeat_free_input():
+    empty = compact_transcript("")
+    assert (empty.text, empty.words) == ("", 0)
+    assert empty.offsets.span(0, 0) == (0, 0)
+
+    text = "we we hold the the line"
+    assert compact_transcript(text, min_repeat_words=0).text == "we we hold the the line"
+
+
+def test_invalid_repeat_bounds():
+    with pytest.raises(ValueError):
+        compact_transcript("text", min_repeat_words=5, max_repeat_words=2)
@@ -0,0 +1,138 @@
+"""Tests for yield-curve spreads, inversion episodes and the incremental monitor."""
+
+import numpy as np
+import pytest
+
+from src.yield_curve import (
+    CurveMonitor, build_curves, compute_spreads, find_episodes, real_rates, tenor_months
+)
+
+TENORS = (3.0, 24.0, 120.0, 360.0)
+COUNTRIES = ("DE", "JP")
+DAYS = 400
+
+
+@pytest.mark.parametrize("label,months", [
+    ("3mo", 3.0), ("3m", 3.0), ("18 months", 18.0), ("10yr", 120.0), ("2Y", 24.0),
+    ("0.5yr", 6.0), ("30 years", 360.0), ("O/N", 0.0), ("overnight rate", 0.0),
+    ("Yield", None), ("10yr spread", None), ("", None),
+])
+def test_tenor_months(label, months):
+    assert tenor_months(label) == months
+
+
+def _observations(seed=5):
+    """Random-walk curves whose spreads cross zero; JP reports weekly with gaps."""
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64("2020-01-01") + np.arange(DAYS)
+    level = 1.0 + np.cumsum(rng.normal(scale=0.05, size=(DAYS, len(COUNTRIES), 1)), axis=0)
+    slope = np.cumsum(rng.normal(scale=0.04, size=(DAYS, len(COUNTRIES), 1)), axis=0)
+    values = level + slope * (np.log1p(np.array(TENORS)) - 3.0)
+    values[rng.random(values.shape) < 0.05] = np.nan
+    values[np.arange(DAYS) % 7 != 0, 1] = np.nan
+    values[200:230, 1] = np.nan  # a month without JP data: longer than max_stale_days
+    return dates, values
+
+
+def _series(dates, values):
+    return {
+        country: {
+            months: (dates[~np.isnan(values[:, c, k])], values[~np.isnan(values[:, c, k]), c, k])
+            for k, months in enumerate(TENORS)
+        }
+        for c, country in enumerate(COUNTRIES)
+    }
+
+
+def _batch(dates, values, max_stale_days=10):
+    curves = build_curves(_series(dates, values), max_stale_days)
+    return curves, find_episodes(curves, compute_spreads(curves))
+
+
+def _key(episode):
+    return (episode.country, episode.spread, episode.start, episode.end, round(episode.trough, 9))
+
+
+def test_incremental_updates_match_the_batch_pass():
+    dates, values = _observations()
+    curves, expected = _batch(dates, values)
+    assert len(expected) > 5
+
+    monitor = CurveMonitor(COUNTRIES, TENORS)
+    started = []
+    for row, when in enumerate(dates):
+        started += [e for e in monitor.update(when, values[row]) if e.end is None]
+
+    closed = sorted(monitor.episodes, key=lambda e: (e.start, e.country, e.spread))
+    assert [_key(e) for e in closed] == [_key(e) for e in expected if e.end is not None]
+    assert sorted(_key(e) for e in monitor.open_episodes()) == sorted(_key(e) for e in expected if e.end is None)
+    assert [e.start for e in started] == sorted(e.start for e in started)
+    assert len(started) == len(expected)
+
+    np.testing.assert_allclose(monitor.current_spreads(), compute_spreads(curves)[-1], equal_nan=True)
+
+
+def test_history_then_updates_match_the_batch_pass():
+    dates, values = _observations(seed=9)
+    _, expected = _batch(dates, values)
+
+    split = 250
+    history, _ = _batch(dates[:split], values[:split])
+    monitor = CurveMonitor.from_history(history)
+    for row in range(split, DAYS):
+        monitor.update(dates[row], values[row])
+
+    everything = monitor.episodes + monitor.open_episodes()
+    assert sorted(_key(e) for e in everything) == sorted(_key(e) for e in expected)
+
+
+def test_stale_observations_expire_without_ending_an_inversion():
+    monitor = CurveMonitor(["US"], [24.0, 120.0], max_stale_days=10)
+    events = monitor.update("2024-01-01", [[4.5, 4.0]])
+    assert [(e.spread, e.end) for e in events] == [("2s10s", None)]
+    assert monitor.current_spreads()[0, 1] == pytest.approx(-0.5)
+
+    # Only the 10yr keeps reporting; after ten days the 2yr is stale and 2s10s unknown
+    monitor.update("2024-01-08", [[np.nan, 4.1]])
+    assert monitor.current_spreads()[0, 1] == pytest.approx(-0.4)
+    assert monitor.update("2024-01-15", [[np.nan, 4.9]]) == []
+    assert np.isnan(monitor.current_spreads()[0, 1])
+    assert len(monitor.open_episodes()) == 1
+
+    ended = monitor.update("2024-01-16", [[4.6, 4.9]])
+    assert [(e.start, e.end, e.trough) for e in ended] == [
+        (np.datetime64("2024-01-01"), np.datetime64("2024-01-16"), pytest.approx(-0.5))
+    ]
+    assert ended[0].days == 15
+    assert monitor.open_episodes() == []
+
+
+def test_updates_must_move_forward_with_the_right_shape():
+    monitor = CurveMonitor(["US"], [24.0, 120.0])
+    monitor.update("2024-01-02", [[4.0, 4.5]])
+    with pytest.raises(ValueError):
+        monitor.update("2024-01-02", [[4.0, 4.5]])
+    with pytest.raises(ValueError):
+        monitor.update("2024-01-03", [4.0, 4.5])
+
+
+def test_state_round_trips_through_json(tmp_path):
+    dates, values = _observations()
+    monitor = CurveMonitor(COUNTRIES, TENORS)
+    for row in range(300):
+        monitor.update(dates[row], values[row])
+    path = tmp_path / "monitor.json"
+    monitor.save(path)
+
+    restored = CurveMonitor.load(path)
+    for row in range(300, DAYS):
+        assert [_key(e) for e in restored.update(dates[row], values[row])] == \
+            [_key(e) for e in monitor.update(dates[row], values[row])]
+    assert [_key(e) for e in restored.episodes] == [_key(e) for e in monitor.episodes]
+
+
+def test_real_rates_use_the_latest_print():
+    nominal_dates = np.array(["2024-01-15", "2024-02-15", "2024-06-15"], dtype="datetime64[D]")
+    cpi_dates = np.array(["2024-01-01", "2024-02-01"], dtype="datetime64[D]")
+    real = real_rates(nominal_dates, np.array([4.0, 4.2, 4.4]), cpi_dates, np.array([3.0, 2.5]), max_lag_days=62)
+    np.testing.assert_allclose(real, [1.0, 1.7, np.nan])